@@ -0,0 +1,102 @@
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from academics.models import AcademicYear, Branch, Program, Semester, StudentEnrollment
+from academics.rollover import rollover_semester, semester_order
+from core.models import Institute, Student, User
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare a row-by-row ORM semester promotion with the set-based rollover on synthetic students'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=100000)
+        parser.add_argument('--sample', type=int, default=5000,
+                            help='Enrollments promoted row by row; the full run time is extrapolated')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                program = self.seed(options['students'])
+                self.run(program, options['students'], options['sample'])
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Synthetic data rolled back')
+
+    def seed(self, count):
+        started = time.perf_counter()
+        institute = Institute.objects.create(name='Rollover Benchmark', subdomain='rollover-benchmark', code='RLBENCH',
+                                             address='-', phone='0', email='bench@example.com',
+                                             established_date=date(2000, 1, 1))
+        program = Program.objects.create(institute=institute, name='Benchmark Program', code='BENCH', duration_years=4)
+        branch = Branch.objects.create(program=program, name='Benchmark Branch', code='BENCH')
+        term = date(2026, 1, 5)
+        current = []
+        for year in range(1, 5):
+            academic_year = AcademicYear.objects.create(program=program, year_number=year, name=f'Year {year}')
+            for number in (2 * year - 1, 2 * year):
+                semester = Semester.objects.create(
+                    academic_year=academic_year, semester_number=number, name=f'Semester {number}',
+                    start_date=term, end_date=term + timedelta(days=150), is_current=number % 2 == 1)
+                if semester.is_current:
+                    current.append(semester)
+
+        password = make_password(None)
+        for offset in range(0, count, 10000):
+            size = min(10000, count - offset)
+            users = User.objects.bulk_create([
+                User(username=f'rollover{offset + i}', email=f'rollover{offset + i}@example.com', password=password)
+                for i in range(size)
+            ])
+            students = Student.objects.bulk_create([
+                Student(user=user, enrollment_number=f'RB{offset + i:08d}', admission_date=term)
+                for i, user in enumerate(users)
+            ])
+            StudentEnrollment.objects.bulk_create([
+                StudentEnrollment(student=student, program=program, branch=branch,
+                                  current_semester=current[(offset + i) % len(current)], enrollment_date=term)
+                for i, student in enumerate(students)
+            ])
+        self.stdout.write(f'Seeded {count} students in {time.perf_counter() - started:.1f}s')
+        return program
+
+    def run(self, program, count, sample):
+        semesters = semester_order(program)
+        following = {semester.pk: semesters[i + 1] if i + 1 < len(semesters) else None
+                     for i, semester in enumerate(semesters) if semester.is_current}
+
+        sid = transaction.savepoint()
+        started = time.perf_counter()
+        enrollments = StudentEnrollment.objects.filter(program=program, is_active=True).select_related('student')
+        for enrollment in enrollments[:sample]:
+            target = following[enrollment.current_semester_id]
+            if target is None:
+                enrollment.is_active = False
+                enrollment.graduation_date = date(2026, 6, 4)
+                enrollment.student.status = 'graduated'
+                enrollment.student.save()
+            else:
+                enrollment.current_semester = target
+            enrollment.save()
+        per_row = (time.perf_counter() - started) / min(sample, count)
+        transaction.savepoint_rollback(sid)
+        self.stdout.write(f'Row by row: {per_row * 1000:.2f} ms per student, '
+                          f'~{per_row * count:.0f}s extrapolated to {count} students')
+
+        started = time.perf_counter()
+        summary = rollover_semester(program, date(2026, 7, 6))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Set-based rollover: {elapsed:.2f}s (promoted {summary['promoted']}, graduated {summary['graduated']})"))
+        started = time.perf_counter()
+        summary = rollover_semester(program, date(2026, 7, 6))
+        self.stdout.write(f"Repeat run: {(time.perf_counter() - started) * 1000:.1f} ms, "
+                          f"already done: {summary['already_done']}")
@@ -0,0 +1,39 @@
+import json
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.models import Program
+from academics.rollover import RolloverError, rollover_semester
+
+
+class Command(BaseCommand):
+    help = "Promote every student of a program into the next term and move the current semester flag"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--program', type=int, action='append', help='Program ids (default: all active programs)')
+        parser.add_argument('--term-start', type=date.fromisoformat, required=True,
+                            help='First day of the new term (YYYY-MM-DD)')
+        parser.add_argument('--term-end', type=date.fromisoformat, help='Last day of the new term (YYYY-MM-DD)')
+        parser.add_argument('--dry-run', action='store_true', help='Show the changes without writing them')
+
+    def handle(self, *args, **options):
+        programs = Program.objects.filter(is_active=True).order_by('pk')
+        if options['program']:
+            programs = programs.filter(pk__in=options['program'])
+        for program in programs:
+            try:
+                summary = rollover_semester(program, options['term_start'], options['term_end'],
+                                            dry_run=options['dry_run'])
+            except RolloverError as e:
+                raise CommandError(f'{program.code}: {e}')
+            if summary['already_done']:
+                self.stdout.write(f'{program.code}: already rolled over into {options["term_start"]}')
+                continue
+            if options['dry_run']:
+                self.stdout.write(f'{program.code} (dry run):')
+                self.stdout.write(json.dumps(summary, indent=2))
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f"{program.code}: promoted {summary['promoted']}, graduated {summary['graduated']}, "
+                f"cloned {len(summary['offerings_created'])} offerings"))
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:52
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_user_search_vector_and_more'),
+        ('academics', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subject',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='subject',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='academics_s_search__8e90ae_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='subject',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='academics_subject_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
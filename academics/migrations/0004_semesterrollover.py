@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('academics', '0003_subject_search_vector_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SemesterRollover',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term_start', models.DateField(help_text='Start date of the term students were promoted into')),
+                ('summary', models.JSONField(default=dict)),
+                ('performed_at', models.DateTimeField(auto_now_add=True)),
+                ('performed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='semester_rollovers', to=settings.AUTH_USER_MODEL)),
+                ('program', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollovers', to='academics.program')),
+            ],
+            options={
+                'unique_together': {('program', 'term_start')},
+            },
+        ),
+    ]
@@ -1,5 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
-from core.models import Institute, Student, Faculty
+from core.models import Institute, User, Student, Faculty
 
 
 class Program(models.Model):
@@ -91,9 +93,14 @@ class Subject(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         unique_together = ['branch', 'semester', 'code']
+        indexes = [
+            GinIndex(fields=['search_vector']),
+            GinIndex(name='academics_subject_name_trgm', fields=['name'], opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.code})"
@@ -116,3 +123,18 @@ class StudentEnrollment(models.Model):
 
     def __str__(self):
         return f"{self.student.user.get_full_name()} - {self.branch.name}"
+
+
+class SemesterRollover(models.Model):
+    """Record of a completed semester rollover, so repeating it is a no-op"""
+    program = models.ForeignKey(Program, on_delete=models.CASCADE, related_name='rollovers')
+    term_start = models.DateField(help_text="Start date of the term students were promoted into")
+    summary = models.JSONField(default=dict)
+    performed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='semester_rollovers')
+    performed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['program', 'term_start']
+
+    def __str__(self):
+        return f"{self.program.name} rollover into {self.term_start}"
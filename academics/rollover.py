@@ -0,0 +1,126 @@
+"""
+End-of-term promotion of a whole program in one transaction.
+
+Students in the program's current semesters move to the next semester (by
+academic year, then semester number) and those in the final semester
+graduate, each with a single set-based UPDATE. The current flag moves to the
+next semesters, which take the new term's dates, and offerings missing for
+their subjects are cloned from each subject's latest offering. The rollover
+is recorded per (program, term start), so repeating it changes nothing.
+"""
+from django.db import connection, transaction
+from django.db.models import Count
+
+from courses.models import CourseOffering
+from .models import Program, Semester, StudentEnrollment, Subject, SemesterRollover
+
+
+class RolloverError(Exception):
+    pass
+
+
+def semester_order(program):
+    return list(Semester.objects.filter(academic_year__program=program, is_active=True)
+                .select_related('academic_year').order_by('academic_year__year_number', 'semester_number'))
+
+
+def _offerings_to_clone(targets):
+    """
+    Copy each subject's latest offering into the target semesters where it has none.
+
+    Returns the unsaved offerings, labels for them and the codes of subjects
+    that were never offered and so have no faculty to clone.
+    """
+    subjects = Subject.objects.filter(semester__in=targets, is_active=True).exclude(
+        offerings__semester_id__in=[semester.pk for semester in targets]).values_list('pk', 'semester_id', 'code')
+    subjects = {subject_id: (semester_id, code) for subject_id, semester_id, code in subjects}
+    latest = (CourseOffering.objects.filter(subject_id__in=subjects)
+              .order_by('subject_id', 'section', '-created_at').distinct('subject_id', 'section'))
+    clones = [
+        CourseOffering(subject_id=source.subject_id, semester_id=subjects[source.subject_id][0],
+                       faculty_id=source.faculty_id, section=source.section, max_enrollment=source.max_enrollment,
+                       room_number=source.room_number, schedule=source.schedule)
+        for source in latest
+    ]
+    cloned = {clone.subject_id for clone in clones}
+    labels = [f'{subjects[clone.subject_id][1]}-{clone.section}' for clone in clones]
+    unstaffed = sorted(code for subject_id, (_, code) in subjects.items() if subject_id not in cloned)
+    return clones, labels, unstaffed
+
+
+def rollover_semester(program, term_start, term_end=None, dry_run=False, user=None):
+    """
+    Promote ``program`` into the term starting ``term_start`` and return a summary of the changes.
+
+    With ``dry_run`` the summary is computed but nothing is written. If this
+    rollover was already performed, the recorded summary is returned with
+    ``already_done`` set.
+    """
+    with transaction.atomic():
+        program = Program.objects.select_for_update().get(pk=program.pk if isinstance(program, Program) else program)
+        done = SemesterRollover.objects.filter(program=program, term_start=term_start).first()
+        if done:
+            return {**done.summary, 'already_done': True, 'applied': False}
+
+        semesters = semester_order(program)
+        following = {
+            semester.pk: (semesters[i + 1] if i + 1 < len(semesters) else None)
+            for i, semester in enumerate(semesters) if semester.is_current
+        }
+        if not following:
+            raise RolloverError(f'{program.name} has no current semester')
+        current = [semester for semester in semesters if semester.pk in following]
+        if term_start <= max(semester.start_date for semester in current):
+            raise RolloverError('The new term must start after the current one')
+        if term_end is None:
+            term_end = term_start + max(semester.end_date - semester.start_date for semester in current)
+        targets = list({target.pk: target for target in following.values() if target}.values())
+
+        counts = dict(StudentEnrollment.objects.filter(program=program, is_active=True, current_semester__in=current)
+                      .values('current_semester_id').annotate(n=Count('id')).values_list('current_semester_id', 'n'))
+        clones, cloned, unstaffed = _offerings_to_clone(targets)
+        summary = {
+            'program': program.pk,
+            'term_start': term_start.isoformat(),
+            'term_end': term_end.isoformat(),
+            'promotions': [
+                {'from': semester.name, 'to': following[semester.pk].name if following[semester.pk] else None,
+                 'students': counts.get(semester.pk, 0)}
+                for semester in current
+            ],
+            'promoted': sum(counts.get(pk, 0) for pk, target in following.items() if target),
+            'graduated': sum(counts.get(pk, 0) for pk, target in following.items() if target is None),
+            'current_semesters': [target.name for target in targets],
+            'offerings_created': cloned,
+            'subjects_without_offering': unstaffed,
+        }
+        if dry_run:
+            return {**summary, 'already_done': False, 'applied': False}
+
+        final = [pk for pk, target in following.items() if target is None]
+        graduated_on = max((semester.end_date for semester in current if semester.pk in final), default=None)
+        moves = [(pk, target.pk) for pk, target in following.items() if target]
+        with connection.cursor() as cursor:
+            if final:
+                cursor.execute('''
+                    UPDATE core_student s SET status = 'graduated', graduation_date = %s, updated_at = now()
+                    FROM academics_studentenrollment e
+                    WHERE e.student_id = s.id AND e.program_id = %s AND e.is_active AND e.current_semester_id = ANY(%s)
+                ''', [graduated_on, program.pk, final])
+                cursor.execute('''
+                    UPDATE academics_studentenrollment SET is_active = false, graduation_date = %s, updated_at = now()
+                    WHERE program_id = %s AND is_active AND current_semester_id = ANY(%s)
+                ''', [graduated_on, program.pk, final])
+            if moves:
+                cursor.execute('''
+                    UPDATE academics_studentenrollment e SET current_semester_id = m.to_id, updated_at = now()
+                    FROM unnest(%s::bigint[], %s::bigint[]) AS m (from_id, to_id)
+                    WHERE e.current_semester_id = m.from_id AND e.program_id = %s AND e.is_active
+                ''', [[pk for pk, _ in moves], [pk for _, pk in moves], program.pk])
+
+        Semester.objects.filter(pk__in=following).update(is_current=False)
+        Semester.objects.filter(pk__in=[target.pk for target in targets]).update(
+            is_current=True, start_date=term_start, end_date=term_end)
+        CourseOffering.objects.bulk_create(clones, ignore_conflicts=True)
+        SemesterRollover.objects.create(program=program, term_start=term_start, summary=summary, performed_by=user)
+        return {**summary, 'already_done': False, 'applied': True}
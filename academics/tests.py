@@ -1,3 +1,73 @@
+from datetime import date
+
 from django.test import TestCase
 
-# Create your tests here.
+from core.models import Student
+from courses.models import CourseOffering
+from courses.tests import build_offering
+from .models import AcademicYear, Semester, SemesterRollover, StudentEnrollment, Subject
+from .rollover import RolloverError, rollover_semester
+
+
+class RolloverTests(TestCase):
+    """A rollover promotes, graduates and clones offerings once; repeating it changes nothing"""
+
+    @classmethod
+    def setUpTestData(cls):
+        offering, _, users = build_offering('RO', students=3)
+        cls.first = offering.semester
+        cls.program = cls.first.academic_year.program
+        branch = offering.subject.branch
+        cls.second = Semester.objects.create(academic_year=cls.first.academic_year, semester_number=2,
+                                             name='Semester 2', start_date=date(2027, 1, 1), end_date=date(2027, 5, 31))
+        final_year = AcademicYear.objects.create(program=cls.program, year_number=2, name='Second Year')
+        cls.final = Semester.objects.create(academic_year=final_year, semester_number=1, name='Semester 3',
+                                            start_date=date(2026, 7, 1), end_date=date(2026, 12, 15), is_current=True)
+        # Taught last term in the first semester, so the rollover clones it into the second
+        cls.subject = Subject.objects.create(branch=branch, semester=cls.second, code='CS102RO', name='Algorithms',
+                                             credits=4)
+        CourseOffering.objects.create(subject=cls.subject, semester=cls.first, faculty=offering.faculty, section='B')
+        cls.students = [user.student_profile for user in users]
+        for student, semester in zip(cls.students, (cls.first, cls.first, cls.final)):
+            StudentEnrollment.objects.create(student=student, program=cls.program, branch=branch,
+                                             current_semester=semester, enrollment_date=date(2026, 7, 1))
+
+    def state(self):
+        return (
+            list(StudentEnrollment.objects.order_by('student_id').values_list('current_semester_id', 'is_active')),
+            list(Student.objects.filter(pk__in=[student.pk for student in self.students]).order_by('pk')
+                 .values_list('status', 'graduation_date')),
+            list(Semester.objects.filter(is_current=True).order_by('pk').values_list('pk', 'start_date', 'end_date')),
+            CourseOffering.objects.filter(subject=self.subject).count(),
+        )
+
+    def test_promotes_graduates_and_clones(self):
+        summary = rollover_semester(self.program, date(2027, 1, 4))
+        self.assertEqual((summary['applied'], summary['promoted'], summary['graduated']), (True, 2, 1))
+        self.assertEqual(summary['offerings_created'], ['CS102RO-B'])
+        enrollments, students, current, offerings = self.state()
+        self.assertEqual(enrollments, [(self.second.pk, True), (self.second.pk, True), (self.final.pk, False)])
+        self.assertEqual(students[2], ('graduated', date(2026, 12, 15)))
+        self.assertEqual(current, [(self.second.pk, date(2027, 1, 4), date(2027, 6, 20))])
+        self.assertEqual(offerings, 2)
+
+    def test_repeating_a_rollover_changes_nothing(self):
+        first = rollover_semester(self.program, date(2027, 1, 4))
+        before = self.state()
+        again = rollover_semester(self.program, date(2027, 1, 4))
+        self.assertEqual((again['already_done'], again['applied']), (True, False))
+        self.assertEqual({key: again[key] for key in first if key not in ('already_done', 'applied')},
+                         {key: first[key] for key in first if key not in ('already_done', 'applied')})
+        self.assertEqual(self.state(), before)
+        self.assertEqual(SemesterRollover.objects.filter(program=self.program).count(), 1)
+
+    def test_dry_run_writes_nothing(self):
+        before = self.state()
+        summary = rollover_semester(self.program, date(2027, 1, 4), dry_run=True)
+        self.assertEqual((summary['applied'], summary['promoted']), (False, 2))
+        self.assertEqual(self.state(), before)
+        self.assertFalse(SemesterRollover.objects.exists())
+
+    def test_new_term_must_start_after_the_current_one(self):
+        with self.assertRaises(RolloverError):
+            rollover_semester(self.program, date(2026, 7, 1))
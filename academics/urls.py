@@ -6,5 +6,6 @@ router = DefaultRouter()
 # We'll add viewsets here later
 
 urlpatterns = [
+    path('rollover/', views.rollover_semester, name='rollover-semester'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
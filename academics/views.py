@@ -1,3 +1,29 @@
-from django.shortcuts import render
+from datetime import date
 
-# Create your views here.
+from rest_framework import status, permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .models import Program
+from .rollover import RolloverError, rollover_semester as perform_rollover
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAdminUser])
+def rollover_semester(request):
+    """Promote a program's students into the next term; pass dry_run to preview the changes"""
+    program = Program.objects.filter(pk=request.data.get('program')).first()
+    if program is None:
+        return Response({'error': 'Program not found'}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        term_start = date.fromisoformat(request.data.get('term_start', ''))
+        term_end = date.fromisoformat(request.data['term_end']) if request.data.get('term_end') else None
+    except (TypeError, ValueError):
+        return Response({'error': 'term_start (and term_end) must be dates in YYYY-MM-DD format'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    try:
+        summary = perform_rollover(program, term_start, term_end,
+                                   dry_run=bool(request.data.get('dry_run')), user=request.user)
+    except RolloverError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(summary, status=status.HTTP_200_OK if not summary['applied'] else status.HTTP_201_CREATED)
@@ -0,0 +1,208 @@
+"""
+Attendance of an offering as a students × sessions bit matrix.
+
+Each student of an offering owns a fixed bit position (``AttendanceMatrix``)
+and each session stores one bitset per status (``SessionBitmap``), so
+per-student counts, streaks and runs of absences are computed with bitwise
+operations on Python integers instead of scanning one row per cell.
+"""
+from django.db import transaction
+
+from courses.models import AttendanceRecord, AttendanceSession
+from .models import AttendanceMatrix, SessionBitmap
+
+STATUSES = [status for status, _ in AttendanceRecord.status_choices]
+
+
+def to_int(data):
+    return int.from_bytes(data, 'little')
+
+
+def to_bytes(bits):
+    return bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+
+
+def slot_for(course_offering_id, student_id):
+    """Return the student's bit position in the offering, assigning the next free one if needed"""
+    matrix, _ = AttendanceMatrix.objects.get_or_create(course_offering_id=course_offering_id)
+    if student_id in matrix.student_ids:
+        return matrix.student_ids.index(student_id)
+    matrix = AttendanceMatrix.objects.select_for_update().get(pk=matrix.pk)
+    if student_id not in matrix.student_ids:
+        matrix.student_ids.append(student_id)
+        matrix.save(update_fields=['student_ids', 'updated_at'])
+    return matrix.student_ids.index(student_id)
+
+
+def bitmap_defaults(session):
+    return {
+        'course_offering_id': session.course_offering_id,
+        'session_date': session.session_date,
+        'session_time': session.session_time,
+        'is_mandatory': session.is_mandatory,
+    }
+
+
+@transaction.atomic
+def set_status(attendance_session_id, student_id, status):
+    """Mark ``student_id`` with ``status`` in the session bitmap; ``None`` clears the student"""
+    if status is None:
+        # Deletes may cascade from the session itself, so only touch a bitmap that still exists
+        bitmap = SessionBitmap.objects.select_for_update().filter(attendance_session_id=attendance_session_id).first()
+        student_ids = bitmap and AttendanceMatrix.objects.filter(
+            course_offering_id=bitmap.course_offering_id).values_list('student_ids', flat=True).first()
+        if not student_ids or student_id not in student_ids:
+            return
+        bit = 1 << student_ids.index(student_id)
+    else:
+        session = AttendanceSession.objects.only(
+            'course_offering_id', 'session_date', 'session_time', 'is_mandatory').get(pk=attendance_session_id)
+        bit = 1 << slot_for(session.course_offering_id, student_id)
+        SessionBitmap.objects.get_or_create(attendance_session=session, defaults=bitmap_defaults(session))
+        bitmap = SessionBitmap.objects.select_for_update().get(attendance_session=session)
+    for name in STATUSES:
+        bits = to_int(getattr(bitmap, name))
+        setattr(bitmap, name, to_bytes(bits | bit if name == status else bits & ~bit))
+    bitmap.save(update_fields=STATUSES)
+
+
+@transaction.atomic
+def rebuild_offering(course_offering_id):
+    """Recreate an offering's bitmaps from its attendance records; returns the number of sessions"""
+    matrix, _ = AttendanceMatrix.objects.get_or_create(course_offering_id=course_offering_id)
+    matrix = AttendanceMatrix.objects.select_for_update().get(pk=matrix.pk)
+    slots = {student_id: slot for slot, student_id in enumerate(matrix.student_ids)}
+    sessions = {
+        session.pk: (session, dict.fromkeys(STATUSES, 0))
+        for session in AttendanceSession.objects.filter(course_offering_id=course_offering_id)
+    }
+    records = AttendanceRecord.objects.filter(attendance_session__course_offering_id=course_offering_id).values_list(
+        'attendance_session_id', 'student_id', 'status').order_by('student_id')
+    for session_id, student_id, status in records.iterator():
+        if student_id not in slots:
+            slots[student_id] = len(matrix.student_ids)
+            matrix.student_ids.append(student_id)
+        sessions[session_id][1][status] |= 1 << slots[student_id]
+    matrix.save(update_fields=['student_ids', 'updated_at'])
+
+    SessionBitmap.objects.filter(course_offering_id=course_offering_id).delete()
+    SessionBitmap.objects.bulk_create([
+        SessionBitmap(attendance_session=session, **bitmap_defaults(session),
+                      **{name: to_bytes(bits) for name, bits in statuses.items()})
+        for session, statuses in sessions.values()
+    ])
+    return len(sessions)
+
+
+def column_counts(bitsets, width):
+    """
+    Count, for every bit position below ``width``, how many of ``bitsets`` have it set.
+
+    The counts are accumulated as a bit-sliced binary counter (plane k holds
+    bit k of every position's count), so adding one bitset costs a handful of
+    big-integer operations regardless of the number of students.
+    """
+    planes = []
+    for carry in bitsets:
+        for k, plane in enumerate(planes):
+            planes[k] = plane ^ carry
+            carry &= plane
+            if not carry:
+                break
+        else:
+            if carry:
+                planes.append(carry)
+    return [sum(((plane >> slot) & 1) << k for k, plane in enumerate(planes)) for slot in range(width)]
+
+
+def union(session, statuses):
+    """Students of a session whose status is one of ``statuses``"""
+    bits = 0
+    for status in statuses:
+        bits |= session[status]
+    return bits
+
+
+def set_positions(bits):
+    positions = []
+    while bits:
+        low = bits & -bits
+        positions.append(low.bit_length() - 1)
+        bits ^= low
+    return positions
+
+
+class OfferingAttendance:
+    """In-memory bit matrix of one offering's sessions, oldest first"""
+
+    def __init__(self, student_ids, sessions):
+        self.student_ids = student_ids
+        self.sessions = sessions
+
+    @classmethod
+    def load(cls, course_offering_id, start=None, end=None, mandatory_only=True):
+        return cls.load_many([course_offering_id], start, end, mandatory_only)[course_offering_id]
+
+    @classmethod
+    def load_many(cls, course_offering_ids, start=None, end=None, mandatory_only=True):
+        """Load several offerings with two queries; returns ``{course_offering_id: OfferingAttendance}``"""
+        loaded = {offering_id: cls([], []) for offering_id in course_offering_ids}
+        for offering_id, student_ids in AttendanceMatrix.objects.filter(
+                course_offering_id__in=course_offering_ids).values_list('course_offering_id', 'student_ids'):
+            loaded[offering_id].student_ids = student_ids
+        bitmaps = SessionBitmap.objects.filter(course_offering_id__in=course_offering_ids)
+        if start:
+            bitmaps = bitmaps.filter(session_date__gte=start)
+        if end:
+            bitmaps = bitmaps.filter(session_date__lte=end)
+        if mandatory_only:
+            bitmaps = bitmaps.filter(is_mandatory=True)
+        for row in bitmaps.order_by('session_date', 'session_time').values('course_offering_id', *STATUSES):
+            loaded[row['course_offering_id']].sessions.append({name: to_int(row[name]) for name in STATUSES})
+        return loaded
+
+    @property
+    def width(self):
+        return len(self.student_ids)
+
+    def attended(self):
+        return [union(s, AttendanceRecord.attended_statuses) for s in self.sessions]
+
+    def marked(self):
+        return [union(s, STATUSES) for s in self.sessions]
+
+    def percentages(self):
+        """``{student_id: (attended, marked, percentage)}`` over the sessions each student was marked in"""
+        attended = column_counts(self.attended(), self.width)
+        marked = column_counts(self.marked(), self.width)
+        return {
+            student_id: (attended[slot], marked[slot],
+                         round(attended[slot] * 100.0 / marked[slot], 2) if marked[slot] else None)
+            for slot, student_id in enumerate(self.student_ids)
+        }
+
+    def streaks(self):
+        """``{student_id: n}`` where n is the number of most recent sessions attended without a break"""
+        running, prefixes = -1, []
+        for bits in reversed(self.attended()):
+            running &= bits
+            if not running:
+                break
+            prefixes.append(running)
+        return dict(zip(self.student_ids, column_counts(prefixes, self.width)))
+
+    def absent_runs(self, length=3, latest_only=False):
+        """Students absent in ``length`` consecutive sessions, anywhere or ending at the latest session"""
+        if length < 1:
+            raise ValueError('length must be at least 1')
+        absent = [s['absent'] for s in self.sessions]
+        starts = [len(absent) - length] if latest_only else range(len(absent) - length + 1)
+        flagged = 0
+        for start in starts:
+            if start < 0:
+                continue
+            window = -1
+            for bits in absent[start:start + length]:
+                window &= bits
+            flagged |= window
+        return [self.student_ids[slot] for slot in set_positions(flagged)]
@@ -0,0 +1,75 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Q
+
+from analytics.bitmaps import OfferingAttendance, rebuild_offering
+from analytics.models import AttendanceMatrix
+from courses.models import AttendanceRecord, CourseOffering
+
+
+class Command(BaseCommand):
+    help = 'Compare attendance analytics from bitmaps with SQL aggregation over current-semester offerings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--offerings', type=int, default=200)
+        parser.add_argument('--run', type=int, default=3, help='Length of the absence run to detect')
+
+    def handle(self, *args, **options):
+        offering_ids = list(CourseOffering.objects.filter(semester__is_current=True)
+                            .order_by('pk').values_list('pk', flat=True)[:options['offerings']])
+        if not offering_ids:
+            raise CommandError('No current-semester course offerings')
+        missing = set(offering_ids) - set(AttendanceMatrix.objects.filter(
+            course_offering_id__in=offering_ids).values_list('course_offering_id', flat=True))
+        for offering_id in missing:
+            rebuild_offering(offering_id)
+        run = options['run']
+
+        started = time.perf_counter()
+        sql_percentages = {
+            (row['attendance_session__course_offering_id'], row['student_id']):
+                round(row['attended'] * 100.0 / row['marked'], 2)
+            for row in AttendanceRecord.objects.filter(
+                attendance_session__course_offering_id__in=offering_ids, attendance_session__is_mandatory=True)
+            .values('attendance_session__course_offering_id', 'student_id')
+            .annotate(marked=Count('id'),
+                      attended=Count('id', filter=Q(status__in=AttendanceRecord.attended_statuses)))
+        }
+        lags = ', '.join(f'lag(r.status, {i}) OVER w AS prev{i}' for i in range(1, run))
+        with connection.cursor() as cursor:
+            cursor.execute(f'''
+                SELECT DISTINCT course_offering_id, student_id FROM (
+                    SELECT s.course_offering_id, r.student_id, r.status{', ' + lags if lags else ''}
+                    FROM courses_attendancerecord r
+                    JOIN courses_attendancesession s ON s.id = r.attendance_session_id
+                    WHERE s.course_offering_id = ANY(%s) AND s.is_mandatory
+                    WINDOW w AS (PARTITION BY s.course_offering_id, r.student_id
+                                 ORDER BY s.session_date, s.session_time)
+                ) runs
+                WHERE status = 'absent' {''.join(f" AND prev{i} = 'absent'" for i in range(1, run))}
+            ''', [offering_ids])
+            sql_runs = set(cursor.fetchall())
+        sql_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        bitmap_percentages, bitmap_runs, students, sessions = {}, set(), 0, 0
+        for offering_id, attendance in OfferingAttendance.load_many(offering_ids).items():
+            for student_id, (_, marked, percentage) in attendance.percentages().items():
+                if marked:
+                    bitmap_percentages[offering_id, student_id] = percentage
+            bitmap_runs.update((offering_id, student_id) for student_id in attendance.absent_runs(run))
+            attendance.streaks()
+            students += attendance.width
+            sessions += len(attendance.sessions)
+        bitmap_elapsed = time.perf_counter() - started
+
+        self.stdout.write(f'{len(offering_ids)} offerings, {sessions} sessions, {students} student slots')
+        self.stdout.write(f'SQL aggregation: {sql_elapsed * 1000:.1f} ms (percentages and absence runs)')
+        self.stdout.write(f'Bitmaps: {bitmap_elapsed * 1000:.1f} ms (percentages, absence runs and streaks)')
+        if sql_percentages != bitmap_percentages or sql_runs != bitmap_runs:
+            self.stdout.write(self.style.WARNING(
+                'Results differ; rebuild_attendance_bitmaps may be needed, and SQL runs skip unmarked sessions'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Results match ({len(sql_runs)} students with {run} absences in a row)'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from courses.models import CourseOffering
+from analytics.bitmaps import rebuild_offering
+
+
+class Command(BaseCommand):
+    help = 'Rebuild attendance bitmaps from attendance records'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--offering', type=int, action='append', help='Only these course offering ids')
+        parser.add_argument('--current', action='store_true', help='Only offerings of current semesters')
+
+    def handle(self, *args, **options):
+        offerings = CourseOffering.objects.order_by('pk')
+        if options['offering']:
+            offerings = offerings.filter(pk__in=options['offering'])
+        if options['current']:
+            offerings = offerings.filter(semester__is_current=True)
+        total = 0
+        for offering_id in offerings.values_list('pk', flat=True).iterator():
+            total += rebuild_offering(offering_id)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt bitmaps for {total} sessions'))
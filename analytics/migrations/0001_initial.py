@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('courses', '0006_partition_attendancerecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceMatrix',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student_ids', models.JSONField(default=list, help_text='Bit i of every session bitmap belongs to student_ids[i]')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course_offering', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_matrix', to='courses.courseoffering')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SessionBitmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_date', models.DateField()),
+                ('session_time', models.TimeField()),
+                ('is_mandatory', models.BooleanField(default=True)),
+                ('present', models.BinaryField(default=b'')),
+                ('absent', models.BinaryField(default=b'')),
+                ('late', models.BinaryField(default=b'')),
+                ('excused', models.BinaryField(default=b'')),
+                ('attendance_session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='bitmap', to='courses.attendancesession')),
+                ('course_offering', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_bitmaps', to='courses.courseoffering')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course_offering', 'session_date', 'session_time'], name='analytics_s_course__27d3da_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import models
+from courses.models import CourseOffering, AttendanceSession
+
+
+class AttendanceMatrix(models.Model):
+    """Bit positions of an offering's students in its attendance bitmaps"""
+    course_offering = models.OneToOneField(CourseOffering, on_delete=models.CASCADE, related_name='attendance_matrix')
+    student_ids = models.JSONField(default=list, help_text="Bit i of every session bitmap belongs to student_ids[i]")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.course_offering} ({len(self.student_ids)} students)"
+
+
+class SessionBitmap(models.Model):
+    """Attendance of one session packed as one little-endian bitset per status"""
+    attendance_session = models.OneToOneField(AttendanceSession, on_delete=models.CASCADE, related_name='bitmap')
+    course_offering = models.ForeignKey(CourseOffering, on_delete=models.CASCADE, related_name='attendance_bitmaps')
+    session_date = models.DateField()
+    session_time = models.TimeField()
+    is_mandatory = models.BooleanField(default=True)
+    present = models.BinaryField(default=b'')
+    absent = models.BinaryField(default=b'')
+    late = models.BinaryField(default=b'')
+    excused = models.BinaryField(default=b'')
+
+    class Meta:
+        indexes = [models.Index(fields=['course_offering', 'session_date', 'session_time'])]
+
+    def __str__(self):
+        return f"Bitmap for {self.attendance_session}"
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from courses.models import AttendanceRecord, AttendanceSession
+from .bitmaps import bitmap_defaults, set_status
+from .models import SessionBitmap
+
+
+@receiver(post_save, sender=AttendanceRecord)
+def set_attendance_bit(sender, instance, **kwargs):
+    set_status(instance.attendance_session_id, instance.student_id, instance.status)
+
+
+@receiver(post_delete, sender=AttendanceRecord)
+def clear_attendance_bit(sender, instance, **kwargs):
+    set_status(instance.attendance_session_id, instance.student_id, None)
+
+
+@receiver(post_save, sender=AttendanceSession)
+def sync_session_bitmap(sender, instance, created, **kwargs):
+    if not created:
+        SessionBitmap.objects.filter(attendance_session=instance).update(**bitmap_defaults(instance))
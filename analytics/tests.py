@@ -0,0 +1,58 @@
+from datetime import date, time, timedelta
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from courses.models import AttendanceRecord, AttendanceSession
+from courses.tests import build_offering
+from .bitmaps import OfferingAttendance
+
+
+class OfferingAttendanceTests(TestCase):
+    """Bitmaps kept up to date by the record signals answer percentages, streaks and absence runs"""
+
+    # Per student, oldest session first
+    STATUSES = [
+        ['present', 'present', 'absent', 'present', 'late'],
+        ['absent', 'absent', 'absent', 'present', 'absent'],
+        ['present', 'excused', 'absent', 'absent', 'absent'],
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.offering, cls.teacher, users = build_offering('AN', students=3)
+        cls.students = [user.student_profile for user in users]
+        for day, column in enumerate(zip(*cls.STATUSES)):
+            session = AttendanceSession.objects.create(course_offering=cls.offering, topic_covered=f'Week {day}',
+                                                       session_date=date(2026, 7, 6) + timedelta(days=day),
+                                                       session_time=time(9))
+            for student, status in zip(cls.students, column):
+                AttendanceRecord.objects.create(attendance_session=session, student=student, status=status)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+        self.url = f'/api/analytics/offerings/{self.offering.pk}/attendance/'
+
+    def test_percentages_streaks_and_runs(self):
+        attendance = OfferingAttendance.load(self.offering.pk)
+        first, second, third = (student.pk for student in self.students)
+        self.assertEqual(attendance.percentages()[first], (4, 5, 80.0))
+        self.assertEqual(attendance.percentages()[third], (2, 5, 40.0))
+        self.assertEqual(attendance.streaks(), {first: 2, second: 0, third: 0})
+        self.assertEqual(sorted(attendance.absent_runs(3)), [second, third])
+        self.assertEqual(attendance.absent_runs(3, latest_only=True), [third])
+
+    def test_run_must_be_positive(self):
+        attendance = OfferingAttendance.load(self.offering.pk)
+        for length in (0, -1):
+            with self.assertRaises(ValueError):
+                attendance.absent_runs(length)
+        for run in ('0', '-2', 'x'):
+            self.assertEqual(self.client.get(self.url, {'run': run}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'run': 1}).status_code, 200)
+
+    def test_only_offering_faculty(self):
+        client = APIClient()
+        client.force_authenticate(self.students[0].user)
+        self.assertEqual(client.get(self.url).status_code, 403)
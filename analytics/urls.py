@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('offerings/<int:course_offering_id>/attendance/', views.offering_attendance, name='offering-attendance'),
+]
@@ -0,0 +1,50 @@
+from datetime import date
+
+from rest_framework import status, permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from courses.models import CourseOffering
+from .bitmaps import OfferingAttendance
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def offering_attendance(request, course_offering_id):
+    """Attendance percentage, current streak and runs of absences for every student of an offering"""
+    offerings = CourseOffering.objects.filter(pk=course_offering_id)
+    if not offerings.exists():
+        return Response({'error': 'Course offering not found'}, status=status.HTTP_404_NOT_FOUND)
+    if not request.user.is_staff and not offerings.filter(faculty__user=request.user).exists():
+        return Response({'error': 'Only the offering faculty can view its attendance'},
+                        status=status.HTTP_403_FORBIDDEN)
+    try:
+        run = int(request.query_params.get('run', 3))
+        start, end = (request.query_params.get(name) for name in ('from', 'to'))
+        start, end = (date.fromisoformat(value) if value else None for value in (start, end))
+    except ValueError:
+        return Response({'error': 'run must be a number and from/to dates YYYY-MM-DD'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if run < 1:
+        return Response({'error': 'run must be at least 1'}, status=status.HTTP_400_BAD_REQUEST)
+
+    attendance = OfferingAttendance.load(course_offering_id, start, end)
+    streaks = attendance.streaks()
+    absent_runs = set(attendance.absent_runs(run))
+    absent_now = set(attendance.absent_runs(run, latest_only=True))
+    return Response({
+        'course_offering': course_offering_id,
+        'sessions': len(attendance.sessions),
+        'students': [
+            {
+                'student_id': student_id,
+                'attended': attended,
+                'marked': marked,
+                'percentage': percentage,
+                'streak': streaks[student_id],
+                'absent_run': student_id in absent_runs,
+                'currently_absent_run': student_id in absent_now,
+            }
+            for student_id, (attended, marked, percentage) in attendance.percentages().items()
+        ],
+    })
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.suite import MIXES, load_history, record, regressions, run_mix
+from benchmarks.synthetic import institute_code
+from core.models import Institute
+from courses.models import CourseOffering
+
+
+class Command(BaseCommand):
+    help = ('Replay student, faculty and admin API mixes against a synthetic institute, append the results to '
+            'BENCHMARK_HISTORY and compare them with earlier runs')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=1, help='Institute made by seed_synthetic_institute --seed')
+        parser.add_argument('--mix', action='append', choices=sorted(MIXES), help='Default: every mix')
+        parser.add_argument('--requests', type=int, default=2000, help='Per mix')
+        parser.add_argument('--workers', type=int, default=1, help='Processes replaying each mix in parallel')
+        parser.add_argument('--actors', type=int, default=50, help='Distinct users per mix')
+        parser.add_argument('--warmup', type=int, default=100, help='Requests per mix before measuring')
+        parser.add_argument('--history', default=None, help='Default: BENCHMARK_HISTORY')
+        parser.add_argument('--baseline-runs', type=int, default=5, help='Earlier runs whose median is the baseline')
+        parser.add_argument('--threshold', type=float, default=0.15, help='Tolerated slowdown (0.15 = 15%%)')
+        parser.add_argument('--no-record', action='store_true', help='Compare without appending to the history')
+        parser.add_argument('--fail-on-regression', action='store_true', help='Exit with an error on a regression')
+
+    def handle(self, *args, **options):
+        code = institute_code(options['seed'])
+        institute = Institute.objects.filter(code=code).first()
+        if institute is None:
+            raise CommandError(f'No institute {code}; run seed_synthetic_institute --seed {options["seed"]} first')
+        dataset = {
+            'institute': code,
+            'students': institute.user_roles.filter(role__name='student').count(),
+            'offerings': CourseOffering.objects.filter(subject__branch__program__institute=institute).count(),
+        }
+        path = options['history'] or settings.BENCHMARK_HISTORY
+        history = load_history(path)
+        self.stdout.write(f"{code}: {dataset['students']} students, {dataset['offerings']} offerings")
+
+        failed = []
+        for mix in options['mix'] or list(MIXES):
+            result = run_mix(institute, mix, options['requests'], options['workers'], options['seed'],
+                             options['actors'], options['warmup'])
+            if result is None:
+                self.stdout.write(self.style.WARNING(f'{mix}: no users with this role'))
+                continue
+            entry = {'at': None, 'revision': None, 'dataset': dataset, **result}
+            if not options['no_record']:
+                entry = record(path, dataset, result)
+            self.report(entry)
+
+            compared, found = regressions(history, entry, options['baseline_runs'], options['threshold'])
+            if compared is None:
+                self.stdout.write('  too few earlier runs to compare with; this one joins the baseline')
+            elif found:
+                failed.append(mix)
+                for line in found:
+                    self.stdout.write(self.style.ERROR(f'  regression against {compared} runs: {line}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'  within {options["threshold"]:.0%} of the last {compared} runs'))
+
+        if failed and options['fail_on_regression']:
+            raise CommandError(f'Regressions in: {", ".join(failed)}')
+
+    def report(self, entry):
+        self.stdout.write(f"{entry['mix']}: {entry['requests']} requests by {entry['actors']} users, "
+                          f"{entry['throughput']:.0f} req/s with {entry['workers']} worker(s), "
+                          f"p50 {entry['p50_ms']:.1f} ms, p95 {entry['p95_ms']:.1f} ms, {entry['errors']} errors")
+        for label, stats in entry['endpoints'].items():
+            self.stdout.write(f"  {label:22} {stats['requests']:6}  p50 {stats['p50_ms']:8.1f} ms  "
+                              f"p95 {stats['p95_ms']:8.1f} ms  p99 {stats['p99_ms']:8.1f} ms  "
+                              f"{stats['errors']} errors")
@@ -0,0 +1,107 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from analytics.bitmaps import rebuild_offering
+from benchmarks.synthetic import SyntheticInstitute, institute_code
+from core.models import Institute
+from courses.models import CourseOffering
+from courses.partitions import attached_partitions, create_partition, is_partitioned, next_period, period_start
+
+ANALYZED_TABLES = (
+    'core_user', 'core_student', 'core_faculty', 'core_userrole', 'academics_subject', 'academics_studentenrollment',
+    'courses_courseoffering', 'courses_enrollment', 'courses_attendancesession', 'courses_attendancerecord',
+    'courses_assignment', 'courses_assignmentsubmission',
+)
+
+
+class Command(BaseCommand):
+    help = ('Generate a synthetic institute (hierarchy, students, faculty, offerings, a semester of attendance, '
+            'assignments and graded submissions), identical for the same --seed, scale and --start-date')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=1, help='Also names the institute: code SYN<seed>')
+        parser.add_argument('--students', type=int, default=50000)
+        parser.add_argument('--programs', type=int, default=3)
+        parser.add_argument('--branches', type=int, default=3, help='Per program')
+        parser.add_argument('--subjects', type=int, default=6, help='Per branch and semester')
+        parser.add_argument('--section-size', type=int, default=60)
+        parser.add_argument('--weeks', type=int, default=16, help='Length of the current semester')
+        parser.add_argument('--sessions-per-week', type=int, default=3, choices=range(1, 6))
+        parser.add_argument('--assignments', type=int, default=4, help='Per offering')
+        parser.add_argument('--start-date', type=date.fromisoformat,
+                            help='Monday the current semester started (default: --weeks weeks ago)')
+        parser.add_argument('--password', default='synthetic', help='Password of every generated user')
+        parser.add_argument('--with-outbox', action='store_true',
+                            help='Let the outbox triggers record the generated rows (skipped by default)')
+
+    def handle(self, *args, **options):
+        code = institute_code(options['seed'])
+        if len(code) > Institute._meta.get_field('code').max_length:
+            raise CommandError('--seed is too long for an institute code')
+        if Institute.objects.filter(code=code).exists():
+            raise CommandError(f'Institute {code} already exists; pick another --seed')
+        start = options['start_date']
+        if start is None:
+            start = date.today() - timedelta(weeks=options['weeks'])
+            start -= timedelta(days=start.weekday())
+        elif start.weekday() != 0:
+            raise CommandError('--start-date must be a Monday')
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Check foreign keys row by row instead of queueing millions of deferred checks until commit
+                with connection.cursor() as cursor:
+                    cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+            if not options['with_outbox']:
+                # Millions of synthetic rows should not reach the warehouse
+                self.skip_outbox(True)
+            self.partitions(start, start + timedelta(weeks=options['weeks']))
+            generator = SyntheticInstitute(
+                random.Random(options['seed']), options['seed'], start, students=options['students'],
+                programs=options['programs'], branches=options['branches'], subjects=options['subjects'],
+                section_size=options['section_size'], weeks=options['weeks'],
+                sessions_per_week=options['sessions_per_week'], assignments=options['assignments'],
+                password=options['password'], progress=lambda message: self.stdout.write(f'  {message}'))
+            institute = generator.generate()
+            if not options['with_outbox']:
+                self.skip_outbox(False)
+            if connection.vendor == 'postgresql':
+                # Fresh statistics, or the rebuilds below and the first benchmark runs get seq-scan plans
+                with connection.cursor() as cursor:
+                    cursor.execute(f'ANALYZE {", ".join(ANALYZED_TABLES)}')
+
+            call_command('backfill_search_vectors', stdout=self.stdout)
+            offerings = CourseOffering.objects.filter(subject__branch__program__institute=institute)
+            sessions = sum(rebuild_offering(pk) for pk in offerings.values_list('pk', flat=True).order_by('pk'))
+            self.stdout.write(f'  attendance bitmaps: {sessions} sessions')
+
+        rows = sum(generator.counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {institute.name} ({code}, semester starting {start}) with {rows} rows in '
+            f'{time.perf_counter() - started:.0f}s; users {code.lower()}-admin, {code.lower()}-s000000 and '
+            f'{code.lower()}-f00000 log in with the --password'))
+
+    def skip_outbox(self, skip):
+        """Turn outbox capture off or on for this transaction only; unlike disabling the triggers it locks nothing"""
+        if connection.vendor != 'postgresql':
+            return
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT set_config('outbox.skip', %s, true)", ['on' if skip else 'off'])
+
+    def partitions(self, first, last):
+        """Attendance partitions for the semester, so records do not pile up in the default partition"""
+        if not is_partitioned():
+            return
+        attached = attached_partitions()
+        start = period_start(first)
+        while start <= last:
+            if start not in attached:
+                name, _ = create_partition(start)
+                self.stdout.write(f'  created {name}')
+            start = next_period(start)
@@ -0,0 +1,234 @@
+"""
+API mixes replayed against a synthetic institute, with a history of results.
+
+A mix is a weighted list of read endpoints that one kind of user calls; each
+request picks an actor of that kind and an endpoint from a ``random.Random``
+seeded by the run, so two runs against the same institute send the same
+requests in the same order. Requests go through the full middleware stack
+with a real JWT, in process, with DEBUG off.
+
+Every run appends one JSON line to BENCHMARK_HISTORY. A run is compared with
+the median of the previous runs of the same mix on the same data set and
+worker count; a drop in throughput or a rise in an endpoint's p95 beyond the
+threshold is reported as a regression.
+"""
+import json
+import os
+import random
+import statistics
+import subprocess
+import time
+from collections import defaultdict
+from multiprocessing import Pool
+
+from django.conf import settings
+from django.db import connections
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import User
+from courses.models import Assignment, CourseOffering, Enrollment
+
+# Fewer earlier runs than this only build the baseline
+MIN_BASELINE_RUNS = 3
+
+# name -> [(endpoint label, weight, path for an actor)]
+MIXES = {
+    'student': [
+        ('profile', 10, lambda a, rng: '/api/auth/profile/'),
+        ('dashboard', 20, lambda a, rng: '/api/async/dashboard/'),
+        ('course offerings', 15, lambda a, rng: '/api/async/course-offerings/'),
+        ('sync', 20, lambda a, rng: '/api/sync/'),
+        ('notifications', 15, lambda a, rng: '/api/notifications/'),
+        ('transcript', 10, lambda a, rng: f"/api/courses/transcripts/{a['student_id']}/"),
+        ('search', 10, lambda a, rng: f"/api/search/?q={rng.choice(a['words'])}&types=subjects,assignments"),
+    ],
+    'faculty': [
+        ('profile', 10, lambda a, rng: '/api/auth/profile/'),
+        ('dashboard', 15, lambda a, rng: '/api/async/dashboard/'),
+        ('offering attendance', 25,
+         lambda a, rng: f"/api/analytics/offerings/{rng.choice(a['offerings'])}/attendance/"),
+        ('similar submissions', 10,
+         lambda a, rng: f"/api/similarity/assignments/{rng.choice(a['assignments'])}/pairs/"),
+        ('sync', 15, lambda a, rng: '/api/sync/?limit=500'),
+        ('autocomplete', 15, lambda a, rng: f"/api/search/autocomplete/?q={rng.choice(a['prefixes'])}"
+                                           f"&institute={a['institute_id']}"),
+        ('student detail', 10, lambda a, rng: f"/api/students/{rng.choice(a['students'])}/"),
+    ],
+    'admin': [
+        ('users', 15, lambda a, rng: f"/api/users/?page={rng.randint(1, 50)}"),
+        ('students', 20, lambda a, rng: f"/api/students/?page={rng.randint(1, 50)}&expand=user"),
+        ('faculty', 10, lambda a, rng: '/api/faculty/'),
+        ('rankings', 10, lambda a, rng: f"/api/courses/rankings/{rng.choice(a['programs'])}/"),
+        ('search', 25, lambda a, rng: f"/api/search/?q={rng.choice(a['words'])}"),
+        ('autocomplete', 20, lambda a, rng: f"/api/search/autocomplete/?q={rng.choice(a['prefixes'])}"
+                                           f"&institute={a['institute_id']}"),
+    ],
+}
+
+
+def actors(institute, kind, count, rng):
+    """Up to ``count`` users of ``kind`` in ``institute`` with the ids their mix needs"""
+    offerings = CourseOffering.objects.filter(subject__branch__program__institute=institute)
+    words = sorted({word for name in offerings.values_list('subject__name', flat=True).distinct()
+                    for word in name.split() if len(word) > 3})
+    common = {'institute_id': institute.pk, 'words': words, 'prefixes': sorted({word[:3].lower() for word in words})}
+    roles = institute.user_roles.filter(role__name=kind, is_active=True).order_by('user_id')
+    user_ids = list(roles.values_list('user_id', flat=True))
+    chosen = sorted(rng.sample(user_ids, min(count, len(user_ids))))
+    result = []
+    if kind == 'student':
+        students = dict(Enrollment.objects.filter(student__user_id__in=chosen).values_list(
+            'student__user_id', 'student_id').distinct())
+        result = [{**common, 'user_id': user_id, 'student_id': students[user_id]}
+                  for user_id in chosen if user_id in students]
+    elif kind == 'faculty':
+        for user_id in chosen:
+            taught = list(offerings.filter(faculty__user_id=user_id).values_list('pk', flat=True).order_by('pk'))
+            if not taught:
+                continue
+            result.append({
+                **common, 'user_id': user_id, 'offerings': taught,
+                'assignments': list(Assignment.objects.filter(course_offering_id__in=taught).values_list(
+                    'pk', flat=True).order_by('pk')),
+                'students': list(Enrollment.objects.filter(course_offering_id=taught[0]).values_list(
+                    'student_id', flat=True).order_by('student_id')),
+            })
+    else:
+        programs = list(institute.programs.values_list('pk', flat=True).order_by('pk'))
+        result = [{**common, 'user_id': user_id, 'programs': programs} for user_id in chosen]
+    return result
+
+
+def plan(mix, actors, count, rng):
+    """The (actor index, endpoint label, path) of ``count`` requests"""
+    endpoints = MIXES[mix]
+    weights = [weight for _, weight, _ in endpoints]
+    requests = []
+    for _ in range(count):
+        index = rng.randrange(len(actors))
+        label, _, path = rng.choices(endpoints, weights)[0]
+        requests.append((index, label, path(actors[index], rng)))
+    return requests
+
+
+def replay(task):
+    """Pool worker: run ``requests`` and return {label: [(seconds, status)]} plus the wall time"""
+    tokens, requests = task
+    clients = {}
+    timings = defaultdict(list)
+    with override_settings(DEBUG=False, METRICS_PROFILE_RATE=0):
+        started = time.perf_counter()
+        for index, label, path in requests:
+            client = clients.get(index)
+            if client is None:
+                client = clients[index] = APIClient(HTTP_AUTHORIZATION=f'Bearer {tokens[index]}')
+            begun = time.perf_counter()
+            response = client.get(path, HTTP_ACCEPT='application/json')
+            timings[label].append((time.perf_counter() - begun, response.status_code))
+        elapsed = time.perf_counter() - started
+    return dict(timings), elapsed
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(timings):
+    summary = {}
+    for label, samples in sorted(timings.items()):
+        ordered = sorted(seconds for seconds, _ in samples)
+        summary[label] = {
+            'requests': len(samples),
+            'errors': sum(status >= 400 for _, status in samples),
+            'p50_ms': round(percentile(ordered, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(ordered, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(ordered, 0.99) * 1000, 2),
+        }
+    return summary
+
+
+def run_mix(institute, mix, requests, workers, seed, actor_count, warmup):
+    rng = random.Random(f'{seed}:{mix}')
+    people = actors(institute, mix, actor_count, rng)
+    if not people:
+        return None
+    users = User.objects.in_bulk([person['user_id'] for person in people])
+    tokens = [str(AccessToken.for_user(users[person['user_id']])) for person in people]
+    replay((tokens, plan(mix, people, warmup, rng)))
+
+    shares = [plan(mix, people, requests // workers, random.Random(f'{seed}:{mix}:{worker}'))
+              for worker in range(workers)]
+    if workers > 1:
+        # Forked workers must not share the parent's database sockets
+        connections.close_all()
+        with Pool(workers) as pool:
+            results = pool.map(replay, [(tokens, share) for share in shares])
+    else:
+        results = [replay((tokens, shares[0]))]
+
+    timings = defaultdict(list)
+    for result, _ in results:
+        for label, samples in result.items():
+            timings[label].extend(samples)
+    elapsed = max(elapsed for _, elapsed in results)
+    total = sum(map(len, timings.values()))
+    everything = sorted(seconds for samples in timings.values() for seconds, _ in samples)
+    return {
+        'mix': mix,
+        'requests': total,
+        'workers': workers,
+        'actors': len(people),
+        'throughput': round(total / elapsed, 1),
+        'p50_ms': round(percentile(everything, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(everything, 0.95) * 1000, 2),
+        'errors': sum(status >= 400 for samples in timings.values() for _, status in samples),
+        'endpoints': summarize(timings),
+    }
+
+
+def revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def record(path, dataset, result):
+    entry = {'at': timezone.now().isoformat(), 'revision': revision(), 'dataset': dataset, **result}
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+    return entry
+
+
+def regressions(history, entry, baseline_runs, threshold):
+    """
+    Differences from the median of the last ``baseline_runs`` comparable runs
+    that exceed ``threshold``; returns (runs compared, differences), with None
+    runs while there are fewer than MIN_BASELINE_RUNS.
+    """
+    previous = [run for run in history
+                if run['dataset'] == entry['dataset'] and run['mix'] == entry['mix']
+                and run['workers'] == entry['workers']][-baseline_runs:]
+    if len(previous) < min(MIN_BASELINE_RUNS, baseline_runs):
+        return None, []
+    found = []
+    throughput = statistics.median(run['throughput'] for run in previous)
+    if entry['throughput'] < throughput * (1 - threshold):
+        found.append(f"throughput {entry['throughput']:.0f}/s vs {throughput:.0f}/s")
+    for label, stats in entry['endpoints'].items():
+        p95s = [run['endpoints'][label]['p95_ms'] for run in previous if label in run['endpoints']]
+        if p95s and stats['p95_ms'] > statistics.median(p95s) * (1 + threshold):
+            found.append(f"{label} p95 {stats['p95_ms']:.1f} ms vs {statistics.median(p95s):.1f} ms")
+    return len(previous), found
@@ -0,0 +1,334 @@
+"""
+Deterministic synthetic institute for load tests and benchmarks.
+
+Every value is drawn from one ``random.Random(seed)`` in a fixed order, so the
+same seed, scale and start date always produce the same institute (primary
+keys aside). The hierarchy, people, offerings, sessions and assignments go
+through ``bulk_create``; enrollments, submissions and attendance records, the
+bulk of the rows, are streamed in with COPY. Neither fires signals, so derived
+data (search vectors, attendance bitmaps) has to be rebuilt afterwards.
+
+Students are spread evenly over the cohorts (branch × year of study). Each
+cohort sits in the odd, current semester of its year, is split into sections
+of ``section_size`` and every section takes every subject of that semester,
+so a student has ``subjects`` enrollments.
+"""
+import io
+import math
+import time
+from datetime import datetime, time as clock, timedelta, timezone as tz
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+
+from academics.models import AcademicYear, Branch, Program, Semester, StudentEnrollment, Subject
+from core.models import Faculty, Institute, Role, Student, User, UserRole
+from courses.models import Assignment, AttendanceSession, CourseOffering
+
+FIRST_NAMES = (
+    'Aarav', 'Aditi', 'Amara', 'Ana', 'Arjun', 'Chen', 'Daniel', 'Diya', 'Elena', 'Emeka', 'Fatima', 'Hana',
+    'Ishaan', 'Jonas', 'Kavya', 'Layla', 'Lucas', 'Maya', 'Meera', 'Mohammed', 'Nikhil', 'Noah', 'Olivia',
+    'Priya', 'Rahul', 'Riya', 'Rohan', 'Sara', 'Sofia', 'Tanvi', 'Vikram', 'Wei', 'Yusuf', 'Zara',
+)
+LAST_NAMES = (
+    'Agarwal', 'Bose', 'Chatterjee', 'Costa', 'Das', 'Fernandes', 'Garcia', 'Gupta', 'Iyer', 'Joshi', 'Kapoor',
+    'Khan', 'Kim', 'Kumar', 'Li', 'Mehta', 'Menon', 'Mukherjee', 'Nair', 'Okafor', 'Patel', 'Pillai', 'Rao',
+    'Reddy', 'Sato', 'Shah', 'Sharma', 'Singh', 'Smith', 'Verma', 'Wang', 'Yadav',
+)
+PROGRAMS = (
+    ('BTECH', 'Bachelor of Technology'), ('BSC', 'Bachelor of Science'), ('BCOM', 'Bachelor of Commerce'),
+    ('BA', 'Bachelor of Arts'), ('BBA', 'Bachelor of Business Administration'), ('BDES', 'Bachelor of Design'),
+)
+TOPICS = (
+    'Algebra', 'Algorithms', 'Analysis', 'Accounting', 'Biology', 'Chemistry', 'Circuits', 'Communication',
+    'Databases', 'Design', 'Economics', 'Ethics', 'Finance', 'Geometry', 'History', 'Linguistics', 'Logic',
+    'Management', 'Marketing', 'Mechanics', 'Networks', 'Optics', 'Philosophy', 'Physics', 'Probability',
+    'Programming', 'Psychology', 'Sociology', 'Statistics', 'Thermodynamics',
+)
+LEVELS = ('Foundations of', 'Introduction to', 'Applied', 'Advanced', 'Topics in', 'Principles of')
+WORDS = (
+    'the', 'method', 'result', 'we', 'show', 'that', 'data', 'model', 'each', 'case', 'study', 'answer', 'is',
+    'given', 'by', 'our', 'analysis', 'of', 'a', 'simple', 'approach', 'which', 'uses', 'this', 'problem',
+    'and', 'then', 'compare', 'with', 'previous', 'work', 'in', 'class', 'example', 'first', 'second', 'step',
+)
+WEEKDAYS = (0, 1, 2, 3, 4)
+DAY_NAMES = ('mon', 'tue', 'wed', 'thu', 'fri')
+
+
+def institute_code(seed):
+    return f'SYN{seed}'
+
+
+def copy_lines(table, columns, lines, chunk=200000):
+    """
+    Stream tab-separated ``lines`` (newline-terminated, ``\\N`` for NULL) into
+    ``table`` with COPY, ``chunk`` lines per round trip; returns the line count.
+    Values must not contain tabs, newlines or backslashes.
+    """
+    count = 0
+    buffer = io.StringIO()
+    with connection.cursor() as cursor:
+        for line in lines:
+            buffer.write(line)
+            count += 1
+            if count % chunk == 0:
+                buffer.seek(0)
+                cursor.copy_expert(f'COPY {table} ({", ".join(columns)}) FROM STDIN', buffer)
+                buffer = io.StringIO()
+        if buffer.tell():
+            buffer.seek(0)
+            cursor.copy_expert(f'COPY {table} ({", ".join(columns)}) FROM STDIN', buffer)
+    return count
+
+
+class SyntheticInstitute:
+    """Builds one institute; call ``generate()`` inside a transaction"""
+
+    def __init__(self, rng, seed, start, students=50000, programs=3, branches=3, subjects=6, section_size=60,
+                 weeks=16, sessions_per_week=3, assignments=4, faculty_load=3, password='synthetic', progress=None):
+        self.rng = rng
+        self.seed = seed
+        self.code = institute_code(seed)
+        self.prefix = self.code.lower()
+        self.start = start
+        self.end = start + timedelta(weeks=weeks, days=-3)
+        self.students = students
+        self.programs = programs
+        self.branches = branches
+        self.subjects = subjects
+        self.section_size = section_size
+        self.weeks = weeks
+        self.sessions_per_week = sessions_per_week
+        self.assignments = assignments
+        self.faculty_load = faculty_load
+        # A fixed salt keeps the hash, like everything else, the same on every run
+        self.password = make_password(password, salt=f'synthetic{seed}')
+        self.progress = progress or (lambda message: None)
+        self.counts = {}
+        self.started = time.perf_counter()
+
+    def report(self, name, count):
+        self.counts[name] = count
+        self.progress(f'{name}: {count} ({time.perf_counter() - self.started:.1f}s)')
+
+    def at(self, day, hour=9, minute=0):
+        return datetime.combine(day, clock(hour, minute), tzinfo=tz.utc)
+
+    def person(self):
+        return self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+
+    def sentence(self, words):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+    def generate(self):
+        self.institute = Institute.objects.create(
+            name=f'Synthetic Institute {self.seed}', subdomain=f'synthetic-{self.seed}', code=self.code,
+            address='1 Benchmark Road', phone='0000000000', email=f'office@{self.prefix}.example.edu',
+            established_date=self.start.replace(year=self.start.year - 25, day=1))
+        self.roles = {role.name: role for role in (Role.objects.get_or_create(name=name)[0]
+                                                   for name in ('admin', 'faculty', 'student'))}
+        admin = User.objects.create(username=f'{self.prefix}-admin', email=f'admin@{self.prefix}.example.edu',
+                                    first_name='Institute', last_name='Admin', password=self.password, is_staff=True)
+        UserRole.objects.create(user=admin, role=self.roles['admin'], institute=self.institute)
+
+        cohorts = self.hierarchy()
+        self.people(cohorts)
+        offerings = self.offerings(cohorts)
+        self.enrollments(offerings)
+        self.attendance(offerings)
+        self.coursework(offerings)
+        return self.institute
+
+    def hierarchy(self):
+        """Programs, branches, years, semesters and subjects; returns the cohorts as (branch, semester, subjects)"""
+        cohorts = []
+        subject_count = 0
+        term = timedelta(weeks=self.weeks + 4)
+        for p in range(self.programs):
+            code, name = PROGRAMS[p % len(PROGRAMS)]
+            program = Program.objects.create(institute=self.institute, code=f'{code}{p // len(PROGRAMS) or ""}',
+                                              name=name, duration_years=4)
+            branches = [Branch.objects.create(program=program, code=f'BR{b + 1}',
+                                              name=f'{self.rng.choice(TOPICS)} Stream {b + 1}')
+                        for b in range(self.branches)]
+            for year in range(1, 5):
+                academic_year = AcademicYear.objects.create(program=program, year_number=year, name=f'Year {year}')
+                for number in (2 * year - 1, 2 * year):
+                    current = number % 2 == 1
+                    start = self.start if current else self.start + term
+                    semester = Semester.objects.create(
+                        academic_year=academic_year, semester_number=number, name=f'Semester {number}',
+                        start_date=start, end_date=start + term - timedelta(days=1), is_current=current)
+                    for branch in branches:
+                        subjects = Subject.objects.bulk_create([
+                            Subject(branch=branch, semester=semester, code=f'{branch.code}-{number}{k + 1:02}',
+                                    name=f'{self.rng.choice(LEVELS)} {self.rng.choice(TOPICS)}',
+                                    credits=self.rng.choice((2, 3, 3, 4)),
+                                    subject_type='practical' if k == self.subjects - 1 else 'core')
+                            for k in range(self.subjects)
+                        ])
+                        subject_count += len(subjects)
+                        if current:
+                            cohorts.append((branch, semester, subjects))
+        self.report('subjects', subject_count)
+        return cohorts
+
+    def people(self, cohorts):
+        """Students spread over the cohorts; sets ``self.members[cohort index]`` to their ids"""
+        self.members = [[] for _ in cohorts]
+        self.diligence = {}
+        for offset in range(0, self.students, 5000):
+            numbers = range(offset, min(offset + 5000, self.students))
+            users = User.objects.bulk_create([
+                User(username=f'{self.prefix}-s{n:06}', email=f's{n:06}@{self.prefix}.example.edu',
+                     first_name=first, last_name=last, password=self.password)
+                for n, (first, last) in zip(numbers, (self.person() for _ in numbers))
+            ])
+            students = Student.objects.bulk_create([
+                Student(user=user, enrollment_number=f'{self.code}{n:07}', admission_date=self.start)
+                for n, user in zip(numbers, users)
+            ])
+            enrollments = []
+            for n, student in zip(numbers, students):
+                cohort = n % len(cohorts)
+                branch, semester, _ = cohorts[cohort]
+                self.members[cohort].append(student.pk)
+                # Attendance rate and share of assignments submitted; marks follow the same disposition
+                self.diligence[student.pk] = self.rng.betavariate(8, 2)
+                enrollments.append(StudentEnrollment(student=student, program_id=branch.program_id, branch=branch,
+                                                     current_semester=semester, enrollment_date=self.start))
+            StudentEnrollment.objects.bulk_create(enrollments)
+            UserRole.objects.bulk_create([
+                UserRole(user=user, role=self.roles['student'], institute=self.institute) for user in users
+            ])
+        self.report('students', self.students)
+
+    def offerings(self, cohorts):
+        """Sections per cohort and subject, taught by a pool of faculty per branch"""
+        offerings = []
+        faculty_count = 0
+        by_branch = {}
+        for cohort, (branch, semester, subjects) in enumerate(cohorts):
+            members = self.members[cohort]
+            sections = max(1, math.ceil(len(members) / self.section_size))
+            for subject in subjects:
+                for section in range(sections):
+                    by_branch.setdefault(branch, []).append(
+                        (subject, semester, section, members[section::sections]))
+
+        for branch, planned in by_branch.items():
+            count = math.ceil(len(planned) / self.faculty_load)
+            users = User.objects.bulk_create([
+                User(username=f'{self.prefix}-f{faculty_count + i:05}',
+                     email=f'f{faculty_count + i:05}@{self.prefix}.example.edu',
+                     first_name=first, last_name=last, password=self.password)
+                for i, (first, last) in enumerate(self.person() for _ in range(count))
+            ])
+            faculty = Faculty.objects.bulk_create([
+                Faculty(user=user, employee_id=f'{self.code}F{faculty_count + i:05}', department=branch.name,
+                        designation=self.rng.choice(('Assistant Professor', 'Associate Professor', 'Professor')),
+                        joining_date=self.start.replace(year=self.start.year - self.rng.randint(1, 20)),
+                        experience_years=self.rng.randint(1, 25))
+                for i, user in enumerate(users)
+            ])
+            UserRole.objects.bulk_create([
+                UserRole(user=user, role=self.roles['faculty'], institute=self.institute) for user in users
+            ])
+            faculty_count += count
+
+            rows = []
+            for i, (subject, semester, section, members) in enumerate(planned):
+                days = sorted(self.rng.sample(WEEKDAYS, self.sessions_per_week))
+                hour = self.rng.randint(8, 16)
+                rows.append((CourseOffering(
+                    subject=subject, semester=semester, faculty=faculty[i // self.faculty_load],
+                    section=chr(ord('A') + section) if section < 26 else f'S{section + 1}',
+                    max_enrollment=self.section_size, room_number=f'{branch.code}-{self.rng.randint(100, 450)}',
+                    schedule={DAY_NAMES[day]: f'{hour:02}:00' for day in days}), members, days, hour))
+            created = CourseOffering.objects.bulk_create([offering for offering, *_ in rows])
+            offerings.extend((offering, *plan) for offering, (_, *plan) in zip(created, rows))
+        self.report('faculty', faculty_count)
+        self.report('offerings', len(offerings))
+        return offerings
+
+    def enrollments(self, offerings):
+        enrolled = self.at(self.start - timedelta(days=7))
+        lines = (f'{student_id}\t{offering.pk}\t{enrolled}\tenrolled\t\t{enrolled}\n'
+                 for offering, members, _, _ in offerings for student_id in members)
+        self.report('enrollments', copy_lines(
+            'courses_enrollment', ['student_id', 'course_offering_id', 'enrolled_date', 'status', 'final_grade',
+                                   'updated_at'], lines))
+
+    def attendance(self, offerings):
+        sessions = []
+        for offering, _, days, hour in offerings:
+            for week in range(self.weeks):
+                for day in days:
+                    sessions.append(AttendanceSession(
+                        course_offering=offering, session_date=self.start + timedelta(weeks=week, days=day),
+                        session_time=clock(hour), topic_covered=f'Week {week + 1}: {self.rng.choice(TOPICS)}',
+                        session_type='lab' if offering.subject.subject_type == 'practical' else 'lecture'))
+        created = AttendanceSession.objects.bulk_create(sessions, batch_size=5000)
+        self.report('attendance sessions', len(created))
+
+        by_offering = {}
+        for session in created:
+            by_offering.setdefault(session.course_offering_id, []).append(session)
+
+        def lines():
+            random = self.rng.random
+            for offering, members, _, hour in offerings:
+                for session in by_offering[offering.pk]:
+                    tail = f'\t{self.at(session.session_date, hour, 5)}\t\t{session.pk}\t{offering.faculty_id}\t'
+                    day = f'\t{session.session_date}\n'
+                    for student_id in members:
+                        rate = self.diligence[student_id]
+                        draw = random()
+                        if draw < rate:
+                            status = 'late' if draw > rate * 0.93 else 'present'
+                        else:
+                            status = 'excused' if draw < rate + (1 - rate) * 0.15 else 'absent'
+                        yield f'{status}{tail}{student_id}{day}'
+
+        self.report('attendance records', copy_lines(
+            'courses_attendancerecord', ['status', 'marked_at', 'notes', 'attendance_session_id', 'marked_by_id',
+                                         'student_id', 'session_date'], lines()))
+
+    def coursework(self, offerings):
+        assignments = []
+        for offering, *_ in offerings:
+            for k in range(self.assignments):
+                due = self.at(self.start + timedelta(weeks=(k + 1) * self.weeks // (self.assignments + 1), days=4),
+                              23, 59)
+                assignments.append(Assignment(
+                    course_offering=offering, title=f'{offering.subject.name} {("Homework", "Project")[k % 2]} {k + 1}',
+                    description=self.sentence(24), due_date=due, max_marks=self.rng.choice((10, 20, 50, 100)),
+                    assignment_type=('homework', 'project')[k % 2], is_published=True,
+                    allow_late_submission=True, late_penalty_per_day=5))
+        created = Assignment.objects.bulk_create(assignments, batch_size=5000)
+        self.report('assignments', len(created))
+
+        by_offering = {}
+        for assignment in created:
+            by_offering.setdefault(assignment.course_offering_id, []).append(assignment)
+
+        def lines():
+            rng = self.rng
+            for offering, members, *_ in offerings:
+                for assignment in by_offering[offering.pk]:
+                    graded = assignment.due_date + timedelta(days=5)
+                    for student_id in members:
+                        diligence = self.diligence[student_id]
+                        if rng.random() > diligence:
+                            continue
+                        late = rng.random() > diligence
+                        submitted = assignment.due_date + timedelta(hours=rng.randint(1, 72) * (1 if late else -1))
+                        share = min(1.0, max(0.0, rng.gauss(diligence, 0.12)))
+                        marks = round(assignment.max_marks * share, 2)
+                        yield (f'{assignment.pk}\t{student_id}\t{self.sentence(30)}\t{submitted}\t{late}\t{marks}\t'
+                               f'{"Late" if late else "Good work"}\t{graded}\t{offering.faculty_id}\tgraded\t{graded}\n')
+
+        self.report('submissions', copy_lines(
+            'courses_assignmentsubmission', ['assignment_id', 'student_id', 'submission_text', 'submitted_date',
+                                             'is_late', 'marks_obtained', 'feedback', 'graded_date', 'graded_by_id',
+                                             'status', 'updated_at'], lines()))
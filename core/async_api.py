@@ -0,0 +1,83 @@
+"""
+Helpers for the async (ASGI) read endpoints, which are plain Django async
+views because DRF views are synchronous.
+
+Responses keep the shapes of their DRF counterparts: the same serializers
+(fed with fully prefetched objects, so they never touch the database) and
+the same page-number pagination envelope.
+"""
+import asyncio
+
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import User
+
+
+async def user_for_token(token):
+    """Return the active user for a JWT access token, or None"""
+    if not token:
+        return None
+    try:
+        user_id = AccessToken(token)[api_settings.USER_ID_CLAIM]
+    except (TokenError, KeyError):
+        return None
+    return await User.objects.filter(pk=user_id, is_active=True).only('id', 'is_staff').afirst()
+
+
+def bearer_token(request):
+    header = request.headers.get('Authorization', '')
+    return header[len('Bearer '):] if header.startswith('Bearer ') else None
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, safe=False, encoder=JSONEncoder)
+
+
+def error(detail, status):
+    return json_response({'detail': detail}, status=status)
+
+
+def authenticated(view):
+    """Require a valid Bearer access token and expose the user as ``request.user``"""
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return error(f'Method "{request.method}" not allowed.', 405)
+        user = await user_for_token(bearer_token(request))
+        if user is None:
+            return error('Authentication credentials were not provided.', 401)
+        request.user = user
+        return await view(request, *args, **kwargs)
+    wrapper.__name__ = view.__name__
+    wrapper.__doc__ = view.__doc__
+    return wrapper
+
+
+async def paginate(request, queryset, serialize):
+    """Async equivalent of DRF's PageNumberPagination for ``queryset``; returns a response"""
+    size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    page = request.GET.get('page', '1')
+    if not page.isdigit() or int(page) < 1:
+        return error('Invalid page.', 404)
+    page = int(page)
+    offset = (page - 1) * size
+    count, rows = await asyncio.gather(queryset.acount(), alist(queryset[offset:offset + size]))
+    if page > 1 and not rows:
+        return error('Invalid page.', 404)
+    url = request.build_absolute_uri()
+    return json_response({
+        'count': count,
+        'next': replace_query_param(url, 'page', page + 1) if offset + size < count else None,
+        'previous': None if page == 1 else (
+            remove_query_param(url, 'page') if page == 2 else replace_query_param(url, 'page', page - 1)),
+        'results': [serialize(row) for row in rows],
+    })
+
+
+async def alist(queryset):
+    return [row async for row in queryset]
@@ -0,0 +1,10 @@
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path('auth/profile/', async_views.profile, name='async_auth_profile'),
+    path('students/', async_views.students, name='async_students'),
+    path('faculty/', async_views.faculty, name='async_faculty'),
+    path('course-offerings/', async_views.course_offerings, name='async_course_offerings'),
+    path('dashboard/', async_views.dashboard, name='async_dashboard'),
+]
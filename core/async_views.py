@@ -0,0 +1,134 @@
+"""
+Async versions of the hottest read endpoints, mounted under ``/api/async/``.
+
+Served by an ASGI server each request waits on the event loop instead of
+holding a worker thread. The independent queries of a request (page count and
+rows, the dashboard counters...) are awaited with ``asyncio.gather``, but the
+async ORM hands every query to Django's single thread-sensitive executor, so
+they still run one after another; the gain is in requests in flight, not in
+per-request latency. Profile, student and faculty responses match their
+``/api/`` counterparts, absolute file URLs included.
+"""
+import asyncio
+from datetime import timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from courses.models import Assignment, AssignmentSubmission, AttendanceRecord, CourseOffering, Enrollment
+from notifications.models import Notification
+from .async_api import alist, authenticated, error, json_response, paginate
+from .models import Faculty, Student, User, UserRole
+from .serializers import FacultySerializer, StudentSerializer, UserSerializer
+
+OFFERING_FIELDS = ('id', 'section', 'room_number', 'schedule', 'max_enrollment', 'is_active',
+                   'subject_id', 'subject__code', 'subject__name', 'subject__credits',
+                   'semester_id', 'semester__name', 'faculty_id', 'faculty__user__first_name',
+                   'faculty__user__last_name')
+
+
+@authenticated
+async def profile(request):
+    """Get current user profile"""
+    user, roles = await asyncio.gather(
+        User.objects.select_related('profile').aget(pk=request.user.pk),
+        alist(UserRole.objects.filter(user_id=request.user.pk, is_active=True).values_list('role__name', flat=True)),
+    )
+    return json_response({'user': UserSerializer(user, context={'request': request}).data, 'roles': roles})
+
+
+@authenticated
+async def students(request):
+    """Paginated student list"""
+    queryset = Student.objects.select_related('user__profile').order_by('pk')
+    context = {'request': request}
+    return await paginate(request, queryset, lambda student: StudentSerializer(student, context=context).data)
+
+
+@authenticated
+async def faculty(request):
+    """Paginated faculty list"""
+    queryset = Faculty.objects.select_related('user__profile').order_by('pk')
+    context = {'request': request}
+    return await paginate(request, queryset, lambda member: FacultySerializer(member, context=context).data)
+
+
+@authenticated
+async def course_offerings(request):
+    """Paginated course offerings, filterable by ``semester``, ``subject``, ``faculty`` and ``active``"""
+    queryset = CourseOffering.objects.order_by('pk')
+    for param in ('semester', 'subject', 'faculty'):
+        value = request.GET.get(param)
+        if value is not None:
+            if not value.isdigit():
+                return error(f'Invalid {param}.', 400)
+            queryset = queryset.filter(**{f'{param}_id': value})
+    if request.GET.get('active') in ('true', 'false'):
+        queryset = queryset.filter(is_active=request.GET['active'] == 'true')
+
+    def serialize(row):
+        return {
+            'id': row['id'],
+            'subject': {'id': row['subject_id'], 'code': row['subject__code'],
+                        'name': row['subject__name'], 'credits': row['subject__credits']},
+            'semester': {'id': row['semester_id'], 'name': row['semester__name']},
+            'faculty': {'id': row['faculty_id'],
+                        'name': f"{row['faculty__user__first_name']} {row['faculty__user__last_name']}".strip()},
+            'section': row['section'],
+            'room_number': row['room_number'],
+            'schedule': row['schedule'],
+            'max_enrollment': row['max_enrollment'],
+            'is_active': row['is_active'],
+        }
+    return await paginate(request, queryset.values(*OFFERING_FIELDS), serialize)
+
+
+async def _student_dashboard(student_id, now):
+    attendance, enrolled, due = await asyncio.gather(
+        AttendanceRecord.objects.filter(student_id=student_id).aaggregate(
+            total=Count('id'), attended=Count('id', filter=Q(status__in=AttendanceRecord.attended_statuses))),
+        Enrollment.objects.filter(student_id=student_id, status='enrolled').acount(),
+        alist(Assignment.objects.filter(
+            course_offering__enrollments__student_id=student_id, course_offering__enrollments__status='enrolled',
+            is_published=True, due_date__range=(now, now + timedelta(days=7)),
+        ).exclude(submissions__student_id=student_id).order_by('due_date').values(
+            'id', 'title', 'due_date', 'course_offering__subject__code')[:10]),
+    )
+    return {
+        'enrolled_courses': enrolled,
+        'attendance_percentage': (round(100 * attendance['attended'] / attendance['total'], 2)
+                                  if attendance['total'] else None),
+        'upcoming_assignments': [{
+            'id': row['id'], 'title': row['title'], 'due_date': row['due_date'],
+            'subject': row['course_offering__subject__code'],
+        } for row in due],
+    }
+
+
+async def _faculty_dashboard(faculty_id):
+    offerings, pending = await asyncio.gather(
+        CourseOffering.objects.filter(faculty_id=faculty_id, is_active=True).acount(),
+        AssignmentSubmission.objects.filter(
+            assignment__course_offering__faculty_id=faculty_id, status='submitted').acount(),
+    )
+    return {'active_offerings': offerings, 'submissions_to_grade': pending}
+
+
+@authenticated
+async def dashboard(request):
+    """Counters for the landing page of the current student or faculty member"""
+    user_id = request.user.pk
+    student_id, faculty_id, unread = await asyncio.gather(
+        Student.objects.filter(user_id=user_id).values_list('pk', flat=True).afirst(),
+        Faculty.objects.filter(user_id=user_id).values_list('pk', flat=True).afirst(),
+        Notification.objects.filter(recipient_id=user_id, is_read=False).acount(),
+    )
+    data = {'unread_notifications': unread}
+    sections = []
+    if student_id is not None:
+        sections.append(_student_dashboard(student_id, timezone.now()))
+    if faculty_id is not None:
+        sections.append(_faculty_dashboard(faculty_id))
+    for section in await asyncio.gather(*sections):
+        data.update(section)
+    return json_response(data)
@@ -0,0 +1,148 @@
+"""
+Read-replica routing.
+
+Queries made by read-only ViewSet actions (``list`` and ``retrieve``) go to
+the replica alias when one is configured; everything else goes to the
+primary. Once a request writes, the rest of it reads from the primary, and so
+do the user's requests for ``REPLICA_STICKY_SECONDS`` afterwards, so nobody
+reads past their own writes while the replica catches up. The sticky flag is
+kept in Redis so every worker process sees it; while Redis is unreachable
+reads go to the primary.
+"""
+import logging
+from contextvars import ContextVar
+
+import redis
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+READ_ACTIONS = ('list', 'retrieve')
+
+_routing = ContextVar('db_routing', default=None)
+
+
+class RoutingState:
+    """Routing decisions of the current request"""
+
+    def __init__(self):
+        self.use_replica = False
+        self.wrote = False
+
+
+def replica_alias():
+    alias = settings.DATABASE_REPLICA_ALIAS
+    return alias if alias in settings.DATABASES else None
+
+
+def sticky_key(user_id):
+    return f'db:primary:{user_id}'
+
+
+def request_user_id(request):
+    """User id from the Bearer access token (verified, no query) or the session"""
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        try:
+            return AccessToken(header[len('Bearer '):])[api_settings.USER_ID_CLAIM]
+        except (TokenError, KeyError):
+            return None
+    user = getattr(request, 'user', None)
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+class ReplicaRouter:
+    """Send reads to the replica while the current request allows it, and all writes to the primary"""
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is None or not state.use_replica or state.wrote:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return replica_alias()
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == replica_alias():
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Scope routing state to each request; enables replica reads for read-only ViewSet actions"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RoutingState()
+        token = _routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if state.wrote and replica_alias() is not None:
+            self.remember_write(request)
+        return response
+
+    async def __acall__(self, request):
+        state = RoutingState()
+        token = _routing.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if state.wrote and replica_alias() is not None:
+            await sync_to_async(self.remember_write)(request)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _routing.get()
+        actions = getattr(view_func, 'actions', None)
+        if state is None or not actions or replica_alias() is None:
+            return None
+        if actions.get(request.method.lower()) in READ_ACTIONS:
+            user_id = request_user_id(request)
+            state.use_replica = user_id is None or not self.is_sticky(user_id)
+        return None
+
+    def is_sticky(self, user_id):
+        try:
+            return bool(get_redis().exists(sticky_key(user_id)))
+        except redis.RedisError:
+            logger.warning("Could not read the replica sticky flag; reading from the primary", exc_info=True)
+            return True
+
+    def remember_write(self, request):
+        user_id = request_user_id(request)
+        if user_id is None:
+            return
+        try:
+            get_redis().set(sticky_key(user_id), 1, ex=settings.REPLICA_STICKY_SECONDS)
+        except redis.RedisError:
+            logger.warning("Could not set the replica sticky flag of user %s", user_id, exc_info=True)
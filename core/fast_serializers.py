@@ -0,0 +1,118 @@
+"""
+Read-only fast path for ModelSerializers on list endpoints.
+
+A serializer class is compiled once per requested shape (see
+``sparse_fields``) into the ``.values()`` paths it reads, following nested
+serializers through joins, and a generated function that builds its
+representation from one row. Rows never become model instances and no DRF
+field machinery runs per row, except ``to_representation`` for the types that
+need formatting (dates, decimals...). The output is the same data in the same
+key order, so the rendered JSON is byte-identical.
+"""
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .sparse_fields import requested_shape, shape_trees
+
+# Fields whose representation of a database value is the value itself
+IDENTITY_FIELDS = (
+    serializers.CharField, serializers.EmailField, serializers.SlugField, serializers.URLField,
+    serializers.IntegerField, serializers.BooleanField, serializers.ChoiceField,
+)
+
+
+def file_url(storage, name, request):
+    """``FileField.to_representation`` for a stored file name"""
+    url = storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def _compile(serializer, prefix, namespace, paths):
+    """Return a Python expression building ``serializer``'s representation from ``row``"""
+    model = serializer.Meta.model
+    items = []
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*' or '.' in field.source:
+            raise ImproperlyConfigured(f'{type(serializer).__name__}.{field.field_name} does not map to a column')
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            raise ImproperlyConfigured(f'{type(serializer).__name__}.{field.field_name} does not map to a column')
+        path = prefix + field.source
+
+        if isinstance(field, serializers.ModelSerializer):
+            pk_path = f'{path}__{field.Meta.model._meta.pk.name}'
+            paths.append(pk_path)
+            nested = _compile(field, f'{path}__', namespace, paths)
+            items.append(f'{field.field_name!r}: None if row[{pk_path!r}] is None else {nested}')
+            continue
+        if isinstance(field, serializers.BaseSerializer) or model_field.many_to_many or model_field.one_to_many:
+            raise ImproperlyConfigured(f'{type(serializer).__name__}.{field.field_name} is a to-many relation')
+
+        paths.append(path)
+        value = f'row[{path!r}]'
+        if isinstance(field, serializers.FileField):
+            if getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+                storage = f'_storage{len(namespace)}'
+                namespace[storage] = model_field.storage
+                expression = f'None if not (v := {value}) else file_url({storage}, v, request)'
+            else:
+                expression = f'{value} or None'
+        elif type(field) in IDENTITY_FIELDS or (
+                type(field) is PrimaryKeyRelatedField and field.pk_field is None) or (
+                type(field) is serializers.JSONField and not field.binary):
+            expression = value
+        else:
+            convert = f'_convert{len(namespace)}'
+            namespace[convert] = field.to_representation
+            expression = f'None if (v := {value}) is None else {convert}(v)'
+        items.append(f'{field.field_name!r}: {expression}')
+    return '{' + ', '.join(items) + '}'
+
+
+class FastSerializer:
+    """Compiled, read-only equivalent of a ModelSerializer instance that works on ``.values()`` rows"""
+
+    def __init__(self, serializer):
+        namespace, paths = {'file_url': file_url}, []
+        expression = _compile(serializer, '', namespace, paths)
+        exec(f'def to_representation(row, request):\n    return {expression}\n', namespace)
+        self.to_representation = namespace['to_representation']
+        self.paths = tuple(dict.fromkeys(paths))
+
+    def values(self, queryset):
+        return queryset.values(*self.paths)
+
+    def serialize(self, rows, request=None):
+        to_representation = self.to_representation
+        return [to_representation(row, request) for row in rows]
+
+
+@lru_cache(maxsize=256)
+def fast_serializer(serializer_class, shape=None):
+    """Compiled form of ``serializer_class``, for a ``(fields, expand)`` shape from ``requested_shape``"""
+    if shape is None:
+        return FastSerializer(serializer_class())
+    return FastSerializer(serializer_class(sparse=shape_trees(*shape)))
+
+
+class FastListMixin:
+    """ViewSet mixin serving ``list`` through the compiled form of its serializer class"""
+
+    def list(self, request, *args, **kwargs):
+        fast = fast_serializer(self.get_serializer_class(), requested_shape(request))
+        queryset = self.filter_queryset(self.get_queryset())
+        if not queryset.ordered:
+            queryset = queryset.order_by('pk')
+        rows = fast.values(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(fast.serialize(page, request))
+        return Response(fast.serialize(rows, request))
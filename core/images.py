@@ -0,0 +1,116 @@
+"""
+Resized variants of profile pictures and institute logos.
+
+Each upload is decoded once (JPEGs in draft mode, close to the largest size
+needed), oriented from its EXIF tag and rendered at every configured size as
+WebP and JPEG, without EXIF, ICC or any other metadata. Variants are stored
+under the SHA-256 of the source file, ``variants/<sha>/<size>.<ext>``, so
+identical uploads share them and a variant URL never changes meaning, which
+lets ``core.views.image_variant`` serve them with year-long cache headers.
+"""
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from PIL import Image, ImageOps
+
+from .models import Institute, UserProfile
+
+logger = logging.getLogger(__name__)
+
+# model -> (image field, resize mode)
+SOURCES = {UserProfile: ('profile_picture', 'crop'), Institute: ('logo', 'fit')}
+# extension -> (Pillow format, content type, encoder options)
+FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', 'image/jpeg', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+
+def variant_name(digest, size, extension):
+    return f'variants/{digest[:2]}/{digest}/{size}.{extension}'
+
+
+def variant_sizes():
+    return sorted({size for sizes in settings.IMAGE_VARIANT_SIZES.values() for size in sizes})
+
+
+def render(data, sizes, mode):
+    """Encode ``data`` at each size in every format; returns ``{(size, extension): bytes}``"""
+    edge = max(sizes)
+    with Image.open(BytesIO(data)) as source:
+        source.draft('RGB', (edge, edge))
+        image = ImageOps.exif_transpose(source)
+        alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+        image = image.convert('RGBA' if alpha else 'RGB')
+    image.info = {}
+
+    variants = {}
+    for size in sizes:
+        if mode == 'crop':
+            resized = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        else:
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.LANCZOS)
+        for extension, (image_format, _, options) in FORMATS.items():
+            frame = resized
+            if image_format == 'JPEG' and alpha:
+                frame = Image.new('RGB', resized.size, 'white')
+                frame.paste(resized, mask=resized.getchannel('A'))
+            buffer = BytesIO()
+            frame.save(buffer, image_format, **options)
+            variants[(size, extension)] = buffer.getvalue()
+    return variants
+
+
+def store_variants(name, kind, mode, force=False):
+    """Render and store the variants of the stored file ``name``; returns the source's SHA-256"""
+    with default_storage.open(name, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    sizes = settings.IMAGE_VARIANT_SIZES[kind]
+    names = {(size, extension): variant_name(digest, size, extension) for size in sizes for extension in FORMATS}
+    if not force and all(default_storage.exists(path) for path in names.values()):
+        return digest
+    for key, content in render(data, sizes, mode).items():
+        if default_storage.exists(names[key]):
+            default_storage.delete(names[key])
+        default_storage.save(names[key], ContentFile(content))
+    return digest
+
+
+def regenerate(task):
+    """Pool worker: ``(model, pk, name, force)`` -> ``(model, pk, name, digest)``; digest is '' for unreadable images"""
+    model, pk, name, force = task
+    field_name, mode = SOURCES[model]
+    try:
+        digest = store_variants(name, field_name, mode, force)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.warning('Cannot render variants of %s: %s', name, e)
+        digest = ''
+    return model, pk, name, digest
+
+
+def refresh_variants(model, pk):
+    """Bring the variants and stored hash of one row's image up to date"""
+    close_old_connections()
+    try:
+        field_name, _ = SOURCES[model]
+        name = model.objects.filter(pk=pk).values_list(field_name, flat=True).first()
+        digest = regenerate((model, pk, name, False))[3] if name else ''
+        # Only if the image was not replaced meanwhile; the newer upload has its own job
+        model.objects.filter(pk=pk, **{field_name: name}).update(**{f'{field_name}_hash': digest})
+    finally:
+        close_old_connections()
+
+
+@lru_cache(maxsize=None)
+def image_executor():
+    """Shared background pool rendering variants after uploads"""
+    return ThreadPoolExecutor(max_workers=settings.IMAGE_WORKERS, thread_name_prefix='image-variants')
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import User
+
+ENDPOINTS = {
+    'profile': ('/api/auth/profile/', '/api/async/auth/profile/'),
+    'students': ('/api/students/', '/api/async/students/'),
+    'faculty': ('/api/faculty/', '/api/async/faculty/'),
+}
+SERVERS = {
+    # uvicorn runs WSGI apps on a 10-thread pool, like a gthread worker
+    'wsgi': ['edunexus_backend.wsgi:application', '--interface', 'wsgi'],
+    'asgi': ['edunexus_backend.asgi:application'],
+}
+
+
+async def fetch(reader, writer, request):
+    """Send one keep-alive GET and read the whole response; returns the status code"""
+    writer.write(request)
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = dict(line.lower().split(': ', 1) for line in lines[1:] if ': ' in line)
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    else:
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    return int(lines[0].split()[1])
+
+
+async def load(port, path, token, concurrency, duration):
+    request = (f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n'
+               f'Authorization: Bearer {token}\r\nConnection: keep-alive\r\n\r\n').encode()
+    latencies, errors = [], [0]
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                if await fetch(reader, writer, request) == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors[0] += 1
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            errors[0] += 1
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors[0], time.perf_counter() - started
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError('Server exited during startup')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f'Server did not listen on port {port} within {timeout}s')
+
+
+class Command(BaseCommand):
+    help = 'Compare throughput and latency of the sync (WSGI) and async (ASGI) read endpoints under uvicorn'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=200, help='Concurrent keep-alive connections')
+        parser.add_argument('--duration', type=int, default=15, help='Seconds of load per endpoint and server')
+        parser.add_argument('--workers', type=int, default=1, help='uvicorn worker processes')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--user', help='Username to authenticate as (default: first active user)')
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), action='append',
+                            help='Endpoint to load (repeatable; default: all)')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True).order_by('pk')
+        user = users.filter(username=options['user']).first() if options['user'] else users.first()
+        if user is None:
+            raise CommandError('No matching active user; seed some data first')
+        token = str(AccessToken.for_user(user))
+        endpoints = options['endpoint'] or sorted(ENDPOINTS)
+        port = options['port']
+        self.stdout.write(f"{options['concurrency']} connections, {options['duration']}s per run, "
+                          f"{options['workers']} worker(s), CONN_MAX_AGE={settings.DATABASES['default'].get('CONN_MAX_AGE', 0)}")
+
+        for mode, target in SERVERS.items():
+            process = subprocess.Popen(
+                [sys.executable, '-m', 'uvicorn', *target, '--port', str(port), '--workers', str(options['workers']),
+                 '--no-access-log', '--log-level', 'warning'],
+                cwd=settings.BASE_DIR, env=os.environ.copy())
+            try:
+                wait_for_port(port, process)
+                for name in endpoints:
+                    path = ENDPOINTS[name][mode == 'asgi']
+                    asyncio.run(load(port, path, token, 4, 1))  # warm up connections and caches
+                    latencies, errors, elapsed = asyncio.run(
+                        load(port, path, token, options['concurrency'], options['duration']))
+                    latencies.sort()
+                    if not latencies:
+                        self.stdout.write(self.style.ERROR(f'{mode} {path}: no successful requests ({errors} errors)'))
+                        continue
+                    self.stdout.write(
+                        f'{mode} {path:30} {len(latencies) / elapsed:8.0f} req/s  '
+                        f'p50 {latencies[len(latencies) // 2] * 1000:7.1f} ms  '
+                        f'p99 {latencies[int(len(latencies) * 0.99)] * 1000:7.1f} ms  {errors} errors')
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+        self.stdout.write(self.style.SUCCESS('Done'))
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from core.tokens import revoke_many
+
+
+class Command(BaseCommand):
+    help = ('Copy still-valid blacklisted refresh tokens into the Redis revocation store, then delete '
+            'expired (or with --all, every) row of the simplejwt token tables in batches')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--all', action='store_true',
+                            help='Also delete unexpired rows; revocations are kept in Redis')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        batch_size = options['batch_size']
+
+        copied, batch = 0, []
+        for jti, expires_at in (BlacklistedToken.objects.filter(token__expires_at__gt=now)
+                                .values_list('token__jti', 'token__expires_at').iterator(chunk_size=batch_size)):
+            batch.append((jti, expires_at.timestamp()))
+            if len(batch) == batch_size:
+                copied += revoke_many(batch)
+                batch = []
+        copied += revoke_many(batch)
+        self.stdout.write(f'{copied} unexpired revocations copied to Redis')
+
+        # Walk the primary key in windows so every batch is an index range scan and a short transaction
+        outstanding, blacklisted = OutstandingToken._meta.db_table, BlacklistedToken._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT MIN(id), MAX(id) FROM {outstanding}')
+            low, high = cursor.fetchone()
+        deleted = 0
+        start = low
+        while start is not None and start <= high:
+            with connection.cursor() as cursor:
+                cursor.execute(f'''
+                    WITH doomed AS (
+                        SELECT id FROM {outstanding}
+                        WHERE id >= %s AND id < %s AND (%s OR expires_at <= %s)
+                    ), unlisted AS (
+                        DELETE FROM {blacklisted} WHERE token_id IN (SELECT id FROM doomed)
+                    )
+                    DELETE FROM {outstanding} WHERE id IN (SELECT id FROM doomed)
+                ''', [start, start + batch_size, options['all'], now])
+                deleted += cursor.rowcount
+            start += batch_size
+            if (start - low) % (batch_size * 100) == 0:
+                self.stdout.write(f'  {deleted} rows deleted up to id {start}')
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} outstanding tokens and their blacklist entries'))
@@ -0,0 +1,46 @@
+import time
+from multiprocessing import Pool
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.images import SOURCES, regenerate
+
+
+class Command(BaseCommand):
+    help = 'Render the resized WebP/JPEG variants of every profile picture and institute logo in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+        parser.add_argument('--force', action='store_true', help='Re-render variants that already exist')
+        parser.add_argument('--only', choices=[field for field, _ in SOURCES.values()],
+                            help='Limit to profile pictures or logos')
+
+    def handle(self, *args, **options):
+        tasks = []
+        for model, (field_name, _) in SOURCES.items():
+            if options['only'] not in (None, field_name):
+                continue
+            rows = model.objects.exclude(**{f'{field_name}__isnull': True}).exclude(**{field_name: ''})
+            tasks.extend((model, pk, name, options['force']) for pk, name in rows.values_list('pk', field_name))
+        self.stdout.write(f'{len(tasks)} images to process')
+
+        started = time.perf_counter()
+        results = []
+        # Forked workers must not share the parent's database sockets
+        connections.close_all()
+        with Pool(options['workers']) as pool:
+            for done, result in enumerate(pool.imap_unordered(regenerate, tasks, chunksize=4), 1):
+                results.append(result)
+                if done % 500 == 0:
+                    self.stdout.write(f'  {done} done, {done / (time.perf_counter() - started):.1f} images/s')
+
+        failed = 0
+        for model, pk, name, digest in results:
+            field_name, _ = SOURCES[model]
+            failed += not digest
+            model.objects.filter(pk=pk, **{field_name: name}).update(**{f'{field_name}_hash': digest})
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {len(results)} images in {elapsed:.1f}s ({len(results) / elapsed if elapsed else 0:.1f}/s), '
+            f'{failed} unreadable'))
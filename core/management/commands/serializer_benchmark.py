@@ -0,0 +1,65 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from core.fast_serializers import fast_serializer
+from core.models import Student, User, UserProfile
+from core.serializers import StudentSerializer, UserSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Rows/sec of list pages rendered through the ModelSerializers versus the values() fast path (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per page')
+        parser.add_argument('--repeat', type=int, default=20, help='Pages rendered per variant')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['rows'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+        self.stdout.write(self.style.SUCCESS('Done (seeded rows rolled back)'))
+
+    def run(self, rows, repeat):
+        users = User.objects.bulk_create([
+            User(username=f'bench-{i}', email=f'bench-{i}@example.com', first_name='Bench', last_name=f'Student {i}')
+            for i in range(rows)])
+        UserProfile.objects.bulk_create([UserProfile(user=user, address='Campus') for user in users])
+        Student.objects.bulk_create([
+            Student(user=user, enrollment_number=f'BENCH{i:07}', admission_date=date(2023, 7, 1))
+            for i, user in enumerate(users)])
+        renderer = JSONRenderer()
+
+        for serializer_class, queryset in ((StudentSerializer, Student.objects.filter(user__in=users)),
+                                           (UserSerializer, User.objects.filter(pk__in=[u.pk for u in users]))):
+            queryset = queryset.order_by('pk')
+            fast = fast_serializer(serializer_class)
+            related = 'user__profile' if serializer_class is StudentSerializer else 'profile'
+            variants = (
+                ('serializer', lambda: serializer_class(queryset[:rows], many=True).data),
+                ('serializer + select_related',
+                 lambda: serializer_class(queryset.select_related(related)[:rows], many=True).data),
+                ('values() fast path', lambda: fast.serialize(fast.values(queryset)[:rows])),
+            )
+            self.stdout.write(serializer_class.__name__)
+            bodies = set()
+            for label, build in variants:
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    body = renderer.render(build())
+                elapsed = time.perf_counter() - started
+                bodies.add(body)
+                self.stdout.write(f'  {label:28} {rows * repeat / elapsed:9.0f} rows/s  '
+                                  f'{elapsed / repeat * 1000:7.1f} ms/page  {len(body)} bytes')
+            if len(bodies) != 1:
+                self.stdout.write(self.style.ERROR('  Rendered pages differ between variants'))
@@ -0,0 +1,64 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.models import Student, User, UserProfile
+
+SHAPES = (
+    ('full', ''),
+    ('names only', 'fields=id,enrollment_number,user.first_name,user.last_name'),
+    ('collapsed user', 'fields=id,enrollment_number,status,user'),
+    ('user, profile collapsed', 'expand=user'),
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Payload size, latency and SQL width of student list/detail responses per ?fields=/?expand= shape (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200)
+        parser.add_argument('--repeat', type=int, default=50, help='Requests per shape and endpoint')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['students'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+        self.stdout.write(self.style.SUCCESS('Done (seeded rows rolled back)'))
+
+    def run(self, count, repeat):
+        users = User.objects.bulk_create([
+            User(username=f'sparse-{i}', email=f'sparse-{i}@example.com', first_name='Sparse', last_name=f'Student {i}')
+            for i in range(count)])
+        UserProfile.objects.bulk_create([UserProfile(user=user, address='Campus') for user in users])
+        students = Student.objects.bulk_create([
+            Student(user=user, enrollment_number=f'SPARSE{i:07}', admission_date=date(2023, 7, 1))
+            for i, user in enumerate(users)])
+        client = APIClient()
+        client.force_authenticate(users[0])
+
+        for endpoint, url in (('list', '/api/students/'), ('detail', f'/api/students/{students[0].pk}/')):
+            self.stdout.write(f'{endpoint} {url}')
+            for label, query in SHAPES:
+                path = f'{url}?{query}' if query else url
+                with CaptureQueriesContext(connection) as queries:
+                    response = client.get(path, HTTP_ACCEPT='application/json')
+                query_count = len(queries.captured_queries)
+                select = queries.captured_queries[-1]['sql']
+                columns = select[:select.upper().index(' FROM ')].count(',') + 1
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    client.get(path, HTTP_ACCEPT='application/json')
+                elapsed = (time.perf_counter() - started) / repeat
+                self.stdout.write(f'  {label:24} {len(response.content):7} bytes  {elapsed * 1000:6.2f} ms  '
+                                  f'{query_count} queries  {columns} columns selected')
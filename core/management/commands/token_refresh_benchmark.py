@@ -0,0 +1,84 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt import tokens as jwt_tokens
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from core.models import User
+from core.redis_client import get_redis
+from core.serializers import TokenRefreshSerializer
+from core.tokens import RefreshToken, revoke_many, revoked_key
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Measure refresh latency with a large token history: simplejwt blacklist tables versus the Redis '
+            'revocation store (seeded rows are rolled back)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--history', type=int, default=10_000_000, help='Historical blacklisted tokens in SQL')
+        parser.add_argument('--revoked', type=int, default=100_000,
+                            help='Unexpired revocations in Redis (they expire within minutes)')
+        parser.add_argument('--refreshes', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(is_active=True).order_by('pk').first()
+        if user is None:
+            raise CommandError('No active users; seed some data first')
+        try:
+            with transaction.atomic():
+                self.run(user, options['history'], options['revoked'], options['refreshes'])
+                raise Rollback
+        except Rollback:
+            pass
+        self.stdout.write(self.style.SUCCESS('Done (seeded rows rolled back)'))
+
+    def run(self, user, history, revoked, refreshes):
+        outstanding, blacklisted = OutstandingToken._meta.db_table, BlacklistedToken._meta.db_table
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(f'''
+                INSERT INTO {outstanding} (token, created_at, expires_at, user_id, jti)
+                SELECT 'historical', now() - g * interval '1 second', now() - g * interval '1 second' + interval '7 days',
+                       %s, md5('bench' || g)
+                FROM generate_series(1, %s) g
+            ''', [user.pk, history])
+            cursor.execute(f'''
+                INSERT INTO {blacklisted} (token_id, blacklisted_at)
+                SELECT id, created_at FROM {outstanding} WHERE token = 'historical'
+            ''')
+            cursor.execute(f'ANALYZE {outstanding}')
+            cursor.execute(f'ANALYZE {blacklisted}')
+            cursor.execute('SELECT pg_total_relation_size(%s) + pg_total_relation_size(%s)', [outstanding, blacklisted])
+            size = cursor.fetchone()[0]
+        self.stdout.write(f'Seeded {history} blacklisted tokens ({size / 1024 / 1024:.0f} MiB) '
+                          f'in {time.perf_counter() - started:.1f}s')
+
+        expiry = time.time() + 300
+        for offset in range(0, revoked, 10000):
+            revoke_many((uuid.uuid4().hex, expiry) for _ in range(min(10000, revoked - offset)))
+        self.stdout.write(f'Seeded {revoked} revocations in Redis')
+
+        rotated = []
+        for label, token_class, serializer_class in (
+                ('blacklist tables', jwt_tokens.RefreshToken, jwt_serializers.TokenRefreshSerializer),
+                ('redis store', RefreshToken, TokenRefreshSerializer)):
+            latencies = []
+            for _ in range(refreshes):
+                refresh = token_class.for_user(user)
+                request_started = time.perf_counter()
+                serializer_class(data={'refresh': str(refresh)}).is_valid(raise_exception=True)
+                latencies.append(time.perf_counter() - request_started)
+                rotated.append(refresh['jti'])
+            latencies.sort()
+            self.stdout.write(
+                f'{label:17} mean {sum(latencies) / len(latencies) * 1000:6.2f} ms  '
+                f'p50 {latencies[len(latencies) // 2] * 1000:6.2f} ms  '
+                f'p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.2f} ms')
+        get_redis().delete(*(revoked_key(jti) for jti in rotated))
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_user_search_vector_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='institute',
+            name='logo_hash',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 of the logo; names its resized variants', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='profile_picture_hash',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 of the picture; names its resized variants', max_length=64),
+        ),
+    ]
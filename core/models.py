@@ -1,4 +1,6 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.core.validators import RegexValidator
 
@@ -10,10 +12,18 @@ class User(AbstractUser):
     phone = models.CharField(validators=[phone_regex], max_length=17, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            GinIndex(fields=['search_vector']),
+            GinIndex(name='core_user_first_name_trgm', fields=['first_name'], opclasses=['gin_trgm_ops']),
+            GinIndex(name='core_user_last_name_trgm', fields=['last_name'], opclasses=['gin_trgm_ops']),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.email})"
 
@@ -22,6 +32,8 @@ class UserProfile(models.Model):
     """Extended profile information for users"""
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
+    profile_picture_hash = models.CharField(max_length=64, blank=True, editable=False,
+                                            help_text="SHA-256 of the picture; names its resized variants")
     address = models.TextField(blank=True)
     date_of_birth = models.DateField(blank=True, null=True)
     emergency_contact = models.CharField(max_length=17, blank=True)
@@ -42,6 +54,8 @@ class Institute(models.Model):
     email = models.EmailField()
     website = models.URLField(blank=True)
     logo = models.ImageField(upload_to='institute_logos/', blank=True, null=True)
+    logo_hash = models.CharField(max_length=64, blank=True, editable=False,
+                                 help_text="SHA-256 of the logo; names its resized variants")
     established_date = models.DateField()
     is_active = models.BooleanField(default=True)
     config = models.JSONField(default=dict, help_text="Institute-specific configuration")
@@ -106,6 +120,11 @@ class Student(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            GinIndex(name='core_student_enrollment_trgm', fields=['enrollment_number'], opclasses=['gin_trgm_ops']),
+        ]
+
     def __str__(self):
         return f"{self.user.get_full_name()} ({self.enrollment_number})"
 
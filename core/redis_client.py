@@ -0,0 +1,16 @@
+from functools import lru_cache
+
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+
+
+@lru_cache(maxsize=None)
+def get_redis():
+    """Shared synchronous Redis client (connection pooled)"""
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+def get_async_redis():
+    """New asyncio Redis client; create one per event loop and reuse it"""
+    return aioredis.Redis.from_url(settings.REDIS_URL)
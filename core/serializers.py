@@ -1,7 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt import serializers as jwt_serializers
 from .models import User, UserProfile, Institute, Role, Student, Faculty
+from .sparse_fields import SparseFieldsMixin
+from .tokens import RefreshToken
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -44,13 +47,13 @@ class UserLoginSerializer(serializers.Serializer):
         return attrs
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = UserProfile
         fields = '__all__'
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     profile = UserProfileSerializer(read_only=True)
 
     class Meta:
@@ -59,19 +62,19 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'date_joined')
 
 
-class InstituteSerializer(serializers.ModelSerializer):
+class InstituteSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Institute
         fields = '__all__'
 
 
-class RoleSerializer(serializers.ModelSerializer):
+class RoleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Role
         fields = '__all__'
 
 
-class StudentSerializer(serializers.ModelSerializer):
+class StudentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
 
     class Meta:
@@ -79,9 +82,14 @@ class StudentSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class FacultySerializer(serializers.ModelSerializer):
+class FacultySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
 
     class Meta:
         model = Faculty
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """Token refresh checking and recording rotations in the Redis revocation store"""
+    token_class = RefreshToken
@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save
+
+from .images import SOURCES, image_executor, refresh_variants
+
+
+def remember_image(sender, instance, raw=False, **kwargs):
+    field_name, _ = SOURCES[sender]
+    if raw or instance.pk is None:
+        instance._previous_image = None
+        return
+    instance._previous_image = sender.objects.filter(pk=instance.pk).values_list(field_name, flat=True).first()
+
+
+def queue_variants(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Render variants in the background once a new or replaced image is committed"""
+    field_name, _ = SOURCES[sender]
+    if raw or (update_fields is not None and field_name not in update_fields):
+        return
+    name = getattr(instance, field_name).name or None
+    if name == (getattr(instance, '_previous_image', None) or None):
+        return
+    pk = instance.pk
+    transaction.on_commit(lambda: image_executor().submit(refresh_variants, sender, pk))
+
+
+for model in SOURCES:
+    pre_save.connect(remember_image, sender=model, dispatch_uid=f'image_previous_{model._meta.label_lower}')
+    post_save.connect(queue_variants, sender=model, dispatch_uid=f'image_variants_{model._meta.label_lower}')
@@ -0,0 +1,142 @@
+"""
+Sparse fieldsets (``?fields=``) and on-demand expansion (``?expand=``).
+
+Both parameters take comma-separated field names, with dots reaching into
+nested serializers: ``?fields=id,user.first_name&expand=user.profile``.
+``fields`` keeps only the listed fields; naming a nested field with a
+sub-field (``user.first_name``) expands it. When either parameter is given,
+nested serializers that are not expanded are rendered as their primary key.
+Without them responses are unchanged.
+
+The shape of the pruned serializer also decides the queryset:
+``optimize()`` adds the ``select_related``/``prefetch_related`` joins of the
+expanded relations and an ``only()`` restricted to the columns rendered.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def parse_paths(value):
+    """``'id,user.first_name'`` -> ``{'id': {}, 'user': {'first_name': {}}}``"""
+    tree = {}
+    for path in (value or '').split(','):
+        node = tree
+        for name in path.strip().split('.'):
+            if name:
+                node = node.setdefault(name, {})
+    return tree
+
+
+def requested_shape(request):
+    """The raw ``(fields, expand)`` parameters of a request, or None when it asks for the full shape"""
+    params = getattr(request, 'query_params', request.GET)
+    if 'fields' not in params and 'expand' not in params:
+        return None
+    return params.get('fields'), params.get('expand', '')
+
+
+def shape_trees(fields, expand):
+    return (None if fields is None else parse_paths(fields)), parse_paths(expand)
+
+
+class SparseFieldsMixin:
+    """ModelSerializer mixin applying ``?fields=``/``?expand=`` of the request in its context"""
+
+    def __init__(self, *args, sparse=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (fields tree or None for all fields, expand tree); None means the full shape
+        self.sparse = sparse
+
+    def get_fields(self):
+        fields = super().get_fields()
+        sparse = self.sparse
+        if sparse is None and self._is_root():
+            request = self.context.get('request')
+            shape = requested_shape(request) if request is not None else None
+            sparse = shape_trees(*shape) if shape is not None else None
+        if sparse is None:
+            return fields
+
+        only, expand = sparse
+        if only is not None:
+            fields = {name: field for name, field in fields.items() if name in only}
+        for name, field in list(fields.items()):
+            nested = field.child if isinstance(field, serializers.ListSerializer) else field
+            if not isinstance(nested, serializers.ModelSerializer):
+                continue
+            sub_fields = only.get(name) if only is not None else None
+            if name in expand or sub_fields:
+                if isinstance(nested, SparseFieldsMixin):
+                    nested.sparse = (sub_fields or None, expand.get(name, {}))
+                continue
+            kwargs = {'read_only': True, 'many': nested is not field}
+            if field.source and field.source != name:
+                kwargs['source'] = field.source
+            fields[name] = PrimaryKeyRelatedField(**kwargs)
+        return fields
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+
+def _collect(serializer, model, prefix, related, prefetch, only):
+    """Gather the joins and columns ``serializer`` reads; returns False when ``only()`` cannot be used"""
+    complete = True
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        source = field.source
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            complete = False  # properties, methods and '*' sources may read any column
+            continue
+        path = prefix + source
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        many = nested is not field or isinstance(field, ManyRelatedField)
+
+        if many:
+            prefetch.append(path)
+        elif isinstance(nested, serializers.ModelSerializer) or (
+                model_field.is_relation and not model_field.concrete):
+            related.append(path)
+            if model_field.concrete:
+                only.append(path)
+            else:
+                only.append(f'{path}__{model_field.field.name}')  # reverse one-to-one: the joining column
+            related_model = model_field.related_model
+            only.append(f'{path}__{related_model._meta.pk.name}')
+            if isinstance(nested, serializers.ModelSerializer):
+                complete &= _collect(nested, related_model, f'{path}__', related, prefetch, only)
+        else:
+            only.append(path)
+    return complete
+
+
+def optimize(queryset, serializer):
+    """Add the joins, prefetches and column restriction needed to render ``serializer``'s shape"""
+    related, prefetch, only = [], [], []
+    complete = _collect(serializer, queryset.model, '', related, prefetch, only)
+    if related:
+        queryset = queryset.select_related(*related)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if complete:
+        queryset = queryset.only(*dict.fromkeys(only))
+    return queryset
+
+
+class SparseQuerysetMixin:
+    """ViewSet mixin shaping read querysets after the (possibly sparse) serializer"""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method in SAFE_METHODS:
+            queryset = optimize(queryset, self.get_serializer())
+        return queryset
@@ -1,3 +1,362 @@
-from django.test import TestCase
+import hashlib
+import shutil
+import tempfile
+import time
+from datetime import date
+from io import BytesIO
+from unittest import skipIf
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .db_router import ReplicaRoutingMiddleware
+from .fast_serializers import fast_serializer
+from .images import refresh_variants, render, store_variants, variant_name
+from .models import Faculty, Institute, Role, Student, User, UserProfile, UserRole
+from .serializers import FacultySerializer, StudentSerializer, UserSerializer
+from .tokens import REVOCATION_SLACK, revoke_many, revoked_key
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+class FastSerializerTests(TestCase):
+    """The values() fast path must render exactly what the ModelSerializers render"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(6):
+            user = User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='x',
+                                            first_name=['Ana', 'Zoë', 'Łukasz', '', 'O\'Brien', '李'][i],
+                                            last_name='Test "quoted" line', phone='+911234567890' if i % 2 else '')
+            if i % 3:
+                UserProfile.objects.create(user=user, address='1 Main St\nCity', date_of_birth=date(2000, 1, i + 1),
+                                           profile_picture='profile_pics/p{}.png'.format(i) if i % 2 else None)
+            if i < 4:
+                Student.objects.create(user=user, enrollment_number=f'EN{i:03}', admission_date=date(2023, 7, 1),
+                                       graduation_date=date(2027, 6, 30) if i % 2 else None,
+                                       guardian_name='Guardian ✓')
+            else:
+                Faculty.objects.create(user=user, employee_id=f'EMP{i}', department='CSE', designation='Professor',
+                                       experience_years=i, joining_date=date(2015, 1, 1))
+        cls.request = RequestFactory().get('/api/students/')
+
+    def assertSameJSON(self, serializer_class, queryset):
+        fast = fast_serializer(serializer_class)
+        expected = serializer_class(queryset, many=True, context={'request': self.request}).data
+        actual = fast.serialize(fast.values(queryset), self.request)
+        self.assertEqual(JSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_student_serializer(self):
+        self.assertSameJSON(StudentSerializer, Student.objects.order_by('pk'))
+
+    def test_faculty_serializer(self):
+        self.assertSameJSON(FacultySerializer, Faculty.objects.order_by('pk'))
+
+    def test_user_serializer(self):
+        self.assertSameJSON(UserSerializer, User.objects.order_by('pk'))
+
+    def test_without_request(self):
+        fast = fast_serializer(UserSerializer)
+        queryset = User.objects.order_by('pk')
+        self.assertEqual(JSONRenderer().render(fast.serialize(fast.values(queryset))),
+                         JSONRenderer().render(UserSerializer(queryset, many=True).data))
+
+    def test_list_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username='user0'))
+        response = client.get('/api/students/', HTTP_ACCEPT='application/json')
+        request = RequestFactory().get('/api/students/')
+        expected = StudentSerializer(Student.objects.order_by('pk'), many=True, context={'request': request}).data
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(JSONRenderer().render(response.data['results']), JSONRenderer().render(expected))
+
+
+class SparseFieldsTests(TestCase):
+    """?fields= and ?expand= shape both the payload and the SQL"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='sparse', email='sparse@example.com', password='x',
+                                            first_name='Sam', last_name='Parse')
+        cls.profile = UserProfile.objects.create(user=cls.user, address='Campus')
+        cls.student = Student.objects.create(user=cls.user, enrollment_number='SP001', admission_date=date(2023, 7, 1))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url):
+        response = self.client.get(url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_full_shape_is_unchanged(self):
+        data = self.get(f'/api/students/{self.student.pk}/')
+        self.assertEqual(data['user']['profile']['address'], 'Campus')
+
+    def test_fields_with_nested_path(self):
+        for url in ('/api/students/?fields=id,user.first_name', f'/api/students/{self.student.pk}/?fields=id,user.first_name'):
+            data = self.get(url)
+            row = data['results'][0] if 'results' in data else data
+            self.assertEqual(row, {'id': self.student.pk, 'user': {'first_name': 'Sam'}})
+
+    def test_unexpanded_relations_collapse_to_pk(self):
+        for url in ('/api/students/?fields=id,user', f'/api/students/{self.student.pk}/?fields=id,user'):
+            data = self.get(url)
+            row = data['results'][0] if 'results' in data else data
+            self.assertEqual(row, {'id': self.student.pk, 'user': self.user.pk})
+        for url in ('/api/students/?expand=user', f'/api/students/{self.student.pk}/?expand=user'):
+            data = self.get(url)
+            row = data['results'][0] if 'results' in data else data
+            self.assertEqual(row['user']['profile'], self.profile.pk)
+            self.assertEqual(row['enrollment_number'], 'SP001')
+
+    def test_queryset_only_loads_requested_columns(self):
+        with self.assertNumQueries(1) as queries:
+            self.client.get(f'/api/students/{self.student.pk}/?fields=id,user.first_name', HTTP_ACCEPT='application/json')
+        sql = queries.captured_queries[0]['sql']
+        self.assertIn('"core_user"."first_name"', sql)
+        self.assertNotIn('enrollment_number', sql)
+        self.assertNotIn('core_userprofile', sql)
+
+
+class AsyncEndpointTests(TestCase):
+    """The /api/async/ reads render exactly what their /api/ counterparts render"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='async', email='async@example.com', password='x')
+        UserProfile.objects.create(user=cls.user, profile_picture='profile_pics/async.png')
+        Student.objects.create(user=cls.user, enrollment_number='AS001', admission_date=date(2023, 7, 1))
+
+    def get(self, url):
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}',
+                                   HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_file_urls_are_absolute(self):
+        picture = 'http://testserver/media/profile_pics/async.png'
+        self.assertEqual(self.get('/api/async/auth/profile/')['user']['profile']['profile_picture'], picture)
+        self.assertEqual(self.get('/api/async/students/')['results'][0]['user']['profile']['profile_picture'], picture)
+        self.assertEqual(self.get('/api/async/students/'), self.get('/api/students/'))
+
+    def test_profile_matches_the_sync_endpoint(self):
+        UserRole.objects.create(user=self.user, role=Role.objects.create(name='student'),
+                                institute=Institute.objects.create(
+                                    name='Async Institute', subdomain='async', code='ASY', address='Campus',
+                                    phone='+910000000000', email='async-institute@example.com',
+                                    established_date=date(2000, 1, 1)))
+        profile = self.get('/api/async/auth/profile/')
+        self.assertEqual(profile, self.get('/api/auth/profile/'))
+        self.assertEqual(profile['roles'], ['student'])
+
+
+@skipIf(fakeredis is None, 'fakeredis is not installed')
+class ReplicaRoutingTests(TransactionTestCase):
+    """List and retrieve read from the replica; a write moves the rest of the request and the user to the primary"""
+
+    @classmethod
+    def setUpClass(cls):
+        # A second connection to the test database standing in for the replica; added once the test databases
+        # exist, since the alias is not configured outside of PGREPLICA_HOST deployments
+        connections.settings['replica'] = {**connections['default'].settings_dict, 'TEST': {'MIRROR': 'default'}}
+        cls.databases = {'default', 'replica'}
+        cls.addClassCleanup(cls.remove_replica)
+        super().setUpClass()
+
+    @classmethod
+    def remove_replica(cls):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+
+    def setUp(self):
+        patcher = patch('core.db_router.get_redis', return_value=fakeredis.FakeRedis(server=fakeredis.FakeServer()))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(username='reader', email='reader@example.com', password='x')
+        self.student = Student.objects.create(user=self.user, enrollment_number='RP001',
+                                              admission_date=date(2023, 7, 1))
+
+    def queries(self, request):
+        """``(primary, replica)`` SELECT counts of running ``request``"""
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            request()
+        return tuple(sum(query['sql'].startswith('SELECT') for query in captured)
+                     for captured in (primary, replica))
+
+    def get(self, url, user=None):
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user or self.user)}')
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_and_retrieve_read_from_the_replica(self):
+        for url in ('/api/students/', f'/api/students/{self.student.pk}/'):
+            primary, replica = self.queries(lambda: self.get(url))
+            self.assertEqual(primary, 0, url)
+            self.assertGreater(replica, 0, url)
+
+    def test_write_moves_the_rest_of_the_request_to_the_primary(self):
+        reads = []
+
+        def view(request):
+            middleware.process_view(request, view, (), {})
+            reads.append(self.queries(lambda: Institute.objects.count()))
+            Institute.objects.filter(pk=0).update(name='Nothing')
+            reads.append(self.queries(lambda: Institute.objects.count()))
+            return HttpResponse()
+
+        view.actions = {'get': 'list'}
+        middleware = ReplicaRoutingMiddleware(view)
+        middleware(RequestFactory().get('/api/institutes/'))
+        self.assertEqual(reads, [(0, 1), (1, 0)])
+
+    def test_writer_stays_on_the_primary(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        response = client.patch(f'/api/students/{self.student.pk}/', {'guardian_name': 'Guardian'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Student.objects.get(pk=self.student.pk).guardian_name, 'Guardian')
+        primary, replica = self.queries(lambda: self.get('/api/students/'))
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+        other = User.objects.create_user(username='other', email='other@example.com', password='x')
+        primary, replica = self.queries(lambda: self.get('/api/students/', other))
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+
+@skipIf(fakeredis is None, 'fakeredis is not installed')
+class RefreshTokenTests(TestCase):
+    """Rotated and logged-out refresh tokens are revoked in Redis and refused afterwards"""
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_user(username='tokens', email='tokens@example.com', password='secret')
+
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        patcher = patch('core.tokens.get_redis', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        response = self.client.post('/api/auth/login/', {'email': 'tokens@example.com', 'password': 'secret'},
+                                    format='json')
+        self.assertEqual(response.status_code, 200)
+        self.access, self.refresh = response.data['access'], response.data['refresh']
+
+    def refresh_with(self, token):
+        return self.client.post('/api/auth/refresh/', {'refresh': token}, format='json')
+
+    def test_rotated_token_is_rejected(self):
+        response = self.refresh_with(self.refresh)
+        self.assertEqual(response.status_code, 200)
+        rotated = response.data['refresh']
+        self.assertNotEqual(rotated, self.refresh)
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 401)
+        self.assertEqual(self.refresh_with(rotated).status_code, 200)
+
+    def test_logged_out_token_is_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        self.assertEqual(self.client.post('/api/auth/logout/', {'refresh': self.refresh}, format='json').status_code,
+                         200)
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 401)
+
+    def test_revocations_expire_with_their_tokens(self):
+        now = time.time()
+        self.assertEqual(revoke_many([('expired', now - 3600), ('live', now + 3600)]), 1)
+        self.assertFalse(self.redis.exists(revoked_key('expired')))
+        self.assertAlmostEqual(self.redis.ttl(revoked_key('live')), 3600 + REVOCATION_SLACK, delta=2)
+
+
+def image_bytes(size, mode='RGB', image_format='PNG', **save):
+    buffer = BytesIO()
+    Image.new(mode, size, (200, 0, 0, 0) if mode == 'RGBA' else (200, 0, 0)).save(buffer, image_format, **save)
+    return buffer.getvalue()
+
+
+class ImageVariantTests(TestCase):
+    """Uploads are rendered once per content at every size and format, stripped of metadata, and served immutable"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='pictured', email='pictured@example.com', password='x')
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings = override_settings(MEDIA_ROOT=media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_sizes_modes_and_metadata(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotated 90 degrees: the stored 200x100 image displays as 100x200
+        data = image_bytes((200, 100), image_format='JPEG', exif=exif.tobytes())
+        crop = render(data, [40, 96], 'crop')
+        self.assertEqual(sorted(crop), [(40, 'jpg'), (40, 'webp'), (96, 'jpg'), (96, 'webp')])
+        for (size, extension), content in crop.items():
+            with Image.open(BytesIO(content)) as image:
+                self.assertEqual((image.size, image.format), ((size, size), {'jpg': 'JPEG', 'webp': 'WEBP'}[extension]))
+                self.assertNotIn('exif', image.info)
+        with Image.open(BytesIO(render(data, [64], 'fit')[(64, 'jpg')])) as image:
+            self.assertEqual(image.size, (32, 64))
+
+    def test_transparent_images_get_a_white_jpeg_background(self):
+        variants = render(image_bytes((50, 50), mode='RGBA'), [40], 'fit')
+        with Image.open(BytesIO(variants[(40, 'jpg')])) as image:
+            self.assertTrue(all(channel > 240 for channel in image.getpixel((20, 20))))
+        with Image.open(BytesIO(variants[(40, 'webp')])) as image:
+            self.assertEqual(image.mode, 'RGBA')
+
+    def test_identical_uploads_share_variants(self):
+        data = image_bytes((120, 120))
+        first = default_storage.save('profile_pics/a.png', ContentFile(data))
+        second = default_storage.save('profile_pics/b.png', ContentFile(data))
+        digest = store_variants(first, 'profile_picture', 'crop')
+        self.assertEqual(digest, hashlib.sha256(data).hexdigest())
+        self.assertTrue(default_storage.exists(variant_name(digest, 256, 'webp')))
+        with patch('core.images.render') as rendered:
+            self.assertEqual(store_variants(second, 'profile_picture', 'crop'), digest)
+        rendered.assert_not_called()
+
+    def test_refresh_stores_the_hash_and_variants_are_served(self):
+        name = default_storage.save('profile_pics/c.png', ContentFile(image_bytes((80, 60))))
+        profile = UserProfile.objects.create(user=self.user, profile_picture=name)
+        with patch('core.images.close_old_connections'):
+            refresh_variants(UserProfile, profile.pk)
+        digest = UserProfile.objects.get(pk=profile.pk).profile_picture_hash
+        self.assertEqual(len(digest), 64)
+
+        response = self.client.get(f'/api/images/{digest}/96', HTTP_ACCEPT='image/webp,*/*')
+        self.assertEqual((response.status_code, response['Content-Type']), (200, 'image/webp'))
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.client.get(f'/api/images/{digest}/96')['Content-Type'], 'image/jpeg')
+        self.assertIn('Accept', response['Vary'])
+        revalidated = self.client.get(f'/api/images/{digest}/96.webp', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        other_format = self.client.get(f'/api/images/{digest}/96.jpg', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(other_format.status_code, 200)
+        self.assertEqual(self.client.get(f'/api/images/{digest}/97').status_code, 404)
+
+    def test_unreadable_upload_clears_the_hash(self):
+        name = default_storage.save('profile_pics/broken.png', ContentFile(b'not an image'))
+        profile = UserProfile.objects.create(user=self.user, profile_picture=name)
+        UserProfile.objects.filter(pk=profile.pk).update(profile_picture_hash='0' * 64)
+        with patch('core.images.close_old_connections'), self.assertLogs('core.images', 'WARNING'):
+            refresh_variants(UserProfile, profile.pk)
+        self.assertEqual(UserProfile.objects.get(pk=profile.pk).profile_picture_hash, '')
@@ -0,0 +1,64 @@
+"""
+Refresh-token revocation backed by Redis.
+
+A revoked refresh token's JTI is stored under its own key that expires when
+the token would have expired anyway, so the store only ever holds tokens
+that could still be presented and a lookup is a single EXISTS whatever the
+history. Issued tokens are no longer recorded in simplejwt's
+``OutstandingToken`` table; ``prune_token_blacklist`` moves the existing
+blacklist into Redis and empties those tables.
+"""
+import math
+import time
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from .redis_client import get_redis
+
+# Extra seconds a revocation is kept, covering clock skew between servers
+REVOCATION_SLACK = 60
+
+
+def revoked_key(jti):
+    return f'jwt:revoked:{jti}'
+
+
+def revoke_many(tokens_to_revoke):
+    """Revoke ``(jti, exp)`` pairs, ``exp`` being the token's Unix expiry time; returns how many were stored"""
+    now = time.time()
+    pipe = get_redis().pipeline(transaction=False)
+    stored = 0
+    for jti, exp in tokens_to_revoke:
+        ttl = math.ceil(exp - now) + REVOCATION_SLACK
+        if ttl > 0:
+            pipe.set(revoked_key(jti), 1, ex=ttl)
+            stored += 1
+    pipe.execute()
+    return stored
+
+
+def revoke(jti, exp):
+    revoke_many([(jti, exp)])
+
+
+def is_revoked(jti):
+    return bool(get_redis().exists(revoked_key(jti)))
+
+
+class RefreshToken(tokens.RefreshToken):
+    """Refresh token whose blacklist lives in the Redis revocation store"""
+
+    def check_blacklist(self):
+        if is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        revoke(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+
+    @classmethod
+    def for_user(cls, user):
+        # Skip BlacklistMixin.for_user, which records every issued token in OutstandingToken
+        return super(tokens.BlacklistMixin, cls).for_user(user)
@@ -1,4 +1,4 @@
-from django.urls import path, include
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
 from . import views
@@ -16,5 +16,7 @@ urlpatterns = [
     path('auth/logout/', views.logout, name='auth_logout'),
     path('auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('auth/profile/', views.profile, name='auth_profile'),
+    re_path(r'^images/(?P<digest>[0-9a-f]{64})/(?P<size>[0-9]+)(?:\.(?P<extension>webp|jpg))?$',
+            views.image_variant, name='image_variant'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,9 +1,16 @@
 from rest_framework import status, viewsets, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_safe
+from .images import FORMATS, variant_name, variant_sizes
+from .fast_serializers import FastListMixin
 from .models import User, UserProfile, Institute, Role, Student, Faculty
+from .sparse_fields import SparseQuerysetMixin
+from .tokens import RefreshToken
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserSerializer,
     UserProfileSerializer, InstituteSerializer, RoleSerializer,
@@ -25,7 +32,7 @@ def register(request):
         refresh = RefreshToken.for_user(user)
         
         return Response({
-            'user': UserSerializer(user).data,
+            'user': UserSerializer(user, context={'request': request}).data,
             'access': str(refresh.access_token),
             'refresh': str(refresh),
             'message': 'User created successfully'
@@ -46,7 +53,7 @@ def login(request):
         refresh = RefreshToken.for_user(user)
         
         return Response({
-            'user': UserSerializer(user).data,
+            'user': UserSerializer(user, context={'request': request}).data,
             'access': str(refresh.access_token),
             'refresh': str(refresh),
             'message': 'Login successful'
@@ -75,40 +82,64 @@ def profile(request):
     """Get current user profile"""
     user = request.user
     return Response({
-        'user': UserSerializer(user).data,
+        'user': UserSerializer(user, context={'request': request}).data,
         'roles': [role.role.name for role in user.user_roles.filter(is_active=True)]
     })
 
 
-class UserViewSet(viewsets.ModelViewSet):
+@require_safe
+def image_variant(request, digest, size, extension=None):
+    """Serve a resized image; without an extension WebP is chosen when the client accepts it"""
+    negotiated = extension is None
+    if negotiated:
+        extension = 'webp' if 'image/webp' in request.headers.get('Accept', '') else 'jpg'
+    if int(size) not in variant_sizes():
+        raise Http404
+    name = variant_name(digest, size, extension)
+    etag = f'"{digest[:20]}-{size}-{extension}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+    elif default_storage.exists(name):
+        response = FileResponse(default_storage.open(name, 'rb'), content_type=FORMATS[extension][1])
+    else:
+        raise Http404
+    # The name is derived from the source's content, so a variant never changes
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response['ETag'] = etag
+    if negotiated:
+        patch_vary_headers(response, ['Accept'])
+    return response
+
+
+class UserViewSet(FastListMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for User model"""
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
-class InstituteViewSet(viewsets.ModelViewSet):
+class InstituteViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Institute model"""
     queryset = Institute.objects.all()
     serializer_class = InstituteSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
-class RoleViewSet(viewsets.ModelViewSet):
+class RoleViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Role model"""
     queryset = Role.objects.all()
     serializer_class = RoleSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
-class StudentViewSet(viewsets.ModelViewSet):
+class StudentViewSet(FastListMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Student model"""
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
-class FacultyViewSet(viewsets.ModelViewSet):
+class FacultyViewSet(FastListMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Faculty model"""
     queryset = Faculty.objects.all()
     serializer_class = FacultySerializer
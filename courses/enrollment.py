@@ -0,0 +1,80 @@
+"""
+Bulk enrollment of a semester's students into its core-subject offerings.
+
+For every core subject offered in the semester, the students of the
+subject's branch who are not yet enrolled in any of its sections are
+spread over the sections, always filling the least populated section that
+still has room, and inserted in batches with ON CONFLICT DO NOTHING. Each
+subject's offerings are locked while its students are placed, so concurrent
+runs cannot overfill a section.
+"""
+import heapq
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+from academics.models import StudentEnrollment
+from .models import CourseOffering, Enrollment
+
+
+def _place(student_ids, sections):
+    """Assign students to sections; ``sections`` is a list of (enrolled, section, offering_id, max_enrollment)"""
+    heap = [section for section in sections if section[0] < section[3]]
+    heapq.heapify(heap)
+    placed = []
+    for student_id in student_ids:
+        if not heap:
+            break
+        enrolled, section, offering_id, limit = heapq.heappop(heap)
+        placed.append((student_id, offering_id))
+        if enrolled + 1 < limit:
+            heapq.heappush(heap, (enrolled + 1, section, offering_id, limit))
+    return placed
+
+
+def auto_enroll(semester, branch=None, batch_size=None, progress=None):
+    """
+    Enroll the semester's active students into every core-subject offering of their branch.
+
+    ``progress`` is called as ``progress(subjects_done, subjects_total, created)``
+    after each subject. Returns a report with the number of enrollments
+    created and, per subject code, the students left without a seat.
+    """
+    batch_size = batch_size or settings.ENROLLMENT_BATCH_SIZE
+    offerings = CourseOffering.objects.filter(semester=semester, is_active=True, subject__subject_type='core',
+                                              subject__is_active=True)
+    students = StudentEnrollment.objects.filter(current_semester=semester, is_active=True)
+    if branch is not None:
+        offerings = offerings.filter(subject__branch=branch)
+        students = students.filter(branch=branch)
+
+    by_branch = defaultdict(list)
+    for branch_id, student_id in students.order_by('student_id').values_list('branch_id', 'student_id').iterator():
+        by_branch[branch_id].append(student_id)
+    subjects = sorted(set(offerings.values_list('subject_id', 'subject__branch_id', 'subject__code')))
+
+    report = {'students': sum(len(ids) for ids in by_branch.values()), 'subjects': len(subjects),
+              'created': 0, 'already_enrolled': 0, 'unplaced': {}}
+    for done, (subject_id, branch_id, code) in enumerate(subjects, 1):
+        with transaction.atomic():
+            sections = list(offerings.filter(subject_id=subject_id).select_for_update(of=('self',)).order_by('section'))
+            existing = list(Enrollment.objects.filter(course_offering__in=sections)
+                            .values_list('course_offering_id', 'student_id', 'status'))
+            enrolled = {student_id for _, student_id, _ in existing}
+            counts = Counter(offering_id for offering_id, _, status in existing if status == 'enrolled')
+            pending = [student_id for student_id in by_branch[branch_id] if student_id not in enrolled]
+            placed = _place(pending, [(counts[offering.pk], offering.section, offering.pk, offering.max_enrollment)
+                                      for offering in sections])
+            Enrollment.objects.bulk_create(
+                [Enrollment(student_id=student_id, course_offering_id=offering_id) for student_id, offering_id in placed],
+                batch_size=batch_size, ignore_conflicts=True)
+            created = Enrollment.objects.filter(course_offering__in=sections).count() - len(existing)
+
+        report['created'] += created
+        report['already_enrolled'] += len(by_branch[branch_id]) - len(pending)
+        if len(pending) > len(placed):
+            report['unplaced'][code] = len(pending) - len(placed)
+        if progress:
+            progress(done, len(subjects), report['created'])
+    return report
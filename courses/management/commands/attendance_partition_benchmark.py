@@ -0,0 +1,81 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from courses.partitions import next_period, partition_name, period_start
+
+COLUMNS = '''
+    id bigint NOT NULL,
+    attendance_session_id bigint NOT NULL,
+    student_id bigint NOT NULL,
+    status varchar(20) NOT NULL,
+    session_date date NOT NULL
+'''
+
+
+class Command(BaseCommand):
+    help = 'Compare inserts and current-semester queries on plain versus range partitioned attendance tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000000)
+        parser.add_argument('--years', type=int, default=4)
+        parser.add_argument('--students', type=int, default=5000)
+        parser.add_argument('--queries', type=int, default=50)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('This benchmark needs PostgreSQL')
+        rows, days = options['rows'], options['years'] * 365
+        today = date.today()
+        current = period_start(today)
+
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE IF EXISTS bench_attendance_plain, bench_attendance_partitioned CASCADE')
+            cursor.execute(f'CREATE TABLE bench_attendance_plain ({COLUMNS}, PRIMARY KEY (id))')
+            cursor.execute(f'CREATE TABLE bench_attendance_partitioned ({COLUMNS}, PRIMARY KEY (id, session_date)) '
+                           'PARTITION BY RANGE (session_date)')
+            start = period_start(date.fromordinal(today.toordinal() - days))
+            while start <= current:
+                cursor.execute(
+                    f"CREATE TABLE {partition_name(start).replace('courses_attendancerecord', 'bench_attendance')} "
+                    f"PARTITION OF bench_attendance_partitioned FOR VALUES FROM ('{start}') TO ('{next_period(start)}')")
+                start = next_period(start)
+            for table in ('bench_attendance_plain', 'bench_attendance_partitioned'):
+                cursor.execute(f'CREATE INDEX ON {table} (student_id, session_date)')
+
+            try:
+                for table in ('bench_attendance_plain', 'bench_attendance_partitioned'):
+                    started = time.perf_counter()
+                    cursor.execute(
+                        f"INSERT INTO {table} SELECT g, g / 40, g %% %s, "
+                        f"(ARRAY['present', 'absent', 'late', 'excused'])[1 + g %% 4], "
+                        f"CURRENT_DATE - (g %% %s)::int FROM generate_series(1, %s) g",
+                        [options['students'], days, rows])
+                    inserted = time.perf_counter() - started
+                    cursor.execute(f'ANALYZE {table}')
+
+                    started = time.perf_counter()
+                    for i in range(options['queries']):
+                        cursor.execute(
+                            f"SELECT student_id, count(*) FILTER (WHERE status <> 'absent') * 100.0 / count(*) "
+                            f"FROM {table} WHERE session_date >= %s AND student_id = %s GROUP BY student_id",
+                            [current, i * 97 % options['students']])
+                        cursor.fetchall()
+                    queried = time.perf_counter() - started
+                    started = time.perf_counter()
+                    cursor.execute(
+                        f"SELECT status, count(*) FROM {table} WHERE session_date >= %s GROUP BY status", [current])
+                    cursor.fetchall()
+                    aggregated = time.perf_counter() - started
+                    cursor.execute(
+                        f"EXPLAIN SELECT count(*) FROM {table} WHERE session_date >= %s", [current])
+                    scanned = sum(1 for line, in cursor.fetchall() if ' on bench_attendance' in line)
+                    self.stdout.write(
+                        f'{table}: insert {rows} rows in {inserted:.2f}s ({rows / inserted:.0f}/s), '
+                        f'{options["queries"]} current-semester student queries in {queried * 1000:.1f} ms, '
+                        f'semester-wide aggregate in {aggregated * 1000:.1f} ms, '
+                        f'{scanned} relation(s) scanned')
+            finally:
+                cursor.execute('DROP TABLE IF EXISTS bench_attendance_plain, bench_attendance_partitioned CASCADE')
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.models import Branch, Semester
+from courses.enrollment import auto_enroll
+
+
+class Command(BaseCommand):
+    help = "Enroll a semester's students into every core-subject offering of their branch"
+
+    def add_arguments(self, parser):
+        parser.add_argument('semester_id', type=int)
+        parser.add_argument('--branch', type=int, help='Only this branch')
+        parser.add_argument('--batch-size', type=int)
+
+    def handle(self, *args, **options):
+        semester = Semester.objects.filter(pk=options['semester_id']).first()
+        if semester is None:
+            raise CommandError('Semester not found')
+        branch = None
+        if options['branch']:
+            branch = Branch.objects.filter(pk=options['branch']).first()
+            if branch is None:
+                raise CommandError('Branch not found')
+
+        def progress(done, total, created):
+            self.stdout.write(f'{done}/{total} subjects, {created} enrollments created')
+
+        report = auto_enroll(semester, branch, options['batch_size'], progress)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {report['created']} enrollments for {report['students']} students in {report['subjects']} "
+            f"core subjects ({report['already_enrolled']} already enrolled)"))
+        for code, count in report['unplaced'].items():
+            self.stdout.write(self.style.WARNING(f'{code}: {count} students without a seat; add a section'))
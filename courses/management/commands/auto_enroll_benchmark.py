@@ -0,0 +1,106 @@
+import math
+import time
+from datetime import date
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from academics.models import AcademicYear, Branch, Program, Semester, StudentEnrollment, Subject
+from core.models import Faculty, Institute, Student, User
+from courses.enrollment import auto_enroll
+from courses.models import CourseOffering, Enrollment
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare one-at-a-time enrollment with bulk auto-enrollment on synthetic students'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=5000)
+        parser.add_argument('--subjects', type=int, default=10, help='Core subjects; students x subjects enrollments')
+        parser.add_argument('--sections', type=int, default=4)
+        parser.add_argument('--sample', type=int, default=200,
+                            help='Students enrolled one at a time; the full run time is extrapolated')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                semester = self.seed(options['students'], options['subjects'], options['sections'])
+                self.run(semester, options['students'] * options['subjects'], options['sample'])
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Synthetic data rolled back')
+
+    def seed(self, students, subjects, sections):
+        today = date.today()
+        institute = Institute.objects.create(name='Enrollment Benchmark', subdomain='enrollment-benchmark',
+                                             code='ENBENCH', address='-', phone='0', email='bench@example.com',
+                                             established_date=date(2000, 1, 1))
+        program = Program.objects.create(institute=institute, name='Benchmark Program', code='BENCH', duration_years=4)
+        branch = Branch.objects.create(program=program, name='Benchmark Branch', code='BENCH')
+        year = AcademicYear.objects.create(program=program, year_number=1, name='Year 1')
+        semester = Semester.objects.create(academic_year=year, semester_number=1, name='Semester 1',
+                                           start_date=today, end_date=today, is_current=True)
+        password = make_password(None)
+        faculty = Faculty.objects.create(
+            user=User.objects.create(username='enrollment-bench-faculty', password=password),
+            employee_id='ENBENCH', department='-', designation='-', joining_date=today)
+        limit = math.ceil(students / sections)
+        for number in range(subjects):
+            subject = Subject.objects.create(branch=branch, semester=semester, code=f'BENCH{number}',
+                                             name=f'Benchmark {number}', credits=3)
+            CourseOffering.objects.bulk_create([
+                CourseOffering(subject=subject, semester=semester, faculty=faculty, section=chr(65 + section),
+                               max_enrollment=limit)
+                for section in range(sections)
+            ])
+        for offset in range(0, students, 10000):
+            size = min(10000, students - offset)
+            users = User.objects.bulk_create([
+                User(username=f'enroll{offset + i}', email=f'enroll{offset + i}@example.com', password=password)
+                for i in range(size)
+            ])
+            created = Student.objects.bulk_create([
+                Student(user=user, enrollment_number=f'EB{offset + i:08d}', admission_date=today)
+                for i, user in enumerate(users)
+            ])
+            StudentEnrollment.objects.bulk_create([
+                StudentEnrollment(student=student, program=program, branch=branch, current_semester=semester,
+                                  enrollment_date=today)
+                for student in created
+            ])
+        return semester
+
+    def run(self, semester, total, sample):
+        offerings = CourseOffering.objects.filter(semester=semester)
+        subjects = list(offerings.values_list('subject_id', flat=True).distinct())
+
+        sid = transaction.savepoint()
+        student_ids = StudentEnrollment.objects.filter(current_semester=semester).values_list(
+            'student_id', flat=True)[:sample]
+        started = time.perf_counter()
+        for student_id in student_ids:
+            for subject_id in subjects:
+                offering = (offerings.filter(subject_id=subject_id).annotate(n=Count('enrollments'))
+                            .order_by('n', 'section').first())
+                Enrollment.objects.get_or_create(student_id=student_id, course_offering=offering)
+        per_row = (time.perf_counter() - started) / (len(student_ids) * len(subjects))
+        transaction.savepoint_rollback(sid)
+        self.stdout.write(f'One at a time: {per_row * 1000:.2f} ms per enrollment, '
+                          f'~{per_row * total:.0f}s extrapolated to {total} enrollments')
+
+        started = time.perf_counter()
+        report = auto_enroll(semester)
+        self.stdout.write(self.style.SUCCESS(
+            f"Bulk: {report['created']} enrollments in {time.perf_counter() - started:.2f}s"))
+        started = time.perf_counter()
+        report = auto_enroll(semester)
+        self.stdout.write(f"Repeat run: {report['created']} created in {time.perf_counter() - started:.2f}s")
+        self.stdout.write('Section sizes: ' + ', '.join(
+            str(n) for n in offerings.annotate(n=Count('enrollments')).order_by('subject_id', 'section')
+            .values_list('n', flat=True)[:8]))
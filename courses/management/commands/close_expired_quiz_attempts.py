@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from courses.quizzes import close_expired_attempts
+
+
+class Command(BaseCommand):
+    help = 'Flush and grade quiz attempts whose time ran out (run every minute, e.g. from cron)'
+
+    def handle(self, *args, **options):
+        closed = close_expired_attempts()
+        self.stdout.write(self.style.SUCCESS(f'Closed {closed} expired quiz attempts'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from courses.models import Quiz
+from courses.question_bank import generate_variants
+
+
+class Command(BaseCommand):
+    help = 'Pre-generate per-student question bank variants for a quiz (also runs automatically on publish)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_id', type=int)
+        parser.add_argument('--regenerate', action='store_true',
+                            help='Delete variants without attempts first, e.g. after the bank changed')
+
+    def handle(self, *args, **options):
+        quiz = Quiz.objects.filter(pk=options['quiz_id']).select_related('course_offering').first()
+        if quiz is None or not quiz.questions_from_bank:
+            raise CommandError('Quiz not found or it does not draw from the question bank')
+        if options['regenerate']:
+            quiz.variants.filter(attempts__isnull=True).delete()
+        count = generate_variants(quiz)
+        self.stdout.write(self.style.SUCCESS(f'Generated variants for {count} students'))
@@ -0,0 +1,39 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.partitions import (
+    attached_partitions, create_partition, detach_partition, is_partitioned, next_period, period_start,
+)
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming attendance record partitions and detach or archive old ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=2,
+                            help='Half-year partitions to keep ready beyond the current one')
+        parser.add_argument('--detach-before', type=date.fromisoformat,
+                            help='Detach partitions that end on or before this date (YYYY-MM-DD)')
+        parser.add_argument('--archive-schema', default='',
+                            help='Move detached partitions into this schema')
+
+    def handle(self, *args, **options):
+        if not is_partitioned():
+            raise CommandError('courses_attendancerecord is not a partitioned PostgreSQL table')
+
+        partitions = attached_partitions()
+        start = period_start(date.today())
+        for _ in range(options['ahead'] + 1):
+            if start not in partitions:
+                name, moved = create_partition(start)
+                self.stdout.write(self.style.SUCCESS(f'Created {name} ({moved} rows moved from the default partition)'))
+            start = next_period(start)
+
+        cutoff = options['detach_before']
+        if cutoff:
+            for start, name in sorted(partitions.items()):
+                if next_period(start) <= cutoff:
+                    detach_partition(name, options['archive_schema'] or None)
+                    where = f"into schema {options['archive_schema']}" if options['archive_schema'] else ''
+                    self.stdout.write(self.style.SUCCESS(f'Detached {name} {where}'.strip()))
@@ -0,0 +1,28 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.models import Program
+from courses.transcripts import program_rankings
+
+
+class Command(BaseCommand):
+    help = 'Print the CGPA ranking of every active student in a program as CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('program_id', type=int)
+        parser.add_argument('--branch', type=int)
+
+    def handle(self, *args, **options):
+        program = Program.objects.filter(pk=options['program_id']).first()
+        if program is None:
+            raise CommandError('Program not found')
+        started = time.perf_counter()
+        writer = csv.writer(self.stdout)
+        writer.writerow(['rank', 'enrollment_number', 'credits', 'cgpa'])
+        count = 0
+        for row in program_rankings(program, options['branch']).iterator():
+            writer.writerow([row['rank'], row['student__enrollment_number'], row['credits'], f"{row['cgpa']:.2f}"])
+            count += 1
+        self.stderr.write(f'Ranked {count} students in {time.perf_counter() - started:.2f}s')
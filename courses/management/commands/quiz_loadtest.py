@@ -0,0 +1,79 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.db import connection, connections
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.models import Quiz
+from courses.quizzes import start_attempt, record_answer, submit_attempt
+
+
+@contextmanager
+def count_writes(counter):
+    def wrapper(execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith('SELECT'):
+            counter[0] += 1
+        return execute(sql, params, many, context)
+    with connection.execute_wrapper(wrapper):
+        yield
+
+
+class Command(BaseCommand):
+    help = 'Simulate every enrolled student taking a timed quiz concurrently and report latency and DB writes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_id', type=int)
+        parser.add_argument('--students', type=int, default=500)
+        parser.add_argument('--clicks', type=int, default=3, help='Answer changes per question')
+        parser.add_argument('--workers', type=int, default=32)
+
+    def handle(self, *args, **options):
+        quiz = Quiz.objects.filter(pk=options['quiz_id']).first()
+        if quiz is None:
+            raise CommandError('Quiz not found')
+        questions = list(quiz.questions.values_list('id', 'question_type', 'options_json'))
+        students = [enrollment.student for enrollment in quiz.course_offering.enrollments.select_related('student')
+                    .filter(status='enrolled').exclude(student__quiz_attempts__quiz=quiz)[:options['students']]]
+        if not students:
+            raise CommandError('No enrolled students without an attempt at this quiz')
+
+        def take(student):
+            writes = [0]
+            latencies = []
+            try:
+                with count_writes(writes):
+                    attempt = start_attempt(quiz, student)
+                    for _ in range(options['clicks']):
+                        for question_id, question_type, options_json in questions:
+                            answer = self.random_answer(question_type, options_json)
+                            started = time.perf_counter()
+                            record_answer(attempt, question_id, answer)
+                            latencies.append(time.perf_counter() - started)
+                    submit_attempt(attempt)
+            finally:
+                connections.close_all()
+            return writes[0], latencies
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['workers']) as pool:
+            results = list(pool.map(take, students))
+        elapsed = time.perf_counter() - started
+
+        writes = sum(result[0] for result in results)
+        latencies = sorted(latency for result in results for latency in result[1])
+        p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+        self.stdout.write(f'{len(students)} students, {len(latencies)} answer clicks in {elapsed:.2f}s')
+        self.stdout.write(f'answer latency p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms')
+        self.stdout.write(self.style.SUCCESS(f'{writes} DB writes ({writes / len(students):.1f} per student)'))
+
+    @staticmethod
+    def random_answer(question_type, options_json):
+        if question_type == 'single_choice':
+            return random.randrange(max(len(options_json), 1))
+        if question_type == 'multiple_choice':
+            return random.sample(range(len(options_json)), k=min(2, len(options_json)))
+        if question_type == 'true_false':
+            return random.choice([True, False])
+        return 'answer'
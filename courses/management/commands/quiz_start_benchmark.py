@@ -0,0 +1,56 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from courses.models import Quiz, QuizVariant
+from courses.question_bank import bank_for, build_variant, variant_questions
+
+
+class Command(BaseCommand):
+    help = 'Compare quiz start cost with pre-generated variants versus generating them on the fly'
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_id', type=int)
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=64)
+
+    def handle(self, *args, **options):
+        quiz = Quiz.objects.filter(pk=options['quiz_id']).select_related('course_offering').first()
+        if quiz is None or not quiz.questions_from_bank:
+            raise CommandError('Quiz not found or it does not draw from the question bank')
+        subject_id = quiz.course_offering.subject_id
+        student_ids = list(quiz.variants.values_list('student_id', flat=True)[:options['students']])
+        if not student_ids:
+            raise CommandError('No variants yet; run generate_quiz_variants first')
+
+        def on_the_fly(student_id):
+            try:
+                return variant_questions(build_variant(quiz, student_id, bank_for(subject_id)), subject_id)
+            finally:
+                connections.close_all()
+
+        def precomputed(student_id):
+            try:
+                return variant_questions(QuizVariant.objects.get(quiz=quiz, student_id=student_id), subject_id)
+            finally:
+                connections.close_all()
+
+        for label, start in (('on the fly', on_the_fly), ('precomputed', precomputed)):
+            latencies = []
+
+            def timed(student_id):
+                started = time.perf_counter()
+                start(student_id)
+                latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(options['workers']) as pool:
+                list(pool.map(timed, student_ids))
+            elapsed = time.perf_counter() - started
+            latencies.sort()
+            self.stdout.write(
+                f'{label}: {len(student_ids)} starts in {elapsed:.2f}s, '
+                f'p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, '
+                f'p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms')
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from courses.models import Enrollment
+from courses.transcripts import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-semester grade snapshots from enrollments (e.g. after bulk grade imports)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--program', type=int, help='Only students of this program')
+        parser.add_argument('--semester', type=int, help='Only this semester')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        enrollments = Enrollment.objects.exclude(final_grade='')
+        if options['program']:
+            enrollments = enrollments.filter(student__enrollments__program_id=options['program']).distinct()
+        if options['semester']:
+            enrollments = enrollments.filter(course_offering__semester_id=options['semester'])
+        count = rebuild(enrollments, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} semester results'))
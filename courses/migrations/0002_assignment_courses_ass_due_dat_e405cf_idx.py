@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['due_date'], name='courses_ass_due_dat_e405cf_idx'),
+        ),
+    ]
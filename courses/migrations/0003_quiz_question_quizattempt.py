@@ -0,0 +1,66 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('courses', '0002_assignment_courses_ass_due_dat_e405cf_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Quiz',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('time_limit_minutes', models.PositiveIntegerField(default=30)),
+                ('due_date', models.DateTimeField()),
+                ('is_published', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course_offering', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quizzes', to='courses.courseoffering')),
+            ],
+            options={
+                'verbose_name_plural': 'Quizzes',
+            },
+        ),
+        migrations.CreateModel(
+            name='Question',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_text', models.TextField()),
+                ('question_type', models.CharField(choices=[('single_choice', 'Single Choice'), ('multiple_choice', 'Multiple Choice'), ('true_false', 'True/False'), ('short_answer', 'Short Answer')], default='single_choice', max_length=20)),
+                ('points', models.DecimalField(decimal_places=2, default=1, max_digits=5)),
+                ('options_json', models.JSONField(blank=True, default=list, help_text='List of option texts for choice questions')),
+                ('correct_answer', models.JSONField(help_text='Option index, list of option indexes, boolean, or list of accepted texts')),
+                ('order', models.PositiveIntegerField(default=0)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='courses.quiz')),
+            ],
+            options={
+                'ordering': ['order', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='QuizAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_time', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(help_text='Start time plus the time limit, capped at the quiz due date')),
+                ('end_time', models.DateTimeField(blank=True, null=True)),
+                ('answers', models.JSONField(default=dict, help_text='Question ID to answer; written once on submit or timeout')),
+                ('score', models.DecimalField(blank=True, decimal_places=2, max_digits=7, null=True)),
+                ('status', models.CharField(choices=[('in_progress', 'In Progress'), ('submitted', 'Submitted'), ('timed_out', 'Timed Out')], default='in_progress', max_length=20)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempts', to='courses.quiz')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_attempts', to='core.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'expires_at'], name='courses_qui_status_ec192c_idx')],
+                'unique_together': {('quiz', 'student')},
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('academics', '0002_initial'),
+        ('courses', '0003_quiz_question_quizattempt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='subject',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='bank_questions', to='academics.subject'),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='questions_from_bank',
+            field=models.PositiveIntegerField(blank=True, help_text="If set, each student gets this many questions drawn from the subject's question bank", null=True),
+        ),
+        migrations.AlterField(
+            model_name='question',
+            name='quiz',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='courses.quiz'),
+        ),
+        migrations.CreateModel(
+            name='QuizVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_ids', models.JSONField(default=list, help_text='Bank question IDs in display order')),
+                ('option_orders', models.JSONField(default=list, help_text='Per question, original option index at each display position')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='variants', to='courses.quiz')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_variants', to='core.student')),
+            ],
+            options={
+                'unique_together': {('quiz', 'student')},
+            },
+        ),
+        migrations.AddField(
+            model_name='quizattempt',
+            name='variant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attempts', to='courses.quizvariant'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:52
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_user_search_vector_and_more'),
+        ('courses', '0004_question_subject_quiz_questions_from_bank_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignment',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='courses_ass_search__39e3f9_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='courses_assignment_title_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,123 @@
+# Range-partitions courses_attendancerecord by session_date (PostgreSQL only).
+#
+# Postgres requires the partition key in every unique constraint, so the
+# primary key becomes (id, session_date) and the session/student unique
+# constraint gains session_date; both are equivalent for the ORM because a
+# session has exactly one date. Identity columns are not allowed on
+# partitioned tables before Postgres 17, so ids come from an owned sequence.
+
+from datetime import date
+
+from django.db import migrations, models
+
+TABLE = 'courses_attendancerecord'
+COLUMNS = 'id, status, marked_at, notes, attendance_session_id, marked_by_id, student_id, session_date'
+COLUMN_DEFINITIONS = '''
+    status varchar(20) NOT NULL,
+    marked_at timestamp with time zone NOT NULL,
+    notes text NOT NULL,
+    attendance_session_id bigint NOT NULL
+        REFERENCES courses_attendancesession (id) DEFERRABLE INITIALLY DEFERRED,
+    marked_by_id bigint NULL REFERENCES core_faculty (id) DEFERRABLE INITIALLY DEFERRED,
+    student_id bigint NOT NULL REFERENCES core_student (id) DEFERRABLE INITIALLY DEFERRED,
+    session_date date NOT NULL
+'''
+
+
+def half_year(day):
+    return date(day.year, 1 if day.month <= 6 else 7, 1)
+
+
+def next_half_year(start):
+    return date(start.year + 1, 1, 1) if start.month == 7 else date(start.year, 7, 1)
+
+
+def fill_session_date(apps, schema_editor):
+    AttendanceRecord = apps.get_model('courses', 'AttendanceRecord')
+    AttendanceRecord.objects.update(
+        session_date=models.Subquery(
+            apps.get_model('courses', 'AttendanceSession').objects
+            .filter(pk=models.OuterRef('attendance_session_id')).values('session_date')[:1]
+        )
+    )
+
+
+def partition(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'SELECT min(session_date), max(session_date) FROM {TABLE}')
+        low, high = cursor.fetchone()
+        today = date.today()
+        start = half_year(min(low or today, today))
+        end = next_half_year(next_half_year(half_year(max(high or today, today))))
+
+        cursor.execute(f'ALTER TABLE {TABLE} RENAME TO {TABLE}_unpartitioned')
+        cursor.execute(f'ALTER TABLE {TABLE}_unpartitioned ALTER COLUMN id DROP IDENTITY')
+        cursor.execute(f'CREATE SEQUENCE {TABLE}_id_seq')
+        cursor.execute(f'''
+            CREATE TABLE {TABLE} (
+                id bigint NOT NULL DEFAULT nextval('{TABLE}_id_seq'),
+                {COLUMN_DEFINITIONS},
+                PRIMARY KEY (id, session_date),
+                UNIQUE (attendance_session_id, student_id, session_date)
+            ) PARTITION BY RANGE (session_date)
+        ''')
+        cursor.execute(f'ALTER SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id')
+        cursor.execute(f'CREATE INDEX {TABLE}_student_date ON {TABLE} (student_id, session_date)')
+        cursor.execute(f'CREATE INDEX {TABLE}_marked_by ON {TABLE} (marked_by_id)')
+        cursor.execute(f'CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT')
+        while start < end:
+            stop = next_half_year(start)
+            name = f'{TABLE}_p{start.year}h{1 if start.month == 1 else 2}'
+            cursor.execute(f"CREATE TABLE {name} PARTITION OF {TABLE} FOR VALUES FROM ('{start}') TO ('{stop}')")
+            start = stop
+
+        cursor.execute(f'INSERT INTO {TABLE} ({COLUMNS}) SELECT {COLUMNS} FROM {TABLE}_unpartitioned')
+        cursor.execute(f"SELECT setval('{TABLE}_id_seq', coalesce((SELECT max(id) FROM {TABLE}), 0) + 1, false)")
+        cursor.execute(f'DROP TABLE {TABLE}_unpartitioned')
+
+
+def unpartition(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        cursor.execute(f'''
+            CREATE TABLE {TABLE}_unpartitioned (
+                id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+                {COLUMN_DEFINITIONS},
+                UNIQUE (attendance_session_id, student_id)
+            )
+        ''')
+        cursor.execute(f'INSERT INTO {TABLE}_unpartitioned ({COLUMNS}) SELECT {COLUMNS} FROM {TABLE}')
+        cursor.execute(f"SELECT setval(pg_get_serial_sequence('{TABLE}_unpartitioned', 'id'), "
+                       f"coalesce((SELECT max(id) FROM {TABLE}), 0) + 1, false)")
+        cursor.execute(f'DROP TABLE {TABLE}')
+        cursor.execute(f'ALTER TABLE {TABLE}_unpartitioned RENAME TO {TABLE}')
+        for column in ('attendance_session_id', 'student_id', 'marked_by_id'):
+            cursor.execute(f'CREATE INDEX ON {TABLE} ({column})')
+
+
+class Migration(migrations.Migration):
+
+    atomic = True
+
+    dependencies = [
+        ('courses', '0005_assignment_search_vector_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendancerecord',
+            name='session_date',
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_session_date, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='attendancerecord',
+            name='session_date',
+            field=models.DateField(editable=False, help_text='Copy of the session date; the table is range partitioned on it'),
+        ),
+        migrations.RunPython(partition, unpartition),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_user_search_vector_and_more'),
+        ('academics', '0004_semesterrollover'),
+        ('courses', '0006_partition_attendancerecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SemesterResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('credits_attempted', models.PositiveIntegerField(default=0)),
+                ('credits_earned', models.PositiveIntegerField(default=0)),
+                ('grade_points', models.DecimalField(decimal_places=2, default=0, help_text='Sum of credits x grade point over graded courses', max_digits=8)),
+                ('sgpa', models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True)),
+                ('courses', models.JSONField(default=dict, help_text='Transcript lines keyed by enrollment id')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('semester', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_results', to='academics.semester')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='semester_results', to='core.student')),
+            ],
+            options={
+                'unique_together': {('student', 'semester')},
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_semesterresult'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['course_offering', 'updated_at', 'id'], name='courses_ass_course__2e7f8a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignmentsubmission',
+            index=models.Index(fields=['student', 'updated_at', 'id'], name='courses_ass_student_c460ff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignmentsubmission',
+            index=models.Index(fields=['assignment', 'updated_at', 'id'], name='courses_ass_assignm_1d15ba_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='courseoffering',
+            index=models.Index(fields=['faculty', 'updated_at', 'id'], name='courses_cou_faculty_27042f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['student', 'updated_at', 'id'], name='courses_enr_student_0a7467_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['course_offering', 'updated_at', 'id'], name='courses_enr_course__65846b_idx'),
+        ),
+    ]
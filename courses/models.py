@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from core.models import Faculty, Student
 from academics.models import Subject, Semester
@@ -18,6 +20,7 @@ class CourseOffering(models.Model):
 
     class Meta:
         unique_together = ['subject', 'semester', 'section']
+        indexes = [models.Index(fields=['faculty', 'updated_at', 'id'])]
 
     def __str__(self):
         return f"{self.subject.name} - {self.section} ({self.semester.name})"
@@ -45,6 +48,10 @@ class Enrollment(models.Model):
 
     class Meta:
         unique_together = ['student', 'course_offering']
+        indexes = [
+            models.Index(fields=['student', 'updated_at', 'id']),
+            models.Index(fields=['course_offering', 'updated_at', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.student.user.get_full_name()} - {self.course_offering.subject.name}"
@@ -71,6 +78,15 @@ class Assignment(models.Model):
     submission_format = models.JSONField(default=dict, help_text="Allowed file types and constraints")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['due_date']),
+            models.Index(fields=['course_offering', 'updated_at', 'id']),
+            GinIndex(fields=['search_vector']),
+            GinIndex(name='courses_assignment_title_trgm', fields=['title'], opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.course_offering.subject.name}"
@@ -98,6 +114,10 @@ class AssignmentSubmission(models.Model):
 
     class Meta:
         unique_together = ['assignment', 'student']
+        indexes = [
+            models.Index(fields=['student', 'updated_at', 'id']),
+            models.Index(fields=['assignment', 'updated_at', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.student.user.get_full_name()} - {self.assignment.title}"
@@ -137,13 +157,128 @@ class AttendanceRecord(models.Model):
         ('late', 'Late'),
         ('excused', 'Excused'),
     ]
+    # Statuses counted as attending wherever attendance percentages are computed; excused absences are not held
+    # against the student
+    attended_statuses = ['present', 'late', 'excused']
     status = models.CharField(max_length=20, choices=status_choices, default='absent')
     marked_by = models.ForeignKey(Faculty, on_delete=models.SET_NULL, null=True, related_name='marked_attendance')
     marked_at = models.DateTimeField(auto_now_add=True)
     notes = models.TextField(blank=True)
+    session_date = models.DateField(editable=False, help_text="Copy of the session date; the table is range partitioned on it")
 
     class Meta:
         unique_together = ['attendance_session', 'student']
 
     def __str__(self):
-        return f"{self.student.user.get_full_name()} - {self.attendance_session.session_date} ({self.status})"
+        return f"{self.student.user.get_full_name()} - {self.session_date} ({self.status})"
+
+    def save(self, *args, **kwargs):
+        if self.session_date is None:
+            self.session_date = self.attendance_session.session_date
+        super().save(*args, **kwargs)
+
+
+class Quiz(models.Model):
+    """Timed quizzes for a course offering"""
+    course_offering = models.ForeignKey(CourseOffering, on_delete=models.CASCADE, related_name='quizzes')
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    time_limit_minutes = models.PositiveIntegerField(default=30)
+    due_date = models.DateTimeField()
+    is_published = models.BooleanField(default=False)
+    questions_from_bank = models.PositiveIntegerField(
+        blank=True, null=True,
+        help_text="If set, each student gets this many questions drawn from the subject's question bank")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Quizzes"
+
+    def __str__(self):
+        return f"{self.title} - {self.course_offering.subject.name}"
+
+
+class Question(models.Model):
+    """A question in a quiz, or in a subject's question bank when ``quiz`` is empty"""
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='questions', blank=True, null=True)
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='bank_questions', blank=True, null=True)
+    question_text = models.TextField()
+    question_type_choices = [
+        ('single_choice', 'Single Choice'),
+        ('multiple_choice', 'Multiple Choice'),
+        ('true_false', 'True/False'),
+        ('short_answer', 'Short Answer'),
+    ]
+    question_type = models.CharField(max_length=20, choices=question_type_choices, default='single_choice')
+    points = models.DecimalField(max_digits=5, decimal_places=2, default=1)
+    options_json = models.JSONField(default=list, blank=True, help_text="List of option texts for choice questions")
+    correct_answer = models.JSONField(help_text="Option index, list of option indexes, boolean, or list of accepted texts")
+    order = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['order', 'id']
+
+    def __str__(self):
+        return f"{self.quiz.title if self.quiz_id else self.subject.name} - Q{self.order}"
+
+
+class QuizVariant(models.Model):
+    """Pre-generated question selection and option order for one student in a bank-drawn quiz"""
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='variants')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='quiz_variants')
+    question_ids = models.JSONField(default=list, help_text="Bank question IDs in display order")
+    option_orders = models.JSONField(default=list, help_text="Per question, original option index at each display position")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['quiz', 'student']
+
+    def __str__(self):
+        return f"{self.student.enrollment_number} - {self.quiz.title}"
+
+
+class QuizAttempt(models.Model):
+    """A student's attempt at a quiz"""
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='attempts')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='quiz_attempts')
+    variant = models.ForeignKey(QuizVariant, on_delete=models.SET_NULL, related_name='attempts', blank=True, null=True)
+    start_time = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(help_text="Start time plus the time limit, capped at the quiz due date")
+    end_time = models.DateTimeField(blank=True, null=True)
+    answers = models.JSONField(default=dict, help_text="Question ID to answer; written once on submit or timeout")
+    score = models.DecimalField(max_digits=7, decimal_places=2, blank=True, null=True)
+    status_choices = [
+        ('in_progress', 'In Progress'),
+        ('submitted', 'Submitted'),
+        ('timed_out', 'Timed Out'),
+    ]
+    status = models.CharField(max_length=20, choices=status_choices, default='in_progress')
+
+    class Meta:
+        unique_together = ['quiz', 'student']
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.student.user.get_full_name()} - {self.quiz.title}"
+
+
+class SemesterResult(models.Model):
+    """Per-semester grade snapshot of a student, kept up to date as final grades change"""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='semester_results')
+    semester = models.ForeignKey(Semester, on_delete=models.CASCADE, related_name='student_results')
+    credits_attempted = models.PositiveIntegerField(default=0)
+    credits_earned = models.PositiveIntegerField(default=0)
+    grade_points = models.DecimalField(max_digits=8, decimal_places=2, default=0,
+                                       help_text="Sum of credits x grade point over graded courses")
+    sgpa = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True)
+    courses = models.JSONField(default=dict, help_text="Transcript lines keyed by enrollment id")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['student', 'semester']
+
+    def __str__(self):
+        return f"{self.student.user.get_full_name()} - {self.semester.name} ({self.sgpa})"
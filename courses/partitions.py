@@ -0,0 +1,83 @@
+"""
+Maintenance of the half-yearly range partitions of the attendance record table.
+
+Partitions are named ``courses_attendancerecord_p<year>h<1|2>`` and cover
+January-June and July-December; a DEFAULT partition catches anything else.
+"""
+import re
+from datetime import date
+
+from django.db import connection, transaction
+
+from .models import AttendanceRecord
+
+TABLE = AttendanceRecord._meta.db_table
+DEFAULT_PARTITION = f'{TABLE}_default'
+PARTITION_NAME = re.compile(rf'^{TABLE}_p(\d{{4}})h([12])$')
+
+
+def period_start(day):
+    return date(day.year, 1 if day.month <= 6 else 7, 1)
+
+
+def next_period(start):
+    return date(start.year + 1, 1, 1) if start.month == 7 else date(start.year, 7, 1)
+
+
+def partition_name(start):
+    return f'{TABLE}_p{start.year}h{1 if start.month == 1 else 2}'
+
+
+def is_partitioned():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [TABLE])
+        return cursor.fetchone() is not None
+
+
+def attached_partitions():
+    """Return ``{period start: partition name}`` for the attached range partitions"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = to_regclass(%s)', [TABLE])
+        names = [name for name, in cursor.fetchall()]
+    partitions = {}
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match[1]), 1 if match[2] == '1' else 7, 1)] = name
+    return partitions
+
+
+@transaction.atomic
+def create_partition(start):
+    """
+    Create and attach the partition for the half-year beginning at ``start``.
+
+    Rows that already landed in the default partition for that range are moved
+    into the new table before it is attached, since Postgres refuses to attach
+    a range the default partition still holds rows for.
+    """
+    name, end = partition_name(start), next_period(start)
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE session_date >= %s AND session_date < %s '
+            f'RETURNING *) INSERT INTO {name} SELECT * FROM moved', [start, end])
+        moved = cursor.rowcount
+        cursor.execute(f"ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')")
+    return name, moved
+
+
+@transaction.atomic
+def detach_partition(name, archive_schema=None):
+    """Detach a partition, optionally moving it into ``archive_schema`` instead of leaving it beside the parent"""
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {TABLE} DETACH PARTITION {name}')
+        # A detached table takes no new rows; dropping the default unties it from the parent's id sequence
+        cursor.execute(f'ALTER TABLE {name} ALTER COLUMN id DROP DEFAULT')
+        if archive_schema:
+            cursor.execute(f'CREATE SCHEMA IF NOT EXISTS {archive_schema}')
+            cursor.execute(f'ALTER TABLE {name} SET SCHEMA {archive_schema}')
@@ -0,0 +1,104 @@
+import random
+from itertools import islice
+
+from django.core.cache import cache
+
+from .models import Enrollment, Question, QuizVariant
+
+CHOICE_TYPES = ('single_choice', 'multiple_choice')
+
+
+def bank_for(subject_id):
+    """(id, type, option count) of every bank question of a subject, in a stable order"""
+    return [
+        (question_id, question_type, len(options or []))
+        for question_id, question_type, options in Question.objects.filter(subject_id=subject_id, quiz__isnull=True)
+        .order_by('id').values_list('id', 'question_type', 'options_json')
+    ]
+
+
+def build_variant(quiz, student_id, bank):
+    """Deterministic variant: the same quiz, student and bank always give the same questions and order"""
+    rng = random.Random(f"{quiz.pk}:{student_id}")
+    picked = rng.sample(bank, min(quiz.questions_from_bank, len(bank)))
+    return QuizVariant(
+        quiz=quiz,
+        student_id=student_id,
+        question_ids=[question_id for question_id, _, _ in picked],
+        option_orders=[
+            rng.sample(range(option_count), option_count) if question_type in CHOICE_TYPES else []
+            for _, question_type, option_count in picked
+        ],
+    )
+
+
+def generate_variants(quiz, batch_size=1000):
+    """Pre-generate a variant for every enrolled student; existing variants are kept. Returns how many were added"""
+    bank = bank_for(quiz.course_offering.subject_id)
+    student_ids = (Enrollment.objects.filter(course_offering_id=quiz.course_offering_id, status='enrolled')
+                   .values_list('student_id', flat=True).iterator(chunk_size=batch_size))
+    created = 0
+    while True:
+        chunk = list(islice(student_ids, batch_size))
+        if not chunk:
+            return created
+        existing = set(QuizVariant.objects.filter(quiz=quiz, student_id__in=chunk).values_list('student_id', flat=True))
+        missing = [student_id for student_id in chunk if student_id not in existing]
+        # A student starting the quiz meanwhile may have built their variant already
+        QuizVariant.objects.bulk_create([build_variant(quiz, student_id, bank) for student_id in missing],
+                                        ignore_conflicts=True)
+        created += len(missing)
+
+
+def variant_for(quiz, student):
+    """The student's variant; built on the spot only for students enrolled after publishing"""
+    variant = QuizVariant.objects.filter(quiz=quiz, student=student).first()
+    if variant is None:
+        # Two starts at once build the same variant; whichever insert loses is ignored
+        QuizVariant.objects.bulk_create([build_variant(quiz, student.pk, bank_for(quiz.course_offering.subject_id))],
+                                        ignore_conflicts=True)
+        variant = QuizVariant.objects.get(quiz=quiz, student=student)
+    return variant
+
+
+def bank_payloads(subject_id):
+    """Student-facing bank questions by id, cached so quiz starts do not hit the question table"""
+    from .serializers import StudentQuestionSerializer
+
+    def load():
+        questions = Question.objects.filter(subject_id=subject_id, quiz__isnull=True)
+        return {question['id']: question for question in StudentQuestionSerializer(questions, many=True).data}
+
+    return cache.get_or_set(f"question_bank:{subject_id}", load, timeout=300)
+
+
+def variant_questions(variant, subject_id):
+    """The variant's questions in display order with options permuted"""
+    bank = bank_payloads(subject_id)
+    questions = []
+    for question_id, order in zip(variant.question_ids, variant.option_orders):
+        if question_id not in bank:
+            continue
+        question = dict(bank[question_id])
+        if order:
+            question['options_json'] = [question['options_json'][index] for index in order]
+        questions.append(question)
+    return questions
+
+
+def to_original_options(answers, variant):
+    """Map answers given as displayed option positions back to the bank question's option indexes"""
+    orders = {str(question_id): order for question_id, order in zip(variant.question_ids, variant.option_orders)}
+
+    def original(order, position):
+        return order[position] if isinstance(position, int) and 0 <= position < len(order) else None
+
+    mapped = {}
+    for question_id, answer in answers.items():
+        order = orders.get(question_id)
+        if order and isinstance(answer, int) and not isinstance(answer, bool):
+            answer = original(order, answer)
+        elif order and isinstance(answer, list):
+            answer = [original(order, position) for position in answer]
+        mapped[question_id] = answer
+    return mapped
@@ -0,0 +1,196 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from core.redis_client import get_redis
+from .models import Question, QuizAttempt
+from .question_bank import bank_payloads, variant_for, to_original_options
+
+# In-progress answers live in a Redis hash per attempt (question id -> JSON
+# answer) and reach Postgres once, when the attempt is submitted or times out.
+ANSWERS_GRACE = timedelta(minutes=10)
+
+
+class QuizClosed(Exception):
+    pass
+
+
+def answers_key(attempt_id):
+    return f"quiz:attempt:{attempt_id}:answers"
+
+
+def start_attempt(quiz, student):
+    """Return the student's attempt, creating it on first start"""
+    now = timezone.now()
+    attempt = QuizAttempt.objects.filter(quiz=quiz, student=student).first()
+    if attempt is not None:
+        return attempt
+    if not quiz.is_published or now >= quiz.due_date:
+        raise QuizClosed("This quiz is not open.")
+    expires_at = min(now + timedelta(minutes=quiz.time_limit_minutes), quiz.due_date)
+    variant = variant_for(quiz, student) if quiz.questions_from_bank else None
+    attempt, _ = QuizAttempt.objects.get_or_create(
+        quiz=quiz, student=student, defaults={'expires_at': expires_at, 'variant': variant})
+    return attempt
+
+
+def quiz_question_types(quiz_id):
+    """``{question id: type}`` of a quiz's questions, cached so answering does not query the question table"""
+    return cache.get_or_set(
+        f"quiz:{quiz_id}:question_types",
+        lambda: dict(Question.objects.filter(quiz_id=quiz_id).values_list('id', 'question_type')),
+        timeout=300,
+    )
+
+
+def attempt_question_type(attempt, question_id):
+    """Type of a question of the attempt's quiz (or variant), or None if it is not one of them"""
+    if attempt.variant_id:
+        if question_id not in attempt.variant.question_ids:
+            return None
+        question = bank_payloads(attempt.quiz.course_offering.subject_id).get(question_id)
+        return question and question['question_type']
+    return quiz_question_types(attempt.quiz_id).get(question_id)
+
+
+def _is_index(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def valid_answer(question_type, answer):
+    """Whether ``answer`` has the shape answers to ``question_type`` questions take"""
+    if question_type == 'single_choice':
+        return _is_index(answer)
+    if question_type == 'multiple_choice':
+        return isinstance(answer, list) and all(_is_index(item) for item in answer)
+    if question_type == 'true_false':
+        return isinstance(answer, bool)
+    if question_type == 'short_answer':
+        return isinstance(answer, str)
+    return False
+
+
+def record_answer(attempt, question_id, answer):
+    """Save one answer of an in-progress attempt in Redis only"""
+    now = timezone.now()
+    if attempt.status != 'in_progress' or now >= attempt.expires_at:
+        raise QuizClosed("This attempt is closed.")
+    key = answers_key(attempt.pk)
+    pipe = get_redis().pipeline()
+    pipe.hset(key, str(question_id), json.dumps(answer))
+    pipe.expireat(key, attempt.expires_at + ANSWERS_GRACE)
+    pipe.execute()
+
+
+def saved_answers(attempt_id):
+    return _decode(get_redis().hgetall(answers_key(attempt_id)))
+
+
+def _decode(raw):
+    return {question_id.decode(): json.loads(answer) for question_id, answer in raw.items()}
+
+
+def _final_answers(attempt, raw):
+    answers = _decode(raw)
+    if attempt.variant_id:
+        answers = to_original_options(answers, attempt.variant)
+    return answers
+
+
+def submit_attempt(attempt):
+    """Flush the attempt's answers to the database and grade it"""
+    if attempt.status != 'in_progress':
+        return attempt
+    now = timezone.now()
+    attempt.answers = _final_answers(attempt, get_redis().hgetall(answers_key(attempt.pk)))
+    attempt.end_time = min(now, attempt.expires_at)
+    attempt.status = 'submitted' if now < attempt.expires_at else 'timed_out'
+    with transaction.atomic():
+        grade_attempts([attempt], fields=['answers', 'end_time', 'status', 'score'])
+        transaction.on_commit(lambda: get_redis().delete(answers_key(attempt.pk)))
+    return attempt
+
+
+def close_expired_attempts(batch_size=1000):
+    """Flush and grade every in-progress attempt past its deadline"""
+    closed = 0
+    redis = get_redis()
+    while True:
+        attempts = list(QuizAttempt.objects.filter(status='in_progress', expires_at__lte=timezone.now())
+                        .select_related('variant').order_by('expires_at')[:batch_size])
+        if not attempts:
+            return closed
+        pipe = redis.pipeline()
+        for attempt in attempts:
+            pipe.hgetall(answers_key(attempt.pk))
+        for attempt, raw in zip(attempts, pipe.execute()):
+            attempt.answers = _final_answers(attempt, raw)
+            attempt.end_time = attempt.expires_at
+            attempt.status = 'timed_out'
+        with transaction.atomic():
+            grade_attempts(attempts, fields=['answers', 'end_time', 'status', 'score'])
+            keys = [answers_key(attempt.pk) for attempt in attempts]
+            transaction.on_commit(lambda: redis.delete(*keys))
+        closed += len(attempts)
+
+
+def _normalise(question_type, value):
+    """Comparable form of an answer or answer key; None, which never scores, for malformed ones"""
+    if question_type == 'multiple_choice':
+        return frozenset(value) if isinstance(value, list) and all(_is_index(item) for item in value) else None
+    if question_type == 'short_answer':
+        if isinstance(value, list):
+            return frozenset(str(text).strip().lower() for text in value)
+        return str(value).strip().lower()
+    return value
+
+
+def answer_key(question_ids):
+    """question id -> (points, type, normalised correct answer)
+
+    Answers only reach an attempt after being checked against its quiz's (or
+    variant's) questions and their types, so the key can be loaded by
+    question id alone.
+    """
+    return {
+        str(question_id): (points, question_type, _normalise(question_type, correct))
+        for question_id, points, question_type, correct in Question.objects.filter(id__in=question_ids)
+        .values_list('id', 'points', 'question_type', 'correct_answer')
+    }
+
+
+def _score(answers, key):
+    score = Decimal(0)
+    for question_id, answer in answers.items():
+        entry = key.get(question_id)
+        if entry is None:
+            continue
+        points, question_type, correct = entry
+        given = _normalise(question_type, answer)
+        if given is None:
+            continue
+        if question_type == 'short_answer':
+            is_correct = given in correct if isinstance(correct, frozenset) else given == correct
+        else:
+            is_correct = given == correct
+        if is_correct:
+            score += points
+    return score
+
+
+def grade_attempts(attempts, fields=('score',)):
+    """Grade many attempts in one pass: one query for the answer keys, one bulk update for the scores"""
+    key = answer_key({int(question_id) for attempt in attempts for question_id in attempt.answers})
+    for attempt in attempts:
+        attempt.score = _score(attempt.answers, key)
+    QuizAttempt.objects.bulk_update(attempts, list(fields), batch_size=500)
+    return attempts
+
+
+def regrade_quiz(quiz):
+    """Re-grade every finished attempt of a quiz, e.g. after correcting the answer key"""
+    return grade_attempts(list(quiz.attempts.exclude(status='in_progress')))
@@ -0,0 +1,34 @@
+from rest_framework import serializers
+from .models import Quiz, Question, QuizAttempt
+
+
+class QuestionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Question
+        fields = '__all__'
+
+
+class StudentQuestionSerializer(serializers.ModelSerializer):
+    """Question as shown to a student taking the quiz (no answer key)"""
+
+    class Meta:
+        model = Question
+        fields = ('id', 'question_text', 'question_type', 'points', 'options_json', 'order')
+
+
+class QuizSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Quiz
+        fields = '__all__'
+
+
+class QuizAttemptSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = QuizAttempt
+        fields = '__all__'
+        read_only_fields = ('quiz', 'student', 'start_time', 'expires_at', 'end_time', 'answers', 'score', 'status')
+
+
+class AnswerSerializer(serializers.Serializer):
+    question = serializers.IntegerField()
+    answer = serializers.JSONField()
@@ -0,0 +1,53 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import AttendanceSession, CourseOffering, Enrollment, Quiz
+from .question_bank import generate_variants
+from .transcripts import record_enrollment, update_line
+
+
+@receiver(pre_save, sender=Quiz)
+def remember_quiz_publish_state(sender, instance, **kwargs):
+    instance._was_published = bool(
+        instance.pk and Quiz.objects.filter(pk=instance.pk, is_published=True).exists()
+    )
+
+
+@receiver(post_save, sender=Quiz)
+def pregenerate_variants(sender, instance, **kwargs):
+    if instance.is_published and instance.questions_from_bank and not getattr(instance, '_was_published', False):
+        transaction.on_commit(lambda: generate_variants(instance))
+
+
+@receiver(post_save, sender=AttendanceSession)
+def sync_attendance_record_dates(sender, instance, created, **kwargs):
+    if not created:
+        instance.records.exclude(session_date=instance.session_date).update(session_date=instance.session_date)
+
+
+@receiver(pre_save, sender=Enrollment)
+def remember_enrollment_grade(sender, instance, **kwargs):
+    instance._previous_grade = (
+        Enrollment.objects.filter(pk=instance.pk).values_list(
+            'final_grade', 'course_offering_id', 'course_offering__semester_id').first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Enrollment)
+def update_semester_result(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_grade', None)
+    if previous and previous[1] != instance.course_offering_id:
+        update_line(instance.student_id, previous[2], instance.pk, None)
+    elif (previous[0] if previous else '') == instance.final_grade:
+        return
+    record_enrollment(instance.pk)
+
+
+@receiver(post_delete, sender=Enrollment)
+def remove_from_semester_result(sender, instance, **kwargs):
+    semester_id = CourseOffering.objects.filter(pk=instance.course_offering_id).values_list(
+        'semester_id', flat=True).first()
+    if semester_id:
+        update_line(instance.student_id, semester_id, instance.pk, None)
@@ -1,3 +1,384 @@
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import skipIf, skipUnless
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from academics.models import AcademicYear, Branch, Program, Semester, StudentEnrollment, Subject
+from core.models import Faculty, Institute, Student, User
+from .enrollment import auto_enroll
+from .models import (
+    AttendanceRecord, AttendanceSession, CourseOffering, Enrollment, Question, Quiz, QuizAttempt, QuizVariant,
+)
+from .partitions import DEFAULT_PARTITION, TABLE, attached_partitions, create_partition, next_period, period_start
+from .question_bank import generate_variants, variant_for
+from .quizzes import close_expired_attempts, record_answer, submit_attempt
+from .transcripts import transcript
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+def build_offering(tag, students=2):
+    """An offering of a fresh institute with its faculty user and ``students`` enrolled student users"""
+    institute = Institute.objects.create(name=f'Institute {tag}', subdomain=f'inst-{tag}'.lower(), code=tag,
+                                         address='Campus', phone='+910000000000', email=f'{tag}@example.com',
+                                         established_date=date(2000, 1, 1))
+    program = Program.objects.create(institute=institute, name='B.Tech', code=f'BT{tag}', duration_years=4)
+    branch = Branch.objects.create(program=program, name='Computer Science', code=f'CS{tag}')
+    year = AcademicYear.objects.create(program=program, year_number=1, name='First Year')
+    semester = Semester.objects.create(academic_year=year, semester_number=1, name='Semester 1',
+                                       start_date=date(2026, 7, 1), end_date=date(2026, 12, 15), is_current=True)
+    subject = Subject.objects.create(branch=branch, semester=semester, code=f'CS101{tag}', name='Data Structures',
+                                     credits=4)
+    teacher = User.objects.create_user(username=f'{tag}-faculty', email=f'{tag}-faculty@example.com', password='x')
+    faculty = Faculty.objects.create(user=teacher, employee_id=f'{tag}-F1', department='CSE',
+                                     designation='Professor', joining_date=date(2015, 1, 1))
+    offering = CourseOffering.objects.create(subject=subject, semester=semester, faculty=faculty)
+    users = []
+    for i in range(students):
+        user = User.objects.create_user(username=f'{tag}-s{i}', email=f'{tag}-s{i}@example.com', password='x')
+        student = Student.objects.create(user=user, enrollment_number=f'{tag}{i:04}', admission_date=date(2026, 7, 1))
+        Enrollment.objects.create(student=student, course_offering=offering)
+        users.append(user)
+    return offering, teacher, users
+
+
+class QuizPermissionTests(TestCase):
+    """Students take quizzes; only staff and the offering faculty see answer keys or change anything"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.offering, cls.teacher, (cls.student,) = build_offering('QZ', students=1)
+        cls.other_offering, cls.other_teacher, _ = build_offering('QY', students=0)
+        cls.quiz = Quiz.objects.create(course_offering=cls.offering, title='Quiz 1', is_published=True,
+                                       due_date=timezone.now() + timedelta(days=1))
+        cls.question = Question.objects.create(quiz=cls.quiz, question_text='2 + 2?', options_json=['3', '4'],
+                                               correct_answer=1)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_students_cannot_read_or_write_questions(self):
+        client = self.client_for(self.student)
+        self.assertEqual(client.get('/api/courses/questions/').status_code, 403)
+        self.assertEqual(client.get(f'/api/courses/questions/{self.question.pk}/').status_code, 403)
+        response = client.post('/api/courses/questions/', {'quiz': self.quiz.pk, 'question_text': 'x',
+                                                            'correct_answer': 0}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_students_cannot_change_or_regrade_quizzes(self):
+        client = self.client_for(self.student)
+        self.assertEqual(client.get(f'/api/courses/quizzes/{self.quiz.pk}/').status_code, 200)
+        self.assertEqual(client.patch(f'/api/courses/quizzes/{self.quiz.pk}/', {'title': 'Mine'},
+                                      format='json').status_code, 403)
+        self.assertEqual(client.post(f'/api/courses/quizzes/{self.quiz.pk}/regrade/').status_code, 403)
+        self.assertEqual(client.delete(f'/api/courses/quizzes/{self.quiz.pk}/').status_code, 403)
+        self.assertTrue(Quiz.objects.filter(pk=self.quiz.pk, title='Quiz 1').exists())
+
+    def test_unpublished_quizzes_are_hidden_from_students(self):
+        Quiz.objects.filter(pk=self.quiz.pk).update(is_published=False)
+        self.assertEqual(self.client_for(self.student).get(f'/api/courses/quizzes/{self.quiz.pk}/').status_code, 404)
+
+    def test_offering_faculty_manage_their_questions_only(self):
+        client = self.client_for(self.teacher)
+        response = client.get(f'/api/courses/questions/{self.question.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['correct_answer'], 1)
+        self.assertEqual(client.post(f'/api/courses/quizzes/{self.quiz.pk}/regrade/').status_code, 200)
+
+        other = self.client_for(self.other_teacher)
+        self.assertEqual(other.get(f'/api/courses/questions/{self.question.pk}/').status_code, 404)
+        response = other.post('/api/courses/questions/', {'quiz': self.quiz.pk, 'question_text': 'x',
+                                                           'correct_answer': 0}, format='json')
+        self.assertEqual(response.status_code, 403)
+        response = other.post('/api/courses/quizzes/', {'course_offering': self.offering.pk, 'title': 'Theirs',
+                                                         'due_date': timezone.now().isoformat()}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class QuizVariantTests(TestCase):
+    """Each student of a bank-drawn quiz gets exactly one variant, however many times it is asked for"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.offering, _, cls.students = build_offering('QV', students=3)
+        for i in range(5):
+            Question.objects.create(subject=cls.offering.subject, question_text=f'Q{i}', options_json=['a', 'b', 'c'],
+                                    correct_answer=0)
+        cls.quiz = Quiz.objects.create(course_offering=cls.offering, title='Bank quiz', questions_from_bank=3,
+                                       due_date=timezone.now() + timedelta(days=1))
+
+    def test_generate_counts_only_new_variants(self):
+        variant_for(self.quiz, self.students[0].student_profile)
+        self.assertEqual(generate_variants(self.quiz), 2)
+        self.assertEqual(generate_variants(self.quiz), 0)
+        self.assertEqual(QuizVariant.objects.filter(quiz=self.quiz).count(), 3)
+
+    def test_variant_built_concurrently_is_reused(self):
+        student = self.students[0].student_profile
+        generate_variants(self.quiz)
+        existing = QuizVariant.objects.get(quiz=self.quiz, student=student)
+        # Another start inserted the variant after this one looked for it
+        with patch.object(QuizVariant.objects, 'filter', return_value=QuizVariant.objects.none()):
+            variant = variant_for(self.quiz, student)
+        self.assertEqual(variant.pk, existing.pk)
+        self.assertEqual(len(variant.question_ids), 3)
+
+
+@skipIf(fakeredis is None, 'fakeredis is not installed')
+class QuizGradingTests(TestCase):
+    """Answers are checked when saved and graded on submit or timeout; malformed ones score nothing"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.offering, _, cls.students = build_offering('QG', students=3)
+        cls.quiz = Quiz.objects.create(course_offering=cls.offering, title='Graded', is_published=True,
+                                       due_date=timezone.now() + timedelta(days=1))
+        cls.single = Question.objects.create(quiz=cls.quiz, question_text='2 + 2?', options_json=['3', '4'],
+                                             correct_answer=1, points=2)
+        cls.multiple = Question.objects.create(quiz=cls.quiz, question_text='Primes?', options_json=['2', '3', '4'],
+                                               question_type='multiple_choice', correct_answer=[0, 1], points=3)
+
+    def setUp(self):
+        redis = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        patcher = patch('courses.quizzes.get_redis', return_value=redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def attempt(self, student, expires_in):
+        return QuizAttempt.objects.create(quiz=self.quiz, student=student.student_profile,
+                                          expires_at=timezone.now() + expires_in)
+
+    def answer(self, attempt, **answers):
+        questions = {'single': self.single, 'multiple': self.multiple}
+        for name, answer in answers.items():
+            record_answer(attempt, questions[name].pk, answer)
+
+    def test_answers_of_the_wrong_shape_are_rejected(self):
+        attempt = self.attempt(self.students[0], timedelta(minutes=30))
+        client = APIClient()
+        client.force_authenticate(self.students[0])
+        url = f'/api/courses/quiz-attempts/{attempt.pk}/answer/'
+        for question, answer in [(self.multiple, [[0], 1]), (self.multiple, 0), (self.single, [1]),
+                                 (self.single, True)]:
+            response = client.post(url, {'question': question.pk, 'answer': answer}, format='json')
+            self.assertEqual(response.status_code, 400, answer)
+        response = client.post(url, {'question': self.multiple.pk, 'answer': [1, 0]}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_submit_after_expiry_times_out_with_the_saved_answers(self):
+        attempt = self.attempt(self.students[0], timedelta(minutes=30))
+        self.answer(attempt, single=1, multiple=[1, 0])
+        QuizAttempt.objects.filter(pk=attempt.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+        attempt.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            submit_attempt(attempt)
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.status, 'timed_out')
+        self.assertEqual(attempt.end_time, attempt.expires_at)
+        self.assertEqual(attempt.score, Decimal(5))
+
+    def test_close_expired_grades_every_batch_despite_malformed_answers(self):
+        attempts = [self.attempt(student, timedelta(minutes=30)) for student in self.students]
+        self.answer(attempts[0], single=1, multiple=[0, 1])
+        self.answer(attempts[1], single=0)
+        # Saved before shapes were checked
+        self.answer(attempts[2], single=1, multiple=[[0], 1])
+        QuizAttempt.objects.filter(pk__in=[a.pk for a in attempts]).update(expires_at=timezone.now())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(close_expired_attempts(batch_size=2), 3)
+        scores = dict(QuizAttempt.objects.filter(status='timed_out').values_list('pk', 'score'))
+        self.assertEqual(scores, {attempts[0].pk: 5, attempts[1].pk: 0, attempts[2].pk: 2})
+
+
+class AutoEnrollTests(TestCase):
+    """Students fill the least populated section with room; enrolled students and full sections are left alone"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.offering, _, enrolled = build_offering('AE', students=2)
+        subject = cls.offering.subject
+        cls.semester = cls.offering.semester
+        cls.sections = {'A': cls.offering}
+        for section, limit in (('B', 60), ('C', 2)):
+            cls.sections[section] = CourseOffering.objects.create(subject=subject, semester=cls.semester,
+                                                                  faculty=cls.offering.faculty, section=section,
+                                                                  max_enrollment=limit)
+        students = [user.student_profile for user in enrolled]
+        for i in range(6):
+            user = User.objects.create_user(username=f'AE-n{i}', email=f'ae-n{i}@example.com', password='x')
+            students.append(Student.objects.create(user=user, enrollment_number=f'AEN{i:03}',
+                                                   admission_date=date(2026, 7, 1)))
+        for student in students:
+            StudentEnrollment.objects.create(student=student, program=subject.branch.program, branch=subject.branch,
+                                             current_semester=cls.semester, enrollment_date=date(2026, 7, 1))
+
+    def sizes(self):
+        return {section: offering.enrollments.count() for section, offering in self.sections.items()}
+
+    def test_balances_sections_within_their_limits(self):
+        report = auto_enroll(self.semester)
+        self.assertEqual((report['created'], report['already_enrolled'], report['unplaced']), (6, 2, {}))
+        self.assertEqual(self.sizes(), {'A': 3, 'B': 3, 'C': 2})
+
+    def test_enrolled_students_are_skipped_on_a_rerun(self):
+        auto_enroll(self.semester)
+        report = auto_enroll(self.semester)
+        self.assertEqual((report['created'], report['already_enrolled']), (0, 8))
+        self.assertEqual(self.sizes(), {'A': 3, 'B': 3, 'C': 2})
+
+    def test_students_without_a_seat_are_reported(self):
+        CourseOffering.objects.filter(pk__in=[self.sections['A'].pk, self.sections['B'].pk]).update(max_enrollment=2)
+        report = auto_enroll(self.semester)
+        self.assertEqual((report['created'], report['unplaced']), (4, {self.offering.subject.code: 2}))
+        self.assertEqual(self.sizes(), {'A': 2, 'B': 2, 'C': 2})
+
+
+@skipUnless(connection.vendor == 'postgresql', 'attendance records are only partitioned on PostgreSQL')
+class AttendancePartitionTests(TestCase):
+    """Half-year partitions are created ahead, take over rows parked in the default partition, and archive"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.offering, _, (user,) = build_offering('PT', students=1)
+        cls.student = user.student_profile
+
+    def record(self, day):
+        session = AttendanceSession.objects.create(course_offering=self.offering, session_date=day,
+                                                   session_time=time(9), topic_covered='Trees')
+        return AttendanceRecord.objects.create(attendance_session=session, student=self.student, status='present')
+
+    def partition_of(self, record):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT tableoid::regclass::text FROM {TABLE} WHERE id = %s', [record.pk])
+            return cursor.fetchone()[0]
+
+    def test_command_keeps_upcoming_partitions_ready(self):
+        call_command('manage_attendance_partitions', ahead=3, stdout=StringIO())
+        starts = [period_start(date.today())]
+        for _ in range(3):
+            starts.append(next_period(starts[-1]))
+        self.assertLessEqual(set(starts), set(attached_partitions()))
+        out = StringIO()
+        call_command('manage_attendance_partitions', ahead=3, stdout=out)
+        self.assertEqual(out.getvalue(), '')
+
+    def test_new_partition_takes_over_default_partition_rows(self):
+        record = self.record(date(2040, 2, 10))
+        self.assertEqual(self.partition_of(record), DEFAULT_PARTITION)
+        self.assertEqual(create_partition(date(2040, 1, 1)), (f'{TABLE}_p2040h1', 1))
+        self.assertEqual(self.partition_of(record), f'{TABLE}_p2040h1')
+        self.assertEqual(AttendanceRecord.objects.get(pk=record.pk).status, 'present')
+
+    def test_old_partitions_are_archived(self):
+        record = self.record(date(2001, 3, 1))
+        create_partition(date(2001, 1, 1))
+        self.record(date(2001, 9, 1))
+        call_command('manage_attendance_partitions', ahead=0, detach_before=date(2002, 1, 1),
+                     archive_schema='attendance_archive', stdout=StringIO())
+        self.assertNotIn(date(2001, 1, 1), attached_partitions())
+        self.assertFalse(AttendanceRecord.objects.filter(pk=record.pk).exists())
+        self.assertEqual(AttendanceRecord.objects.filter(session_date__year=2001).count(), 1)
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT id FROM attendance_archive.{TABLE}_p2001h1')
+            self.assertEqual(cursor.fetchall(), [(record.pk,)])
+
+
+class TranscriptTests(TestCase):
+    """SGPA and CGPA follow grades as they are given, changed and removed"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.offering, _, (cls.user, cls.rival) = build_offering('GP', students=2)
+        first = cls.offering.semester
+        subject = cls.offering.subject
+        second = Semester.objects.create(academic_year=first.academic_year, semester_number=2, name='Semester 2',
+                                         start_date=date(2027, 1, 1), end_date=date(2027, 5, 31))
+        cls.offerings = {'DS': cls.offering}
+        for code, semester, credits in (('LAB', first, 3), ('SEM', first, 2), ('OS', second, 4)):
+            cls.offerings[code] = CourseOffering.objects.create(
+                subject=Subject.objects.create(branch=subject.branch, semester=semester, code=f'{code}GP', name=code,
+                                               credits=credits),
+                semester=semester, faculty=cls.offering.faculty)
+        cls.admin = User.objects.create_user(username='gp-admin', email='gp-admin@example.com', password='x',
+                                             is_staff=True)
+
+    def grade(self, user, code, grade):
+        enrollment, _ = Enrollment.objects.get_or_create(student=user.student_profile,
+                                                         course_offering=self.offerings[code])
+        enrollment.final_grade = grade
+        enrollment.save()
+        return enrollment
+
+    def get(self, url):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_sgpa_and_running_cgpa(self):
+        # 4 credits at 8, 3 at 0, 2 incomplete (not counted); then 4 at 10
+        self.grade(self.user, 'DS', 'A')
+        self.grade(self.user, 'LAB', 'F')
+        self.grade(self.user, 'SEM', 'I')
+        self.grade(self.user, 'OS', 'O')
+        data = self.get(f'/api/courses/transcripts/{self.user.student_profile.pk}/')
+        semesters = [(s['credits_attempted'], s['credits_earned'], s['sgpa'], s['cgpa']) for s in data['semesters']]
+        self.assertEqual(semesters, [(7, 4, Decimal('4.57'), Decimal('4.57')),
+                                     (4, 4, Decimal('10.00'), Decimal('6.55'))])
+        self.assertEqual((data['credits_earned'], data['cgpa']), (8, Decimal('6.55')))
+
+    def test_regrades_and_removals_update_the_averages(self):
+        self.grade(self.user, 'DS', 'A')
+        lab = self.grade(self.user, 'LAB', 'F')
+        self.grade(self.user, 'OS', 'O')
+        self.grade(self.user, 'LAB', 'B')
+        self.assertEqual(transcript(self.user.student_profile)['cgpa'], Decimal('8.18'))
+        lab.delete()
+        data = transcript(self.user.student_profile)
+        self.assertEqual([s['sgpa'] for s in data['semesters']], [Decimal('8.00'), Decimal('10.00')])
+        self.assertEqual(data['cgpa'], Decimal('9.00'))
+
+    def test_rankings_order_by_cgpa(self):
+        for user in (self.user, self.rival):
+            StudentEnrollment.objects.create(student=user.student_profile, program=self.offering.subject.branch.program,
+                                             branch=self.offering.subject.branch,
+                                             current_semester=self.offering.semester, enrollment_date=date(2026, 7, 1))
+        self.grade(self.user, 'DS', 'A')
+        self.grade(self.user, 'OS', 'B+')
+        self.grade(self.rival, 'DS', 'O')
+        rows = self.get(f'/api/courses/rankings/{self.offering.subject.branch.program_id}/')
+        self.assertEqual([(row['rank'], row['student'], row['credits'], row['cgpa']) for row in rows],
+                         [(1, self.rival.student_profile.pk, 4, Decimal('10.00')),
+                          (2, self.user.student_profile.pk, 8, Decimal('7.50'))])
+
+
+class CgpaRankingTests(TestCase):
+    """Program rankings, optionally narrowed to one branch"""
+
+    @classmethod
+    def setUpTestData(cls):
+        offering, _, _ = build_offering('RK', students=0)
+        cls.branch = offering.subject.branch
+        cls.admin = User.objects.create_user(username='rk-admin', email='rk-admin@example.com', password='x',
+                                             is_staff=True)
 
-# Create your tests here.
+    def test_branch_must_be_a_number(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        url = f'/api/courses/rankings/{self.branch.program_id}/'
+        self.assertEqual(client.get(url, {'branch': 'abc'}).status_code, 400)
+        response = client.get(url, {'branch': self.branch.pk})
+        self.assertEqual((response.status_code, response.data), (200, []))
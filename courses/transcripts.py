@@ -0,0 +1,142 @@
+"""
+Transcripts and grade point averages from per-semester snapshots.
+
+Each ``SemesterResult`` carries the transcript lines of one student's
+semester plus its totals, and is rewritten whenever one of its enrollments
+is graded, regraded or removed. A transcript is then one row per semester,
+and the CGPA ranking of a program is a single aggregate query.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum, Window
+from django.db.models.functions import Rank
+
+from academics.models import StudentEnrollment
+from .models import Enrollment, SemesterResult
+
+LINE_FIELDS = ('id', 'student_id', 'course_offering_id', 'course_offering__semester_id',
+               'course_offering__subject__code', 'course_offering__subject__name',
+               'course_offering__subject__credits', 'final_grade')
+
+
+def grade_point(grade):
+    """Grade point for a final grade, or None for grades that do not count (blank, incomplete...)"""
+    return settings.GRADE_POINTS.get(grade.strip().upper()) if grade else None
+
+
+def transcript_line(row):
+    return {
+        'course_offering': row['course_offering_id'],
+        'code': row['course_offering__subject__code'],
+        'name': row['course_offering__subject__name'],
+        'credits': row['course_offering__subject__credits'],
+        'grade': row['final_grade'],
+        'grade_point': grade_point(row['final_grade']),
+    }
+
+
+def summarize(result):
+    """Recompute the totals of a snapshot from its transcript lines"""
+    graded = [line for line in result.courses.values() if line['grade_point'] is not None]
+    result.credits_attempted = sum(line['credits'] for line in graded)
+    result.credits_earned = sum(line['credits'] for line in graded if line['grade_point'] > 0)
+    result.grade_points = Decimal(sum(line['credits'] * line['grade_point'] for line in graded))
+    result.sgpa = (round(result.grade_points / result.credits_attempted, 2)
+                   if result.credits_attempted else None)
+    return result
+
+
+@transaction.atomic
+def update_line(student_id, semester_id, enrollment_id, line):
+    """Set (or with ``line=None`` remove) one transcript line and refresh the semester's totals"""
+    if line is None and not SemesterResult.objects.filter(student_id=student_id, semester_id=semester_id).exists():
+        return
+    SemesterResult.objects.get_or_create(student_id=student_id, semester_id=semester_id)
+    result = SemesterResult.objects.select_for_update().get(student_id=student_id, semester_id=semester_id)
+    if line is None:
+        result.courses.pop(str(enrollment_id), None)
+    else:
+        result.courses[str(enrollment_id)] = line
+    if result.courses:
+        summarize(result).save()
+    else:
+        result.delete()
+
+
+def record_enrollment(enrollment_id):
+    row = Enrollment.objects.filter(pk=enrollment_id).values(*LINE_FIELDS).first()
+    if row:
+        update_line(row['student_id'], row['course_offering__semester_id'], row['id'], transcript_line(row))
+
+
+def rebuild(enrollments=None, batch_size=2000):
+    """Recreate the snapshots of every student/semester touched by ``enrollments`` in bulk; returns their number"""
+    enrollments = Enrollment.objects.all() if enrollments is None else enrollments
+    results = {}
+    for row in enrollments.values(*LINE_FIELDS).iterator(chunk_size=batch_size):
+        key = (row['student_id'], row['course_offering__semester_id'])
+        if key not in results:
+            results[key] = SemesterResult(student_id=key[0], semester_id=key[1], courses={})
+        results[key].courses[str(row['id'])] = transcript_line(row)
+    SemesterResult.objects.bulk_create(
+        [summarize(result) for result in results.values()], batch_size=batch_size, update_conflicts=True,
+        unique_fields=['student', 'semester'],
+        update_fields=['credits_attempted', 'credits_earned', 'grade_points', 'sgpa', 'courses', 'updated_at'])
+    return len(results)
+
+
+def semester_results(students):
+    """Snapshots of ``students`` (ids or a queryset), in transcript order for each student"""
+    return (SemesterResult.objects.filter(student__in=students).select_related('semester__academic_year')
+            .order_by('student_id', 'semester__academic_year__year_number', 'semester__semester_number'))
+
+
+def transcript_semesters(results):
+    """Transcript entries with the running CGPA for one student's snapshots, oldest first"""
+    semesters, points, credits = [], Decimal(0), 0
+    for result in results:
+        points += result.grade_points
+        credits += result.credits_attempted
+        semesters.append({
+            'semester': result.semester_id,
+            'name': result.semester.name,
+            'academic_year': result.semester.academic_year.name,
+            'courses': list(result.courses.values()),
+            'credits_attempted': result.credits_attempted,
+            'credits_earned': result.credits_earned,
+            'sgpa': result.sgpa,
+            'cgpa': round(points / credits, 2) if credits else None,
+        })
+    return semesters
+
+
+def transcript(student):
+    """Semester-by-semester transcript with the running CGPA, read from the snapshots"""
+    semesters = transcript_semesters(semester_results([student.pk]))
+    return {
+        'student': student.pk,
+        'enrollment_number': student.enrollment_number,
+        'name': student.user.get_full_name(),
+        'semesters': semesters,
+        'credits_earned': sum(semester['credits_earned'] for semester in semesters),
+        'cgpa': semesters[-1]['cgpa'] if semesters else None,
+    }
+
+
+def program_rankings(program, branch=None):
+    """CGPA and rank of every active student of a program, computed in one aggregate query"""
+    students = StudentEnrollment.objects.filter(program=program, is_active=True)
+    if branch is not None:
+        students = students.filter(branch=branch)
+    return (
+        SemesterResult.objects.filter(student_id__in=students.values('student_id'))
+        .values('student_id', 'student__enrollment_number')
+        .annotate(points=Sum('grade_points'), credits=Sum('credits_attempted'))
+        .filter(credits__gt=0)
+        .annotate(cgpa=ExpressionWrapper(F('points') / F('credits'),
+                                         output_field=DecimalField(max_digits=4, decimal_places=2)))
+        .annotate(rank=Window(Rank(), order_by=F('cgpa').desc()))
+        .order_by('rank', 'student__enrollment_number')
+    )
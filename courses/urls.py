@@ -3,8 +3,12 @@ from rest_framework.routers import DefaultRouter
 from . import views
 
 router = DefaultRouter()
-# We'll add viewsets here later
+router.register(r'quizzes', views.QuizViewSet)
+router.register(r'questions', views.QuestionViewSet)
+router.register(r'quiz-attempts', views.QuizAttemptViewSet, basename='quizattempt')
 
 urlpatterns = [
+    path('transcripts/<int:student_id>/', views.student_transcript, name='student-transcript'),
+    path('rankings/<int:program_id>/', views.cgpa_rankings, name='cgpa-rankings'),
     path('', include(router.urls)),
-]
\ No newline at end of file
+]
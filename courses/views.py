@@ -1,3 +1,198 @@
-from django.shortcuts import render
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
+from rest_framework import status, viewsets, permissions
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.response import Response
+from academics.models import Program
+from core.models import Faculty, Student
+from .models import Quiz, Question, QuizAttempt
+from .question_bank import variant_questions
+from .quizzes import (
+    QuizClosed, start_attempt, record_answer, submit_attempt, saved_answers, regrade_quiz, attempt_question_type,
+    valid_answer
+)
+from .transcripts import transcript, program_rankings
+from .serializers import (
+    QuizSerializer, QuestionSerializer, StudentQuestionSerializer,
+    QuizAttemptSerializer, AnswerSerializer
+)
 
-# Create your views here.
+
+def teaches(user, offering):
+    return user.is_staff or offering.faculty.user_id == user.pk
+
+
+class IsStaffOrFaculty(permissions.BasePermission):
+    """Staff and faculty members; students get 403"""
+
+    def has_permission(self, request, view):
+        return request.user.is_staff or Faculty.objects.filter(user=request.user).exists()
+
+
+class QuizPermission(permissions.BasePermission):
+    """Everyone who can see a quiz may read and start it; only staff and the offering faculty change or regrade it"""
+
+    def has_permission(self, request, view):
+        if view.action == 'create':
+            return IsStaffOrFaculty().has_permission(request, view)
+        return True
+
+    def has_object_permission(self, request, view, obj):
+        return view.action in ('retrieve', 'start') or teaches(request.user, obj.course_offering)
+
+
+class QuizViewSet(viewsets.ModelViewSet):
+    """Quizzes of the offerings a user teaches, or the published quizzes of those a student is enrolled in"""
+    queryset = Quiz.objects.all()
+    serializer_class = QuizSerializer
+    permission_classes = [permissions.IsAuthenticated, QuizPermission]
+
+    def get_queryset(self):
+        queryset = Quiz.objects.select_related('course_offering__faculty').order_by('pk')
+        user = self.request.user
+        if user.is_staff:
+            return queryset
+        enrolled = Q(is_published=True, course_offering__enrollments__student__user=user,
+                     course_offering__enrollments__status='enrolled')
+        return queryset.filter(Q(course_offering__faculty__user=user) | enrolled).distinct()
+
+    def perform_create(self, serializer):
+        if not teaches(self.request.user, serializer.validated_data['course_offering']):
+            raise PermissionDenied('Only the offering faculty can add quizzes to it')
+        serializer.save()
+
+    def perform_update(self, serializer):
+        offering = serializer.validated_data.get('course_offering', serializer.instance.course_offering)
+        if not teaches(self.request.user, offering):
+            raise PermissionDenied('Only the offering faculty can move a quiz to it')
+        serializer.save()
+
+    @action(detail=True, methods=['post'])
+    def start(self, request, pk=None):
+        """Start (or resume) the current student's attempt"""
+        quiz = self.get_object()
+        student = getattr(request.user, 'student_profile', None)
+        if student is None or not quiz.course_offering.enrollments.filter(student=student, status='enrolled').exists():
+            return Response({'error': 'Only enrolled students can take this quiz'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            attempt = start_attempt(quiz, student)
+        except QuizClosed as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if attempt.variant_id:
+            questions = variant_questions(attempt.variant, quiz.course_offering.subject_id)
+        else:
+            questions = StudentQuestionSerializer(quiz.questions.all(), many=True).data
+        return Response({
+            'attempt': QuizAttemptSerializer(attempt).data,
+            'questions': questions,
+            'saved_answers': saved_answers(attempt.pk) if attempt.status == 'in_progress' else attempt.answers,
+        })
+
+    @action(detail=True, methods=['post'])
+    def regrade(self, request, pk=None):
+        """Re-grade all finished attempts in one pass"""
+        attempts = regrade_quiz(self.get_object())
+        return Response({'regraded': len(attempts)})
+
+
+class QuestionViewSet(viewsets.ModelViewSet):
+    """Questions, with their answer keys, of the quizzes and subject banks a faculty member teaches"""
+    queryset = Question.objects.all()
+    serializer_class = QuestionSerializer
+    permission_classes = [permissions.IsAuthenticated, IsStaffOrFaculty]
+
+    def get_queryset(self):
+        queryset = Question.objects.order_by('order', 'id')
+        user = self.request.user
+        if user.is_staff:
+            return queryset
+        return queryset.filter(
+            Q(quiz__course_offering__faculty__user=user) | Q(quiz__isnull=True, subject__offerings__faculty__user=user)
+        ).distinct()
+
+    def check_owner(self, serializer):
+        """The quiz or bank subject a question is saved under must be one the user teaches"""
+        user = self.request.user
+        instance = serializer.instance
+        quiz = serializer.validated_data.get('quiz', instance.quiz if instance else None)
+        subject = serializer.validated_data.get('subject', instance.subject if instance else None)
+        if user.is_staff:
+            return
+        if quiz is not None:
+            allowed = quiz.course_offering.faculty.user_id == user.pk
+        else:
+            allowed = subject is not None and subject.offerings.filter(faculty__user=user).exists()
+        if not allowed:
+            raise PermissionDenied('Only faculty teaching the quiz or subject can edit its questions')
+
+    def perform_create(self, serializer):
+        self.check_owner(serializer)
+        serializer.save()
+
+    def perform_update(self, serializer):
+        self.check_owner(serializer)
+        serializer.save()
+
+
+class QuizAttemptViewSet(viewsets.ReadOnlyModelViewSet):
+    """Quiz attempts; students only see and answer their own"""
+    serializer_class = QuizAttemptSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = QuizAttempt.objects.select_related('quiz__course_offering', 'variant').order_by('-start_time')
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(student__user=self.request.user)
+
+    @action(detail=True, methods=['post'])
+    def answer(self, request, pk=None):
+        """Save an answer; kept in Redis until the attempt is submitted"""
+        attempt = self.get_object()
+        serializer = AnswerSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        question_type = attempt_question_type(attempt, serializer.validated_data['question'])
+        if question_type is None:
+            return Response({'error': 'Question is not part of this quiz'}, status=status.HTTP_400_BAD_REQUEST)
+        if not valid_answer(question_type, serializer.validated_data['answer']):
+            return Response({'error': f'Not a valid answer to a {question_type} question'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            record_answer(attempt, serializer.validated_data['question'], serializer.validated_data['answer'])
+        except QuizClosed as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'message': 'Answer saved'})
+
+    @action(detail=True, methods=['post'])
+    def submit(self, request, pk=None):
+        attempt = submit_attempt(self.get_object())
+        return Response(QuizAttemptSerializer(attempt).data)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def student_transcript(request, student_id):
+    """Full transcript of a student, for the student themselves or staff"""
+    student = get_object_or_404(Student.objects.select_related('user'), pk=student_id)
+    if not request.user.is_staff and student.user_id != request.user.id:
+        return Response({'error': 'You can only view your own transcript'}, status=status.HTTP_403_FORBIDDEN)
+    return Response(transcript(student))
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def cgpa_rankings(request, program_id):
+    """CGPA ranking of all active students in a program, optionally limited to one branch"""
+    program = get_object_or_404(Program, pk=program_id)
+    branch = request.query_params.get('branch')
+    try:
+        branch = int(branch) if branch else None
+    except ValueError:
+        return Response({'error': 'branch must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+    rankings = program_rankings(program, branch)
+    return Response([
+        {'rank': row['rank'], 'student': row['student_id'], 'enrollment_number': row['student__enrollment_number'],
+         'credits': row['credits'], 'cgpa': round(row['cgpa'], 2)}
+        for row in rankings
+    ])
@@ -0,0 +1,37 @@
+# Unread counts compare monotonic "posted" counters, so deleting an item or a
+# reply no longer hides the ones posted after it.
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_reply_counts(apps, schema_editor):
+    Thread = apps.get_model('discussions', 'Thread')
+    Thread.objects.update(replies_posted=F('post_count'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('discussions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='offeringfeed',
+            old_name='items',
+            new_name='posted',
+        ),
+        migrations.AlterField(
+            model_name='offeringfeed',
+            name='posted',
+            field=models.PositiveIntegerField(
+                default=0, help_text='Announcements plus threads ever posted; never decremented'),
+        ),
+        migrations.AddField(
+            model_name='thread',
+            name='replies_posted',
+            field=models.PositiveIntegerField(default=0, help_text='Replies ever posted; never decremented'),
+        ),
+        migrations.RunPython(copy_reply_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+from django.db import models
+from core.models import User
+from courses.models import CourseOffering
+
+
+class Announcement(models.Model):
+    """Notice posted by an offering's faculty to everyone in it"""
+    course_offering = models.ForeignKey(CourseOffering, on_delete=models.CASCADE, related_name='announcements')
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='announcements')
+    title = models.CharField(max_length=200)
+    body = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [models.Index(fields=['course_offering', 'created_at', 'id'])]
+
+    def __str__(self):
+        return f"{self.title} ({self.course_offering})"
+
+
+class Thread(models.Model):
+    """Forum thread in an offering; replies are Posts"""
+    course_offering = models.ForeignKey(CourseOffering, on_delete=models.CASCADE, related_name='threads')
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='threads')
+    title = models.CharField(max_length=200)
+    body = models.TextField()
+    is_locked = models.BooleanField(default=False, help_text="Locked threads take no new replies")
+    post_count = models.PositiveIntegerField(default=0, help_text="Replies, kept up to date as posts come and go")
+    replies_posted = models.PositiveIntegerField(default=0, help_text="Replies ever posted; never decremented")
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_activity_at = models.DateTimeField(auto_now_add=True, help_text="Creation or latest reply")
+
+    class Meta:
+        ordering = ['-last_activity_at', '-id']
+        indexes = [
+            models.Index(fields=['course_offering', 'last_activity_at', 'id']),
+            models.Index(fields=['course_offering', 'created_at', 'id']),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class Post(models.Model):
+    """Reply in a forum thread"""
+    thread = models.ForeignKey(Thread, on_delete=models.CASCADE, related_name='posts')
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='forum_posts')
+    body = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [models.Index(fields=['thread', 'created_at', 'id'])]
+
+    def __str__(self):
+        return f"Reply by {self.author} in {self.thread}"
+
+
+class OfferingFeed(models.Model):
+    """Timeline state of an offering: how many announcements and threads it has had, and how they are delivered"""
+    course_offering = models.OneToOneField(CourseOffering, on_delete=models.CASCADE, primary_key=True,
+                                           related_name='feed')
+    posted = models.PositiveIntegerField(default=0,
+                                         help_text="Announcements plus threads ever posted; never decremented")
+    fan_out = models.BooleanField(default=False, help_text="Items are pushed to each member's timeline on write")
+
+    def __str__(self):
+        return f"Feed of {self.course_offering}"
+
+
+class TimelineRead(models.Model):
+    """OfferingFeed.posted when the user last marked the offering read; unread is the difference"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline_reads')
+    course_offering = models.ForeignKey(CourseOffering, on_delete=models.CASCADE, related_name='timeline_reads')
+    items_read = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['user', 'course_offering']
+
+
+class ThreadRead(models.Model):
+    """Thread.replies_posted when the user last read the thread; unread is the difference"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='thread_reads')
+    thread = models.ForeignKey(Thread, on_delete=models.CASCADE, related_name='reads')
+    posts_read = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['user', 'thread']
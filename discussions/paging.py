@@ -0,0 +1,49 @@
+"""
+Keyset pagination of announcements, threads and replies.
+
+A cursor holds the ``(moment, id)`` of the last row served; the next page is
+read from the ``(course_offering or thread, moment, id)`` index starting right
+after it, so deep pages cost the same as the first and rows posted meanwhile
+neither repeat nor skip rows. That only holds for a moment that never changes
+once a row exists, which is why threads page by ``created_at`` and not by
+``last_activity_at``.
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+
+from .timeline import InvalidCursor
+
+CURSOR_SALT = 'discussions.page'
+
+
+def encode_cursor(moment, pk):
+    return signing.dumps([moment.isoformat(), pk], salt=CURSOR_SALT)
+
+
+def decode_cursor(cursor):
+    try:
+        moment, pk = signing.loads(cursor, salt=CURSOR_SALT)
+        return datetime.fromisoformat(moment), int(pk)
+    except (signing.BadSignature, TypeError, ValueError):
+        raise InvalidCursor
+
+
+def keyset_page(queryset, field, cursor=None, limit=None, descending=True):
+    """Up to ``limit`` rows after ``cursor`` in ``(field, id)`` order and the cursor of the next page, or None"""
+    limit = max(min(limit or settings.DISCUSSION_PAGE_SIZE, settings.DISCUSSION_MAX_PAGE_SIZE), 1)
+    if cursor:
+        moment, pk = decode_cursor(cursor)
+        # The inclusive bound keeps the index range bounded; the second term skips rows already served
+        if descending:
+            queryset = queryset.filter(Q(**{f'{field}__lte': moment}) & (Q(**{f'{field}__lt': moment}) | Q(id__lt=pk)))
+        else:
+            queryset = queryset.filter(Q(**{f'{field}__gte': moment}) & (Q(**{f'{field}__gt': moment}) | Q(id__gt=pk)))
+    order = (f'-{field}', '-id') if descending else (field, 'id')
+    rows = list(queryset.order_by(*order)[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(getattr(last, field), last.pk)
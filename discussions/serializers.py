@@ -0,0 +1,31 @@
+from rest_framework import serializers
+from .models import Announcement, Thread, Post
+
+
+class AnnouncementSerializer(serializers.ModelSerializer):
+    author_name = serializers.CharField(source='author.get_full_name', read_only=True)
+
+    class Meta:
+        model = Announcement
+        fields = ('id', 'course_offering', 'author', 'author_name', 'title', 'body', 'created_at')
+        read_only_fields = ('id', 'course_offering', 'author', 'created_at')
+
+
+class ThreadSerializer(serializers.ModelSerializer):
+    author_name = serializers.CharField(source='author.get_full_name', read_only=True)
+
+    class Meta:
+        model = Thread
+        fields = ('id', 'course_offering', 'author', 'author_name', 'title', 'body', 'is_locked', 'post_count',
+                  'created_at', 'last_activity_at')
+        read_only_fields = ('id', 'course_offering', 'author', 'is_locked', 'post_count', 'created_at',
+                            'last_activity_at')
+
+
+class PostSerializer(serializers.ModelSerializer):
+    author_name = serializers.CharField(source='author.get_full_name', read_only=True)
+
+    class Meta:
+        model = Post
+        fields = ('id', 'thread', 'author', 'author_name', 'body', 'created_at')
+        read_only_fields = ('id', 'thread', 'author', 'created_at')
@@ -0,0 +1,57 @@
+import logging
+
+import redis
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Announcement, Post, Thread, ThreadRead
+from .timeline import count_item, member, push, retract
+
+logger = logging.getLogger(__name__)
+
+
+def update_timelines(action, item):
+    """Run ``action`` on ``item`` once committed; a Redis outage must not fail the request that saved it"""
+
+    def _update():
+        try:
+            action(item)
+        except redis.RedisError:
+            # The sets expire and reload from the database, so a missed update heals by itself
+            logger.warning("Could not update the timelines of %s", member(item), exc_info=True)
+
+    transaction.on_commit(_update)
+
+
+def timeline_item_saved(sender, instance, created, **kwargs):
+    if created:
+        count_item(instance)
+        update_timelines(push, instance)
+
+
+def timeline_item_deleted(sender, instance, **kwargs):
+    update_timelines(retract, instance)
+
+
+for model in (Announcement, Thread):
+    post_save.connect(timeline_item_saved, sender=model, dispatch_uid=f'timeline_saved_{model._meta.label_lower}')
+    post_delete.connect(timeline_item_deleted, sender=model, dispatch_uid=f'timeline_deleted_{model._meta.label_lower}')
+
+
+@receiver(post_save, sender=Post)
+def count_reply(sender, instance, created, **kwargs):
+    if created:
+        Thread.objects.filter(pk=instance.thread_id).update(
+            post_count=F('post_count') + 1, replies_posted=F('replies_posted') + 1,
+            last_activity_at=instance.created_at)
+        # The author has seen their own reply
+        ThreadRead.objects.filter(user_id=instance.author_id, thread_id=instance.thread_id).update(
+            posts_read=F('posts_read') + 1)
+
+
+@receiver(post_delete, sender=Post)
+def uncount_reply(sender, instance, **kwargs):
+    Thread.objects.filter(pk=instance.thread_id).update(post_count=Greatest(F('post_count') - 1, 0))
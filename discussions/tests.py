@@ -0,0 +1,205 @@
+from unittest import skipIf
+from unittest.mock import patch
+
+import redis
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from courses.tests import build_offering
+from .models import Announcement, Thread
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+@skipIf(fakeredis is None, 'fakeredis is not installed')
+class TimelineTests(TestCase):
+    """The merged timeline matches the database order in both delivery modes, page after page"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.first, cls.first_teacher, (cls.student, cls.classmate) = build_offering('DA', students=2)
+        cls.second, cls.second_teacher, _ = build_offering('DB', students=0)
+        cls.second.enrollments.create(student=cls.student.student_profile)
+
+    def setUp(self):
+        redis = fakeredis.FakeRedis()
+        patcher = patch('discussions.timeline.get_redis', return_value=redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = self.client_for(self.student)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def post_items(self):
+        for i in range(4):
+            for offering, teacher in ((self.first, self.first_teacher), (self.second, self.second_teacher)):
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = self.client_for(teacher).post(
+                        f'/api/discussions/offerings/{offering.pk}/announcements/',
+                        {'title': f'Notice {i}', 'body': 'Text'}, format='json')
+                self.assertEqual(response.status_code, 201)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client_for(self.classmate).post(f'/api/discussions/offerings/{self.first.pk}/threads/',
+                                                     {'title': f'Question {i}', 'body': 'Text'}, format='json')
+
+    def expected(self):
+        offerings = [self.first.pk, self.second.pk]
+        rows = [(item.created_at, 'announcement', item.pk)
+                for item in Announcement.objects.filter(course_offering_id__in=offerings)]
+        rows += [(item.created_at, 'thread', item.pk)
+                 for item in Thread.objects.filter(course_offering_id__in=offerings)]
+        return [(kind, pk) for _, kind, pk in sorted(rows, reverse=True)]
+
+    def walk(self, limit):
+        seen, cursor = [], None
+        while True:
+            response = self.client.get('/api/discussions/timeline/',
+                                       {'limit': limit, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            seen += [(row['kind'], row['id']) for row in response.data['results']]
+            cursor = response.data['cursor']
+            if cursor is None:
+                return seen, response.data
+
+    def test_fan_out_on_write(self):
+        self.post_items()
+        seen, data = self.walk(3)
+        self.assertEqual(seen, self.expected())
+        self.assertEqual(data['unread_total'], 12)
+
+    @override_settings(DISCUSSION_FANOUT_MAX=0)
+    def test_fan_out_on_read(self):
+        self.post_items()
+        seen, _ = self.walk(5)
+        self.assertEqual(seen, self.expected())
+
+    @override_settings(DISCUSSION_FANOUT_MAX=0)
+    def test_item_committed_while_its_offering_set_loads(self):
+        self.post_items()
+        read_threads = Thread.objects.filter
+
+        def post_during_load(*args, **kwargs):
+            # Announcements of the offering have been read; the new one commits before the set is renamed in
+            if not Announcement.objects.filter(title='Late notice').exists():
+                with self.captureOnCommitCallbacks(execute=True):
+                    Announcement.objects.create(course_offering=self.first, author=self.first_teacher,
+                                                title='Late notice', body='Text')
+            return read_threads(*args, **kwargs)
+
+        with patch.object(Thread.objects, 'filter', side_effect=post_during_load):
+            self.client.get('/api/discussions/timeline/')
+        seen, _ = self.walk(5)
+        self.assertEqual(seen, self.expected())
+        self.assertEqual(len(seen), 13)
+
+    def test_deleted_items_leave_the_timeline_but_not_hide_newer_ones(self):
+        self.post_items()
+        self.client.post('/api/discussions/timeline/read/', format='json')
+        with self.captureOnCommitCallbacks(execute=True):
+            Announcement.objects.filter(course_offering=self.first).first().delete()
+        seen, data = self.walk(4)
+        self.assertEqual(seen, self.expected())
+        self.assertEqual(data['unread_total'], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client_for(self.first_teacher).post(f'/api/discussions/offerings/{self.first.pk}/announcements/',
+                                                     {'title': 'Late notice', 'body': 'Text'}, format='json')
+        self.assertEqual(self.client.get('/api/discussions/timeline/').data['unread'], {self.first.pk: 1,
+                                                                                         self.second.pk: 0})
+
+    def test_mark_read(self):
+        self.post_items()
+        self.client.post('/api/discussions/timeline/read/', {'course_offering': self.first.pk}, format='json')
+        unread = self.client.get('/api/discussions/timeline/').data['unread']
+        self.assertEqual(unread, {self.first.pk: 0, self.second.pk: 4})
+
+    def test_limit_and_cursor_validation(self):
+        self.post_items()
+        for limit in ('-5', '0'):
+            response = self.client.get('/api/discussions/timeline/', {'limit': limit})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(self.client.get('/api/discussions/timeline/', {'limit': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/discussions/timeline/', {'cursor': 'x'}).status_code, 400)
+        response = self.client.get(f'/api/discussions/offerings/{self.first.pk}/threads/', {'limit': '-5'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+
+
+class RedisOutageTests(TestCase):
+    """Posts are committed and answered normally while Redis is unreachable"""
+
+    def test_post_succeeds_without_redis(self):
+        offering, teacher, _ = build_offering('DR', students=1)
+        client = APIClient()
+        client.force_authenticate(teacher)
+        with patch('discussions.timeline.get_redis', side_effect=redis.ConnectionError('down')), \
+                self.assertLogs('discussions.signals', 'WARNING'), self.captureOnCommitCallbacks(execute=True):
+            response = client.post(f'/api/discussions/offerings/{offering.pk}/announcements/',
+                                   {'title': 'Notice', 'body': 'Text'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Announcement.objects.filter(course_offering=offering).count(), 1)
+        self.assertEqual(offering.feed.posted, 1)
+
+
+class ThreadTests(TestCase):
+    """Threads page by creation, unaffected by replies bumping them, and carry per-user unread counters"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.offering, cls.teacher, (cls.student,) = build_offering('DT', students=1)
+        cls.outsider = build_offering('DU', students=1)[2][0]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def test_keyset_pages_and_unread_replies(self):
+        with patch('discussions.signals.transaction.on_commit'):
+            threads = [Thread.objects.create(course_offering=self.offering, author=self.teacher, title=f'T{i}',
+                                             body='Text') for i in range(5)]
+        teacher = APIClient()
+        teacher.force_authenticate(self.teacher)
+
+        seen, cursor = [], None
+        while True:
+            response = self.client.get(f'/api/discussions/offerings/{self.offering.pk}/threads/',
+                                       {'limit': 2, **({'cursor': cursor} if cursor else {})})
+            seen += response.data['results']
+            cursor = response.data['cursor']
+            if cursor is None:
+                break
+            if len(seen) == 2:
+                # Replies bump a thread's activity after the first page was served; it must still come up
+                for i in range(3):
+                    teacher.post(f'/api/discussions/threads/{threads[1].pk}/posts/', {'body': f'Reply {i}'},
+                                 format='json')
+        self.assertEqual([row['id'] for row in seen], [threads[i].pk for i in (4, 3, 2, 1, 0)])
+        self.assertEqual(seen[3]['unread_posts'], 3)
+
+        def listed():
+            response = self.client.get(f'/api/discussions/offerings/{self.offering.pk}/threads/')
+            return next(row for row in response.data['results'] if row['id'] == threads[1].pk)
+
+        response = self.client.get(f'/api/discussions/threads/{threads[1].pk}/posts/')
+        self.assertEqual([row['body'] for row in response.data['results']], ['Reply 0', 'Reply 1', 'Reply 2'])
+        self.assertEqual(listed()['unread_posts'], 0)
+
+        # A deleted reply the student had read does not hide the next one
+        threads[1].posts.first().delete()
+        teacher.post(f'/api/discussions/threads/{threads[1].pk}/posts/', {'body': 'Reply 3'}, format='json')
+        row = listed()
+        self.assertEqual((row['post_count'], row['unread_posts']), (3, 1))
+
+    def test_members_only(self):
+        client = APIClient()
+        client.force_authenticate(self.outsider)
+        self.assertEqual(client.get(f'/api/discussions/offerings/{self.offering.pk}/threads/').status_code, 403)
+        response = self.client.post(f'/api/discussions/offerings/{self.offering.pk}/announcements/',
+                                    {'title': 'Mine', 'body': 'Text'}, format='json')
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,299 @@
+"""
+Per-user timelines of announcements and forum threads, with unread counters.
+
+Every offering keeps its items in a Redis sorted set, ``timeline:offering:<id>``,
+scored by creation time in microseconds, with members ``<kind>:<offering>:<id>``.
+A user's timeline is a k-way merge of the sets of their offerings (fan-out on
+read). Offerings with at most DISCUSSION_FANOUT_MAX members also push each new
+item into ``timeline:user:<id>`` of every member (fan-out on write), so a student
+in eight small sections reads one set instead of eight.
+
+A set also holds ``cover:<offering>`` scored 0 for each offering whose items it
+holds in full, and pages only read scores above 0. Items are only added to sets
+that cover their offering, so a missing or partial set is never taken for a
+complete one: offering sets are loaded from the database on first read, and a
+user set is rebuilt in Redis (ZUNIONSTORE of the offering sets) whenever the
+offerings it covers are not the user's fan-out offerings. Sets expire after
+DISCUSSION_TIMELINE_TTL.
+
+A load builds its set under a fresh key listed in ``<offering set>:loading``
+before it reads the database, and pushes add to every key listed there as
+well, so an item committed after the read is still in the set once renamed in.
+
+Unread counts never COUNT items: OfferingFeed.posted counts the items ever
+posted to an offering and TimelineRead.items_read is its value when a user last
+marked it read. Deleting an item leaves both alone, so items posted after the
+deleted one still count as unread; a deleted item the user had not seen yet
+keeps counting until they next mark the offering read.
+"""
+import heapq
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import F
+
+from core.models import Faculty, Student
+from core.redis_client import get_redis
+from courses.models import CourseOffering, Enrollment
+from notifications.services import enrolled_user_ids
+from .models import Announcement, OfferingFeed, Thread, TimelineRead
+
+CURSOR_SALT = 'discussions.timeline'
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+KINDS = {'announcement': Announcement, 'thread': Thread}
+ENTRY_KINDS = {model: kind for kind, model in KINDS.items()}
+# Keys per EVAL when pushing an item to many timelines
+PUSH_CHUNK = 1000
+
+ADD_ITEM = """
+for _, key in ipairs(KEYS) do
+    if redis.call('zscore', key, ARGV[1]) then redis.call('zadd', key, ARGV[2], ARGV[3]) end
+end
+return 0
+"""
+
+# KEYS: offering set, its loading list; also adds to the sets being loaded
+ADD_OFFERING_ITEM = """
+if redis.call('zscore', KEYS[1], ARGV[1]) then redis.call('zadd', KEYS[1], ARGV[2], ARGV[3]) end
+for _, building in ipairs(redis.call('smembers', KEYS[2])) do
+    redis.call('zadd', building, ARGV[2], ARGV[3])
+    redis.call('expire', building, ARGV[4])
+end
+return 0
+"""
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def offering_key(course_offering_id):
+    return f"timeline:offering:{course_offering_id}"
+
+
+def loading_key(course_offering_id):
+    return f"{offering_key(course_offering_id)}:loading"
+
+
+def user_key(user_id):
+    return f"timeline:user:{user_id}"
+
+
+def cover(course_offering_id):
+    return f"cover:{course_offering_id}"
+
+
+def member(item):
+    return f"{ENTRY_KINDS[type(item)]}:{item.course_offering_id}:{item.pk}"
+
+
+def score(moment):
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+def member_offering_ids(user):
+    """Offerings whose timeline ``user`` reads, or None for users who are neither students nor faculty"""
+    student_id = Student.objects.filter(user=user).values_list('pk', flat=True).first()
+    if student_id is not None:
+        return list(Enrollment.objects.filter(student_id=student_id, status='enrolled')
+                    .values_list('course_offering_id', flat=True))
+    faculty_id = Faculty.objects.filter(user=user).values_list('pk', flat=True).first()
+    if faculty_id is not None:
+        return list(CourseOffering.objects.filter(faculty_id=faculty_id).values_list('pk', flat=True))
+    return None
+
+
+def member_user_ids(course_offering_id):
+    """Users whose timeline shows the offering: its enrolled students and its faculty"""
+    users = list(enrolled_user_ids(course_offering_id))
+    users.extend(CourseOffering.objects.filter(pk=course_offering_id).values_list('faculty__user_id', flat=True))
+    return users
+
+
+def count_item(item):
+    """Count a new item of the offering; called inside the transaction that saves ``item``"""
+    OfferingFeed.objects.get_or_create(course_offering_id=item.course_offering_id)
+    # The author has seen their own item
+    TimelineRead.objects.filter(user_id=item.author_id, course_offering_id=item.course_offering_id).update(
+        items_read=F('items_read') + 1)
+    OfferingFeed.objects.filter(course_offering_id=item.course_offering_id).update(posted=F('posted') + 1)
+
+
+def push(item):
+    """Add a committed item to its offering's set and, for small offerings, to every member's set"""
+    offering_id = item.course_offering_id
+    users = member_user_ids(offering_id)
+    fan_out = len(users) <= settings.DISCUSSION_FANOUT_MAX
+    redis = get_redis()
+    flipped = OfferingFeed.objects.filter(course_offering_id=offering_id).exclude(fan_out=fan_out).update(
+        fan_out=fan_out)
+    if flipped and users:
+        # Members' sets were built for the other mode; they are rebuilt on their next read
+        redis.delete(*[user_key(user_id) for user_id in users])
+    redis.eval(ADD_OFFERING_ITEM, 2, offering_key(offering_id), loading_key(offering_id), cover(offering_id),
+               score(item.created_at), member(item), settings.DISCUSSION_TIMELINE_TTL)
+    keys = [user_key(user_id) for user_id in users] if fan_out else []
+    for start in range(0, len(keys), PUSH_CHUNK):
+        chunk = keys[start:start + PUSH_CHUNK]
+        redis.eval(ADD_ITEM, len(chunk), *chunk, cover(offering_id), score(item.created_at), member(item))
+
+
+def retract(item):
+    """Remove a deleted item from every set that may hold it"""
+    redis = get_redis()
+    keys = [offering_key(item.course_offering_id)]
+    keys.extend(redis.smembers(loading_key(item.course_offering_id)))
+    if OfferingFeed.objects.filter(course_offering_id=item.course_offering_id, fan_out=True).exists():
+        keys.extend(user_key(user_id) for user_id in member_user_ids(item.course_offering_id))
+    with redis.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.zrem(key, member(item))
+        pipe.execute()
+
+
+def load_offerings(redis, offering_ids):
+    """Fill the sets of offerings that have none from the database; a set loaded meanwhile is kept"""
+    with redis.pipeline(transaction=False) as pipe:
+        for offering_id in offering_ids:
+            pipe.exists(offering_key(offering_id))
+        missing = [offering_id for offering_id, exists in zip(offering_ids, pipe.execute()) if not exists]
+    for offering_id in missing:
+        # Built aside and renamed in only if still missing, so items pushed meanwhile are not overwritten;
+        # listed as loading first, so items committed after the read below are pushed into it
+        building = f"{offering_key(offering_id)}:load:{uuid.uuid4().hex}"
+        with redis.pipeline() as pipe:
+            pipe.sadd(loading_key(offering_id), building)
+            pipe.expire(loading_key(offering_id), settings.DISCUSSION_TIMELINE_TTL)
+            pipe.execute()
+        entries = {cover(offering_id): 0}
+        for model in KINDS.values():
+            for item in model.objects.filter(course_offering_id=offering_id).only('pk', 'course_offering_id',
+                                                                                  'created_at'):
+                entries[member(item)] = score(item.created_at)
+        with redis.pipeline() as pipe:
+            pipe.zadd(building, entries)
+            pipe.expire(building, settings.DISCUSSION_TIMELINE_TTL)
+            pipe.srem(loading_key(offering_id), building)
+            pipe.renamenx(building, offering_key(offering_id))
+            pipe.delete(building)
+            pipe.execute()
+
+
+def sync_user_set(redis, user_id, fan_out_ids):
+    """Make ``timeline:user:<id>`` cover exactly the user's fan-out offerings, rebuilding it if not"""
+    key = user_key(user_id)
+    covered = {int(name.split(b':')[1]) for name in redis.zrangebyscore(key, 0, 0)}
+    if covered == set(fan_out_ids):
+        return
+    with redis.pipeline() as pipe:
+        if fan_out_ids:
+            pipe.zunionstore(key, [offering_key(offering_id) for offering_id in fan_out_ids])
+            pipe.expire(key, settings.DISCUSSION_TIMELINE_TTL)
+        else:
+            pipe.delete(key)
+        pipe.execute()
+
+
+def encode_cursor(entry):
+    return signing.dumps([entry[1], entry[0].decode()], salt=CURSOR_SALT)
+
+
+def decode_cursor(cursor):
+    try:
+        position, name = signing.loads(cursor, salt=CURSOR_SALT)
+        return int(position), name.encode()
+    except (signing.BadSignature, TypeError, ValueError):
+        raise InvalidCursor
+
+
+def read_page(redis, keys, position, limit):
+    """Up to ``limit`` newest ``(member, score)`` entries of each set that sort before ``position``"""
+    with redis.pipeline(transaction=False) as pipe:
+        for key in keys:
+            if position is None:
+                pipe.zrevrangebyscore(key, '+inf', '(0', start=0, num=limit, withscores=True)
+            else:
+                # Entries sharing the cursor's score sort by member, newest (greatest) first
+                pipe.zrevrangebyscore(key, position[0], position[0], withscores=True)
+                pipe.zrevrangebyscore(key, f'({position[0]}', '(0', start=0, num=limit, withscores=True)
+        results = pipe.execute()
+    if position is None:
+        pages = results
+    else:
+        pages = [[entry for entry in ties if entry[0] < position[1]] + older
+                 for ties, older in zip(results[::2], results[1::2])]
+    return [[(name, int(value)) for name, value in page] for page in pages]
+
+
+def merge(pages, limit):
+    """k-way merge of pages sorted newest first; the first ``limit`` entries"""
+    merged = heapq.merge(*pages, key=lambda entry: (entry[1], entry[0]), reverse=True)
+    return [entry for _, entry in zip(range(limit), merged)]
+
+
+def hydrate(entries):
+    """The items behind ``entries``, in order; items deleted since they were read are dropped"""
+    wanted = {kind: [] for kind in KINDS}
+    for name, _ in entries:
+        kind, _, pk = name.decode().split(':')
+        wanted[kind].append(int(pk))
+    found = {kind: KINDS[kind].objects.select_related('author').in_bulk(pks) for kind, pks in wanted.items() if pks}
+    items = []
+    for name, _ in entries:
+        kind, _, pk = name.decode().split(':')
+        item = found[kind].get(int(pk))
+        if item is not None:
+            items.append((kind, item))
+    return items
+
+
+def feeds(offering_ids):
+    """{offering id: (posted, fan_out)} of the offerings that have had any items"""
+    return {offering_id: (posted, fan_out) for offering_id, posted, fan_out in OfferingFeed.objects.filter(
+        course_offering_id__in=offering_ids).values_list('course_offering_id', 'posted', 'fan_out')}
+
+
+def unread_counts(user, offering_feeds):
+    read = dict(TimelineRead.objects.filter(user=user, course_offering_id__in=offering_feeds).values_list(
+        'course_offering_id', 'items_read'))
+    return {offering_id: max(posted - read.get(offering_id, 0), 0)
+            for offering_id, (posted, _) in offering_feeds.items()}
+
+
+def timeline(user, offering_ids, cursor=None, limit=None):
+    """
+    One page of the user's timeline, newest first, after ``cursor``.
+
+    Returns ``(items, next cursor or None, unread per offering)`` where items
+    are ``(kind, Announcement or Thread)`` pairs; raises InvalidCursor.
+    """
+    limit = max(min(limit or settings.DISCUSSION_PAGE_SIZE, settings.DISCUSSION_MAX_PAGE_SIZE), 1)
+    position = decode_cursor(cursor) if cursor else None
+    offering_feeds = feeds(offering_ids)
+    unread = unread_counts(user, offering_feeds)
+    if not offering_feeds:
+        return [], None, unread
+
+    redis = get_redis()
+    load_offerings(redis, sorted(offering_feeds))
+    fan_out_ids = sorted(offering_id for offering_id, (_, fan_out) in offering_feeds.items() if fan_out)
+    sync_user_set(redis, user.pk, fan_out_ids)
+    keys = [user_key(user.pk)] if fan_out_ids else []
+    keys.extend(offering_key(offering_id) for offering_id, (_, fan_out) in sorted(offering_feeds.items())
+                if not fan_out)
+
+    entries = merge(read_page(redis, keys, position, limit + 1), limit + 1)
+    next_cursor = encode_cursor(entries[limit - 1]) if len(entries) > limit else None
+    return hydrate(entries[:limit]), next_cursor, unread
+
+
+def mark_read(user, offering_ids):
+    """Mark every current item of the offerings as seen by ``user``"""
+    offering_feeds = feeds(offering_ids)
+    TimelineRead.objects.bulk_create(
+        [TimelineRead(user=user, course_offering_id=offering_id, items_read=posted)
+         for offering_id, (posted, _) in offering_feeds.items()],
+        update_conflicts=True, unique_fields=['user', 'course_offering'], update_fields=['items_read'])
+    return len(offering_feeds)
@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('timeline/', views.user_timeline, name='discussion-timeline'),
+    path('timeline/read/', views.mark_timeline_read, name='discussion-timeline-read'),
+    path('offerings/<int:course_offering_id>/announcements/', views.offering_announcements,
+         name='offering-announcements'),
+    path('offerings/<int:course_offering_id>/threads/', views.offering_threads, name='offering-threads'),
+    path('threads/<int:thread_id>/posts/', views.thread_posts, name='thread-posts'),
+]
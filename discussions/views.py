@@ -0,0 +1,158 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import status, permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from courses.models import CourseOffering
+from .models import Announcement, Thread, ThreadRead
+from .paging import keyset_page
+from .serializers import AnnouncementSerializer, PostSerializer, ThreadSerializer
+from .timeline import InvalidCursor, mark_read, member_offering_ids, timeline
+
+SERIALIZERS = {'announcement': AnnouncementSerializer, 'thread': ThreadSerializer}
+
+
+def page_limit(request):
+    """?limit raised to at least 1, or None for the default page size; raises ValueError"""
+    limit = request.query_params.get('limit')
+    return max(int(limit), 1) if limit else None
+
+
+def is_member(user, offering):
+    """Staff, the offering's faculty and its enrolled students take part in its discussions"""
+    return (user.is_staff or offering.faculty.user_id == user.pk
+            or offering.enrollments.filter(student__user=user, status='enrolled').exists())
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def user_timeline(request):
+    """Announcements and threads of the user's offerings, newest first, with unread counts per offering"""
+    offering_ids = member_offering_ids(request.user)
+    if offering_ids is None:
+        return Response({'error': 'Only students and faculty have a timeline'}, status=status.HTTP_403_FORBIDDEN)
+    try:
+        limit = page_limit(request)
+    except ValueError:
+        return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        items, cursor, unread = timeline(request.user, offering_ids, request.query_params.get('cursor') or None, limit)
+    except InvalidCursor:
+        return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        'results': [{'kind': kind, **SERIALIZERS[kind](item).data} for kind, item in items],
+        'cursor': cursor,
+        'unread': unread,
+        'unread_total': sum(unread.values()),
+    })
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def mark_timeline_read(request):
+    """Mark the timeline read, or only one offering's part of it with {"course_offering": id}"""
+    offering_ids = member_offering_ids(request.user)
+    if offering_ids is None:
+        return Response({'error': 'Only students and faculty have a timeline'}, status=status.HTTP_403_FORBIDDEN)
+    course_offering = request.data.get('course_offering')
+    if course_offering is not None:
+        offering_ids = [pk for pk in offering_ids if str(pk) == str(course_offering)]
+    return Response({'marked': mark_read(request.user, offering_ids)})
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticated])
+def offering_announcements(request, course_offering_id):
+    """Announcements of an offering, newest first; its faculty post new ones"""
+    offering = get_object_or_404(CourseOffering.objects.select_related('faculty'), pk=course_offering_id)
+    if not is_member(request.user, offering):
+        return Response({'error': 'Only members of the offering can see its announcements'},
+                        status=status.HTTP_403_FORBIDDEN)
+    if request.method == 'POST':
+        if not request.user.is_staff and offering.faculty.user_id != request.user.pk:
+            return Response({'error': 'Only the offering faculty can post announcements'},
+                            status=status.HTTP_403_FORBIDDEN)
+        serializer = AnnouncementSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(course_offering=offering, author=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    announcements = Announcement.objects.filter(course_offering=offering).select_related('author')
+    try:
+        limit = page_limit(request)
+    except ValueError:
+        return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        rows, cursor = keyset_page(announcements, 'created_at', request.query_params.get('cursor'), limit)
+    except InvalidCursor:
+        return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'results': AnnouncementSerializer(rows, many=True).data, 'cursor': cursor})
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticated])
+def offering_threads(request, course_offering_id):
+    """Forum threads of an offering, newest first, with the replies each has that the user has not seen.
+
+    Threads page by creation: a reply moves ``last_activity_at``, so a cursor on it
+    would skip threads bumped above the page a reader had already reached.
+    """
+    offering = get_object_or_404(CourseOffering.objects.select_related('faculty'), pk=course_offering_id)
+    if not is_member(request.user, offering):
+        return Response({'error': 'Only members of the offering can see its forum'},
+                        status=status.HTTP_403_FORBIDDEN)
+    if request.method == 'POST':
+        serializer = ThreadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(course_offering=offering, author=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    threads = Thread.objects.filter(course_offering=offering).select_related('author')
+    try:
+        limit = page_limit(request)
+    except ValueError:
+        return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        rows, cursor = keyset_page(threads, 'created_at', request.query_params.get('cursor'), limit)
+    except InvalidCursor:
+        return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+    read = dict(ThreadRead.objects.filter(user=request.user, thread__in=rows).values_list('thread_id', 'posts_read'))
+    results = ThreadSerializer(rows, many=True).data
+    for row, thread in zip(results, rows):
+        row['unread_posts'] = max(thread.replies_posted - read.get(thread.pk, 0), 0)
+    return Response({'results': results, 'cursor': cursor})
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticated])
+def thread_posts(request, thread_id):
+    """Replies of a thread, oldest first; reading the last page marks them all read"""
+    thread = get_object_or_404(Thread.objects.select_related('course_offering__faculty'), pk=thread_id)
+    if not is_member(request.user, thread.course_offering):
+        return Response({'error': 'Only members of the offering can see its forum'},
+                        status=status.HTTP_403_FORBIDDEN)
+    if request.method == 'POST':
+        if thread.is_locked:
+            return Response({'error': 'This thread is locked'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = PostSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(thread=thread, author=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    try:
+        limit = page_limit(request)
+    except ValueError:
+        return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        rows, cursor = keyset_page(thread.posts.select_related('author'), 'created_at',
+                                   request.query_params.get('cursor'), limit, descending=False)
+    except InvalidCursor:
+        return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+    if cursor is None:
+        ThreadRead.objects.update_or_create(user=request.user, thread=thread,
+                                            defaults={'posts_read': thread.replies_posted})
+    return Response({
+        'thread': ThreadSerializer(thread).data,
+        'results': PostSerializer(rows, many=True).data,
+        'cursor': cursor,
+    })
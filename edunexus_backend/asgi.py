@@ -2,6 +2,10 @@
 ASGI config for edunexus_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP requests go to Django; WebSocket connections on ``/ws/`` go to the realtime
+push endpoint. Serve with an ASGI server, e.g.:
+
+    uvicorn edunexus_backend.asgi:application --host 0.0.0.0 --port 8000
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -12,5 +16,21 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'edunexus_backend.settings')
+# Sync views run on per-request threads here, so persistent connections would pile up; pool with PgBouncer instead
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
+
+django_application = get_asgi_application()
+
+from realtime.consumers import websocket_application  # noqa: E402  (needs the app registry loaded)
+from search.autocomplete import preload_in_background  # noqa: E402
+
+preload_in_background()
+
 
-application = get_asgi_application()
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        if scope['path'].rstrip('/') == '/ws':
+            return await websocket_application(scope, receive, send)
+        await receive()
+        return await send({'type': 'websocket.close', 'code': 4404})
+    return await django_application(scope, receive, send)
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
@@ -49,9 +50,21 @@ INSTALLED_APPS = [
     'core',
     'academics',
     'courses',
+    'notifications',
+    'realtime',
+    'search',
+    'analytics',
+    'reports',
+    'similarity',
+    'sync',
+    'outbox',
+    'metrics',
+    'benchmarks',
+    'discussions',
 ]
 
 MIDDLEWARE = [
+    'metrics.middleware.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -60,6 +73,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.db_router.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'edunexus_backend.urls'
@@ -94,9 +108,24 @@ DATABASES = {
         'PASSWORD': os.getenv('PGPASSWORD'),
         'HOST': os.getenv('PGHOST'),
         'PORT': os.getenv('PGPORT'),
+        # Persistent connections, checked before reuse; the ASGI entry point defaults DB_CONN_MAX_AGE to 0
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Read replica (list/retrieve ViewSet reads go to it when PGREPLICA_HOST is set)
+if os.getenv('PGREPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('PGREPLICA_HOST'),
+        'PORT': os.getenv('PGREPLICA_PORT', os.getenv('PGPORT')),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+DATABASE_REPLICA_ALIAS = 'replica'
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 10))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -159,6 +188,8 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'UPDATE_LAST_LOGIN': True,
+    # Rotated and logged-out refresh tokens are revoked in Redis (core.tokens)
+    'TOKEN_REFRESH_SERIALIZER': 'core.serializers.TokenRefreshSerializer',
 }
 
 # CORS Configuration
@@ -173,5 +204,83 @@ CSRF_TRUSTED_ORIGINS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Image variants (edge lengths in px, rendered as WebP and JPEG; pictures are cropped square, logos fitted)
+IMAGE_VARIANT_SIZES = {'profile_picture': [40, 96, 256], 'logo': [64, 256]}
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', 2))
+
 # Custom User Model
 AUTH_USER_MODEL = 'core.User'
+
+
+# Redis (pub/sub for realtime push)
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+SSE_MAX_STREAM_SECONDS = int(os.getenv('SSE_MAX_STREAM_SECONDS', 600))
+
+# Autocomplete (in-memory prefix index per institute)
+AUTOCOMPLETE_MAX_AGE = int(os.getenv('AUTOCOMPLETE_MAX_AGE', 300))
+AUTOCOMPLETE_PRELOAD = os.getenv('AUTOCOMPLETE_PRELOAD', 'false').lower() == 'true'
+
+# Transcripts (grade point per final_grade; other grades, e.g. incomplete, are not counted)
+GRADE_POINTS = {'O': 10, 'A+': 9, 'A': 8, 'B+': 7, 'B': 6, 'C': 5, 'P': 4, 'F': 0, 'AB': 0}
+
+# Bulk enrollment (rows per INSERT when auto-enrolling students)
+ENROLLMENT_BATCH_SIZE = int(os.getenv('ENROLLMENT_BATCH_SIZE', 5000))
+
+# Notifications (delivered to the backends by NOTIFICATION_WORKERS background threads)
+NOTIFICATION_BACKENDS = [
+    'notifications.backends.InAppBackend',
+    'notifications.backends.EmailBackend',
+]
+NOTIFICATION_BATCH_SIZE = int(os.getenv('NOTIFICATION_BATCH_SIZE', 2000))
+NOTIFICATION_WORKERS = int(os.getenv('NOTIFICATION_WORKERS', 1))
+
+# Near-duplicate submissions (default estimated Jaccard similarity reported; larger LSH buckets are skipped;
+# submissions are signed by SIMILARITY_WORKERS background threads)
+SIMILARITY_THRESHOLD = float(os.getenv('SIMILARITY_THRESHOLD', 0.5))
+SIMILARITY_MAX_BUCKET = int(os.getenv('SIMILARITY_MAX_BUCKET', 100))
+SIMILARITY_WORKERS = int(os.getenv('SIMILARITY_WORKERS', 1))
+
+# Change feed (rows per feed per call; rows younger than the lag wait for in-flight transactions to commit)
+SYNC_BATCH_SIZE = int(os.getenv('SYNC_BATCH_SIZE', 200))
+SYNC_MAX_BATCH_SIZE = int(os.getenv('SYNC_MAX_BATCH_SIZE', 1000))
+SYNC_LAG_SECONDS = int(os.getenv('SYNC_LAG_SECONDS', 5))
+SYNC_TOMBSTONE_DAYS = int(os.getenv('SYNC_TOMBSTONE_DAYS', 90))
+
+# Discussions (timelines merge per-offering Redis sorted sets on read; offerings with at most
+# DISCUSSION_FANOUT_MAX members also push each announcement and thread into their members' sets on write)
+DISCUSSION_FANOUT_MAX = int(os.getenv('DISCUSSION_FANOUT_MAX', 200))
+DISCUSSION_TIMELINE_TTL = int(os.getenv('DISCUSSION_TIMELINE_TTL', 60 * 60 * 24 * 7))
+DISCUSSION_PAGE_SIZE = int(os.getenv('DISCUSSION_PAGE_SIZE', 20))
+DISCUSSION_MAX_PAGE_SIZE = int(os.getenv('DISCUSSION_MAX_PAGE_SIZE', 100))
+
+# Outbox relay (events of enrollments, submissions, attendance and user roles for the analytics warehouse)
+OUTBOX_SINK = os.getenv('OUTBOX_SINK', 'outbox.sinks.JSONLinesSink')
+OUTBOX_JSONL_DIR = os.getenv('OUTBOX_JSONL_DIR', str(BASE_DIR / 'outbox_events'))
+OUTBOX_STREAM_MAXLEN = int(os.getenv('OUTBOX_STREAM_MAXLEN', 1000000))
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 1000))
+OUTBOX_RETENTION_DAYS = int(os.getenv('OUTBOX_RETENTION_DAYS', 7))
+
+# Metrics (/metrics needs `Authorization: Bearer <METRICS_TOKEN>` when set; each worker shares its counters
+# through Redis every METRICS_FLUSH_SECONDS; 1 in METRICS_PROFILE_RATE requests is stack-sampled into
+# folded-stack files under METRICS_PROFILE_DIR, 0 turns profiling off)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_FLUSH_SECONDS = int(os.getenv('METRICS_FLUSH_SECONDS', 10))
+METRICS_PROFILE_RATE = int(os.getenv('METRICS_PROFILE_RATE', 0))
+METRICS_PROFILE_INTERVAL_MS = int(os.getenv('METRICS_PROFILE_INTERVAL_MS', 5))
+METRICS_PROFILE_DIR = os.getenv('METRICS_PROFILE_DIR', str(BASE_DIR / 'profiles'))
+
+# Benchmark suite (one JSON line per run of run_benchmark_suite, compared against earlier runs)
+BENCHMARK_HISTORY = os.getenv('BENCHMARK_HISTORY', str(BASE_DIR / 'benchmark_history.jsonl'))
+
+# Django cache (hits and misses are counted in /metrics)
+CACHES = {
+    'default': {
+        'BACKEND': 'metrics.cache.LocMemCache',
+    },
+}
+
+# Email (defaults to a local SMTP server such as `python -m aiosmtpd -n -l localhost:1025`)
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', 1025))
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@edunexus.local')
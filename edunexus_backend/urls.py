@@ -22,8 +22,17 @@ from django.conf.urls.static import static
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('core.urls')),
+    path('api/async/', include('core.async_urls')),
     path('api/academics/', include('academics.urls')),
     path('api/courses/', include('courses.urls')),
+    path('api/notifications/', include('notifications.urls')),
+    path('api/realtime/', include('realtime.urls')),
+    path('api/search/', include('search.urls')),
+    path('api/analytics/', include('analytics.urls')),
+    path('api/similarity/', include('similarity.urls')),
+    path('api/sync/', include('sync.urls')),
+    path('api/discussions/', include('discussions.urls')),
+    path('metrics', include('metrics.urls')),
 ]
 
 # Serve media files in development
@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'edunexus_backend.settings')
 
 application = get_wsgi_application()
+
+from search.autocomplete import preload_in_background  # noqa: E402
+
+preload_in_background()
@@ -0,0 +1,50 @@
+from django.core.cache.backends import locmem, redis
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+from .registry import CACHE_REQUESTS
+
+_missing = object()
+
+
+class CacheMetricsMixin:
+    """Count hits and misses of get and get_or_set (a miss filled by get_or_set counts once)"""
+
+    def record(self, hits, misses):
+        backend = type(self).__name__
+        if hits:
+            CACHE_REQUESTS.inc((backend, 'hit'), hits)
+        if misses:
+            CACHE_REQUESTS.inc((backend, 'miss'), misses)
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _missing, version=version)
+        if value is _missing:
+            self.record(0, 1)
+            return default
+        self.record(1, 0)
+        return value
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        value = super().get(key, _missing, version=version)
+        if value is not _missing:
+            self.record(1, 0)
+            return value
+        self.record(0, 1)
+        if callable(default):
+            default = default()
+        self.add(key, default, timeout=timeout, version=version)
+        # Another caller may have added a value between the get() and the add()
+        return super().get(key, default, version=version)
+
+
+class LocMemCache(CacheMetricsMixin, locmem.LocMemCache):
+    pass
+
+
+class RedisCache(CacheMetricsMixin, redis.RedisCache):
+    # The base get_many() goes through get(); Redis fetches all keys at once
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version=version)
+        self.record(len(found), len(keys) - len(found))
+        return found
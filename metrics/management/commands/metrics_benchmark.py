@@ -0,0 +1,121 @@
+import gc
+import os
+import random
+import tempfile
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from core.models import Student, User, UserProfile
+from metrics.middleware import MetricsMiddleware, time_query
+
+MIDDLEWARE = 'metrics.middleware.MetricsMiddleware'
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Per-request overhead of the metrics middleware and the sampled profiler on an API mix (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200)
+        parser.add_argument('--requests', type=int, default=100, help='Requests per configuration and round')
+        parser.add_argument('--rounds', type=int, default=10,
+                            help='Configurations run in a shuffled order each round; the median round counts')
+        parser.add_argument('--profile-rate', type=int, default=100)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic(), tempfile.TemporaryDirectory() as directory:
+                paths, user = self.seed(options['students'])
+                self.run(paths, user, options, directory)
+                self.hooks(paths, user)
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Synthetic data rolled back')
+
+    def seed(self, count):
+        users = User.objects.bulk_create([
+            User(username=f'metrics-{i}', email=f'metrics-{i}@example.com', first_name='Metrics',
+                 last_name=f'Student {i}')
+            for i in range(count)])
+        UserProfile.objects.bulk_create([UserProfile(user=user, address='Campus') for user in users])
+        students = Student.objects.bulk_create([
+            Student(user=user, enrollment_number=f'METRICS{i:06}', admission_date=date(2023, 7, 1))
+            for i, user in enumerate(users)])
+        paths = ['/api/students/', f'/api/students/{students[0].pk}/', '/api/auth/profile/',
+                 '/api/users/?fields=id,username']
+        return paths, users[0]
+
+    def run(self, paths, user, options, directory):
+        without = [name for name in settings.MIDDLEWARE if name != MIDDLEWARE]
+        configurations = [
+            ('no metrics', {'MIDDLEWARE': without}),
+            ('metrics', {'MIDDLEWARE': [MIDDLEWARE, *without], 'METRICS_PROFILE_RATE': 0}),
+            (f"metrics + profiling 1/{options['profile_rate']}",
+             {'MIDDLEWARE': [MIDDLEWARE, *without], 'METRICS_PROFILE_RATE': options['profile_rate']}),
+            ('profiling every request', {'MIDDLEWARE': [MIDDLEWARE, *without], 'METRICS_PROFILE_RATE': 1}),
+        ]
+        clients = {}
+        rounds = {label: [] for label, _ in configurations}
+        for _ in range(options['rounds']):
+            for label, overrides in random.sample(configurations, len(configurations)):
+                with override_settings(**overrides, METRICS_FLUSH_SECONDS=3600, METRICS_PROFILE_DIR=directory):
+                    if label not in clients:
+                        clients[label] = APIClient()
+                        clients[label].force_authenticate(user)
+                    rounds[label].append(self.timed(clients[label], paths, options['requests'], label == 'no metrics'))
+
+        median = {label: sorted(times)[len(times) // 2] / options['requests'] for label, times in rounds.items()}
+        baseline = self.request_time = median['no metrics']
+        self.stdout.write(f'End to end ({len(paths)} endpoints, median of {options["rounds"]} rounds)')
+        for label, _ in configurations:
+            self.stdout.write(f'  {label:32} {median[label] * 1000:7.3f} ms per request  '
+                              f'{(median[label] - baseline) / baseline * 100:+6.2f}%')
+        stacks = [os.path.join(directory, name) for name in os.listdir(directory)]
+        samples = sum(int(line.rsplit(' ', 1)[1]) for path in stacks for line in open(path, encoding='utf-8'))
+        self.stdout.write(self.style.SUCCESS(f'{samples} stack samples in {len(stacks)} folded-stack files'))
+
+    def timed(self, client, paths, count, bare):
+        """Seconds for ``count`` requests cycling through ``paths``"""
+        gc.collect()
+        wrappers = connection.execute_wrappers
+        if bare and time_query in wrappers:
+            wrappers.remove(time_query)
+        try:
+            started = time.perf_counter()
+            for number in range(count):
+                client.get(paths[number % len(paths)], HTTP_ACCEPT='application/json')
+            return time.perf_counter() - started
+        finally:
+            if bare and time_query not in wrappers:
+                wrappers.append(time_query)
+
+    def hooks(self, paths, user, repeat=20000):
+        """Cost of the middleware's own work per request, isolated from the request-to-request noise above"""
+        client = APIClient()
+        client.force_authenticate(user)
+        middleware = MetricsMiddleware(lambda request: None)
+        response = client.get(paths[0], HTTP_ACCEPT='application/json')
+        request = response.wsgi_request
+        queries = 3
+
+        with override_settings(METRICS_PROFILE_RATE=0):
+            gc.collect()
+            started = time.perf_counter()
+            for _ in range(repeat):
+                stats, token, begun = middleware.begin()
+                for _ in range(queries):
+                    time_query(lambda *args: None, 'SELECT 1', None, False, {})
+                middleware.end(stats, token)
+                middleware.record(request, response, stats, begun)
+            cost = (time.perf_counter() - started) / repeat
+        self.stdout.write(f'Middleware and query timing: {cost * 1e6:.1f} us per request with {queries} queries '
+                          f'({cost / self.request_time * 100:.2f}% of the median request)')
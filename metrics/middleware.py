@@ -0,0 +1,105 @@
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+
+from .profiling import SAMPLER, Profile
+from .registry import DB_QUERIES, DB_TIME, LATENCY, PROFILED, REGISTRY, REQUESTS, RESPONSE_SIZE
+
+_stats = ContextVar('request_metrics', default=None)
+
+
+class RequestStats:
+    """Query time of the current request; shared with the threads its queries run in"""
+
+    def __init__(self):
+        self.db_time = 0.0
+        self.queries = 0
+        self.profile = None
+
+
+def time_query(execute, sql, params, many, context):
+    """Execute wrapper installed on every database connection (see signals)"""
+    stats = _stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    if stats.profile is not None:
+        stats.profile.add_thread(threading.get_ident())
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_time += time.perf_counter() - started
+        stats.queries += 1
+
+
+def route_of(request):
+    match = getattr(request, 'resolver_match', None)
+    # Unmatched paths share one label so scanners cannot blow up the series count
+    return match.view_name if match is not None else 'unmatched'
+
+
+class MetricsMiddleware:
+    """Record latency, SQL time, response size and status per route; profile one request in METRICS_PROFILE_RATE"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, token, started = self.begin()
+        try:
+            response = self.get_response(request)
+        finally:
+            self.end(stats, token)
+        self.record(request, response, stats, started)
+        if REGISTRY.flush_due():
+            REGISTRY.flush()
+        return response
+
+    async def __acall__(self, request):
+        stats, token, started = self.begin()
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.end(stats, token)
+        self.record(request, response, stats, started)
+        if REGISTRY.flush_due():
+            await sync_to_async(REGISTRY.flush)()
+        return response
+
+    def begin(self):
+        stats = RequestStats()
+        rate = settings.METRICS_PROFILE_RATE
+        if rate and random.randrange(rate) == 0:
+            stats.profile = Profile()
+            SAMPLER.start(stats.profile)
+        return stats, _stats.set(stats), time.perf_counter()
+
+    def end(self, stats, token):
+        _stats.reset(token)
+        if stats.profile is not None:
+            SAMPLER.stop(stats.profile)
+
+    def record(self, request, response, stats, started):
+        elapsed = time.perf_counter() - started
+        route = route_of(request)
+        labels = (request.method, route)
+        REQUESTS.inc((*labels, str(response.status_code)))
+        LATENCY.observe(labels, elapsed)
+        DB_TIME.observe(labels, stats.db_time)
+        if stats.queries:
+            DB_QUERIES.inc(labels, stats.queries)
+        if not response.streaming:
+            RESPONSE_SIZE.observe(labels, len(response.content))
+        if stats.profile is not None:
+            PROFILED.inc((route,))
+            stats.profile.write(route)
@@ -0,0 +1,132 @@
+"""
+Sampled request profiling.
+
+One request in METRICS_PROFILE_RATE is followed by a background thread that
+reads the Python stack of every thread serving it each
+METRICS_PROFILE_INTERVAL_MS. Stacks are written in the folded format
+(``outer;inner;leaf count``, one file per route under METRICS_PROFILE_DIR)
+that flamegraph.pl, speedscope and inferno read directly; appending keeps
+adding samples, so a file becomes the route's profile over many requests.
+
+A request's threads are the one running the middleware and, under ASGI, the
+worker threads that run its queries (they register themselves from the
+execute wrapper). Requests that are not sampled pay nothing here.
+"""
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_frame_labels = {}
+
+
+def frame_label(code):
+    label = _frame_labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        for root in (str(settings.BASE_DIR), *sorted(sys.path, key=len, reverse=True)):
+            if root and filename.startswith(root + os.sep):
+                filename = filename[len(root) + 1:]
+                break
+        label = _frame_labels[code] = f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ':')
+    return label
+
+
+def fold(frame):
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class Profile:
+    """Stacks sampled while one request was in flight"""
+
+    def __init__(self):
+        self.threads = {threading.get_ident()}
+        self.threads_lock = threading.Lock()
+        self.stacks = Counter()
+
+    def add_thread(self, thread_id):
+        with self.threads_lock:
+            self.threads.add(thread_id)
+
+    def thread_ids(self):
+        with self.threads_lock:
+            return list(self.threads)
+
+    def write(self, route):
+        if not self.stacks:
+            return
+        os.makedirs(settings.METRICS_PROFILE_DIR, exist_ok=True)
+        path = os.path.join(settings.METRICS_PROFILE_DIR, re.sub(r'[^\w.-]+', '_', route) + '.folded')
+        with open(path, 'a', encoding='utf-8') as f:
+            f.writelines(f'{stack} {count}\n' for stack, count in self.stacks.items())
+
+
+class StackSampler:
+    """
+    Daemon thread sampling the profiles in flight; it sleeps while there are none.
+
+    A sampling pass holds the lock, so once stop() returns the sampler no
+    longer touches that profile and its stacks can be written out safely.
+    """
+
+    def __init__(self):
+        self.profiles = set()
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+
+    def start(self, profile):
+        with self.lock:
+            self.profiles.add(profile)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='metrics-stack-sampler', daemon=True)
+                self.thread.start()
+        self.wake.set()
+
+    def stop(self, profile):
+        """Forget ``profile``, waiting for a sampling pass in progress to finish"""
+        with self.lock:
+            self.profiles.discard(profile)
+
+    def sample(self):
+        """Add one sample of every profile in flight; False when there are none"""
+        with self.lock:
+            if not self.profiles:
+                self.wake.clear()
+                return False
+            frames = sys._current_frames()
+            try:
+                for profile in self.profiles:
+                    for thread_id in profile.thread_ids():
+                        frame = frames.get(thread_id)
+                        if frame is not None:
+                            profile.stacks[fold(frame)] += 1
+            finally:
+                del frames
+            return True
+
+    def run(self):
+        interval = settings.METRICS_PROFILE_INTERVAL_MS / 1000
+        while True:
+            self.wake.wait()
+            try:
+                sampled = self.sample()
+            except Exception:
+                logger.exception('Stack sampling failed')
+                sampled = True
+            if sampled:
+                time.sleep(interval)
+
+
+SAMPLER = StackSampler()
@@ -0,0 +1,185 @@
+"""
+In-process metrics in the Prometheus text format.
+
+Each worker process keeps its own counters and histograms and, every
+METRICS_FLUSH_SECONDS, stores a snapshot in Redis under its host and pid.
+``/metrics`` sums the snapshots of every live worker, so a scrape sees the
+whole server rather than whichever worker answered it. Snapshots of workers
+that stopped expire; Prometheus treats the drop as a counter reset.
+"""
+import json
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+
+import redis
+from django.conf import settings
+
+from core.redis_client import get_redis
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+SNAPSHOT_PREFIX = 'metrics:process:'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, registry, name, documentation, labelnames):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def inc(self, labels, amount=1):
+        values = self.registry.values[self.name]
+        with self.registry.lock:
+            values[labels] = values.get(labels, 0) + amount
+
+    @staticmethod
+    def merge(total, value):
+        return total + value
+
+    def render(self, values):
+        for labels, value in values:
+            yield f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}'
+
+
+class Histogram:
+    """Per-bucket counts (not cumulative) followed by the sum and the count of observations"""
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames, buckets):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+
+    def observe(self, labels, value):
+        values = self.registry.values[self.name]
+        with self.registry.lock:
+            row = values.get(labels)
+            if row is None:
+                row = values[labels] = [0] * (len(self.buckets) + 3)
+            row[bisect_left(self.buckets, value)] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    @staticmethod
+    def merge(total, value):
+        return [a + b for a, b in zip(total, value)]
+
+    def render(self, values):
+        for labels, row in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), row):
+                cumulative += count
+                le = (('le', bound if bound == '+Inf' else _number(bound)),)
+                yield f'{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}'
+            yield f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(row[-2])}'
+            yield f'{self.name}_count{_labels(self.labelnames, labels)} {row[-1]}'
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.values = {}
+        self.lock = threading.Lock()
+        self.flushed_at = time.monotonic()
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        self.values[metric.name] = {}
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def snapshot(self):
+        """JSON-ready copy of this process's values: {metric: [[labels, value], ...]}"""
+        with self.lock:
+            return {name: [[list(labels), value if isinstance(value, (int, float)) else list(value)]
+                           for labels, value in values.items()]
+                    for name, values in self.values.items()}
+
+    def snapshot_key(self):
+        return f'{SNAPSHOT_PREFIX}{socket.gethostname()}:{os.getpid()}'
+
+    def flush_due(self):
+        return time.monotonic() - self.flushed_at >= settings.METRICS_FLUSH_SECONDS
+
+    def flush(self):
+        """Publish this process's snapshot for the other workers' /metrics"""
+        self.flushed_at = time.monotonic()
+        try:
+            get_redis().set(self.snapshot_key(), json.dumps(self.snapshot()),
+                            ex=max(60, 6 * settings.METRICS_FLUSH_SECONDS))
+        except redis.RedisError:
+            pass
+
+    def collect(self):
+        """This process's values summed with the latest snapshots of the other workers"""
+        snapshots = [self.snapshot()]
+        try:
+            self.flush()
+            client = get_redis()
+            keys = [key for key in client.scan_iter(match=f'{SNAPSHOT_PREFIX}*', count=1000)
+                    if key.decode() != self.snapshot_key()]
+            snapshots += [json.loads(raw) for raw in client.mget(keys) if raw] if keys else []
+        except redis.RedisError:
+            pass
+
+        merged = {name: {} for name in self.metrics}
+        for snapshot in snapshots:
+            for name, values in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                for labels, value in values:
+                    labels = tuple(labels)
+                    current = merged[name].get(labels)
+                    merged[name][labels] = value if current is None else metric.merge(current, value)
+        return merged
+
+    def render(self):
+        lines = []
+        for name, values in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            lines.extend(metric.render(sorted(values.items())))
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.counter('http_requests_total', 'Requests served', ('method', 'route', 'status'))
+LATENCY = REGISTRY.histogram('http_request_duration_seconds', 'Time from the first middleware to the response',
+                             ('method', 'route'))
+RESPONSE_SIZE = REGISTRY.histogram('http_response_size_bytes', 'Response body size (streaming responses excluded)',
+                                   ('method', 'route'), SIZE_BUCKETS)
+DB_TIME = REGISTRY.histogram('http_request_db_seconds', 'Time spent in SQL queries per request', ('method', 'route'))
+DB_QUERIES = REGISTRY.counter('http_request_db_queries_total', 'SQL queries run by requests', ('method', 'route'))
+CACHE_REQUESTS = REGISTRY.counter('cache_requests_total', 'Django cache lookups by result', ('backend', 'result'))
+PROFILED = REGISTRY.counter('http_requests_profiled_total', 'Requests run under the stack sampler', ('route',))
@@ -0,0 +1,11 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .middleware import time_query
+
+
+@receiver(connection_created, dispatch_uid='metrics_time_query')
+def install_query_timer(sender, connection, **kwargs):
+    # The wrapper list outlives reconnects of the same (per-thread) connection object
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
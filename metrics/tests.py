@@ -0,0 +1,84 @@
+from unittest import skipIf
+from unittest.mock import patch
+
+import redis
+from django.test import SimpleTestCase, override_settings
+
+from .registry import Registry
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+def registry():
+    metrics = Registry()
+    metrics.counter('jobs_total', 'Jobs run', ('queue',))
+    metrics.histogram('job_seconds', 'Job duration', ('queue',), buckets=(0.5, 5))
+    return metrics
+
+
+class RenderTests(SimpleTestCase):
+    """Histogram buckets render cumulatively with inclusive upper bounds, then the sum and the count"""
+
+    def test_render(self):
+        metrics = registry()
+        for seconds in (0.25, 0.5, 3, 7):
+            metrics.metrics['job_seconds'].observe(('mail',), seconds)
+        metrics.metrics['jobs_total'].inc(('say "hi"\n',))
+        with patch('metrics.registry.get_redis', side_effect=redis.ConnectionError):
+            text = metrics.render()
+        self.assertEqual(text.splitlines(), [
+            '# HELP jobs_total Jobs run',
+            '# TYPE jobs_total counter',
+            'jobs_total{queue="say \\"hi\\"\\n"} 1',
+            '# HELP job_seconds Job duration',
+            '# TYPE job_seconds histogram',
+            'job_seconds_bucket{queue="mail",le="0.5"} 2',
+            'job_seconds_bucket{queue="mail",le="5"} 3',
+            'job_seconds_bucket{queue="mail",le="+Inf"} 4',
+            'job_seconds_sum{queue="mail"} 10.75',
+            'job_seconds_count{queue="mail"} 4',
+        ])
+
+
+@skipIf(fakeredis is None, 'fakeredis is not installed')
+@override_settings(METRICS_FLUSH_SECONDS=10)
+class CollectTests(SimpleTestCase):
+    """A scrape sums this worker's live values with the snapshots the other workers flushed"""
+
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        patcher = patch('metrics.registry.get_redis', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.local, self.other = registry(), registry()
+        self.other.snapshot_key = lambda: 'metrics:process:other-host:1'
+
+    def test_workers_are_merged(self):
+        self.local.metrics['jobs_total'].inc(('mail',), 2)
+        self.local.metrics['job_seconds'].observe(('mail',), 0.25)
+        self.other.metrics['jobs_total'].inc(('mail',), 3)
+        self.other.metrics['jobs_total'].inc(('sms',))
+        self.other.metrics['job_seconds'].observe(('mail',), 7)
+        self.other.counter('retired_total', 'Only the other worker still has this', ())
+        self.other.metrics['retired_total'].inc(())
+        self.other.flush()
+
+        # The flushed snapshot of this worker is stale by the time of the scrape and must not be counted again
+        self.local.flush()
+        self.local.metrics['jobs_total'].inc(('mail',))
+
+        merged = self.local.collect()
+        self.assertEqual(merged['jobs_total'], {('mail',): 6, ('sms',): 1})
+        self.assertEqual(merged['job_seconds'], {('mail',): [1, 0, 1, 7.25, 2]})
+        self.assertNotIn('retired_total', merged)
+        self.assertGreater(self.redis.ttl(self.other.snapshot_key()), 0)
+
+    def test_redis_outage_serves_local_values(self):
+        self.other.metrics['jobs_total'].inc(('mail',), 3)
+        self.other.flush()
+        self.local.metrics['jobs_total'].inc(('mail',))
+        with patch('metrics.registry.get_redis', side_effect=redis.ConnectionError):
+            self.assertEqual(self.local.collect()['jobs_total'], {('mail',): 1})
@@ -0,0 +1,20 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET
+
+from .registry import REGISTRY
+
+
+@require_GET
+def metrics(request):
+    """Prometheus text exposition of the request, SQL and cache metrics of all workers.
+
+    Scrapers send ``Authorization: Bearer <METRICS_TOKEN>`` when a token is configured.
+    """
+    if settings.METRICS_TOKEN:
+        header = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(header.encode(), f'Bearer {settings.METRICS_TOKEN}'.encode()):
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
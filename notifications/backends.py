@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.mail import get_connection, EmailMessage
+from django.utils.module_loading import import_string
+from core.models import User
+
+
+class BaseBackend:
+    """Delivers a batch of already-saved notifications over some channel"""
+
+    def deliver(self, notifications):
+        raise NotImplementedError
+
+
+class InAppBackend(BaseBackend):
+    """The stored Notification rows are the in-app inbox, so nothing else to do"""
+
+    def deliver(self, notifications):
+        return len(notifications)
+
+
+class EmailBackend(BaseBackend):
+    """Sends one email per notification over a single SMTP connection per batch"""
+
+    def deliver(self, notifications):
+        if not notifications:
+            return 0
+        emails = dict(
+            User.objects.filter(id__in={n.recipient_id for n in notifications}).values_list('id', 'email')
+        )
+        messages = [
+            EmailMessage(n.title, n.message, settings.DEFAULT_FROM_EMAIL, [emails[n.recipient_id]])
+            for n in notifications if emails.get(n.recipient_id)
+        ]
+        connection = get_connection(fail_silently=True)
+        return connection.send_messages(messages) or 0
+
+
+def get_backends():
+    return [import_string(path)() for path in settings.NOTIFICATION_BACKENDS]
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from notifications.services import send_due_reminders, send_low_attendance_alerts
+
+
+class Command(BaseCommand):
+    help = 'Send assignment deadline reminders and low attendance alerts (run periodically, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--due-within-hours', type=int, default=24,
+                            help='Remind about published assignments due within this many hours')
+        parser.add_argument('--attendance-threshold', type=int, default=75,
+                            help='Alert students whose attendance percentage is below this value')
+
+    def handle(self, *args, **options):
+        reminders = send_due_reminders(timedelta(hours=options['due_within_hours']))
+        self.stdout.write(self.style.SUCCESS(f'Sent {reminders} deadline reminders'))
+
+        alerts = send_low_attendance_alerts(options['attendance_threshold'])
+        self.stdout.write(self.style.SUCCESS(f'Sent {alerts} low attendance alerts'))
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('assignment_published', 'Assignment Published'), ('assignment_due', 'Assignment Due'), ('low_attendance', 'Low Attendance')], max_length=30)),
+                ('title', models.CharField(max_length=200)),
+                ('message', models.TextField(blank=True)),
+                ('data', models.JSONField(default=dict, help_text='Payload for the client (e.g. related object IDs)')),
+                ('dedupe_key', models.CharField(help_text='Prevents the same event notifying a user twice', max_length=100)),
+                ('is_read', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['recipient', 'is_read', 'created_at'], name='notificatio_recipie_86ea8b_idx')],
+                'unique_together': {('recipient', 'dedupe_key')},
+            },
+        ),
+    ]
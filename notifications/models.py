@@ -0,0 +1,29 @@
+from django.db import models
+from core.models import User
+
+
+class Notification(models.Model):
+    """In-app notification delivered to a single user"""
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    kind_choices = [
+        ('assignment_published', 'Assignment Published'),
+        ('assignment_due', 'Assignment Due'),
+        ('low_attendance', 'Low Attendance'),
+    ]
+    kind = models.CharField(max_length=30, choices=kind_choices)
+    title = models.CharField(max_length=200)
+    message = models.TextField(blank=True)
+    data = models.JSONField(default=dict, help_text="Payload for the client (e.g. related object IDs)")
+    dedupe_key = models.CharField(max_length=100, help_text="Prevents the same event notifying a user twice")
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        unique_together = ['recipient', 'dedupe_key']
+        indexes = [
+            models.Index(fields=['recipient', 'is_read', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.title} -> {self.recipient.email}"
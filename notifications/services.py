@@ -0,0 +1,157 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import lru_cache
+from itertools import islice
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, F, FloatField, Q, ExpressionWrapper, Max, Min
+from django.utils import timezone
+
+from academics.models import Semester
+from courses.models import Assignment, Enrollment, AttendanceRecord
+from .backends import get_backends
+from .models import Notification
+
+# pg_advisory_xact_lock(ADVISORY_LOCK, hashtext(dedupe_key)) serializes fan-outs of one dedupe key
+ADVISORY_LOCK = 0x6e6f7466  # 'notf'
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def fan_out(recipient_ids, kind, title, message, dedupe_key, data=None, batch_size=None):
+    """Create one notification per recipient in chunks and hand each chunk to the delivery backends.
+
+    Recipients that already received ``dedupe_key`` are skipped, so re-running a fan-out is a no-op.
+    Delivery runs on ``delivery_executor`` once a chunk has committed.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+    created = 0
+    for chunk in _chunked(recipient_ids, batch_size):
+        with transaction.atomic():
+            # A concurrent fan-out of the same key waits here, so ``already`` is exact and no insert conflicts
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s, hashtext(%s))', [ADVISORY_LOCK, dedupe_key])
+            already = set(
+                Notification.objects.filter(dedupe_key=dedupe_key, recipient_id__in=chunk)
+                .values_list('recipient_id', flat=True)
+            )
+            batch = Notification.objects.bulk_create([
+                Notification(recipient_id=recipient_id, kind=kind, title=title, message=message,
+                             data=data or {}, dedupe_key=dedupe_key)
+                for recipient_id in dict.fromkeys(chunk) if recipient_id not in already
+            ])
+            if batch:
+                ids = [notification.pk for notification in batch]
+                transaction.on_commit(lambda ids=ids: delivery_executor().submit(deliver, ids))
+        created += len(batch)
+    return created
+
+
+def deliver(notification_ids):
+    """Hand saved notifications to every delivery backend; runs on ``delivery_executor``"""
+    close_old_connections()
+    try:
+        notifications = list(Notification.objects.filter(pk__in=notification_ids))
+        for backend in get_backends():
+            backend.deliver(notifications)
+    finally:
+        close_old_connections()
+
+
+@lru_cache(maxsize=None)
+def delivery_executor():
+    """Shared background pool sending notifications (e.g. over SMTP) off the request path"""
+    return ThreadPoolExecutor(max_workers=settings.NOTIFICATION_WORKERS, thread_name_prefix='notifications')
+
+
+def enrolled_user_ids(course_offering_id):
+    """User IDs of every student enrolled in an offering, resolved with a single join"""
+    return (
+        Enrollment.objects.filter(course_offering_id=course_offering_id, status='enrolled')
+        .values_list('student__user_id', flat=True)
+        .iterator(chunk_size=settings.NOTIFICATION_BATCH_SIZE)
+    )
+
+
+def notify_assignment_published(assignment):
+    return fan_out(
+        enrolled_user_ids(assignment.course_offering_id),
+        kind='assignment_published',
+        title=f"New assignment: {assignment.title}",
+        message=f"Due on {assignment.due_date:%Y-%m-%d %H:%M}.",
+        dedupe_key=f"assignment_published:{assignment.pk}",
+        data={'assignment_id': assignment.pk, 'course_offering_id': assignment.course_offering_id},
+    )
+
+
+def notify_assignment_due(assignment):
+    """Remind enrolled students who have not submitted yet"""
+    recipients = (
+        Enrollment.objects.filter(course_offering_id=assignment.course_offering_id, status='enrolled')
+        .exclude(student__assignment_submissions__assignment=assignment)
+        .values_list('student__user_id', flat=True)
+        .iterator(chunk_size=settings.NOTIFICATION_BATCH_SIZE)
+    )
+    return fan_out(
+        recipients,
+        kind='assignment_due',
+        title=f"Assignment due soon: {assignment.title}",
+        message=f"Due on {assignment.due_date:%Y-%m-%d %H:%M}.",
+        dedupe_key=f"assignment_due:{assignment.pk}",
+        data={'assignment_id': assignment.pk, 'course_offering_id': assignment.course_offering_id},
+    )
+
+
+def send_due_reminders(within=timedelta(hours=24)):
+    """Notify for every published assignment due in the next ``within``; uses the due_date index"""
+    now = timezone.now()
+    assignments = Assignment.objects.filter(
+        due_date__gte=now, due_date__lt=now + within, is_published=True
+    ).only('id', 'title', 'due_date', 'course_offering_id')
+    return sum(notify_assignment_due(assignment) for assignment in assignments)
+
+
+def send_low_attendance_alerts(threshold=75):
+    """Alert students whose attendance in a current-semester offering is below ``threshold`` percent"""
+    week = timezone.now().strftime('%G-W%V')
+    # Bounding session_date lets Postgres prune attendance partitions outside the current semesters
+    bounds = Semester.objects.filter(is_current=True).aggregate(start=Min('start_date'), end=Max('end_date'))
+    if bounds['start'] is None:
+        return 0
+    rows = (
+        AttendanceRecord.objects.filter(
+            session_date__range=(bounds['start'], bounds['end']),
+            attendance_session__course_offering__semester__is_current=True,
+            attendance_session__is_mandatory=True,
+        )
+        .values('attendance_session__course_offering_id', 'student__user_id')
+        .annotate(
+            total=Count('id'),
+            attended=Count('id', filter=Q(status__in=AttendanceRecord.attended_statuses)),
+        )
+        .filter(attended__lt=ExpressionWrapper(F('total') * threshold / 100.0, output_field=FloatField()))
+        .order_by('attendance_session__course_offering_id')
+    )
+    by_offering = {}
+    for row in rows.iterator(chunk_size=settings.NOTIFICATION_BATCH_SIZE):
+        by_offering.setdefault(row['attendance_session__course_offering_id'], []).append(row['student__user_id'])
+
+    created = 0
+    for offering_id, user_ids in by_offering.items():
+        created += fan_out(
+            user_ids,
+            kind='low_attendance',
+            title="Low attendance warning",
+            message=f"Your attendance has fallen below {threshold}%.",
+            dedupe_key=f"low_attendance:{offering_id}:{week}",
+            data={'course_offering_id': offering_id, 'threshold': threshold},
+        )
+    return created
@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
+
+from courses.models import Assignment
+from .services import notify_assignment_published
+
+
+@receiver(pre_save, sender=Assignment)
+def remember_publish_state(sender, instance, **kwargs):
+    instance._was_published = bool(
+        instance.pk and Assignment.objects.filter(pk=instance.pk, is_published=True).exists()
+    )
+
+
+@receiver(post_save, sender=Assignment)
+def announce_published_assignment(sender, instance, **kwargs):
+    if instance.is_published and not getattr(instance, '_was_published', False):
+        transaction.on_commit(lambda: notify_assignment_published(instance))
@@ -0,0 +1,98 @@
+from datetime import date, time, timedelta
+from unittest.mock import patch
+
+from django.core import mail
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from courses.models import Assignment, AttendanceRecord, AttendanceSession
+from courses.tests import build_offering
+from .models import Notification
+from .services import fan_out, send_low_attendance_alerts
+
+
+class InlineExecutor:
+    """Runs submitted work on the spot, inside the test's transaction, so delivery can be asserted on"""
+
+    def submit(self, fn, *args):
+        with patch('notifications.services.close_old_connections'):
+            fn(*args)
+
+
+@patch('notifications.services.delivery_executor', return_value=InlineExecutor())
+class FanOutTests(TestCase):
+    """Each recipient is notified once per dedupe key, and only new notifications are delivered"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.offering, cls.teacher, cls.students = build_offering('NF', students=3)
+
+    def test_delivered_after_commit(self, executor):
+        with self.captureOnCommitCallbacks() as callbacks:
+            created = fan_out([user.pk for user in self.students], 'assignment_due', 'Due', 'Soon', 'key')
+            self.assertEqual(mail.outbox, [])
+        for callback in callbacks:
+            callback()
+        self.assertEqual(created, 3)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [user.email for user in self.students])
+
+    def test_only_new_recipients_are_delivered(self, executor):
+        Notification.objects.create(recipient=self.students[0], kind='assignment_due', title='Due', dedupe_key='key')
+        with self.captureOnCommitCallbacks(execute=True):
+            created = fan_out([user.pk for user in self.students] * 2, 'assignment_due', 'Due', 'Soon', 'key',
+                              batch_size=2)
+        self.assertEqual(created, 2)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         [user.email for user in self.students[1:]])
+        self.assertEqual(Notification.objects.filter(dedupe_key='key').count(), 3)
+
+        mail.outbox.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(fan_out([user.pk for user in self.students], 'assignment_due', 'Due', 'Soon', 'key'), 0)
+        self.assertEqual(mail.outbox, [])
+
+    def test_publishing_an_assignment_notifies_enrolled_students(self, executor):
+        with self.captureOnCommitCallbacks(execute=True):
+            Assignment.objects.create(course_offering=self.offering, title='Heaps', description='Text',
+                                      due_date=timezone.now() + timedelta(days=3), max_marks=10, is_published=True)
+        self.assertEqual(Notification.objects.filter(kind='assignment_published').count(), 3)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_low_attendance_counts_excused_as_attended(self, executor):
+        statuses = [['present', 'absent', 'absent', 'absent'],
+                    ['excused', 'excused', 'late', 'absent'],
+                    ['present', 'present', 'absent', 'absent']]
+        for number in range(4):
+            session = AttendanceSession.objects.create(course_offering=self.offering, session_date=date(2026, 8, 3),
+                                                       session_time=time(8 + number), topic_covered='-')
+            AttendanceRecord.objects.bulk_create([
+                AttendanceRecord(attendance_session=session, student=user.student_profile,
+                                 session_date=session.session_date, status=row[number])
+                for user, row in zip(self.students, statuses)
+            ])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(send_low_attendance_alerts(threshold=70), 2)
+        self.assertEqual(set(Notification.objects.filter(kind='low_attendance').values_list('recipient', flat=True)),
+                         {self.students[0].pk, self.students[2].pk})
+
+
+class NotificationInboxTests(TestCase):
+    """Users see and mark only their own notifications"""
+
+    @classmethod
+    def setUpTestData(cls):
+        _, cls.teacher, (cls.student,) = build_offering('NI', students=1)
+        cls.mine = Notification.objects.create(recipient=cls.student, kind='assignment_due', title='Mine',
+                                               dedupe_key='a')
+        cls.theirs = Notification.objects.create(recipient=cls.teacher, kind='assignment_due', title='Theirs',
+                                                 dedupe_key='a')
+
+    def test_inbox(self):
+        client = APIClient()
+        client.force_authenticate(self.student)
+        self.assertEqual([row['title'] for row in client.get('/api/notifications/').data['results']], ['Mine'])
+        self.assertEqual(client.post(f'/api/notifications/{self.theirs.pk}/mark_read/').data, {'updated': 0})
+        self.assertEqual(client.post('/api/notifications/mark_all_read/').data, {'updated': 1})
+        self.assertEqual(client.get('/api/notifications/', {'unread': 'true'}).data['results'], [])
+        self.assertFalse(Notification.objects.get(pk=self.theirs.pk).is_read)
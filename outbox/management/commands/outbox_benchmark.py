@@ -0,0 +1,156 @@
+import os
+import tempfile
+import time
+from datetime import date, time as clock
+
+import redis
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from academics.models import AcademicYear, Branch, Program, Semester, Subject
+from core.models import Faculty, Institute, Student, User
+from core.redis_client import get_redis
+from courses.models import AttendanceSession, CourseOffering
+from outbox.models import OutboxEvent
+from outbox.relay import relay_batch
+from outbox.sinks import JSONLinesSink, RedisStreamSink
+
+CAPTURED_TABLES = ('courses_enrollment', 'courses_attendancerecord')
+# Writes are timed on empty copies of CAPTURED_TABLES, so the live tables are never altered or locked
+PLAIN_PREFIX = 'outbox_benchmark_plain_'
+CAPTURED_PREFIX = 'outbox_benchmark_captured_'
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Write overhead of the outbox triggers and relay throughput per sink on synthetic rows (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=5000)
+        parser.add_argument('--sessions', type=int, default=10, help='Attendance sessions marked for every student')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                offering, students = self.seed(options['students'], options['sessions'])
+                first = OutboxEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+                self.writes(offering, students, first)
+                self.relays(options['batch_size'], first)
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Synthetic data rolled back')
+
+    def seed(self, count, sessions):
+        today = date.today()
+        institute = Institute.objects.create(name='Outbox Benchmark', subdomain='outbox-benchmark', code='OUTBENCH',
+                                             address='-', phone='0', email='bench@example.com',
+                                             established_date=date(2000, 1, 1))
+        program = Program.objects.create(institute=institute, name='Benchmark Program', code='BENCH', duration_years=4)
+        branch = Branch.objects.create(program=program, name='Benchmark Branch', code='BENCH')
+        year = AcademicYear.objects.create(program=program, year_number=1, name='Year 1')
+        semester = Semester.objects.create(academic_year=year, semester_number=1, name='Semester 1',
+                                           start_date=today, end_date=today, is_current=True)
+        password = make_password(None)
+        faculty = Faculty.objects.create(
+            user=User.objects.create(username='outbox-bench-faculty', email='outbox-bench@example.com',
+                                     password=password),
+            employee_id='OUTBENCH', department='-', designation='-', joining_date=today)
+        subject = Subject.objects.create(branch=branch, semester=semester, code='OUTBENCH', name='Benchmark', credits=3)
+        offering = CourseOffering.objects.create(subject=subject, semester=semester, faculty=faculty)
+        AttendanceSession.objects.bulk_create([
+            AttendanceSession(course_offering=offering, session_date=today, session_time=clock(8 + number),
+                              topic_covered='-')
+            for number in range(sessions)
+        ])
+        users = User.objects.bulk_create([
+            User(username=f'outbox{i}', email=f'outbox{i}@example.com', password=password) for i in range(count)
+        ])
+        students = Student.objects.bulk_create([
+            Student(user=user, enrollment_number=f'OB{i:08d}', admission_date=today) for i, user in enumerate(users)
+        ])
+        return offering, students
+
+    def scratch_tables(self, prefix, captured):
+        """Empty copies of the captured tables named ``prefix<table>``, with the outbox trigger if ``captured``"""
+        with connection.cursor() as cursor:
+            for table in CAPTURED_TABLES:
+                scratch = f'{prefix}{table}'
+                # Own ids, so the live tables' sequences are not drawn from
+                cursor.execute(f'CREATE TABLE {scratch} (LIKE {table} INCLUDING ALL EXCLUDING DEFAULTS '
+                               f'EXCLUDING IDENTITY)')
+                cursor.execute(f'ALTER TABLE {scratch} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY')
+                if captured:
+                    cursor.execute('SELECT pg_get_triggerdef(oid) FROM pg_trigger WHERE tgrelid = %s::regclass '
+                                   'AND tgname = %s', [table, f'{table}_outbox'])
+                    function = cursor.fetchone()[0].split(' EXECUTE FUNCTION ')[1]
+                    cursor.execute(f'CREATE TRIGGER {scratch}_outbox AFTER INSERT OR UPDATE OR DELETE ON {scratch} '
+                                   f'FOR EACH ROW EXECUTE FUNCTION {function}')
+
+    def timed_writes(self, offering, students, prefix):
+        """Enroll, grade and mark attendance for every student in the ``prefix`` tables; returns (rows, seconds)"""
+        enrollments, records = (f'{prefix}{table}' for table in CAPTURED_TABLES)
+        student_ids = [student.pk for student in students]
+        sessions = list(offering.attendance_sessions.values_list('pk', 'session_date'))
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                INSERT INTO {enrollments} (student_id, course_offering_id, enrolled_date, status, final_grade,
+                                           updated_at)
+                SELECT student_id, %s, now(), 'enrolled', '', now() FROM unnest(%s::bigint[]) AS student_id
+            """, [offering.pk, student_ids])
+            rows = cursor.rowcount
+            cursor.execute(f"UPDATE {enrollments} SET final_grade = 'A', status = 'completed', updated_at = now()")
+            rows += cursor.rowcount
+            for session_id, session_date in sessions:
+                cursor.execute(f"""
+                    INSERT INTO {records} (attendance_session_id, student_id, session_date, status, marked_at,
+                                           marked_by_id, notes)
+                    SELECT %s, student_id, %s, 'present', now(), %s, '' FROM unnest(%s::bigint[]) AS student_id
+                """, [session_id, session_date, offering.faculty_id, student_ids])
+                rows += cursor.rowcount
+        return rows, time.perf_counter() - started
+
+    def writes(self, offering, students, first):
+        self.scratch_tables(PLAIN_PREFIX, captured=False)
+        self.scratch_tables(CAPTURED_PREFIX, captured=True)
+        rows, plain = self.timed_writes(offering, students, PLAIN_PREFIX)
+        rows, captured = self.timed_writes(offering, students, CAPTURED_PREFIX)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT count(*), avg(octet_length(payload::text)) FROM outbox_outboxevent WHERE id > %s',
+                           [first])
+            events, size = cursor.fetchone()
+        self.stdout.write(f'Writes: {rows} rows in {plain:.2f}s without triggers, {captured:.2f}s with '
+                          f'({(captured - plain) / rows * 1e6:.0f} us per row); '
+                          f'{events} events of ~{size or 0:.0f} bytes of payload')
+
+    def relays(self, batch_size, first):
+        sinks = [('JSONL', lambda directory: JSONLinesSink(directory))]
+        try:
+            get_redis().ping()
+            sinks.append(('Redis Streams', lambda directory: RedisStreamSink(prefix='outbox-benchmark')))
+        except redis.RedisError:
+            self.stdout.write('Redis is not reachable; skipping the Redis Streams sink')
+
+        # Only the benchmark's own events; real pending events are neither sent nor locked
+        events = OutboxEvent.objects.filter(id__gt=first)
+        for label, make_sink in sinks:
+            events.update(published_at=None)
+            with tempfile.TemporaryDirectory() as directory:
+                sink = make_sink(directory)
+                started = time.perf_counter()
+                sent = 0
+                while count := relay_batch(sink, batch_size, events):
+                    sent += count
+                elapsed = time.perf_counter() - started
+                sink.close()
+                written = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+            self.stdout.write(self.style.SUCCESS(
+                f'{label}: {sent} events in {elapsed:.2f}s ({sent / elapsed:.0f} events/s, batches of {batch_size})'
+                + (f', {written / sent:.0f} bytes per line' if written else '')))
+            if isinstance(sink, RedisStreamSink):
+                get_redis().delete(*get_redis().keys('outbox-benchmark:*'))
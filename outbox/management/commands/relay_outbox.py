@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from outbox.relay import acquire_relay_lock, prune_published, relay
+from outbox.sinks import get_sink
+
+
+class Command(BaseCommand):
+    help = 'Stream outbox events in batches to the configured sink (JSONL files or Redis Streams)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sink', help=f'Dotted path of the sink class (default: {settings.OUTBOX_SINK})')
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE)
+        parser.add_argument('--follow', action='store_true', help='Keep polling for new events instead of exiting')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds between polls with --follow')
+        parser.add_argument('--prune', action='store_true',
+                            help='First delete events published more than OUTBOX_RETENTION_DAYS ago')
+
+    def handle(self, *args, **options):
+        if not acquire_relay_lock():
+            raise CommandError('Another relay is running')
+        if options['prune']:
+            self.stdout.write(f'Pruned {prune_published()} published events')
+
+        def progress(sent, elapsed):
+            self.stdout.write(f'  {sent} sent, {sent / elapsed if elapsed else 0:.0f} events/s')
+
+        sink = get_sink(options['sink'])
+        try:
+            sent = relay(sink, options['batch_size'], options['follow'], options['interval'], progress)
+        finally:
+            sink.close()
+        self.stdout.write(self.style.SUCCESS(f'Relayed {sent} events'))
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('aggregate_type', models.CharField(help_text="Captured table, e.g. 'enrollment'", max_length=40)),
+                ('aggregate_id', models.BigIntegerField()),
+                ('operation', models.CharField(help_text='created, updated or deleted', max_length=10)),
+                ('payload', models.JSONField(help_text='Captured columns of the row after (or, for deletes, before) the change')),
+                ('created_at', models.DateTimeField()),
+                ('published_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('published_at__isnull', True)), fields=['id'], name='outbox_unpublished'), models.Index(fields=['aggregate_type', 'aggregate_id', 'id'], name='outbox_outb_aggrega_338593_idx')],
+            },
+        ),
+    ]
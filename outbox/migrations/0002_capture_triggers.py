@@ -0,0 +1,87 @@
+# Row triggers appending an outbox event for every insert, update and delete
+# of the captured tables (PostgreSQL only).
+#
+# Triggers rather than signals: the event commits or rolls back with the write
+# itself, and bulk_create, queryset updates and raw SQL are captured too.
+# Triggers on the partitioned attendance table are cloned to every partition,
+# including ones attached later. Updates that leave every captured column
+# unchanged (e.g. only updated_at) produce no event.
+
+from django.db import migrations
+
+# table -> (aggregate type, captured columns); large text columns are left out to keep events small
+CAPTURED = {
+    'courses_enrollment': ('enrollment', [
+        'id', 'student_id', 'course_offering_id', 'enrolled_date', 'status', 'final_grade', 'final_marks',
+    ]),
+    'courses_assignmentsubmission': ('submission', [
+        'id', 'assignment_id', 'student_id', 'submitted_date', 'is_late', 'marks_obtained', 'graded_date',
+        'graded_by_id', 'status',
+    ]),
+    'courses_attendancerecord': ('attendance', [
+        'id', 'attendance_session_id', 'student_id', 'session_date', 'status', 'marked_at', 'marked_by_id',
+    ]),
+    'core_userrole': ('user_role', [
+        'id', 'user_id', 'role_id', 'institute_id', 'is_active', 'assigned_at', 'assigned_by_id',
+    ]),
+}
+
+CAPTURE_FUNCTION = '''
+    CREATE FUNCTION outbox_capture() RETURNS trigger LANGUAGE plpgsql AS $$
+    DECLARE
+        columns text[] := TG_ARGV[1:];
+        before jsonb;
+        after jsonb;
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            SELECT jsonb_object_agg(key, value) INTO before FROM jsonb_each(to_jsonb(OLD)) WHERE key = ANY(columns);
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            SELECT jsonb_object_agg(key, value) INTO after FROM jsonb_each(to_jsonb(NEW)) WHERE key = ANY(columns);
+        END IF;
+        IF before = after THEN
+            RETURN NULL;
+        END IF;
+        INSERT INTO outbox_outboxevent (aggregate_type, aggregate_id, operation, payload, created_at)
+        VALUES (TG_ARGV[0], (coalesce(after, before) ->> 'id')::bigint,
+                CASE TG_OP WHEN 'INSERT' THEN 'created' WHEN 'UPDATE' THEN 'updated' ELSE 'deleted' END,
+                coalesce(after, before), clock_timestamp());
+        RETURN NULL;
+    END
+    $$
+'''
+
+
+def create_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(CAPTURE_FUNCTION)
+        for table, (aggregate_type, columns) in CAPTURED.items():
+            arguments = ', '.join(f"'{value}'" for value in [aggregate_type, *columns])
+            cursor.execute(f'''
+                CREATE TRIGGER {table}_outbox AFTER INSERT OR UPDATE OR DELETE ON {table}
+                FOR EACH ROW EXECUTE FUNCTION outbox_capture({arguments})
+            ''')
+
+
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in CAPTURED:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {table}_outbox ON {table}')
+        cursor.execute('DROP FUNCTION IF EXISTS outbox_capture()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outbox', '0001_initial'),
+        ('core', '0003_image_hashes'),
+        ('courses', '0008_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -0,0 +1,37 @@
+# Let one transaction opt out of capture with SET LOCAL outbox.skip = on, e.g.
+# bulk loads of synthetic data. Unlike ALTER TABLE ... DISABLE TRIGGER this
+# takes no lock and other sessions keep capturing.
+
+from importlib import import_module
+
+from django.db import migrations
+
+CAPTURE_FUNCTION = import_module('outbox.migrations.0002_capture_triggers').CAPTURE_FUNCTION
+
+SKIP_CHECK = '''
+    BEGIN
+        IF current_setting('outbox.skip', true) = 'on' THEN
+            RETURN NULL;
+        END IF;
+'''
+
+
+def replace_function(definition):
+    def forwards(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(definition.replace('CREATE FUNCTION', 'CREATE OR REPLACE FUNCTION', 1))
+    return forwards
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outbox', '0002_capture_triggers'),
+    ]
+
+    operations = [
+        migrations.RunPython(replace_function(CAPTURE_FUNCTION.replace('\n    BEGIN\n', SKIP_CHECK, 1)),
+                             replace_function(CAPTURE_FUNCTION)),
+    ]
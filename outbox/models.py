@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class OutboxEvent(models.Model):
+    """A change to a captured table, appended by a database trigger in the writing transaction"""
+    aggregate_type = models.CharField(max_length=40, help_text="Captured table, e.g. 'enrollment'")
+    aggregate_id = models.BigIntegerField()
+    operation = models.CharField(max_length=10, help_text="created, updated or deleted")
+    payload = models.JSONField(help_text="Captured columns of the row after (or, for deletes, before) the change")
+    created_at = models.DateTimeField()
+    published_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id'], name='outbox_unpublished', condition=models.Q(published_at__isnull=True)),
+            models.Index(fields=['aggregate_type', 'aggregate_id', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.aggregate_type} {self.aggregate_id} {self.operation}"
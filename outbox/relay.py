@@ -0,0 +1,67 @@
+"""
+Delivery of outbox events to a sink.
+
+One relay runs at a time (a Postgres advisory lock enforces it). It sends the
+oldest unpublished events in id order, then marks them published in the same
+transaction that read them; the published mark is the checkpoint, so a
+restarted relay carries on from the first event not yet acknowledged. A crash
+between ``send`` and the commit resends that batch, so consumers deduplicate
+on the event id (delivery is at least once).
+
+Events of one row are delivered in the order they were written: the trigger
+draws the event id after the write has locked the row, so a later change to
+the same row always gets a larger id than an earlier, committed one. Events of
+different rows may commit out of id order, which is why the relay works from
+the unpublished set rather than from a last-delivered id.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+ADVISORY_LOCK = 0x6f7574626f78  # 'outbox'
+EVENT_FIELDS = ('id', 'aggregate_type', 'aggregate_id', 'operation', 'payload', 'created_at')
+
+
+def acquire_relay_lock():
+    """Session-level lock held until the connection closes; False if another relay holds it"""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_lock(%s)', [ADVISORY_LOCK])
+        return cursor.fetchone()[0]
+
+
+def relay_batch(sink, batch_size=None, outbox=None):
+    """Send and mark the next batch of unpublished events (of ``outbox``, default all); returns how many were sent"""
+    outbox = OutboxEvent.objects.all() if outbox is None else outbox
+    with transaction.atomic():
+        events = list(outbox.filter(published_at__isnull=True).order_by('id')
+                      .values(*EVENT_FIELDS)[:batch_size or settings.OUTBOX_BATCH_SIZE])
+        if events:
+            sink.send(events)
+            OutboxEvent.objects.filter(pk__in=[event['id'] for event in events]).update(published_at=timezone.now())
+    return len(events)
+
+
+def relay(sink, batch_size=None, follow=False, interval=1.0, progress=None):
+    """Drain the outbox into ``sink``; with ``follow``, keep polling every ``interval`` seconds"""
+    sent, started = 0, time.perf_counter()
+    while True:
+        count = relay_batch(sink, batch_size)
+        sent += count
+        if count and progress:
+            progress(sent, time.perf_counter() - started)
+        if not count:
+            if not follow:
+                return sent
+            time.sleep(interval)
+
+
+def prune_published(days=None):
+    """Delete events published more than ``days`` (OUTBOX_RETENTION_DAYS) ago"""
+    cutoff = timezone.now() - timedelta(days=settings.OUTBOX_RETENTION_DAYS if days is None else days)
+    deleted, _ = OutboxEvent.objects.filter(published_at__lt=cutoff).delete()
+    return deleted
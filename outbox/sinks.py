@@ -0,0 +1,87 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+from core.redis_client import get_redis
+from reports.batch import truncate_torn_line
+
+
+def wire_format(event):
+    """Compact JSON-ready form of an outbox event row"""
+    return {
+        'id': event['id'],
+        'type': event['aggregate_type'],
+        'key': event['aggregate_id'],
+        'op': event['operation'],
+        'at': event['created_at'],
+        'data': event['payload'],
+    }
+
+
+class BaseSink:
+    """Receives batches of outbox events in id order; a batch must be durable when ``send`` returns"""
+
+    def send(self, events):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JSONLinesSink(BaseSink):
+    """Appends events to one ``outbox-YYYY-MM-DD.jsonl`` file per day of event time, fsynced per batch"""
+
+    def __init__(self, directory=None):
+        self.directory = directory or settings.OUTBOX_JSONL_DIR
+        os.makedirs(self.directory, exist_ok=True)
+        self.files = {}
+
+    def file_for(self, day):
+        if day not in self.files:
+            path = os.path.join(self.directory, f'outbox-{day}.jsonl')
+            # A crash mid-write leaves a partial line; the events in it are still unpublished and come again
+            truncate_torn_line(path)
+            self.files[day] = open(path, 'a', encoding='utf-8')
+        return self.files[day]
+
+    def send(self, events):
+        touched = set()
+        for event in events:
+            f = self.file_for(event['created_at'].date().isoformat())
+            f.write(json.dumps(wire_format(event), cls=DjangoJSONEncoder, separators=(',', ':')) + '\n')
+            touched.add(f)
+        for f in touched:
+            f.flush()
+            os.fsync(f.fileno())
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        self.files.clear()
+
+
+class RedisStreamSink(BaseSink):
+    """XADDs events to one stream per aggregate type (``outbox:<type>``), trimmed to about OUTBOX_STREAM_MAXLEN"""
+
+    def __init__(self, prefix='outbox'):
+        self.prefix = prefix
+
+    def send(self, events):
+        pipe = get_redis().pipeline(transaction=False)
+        for event in events:
+            message = wire_format(event)
+            pipe.xadd(f"{self.prefix}:{event['aggregate_type']}", {
+                'id': message['id'],
+                'key': message['key'],
+                'op': message['op'],
+                'at': message['at'].isoformat(),
+                'data': json.dumps(message['data'], cls=DjangoJSONEncoder, separators=(',', ':')),
+            }, maxlen=settings.OUTBOX_STREAM_MAXLEN, approximate=True)
+        pipe.execute()
+
+
+def get_sink(path=None):
+    return import_string(path or settings.OUTBOX_SINK)()
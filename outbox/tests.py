@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+
+from django.db import connection
+from django.test import TestCase
+
+from courses.models import Enrollment
+from courses.tests import build_offering
+from .models import OutboxEvent
+from .relay import relay, relay_batch
+from .sinks import BaseSink, JSONLinesSink
+
+
+class ListSink(BaseSink):
+
+    def __init__(self):
+        self.batches = []
+
+    def send(self, events):
+        self.batches.append([event['id'] for event in events])
+
+
+class OutboxCaptureTests(TestCase):
+    """Writes to captured tables append events in the same transaction; the relay drains them in id order"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.offering, _, _ = build_offering('OX', students=2)
+
+    def events(self):
+        return list(OutboxEvent.objects.filter(aggregate_type='enrollment').order_by('id')
+                    .values_list('aggregate_id', 'operation'))
+
+    def test_trigger_captures_changes(self):
+        enrollment = Enrollment.objects.filter(course_offering=self.offering).first()
+        OutboxEvent.objects.all().delete()
+        Enrollment.objects.filter(pk=enrollment.pk).update(final_grade='A')
+        # updated_at is not captured, so this update leaves no event
+        Enrollment.objects.filter(pk=enrollment.pk).update(final_grade='A')
+        Enrollment.objects.filter(pk=enrollment.pk).delete()
+        self.assertEqual(self.events(), [(enrollment.pk, 'updated'), (enrollment.pk, 'deleted')])
+        payload = OutboxEvent.objects.order_by('id').first().payload
+        self.assertEqual((payload['id'], payload['final_grade']), (enrollment.pk, 'A'))
+
+    def test_transaction_can_skip_capture(self):
+        enrollment = Enrollment.objects.filter(course_offering=self.offering).first()
+        OutboxEvent.objects.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL outbox.skip = on")
+            Enrollment.objects.filter(pk=enrollment.pk).update(final_grade='B')
+            cursor.execute("SET LOCAL outbox.skip = off")
+        Enrollment.objects.filter(pk=enrollment.pk).update(final_grade='A')
+        self.assertEqual(self.events(), [(enrollment.pk, 'updated')])
+        self.assertEqual(OutboxEvent.objects.get().payload['final_grade'], 'A')
+
+    def test_relay_sends_in_id_order_and_marks_published(self):
+        ids = list(OutboxEvent.objects.order_by('id').values_list('id', flat=True))
+        self.assertEqual(len(ids), 2)
+        sink = ListSink()
+        self.assertEqual(relay(sink, batch_size=1), 2)
+        self.assertEqual(sink.batches, [ids[:1], ids[1:]])
+        self.assertFalse(OutboxEvent.objects.filter(published_at__isnull=True).exists())
+        self.assertEqual(relay(sink), 0)
+
+    def test_relay_batch_limited_to_a_queryset(self):
+        first, second = OutboxEvent.objects.order_by('id').values_list('id', flat=True)
+        sink = ListSink()
+        self.assertEqual(relay_batch(sink, outbox=OutboxEvent.objects.filter(id__gt=first)), 1)
+        self.assertEqual(sink.batches, [[second]])
+        self.assertTrue(OutboxEvent.objects.filter(pk=first, published_at__isnull=True).exists())
+
+    def test_jsonl_sink(self):
+        with tempfile.TemporaryDirectory() as directory:
+            sink = JSONLinesSink(directory)
+            relay(sink)
+            sink.close()
+            lines = []
+            for name in os.listdir(directory):
+                with open(os.path.join(directory, name), encoding='utf-8') as f:
+                    lines.extend(json.loads(line) for line in f)
+        self.assertEqual(len(lines), 2)
+        self.assertEqual({line['data']['course_offering_id'] for line in lines}, {self.offering.pk})
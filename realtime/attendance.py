@@ -0,0 +1,155 @@
+import asyncio
+import json
+
+from django.db import transaction
+from django.db.models import Count
+
+from core.redis_client import get_redis, get_async_redis
+from courses.models import AttendanceRecord
+from .hub import hub
+
+COUNTS_TTL = 60 * 60 * 24
+SEED_ATTEMPTS = 3
+STATUSES = [status for status, _ in AttendanceRecord.status_choices]
+
+# Counters only move once a stream has seeded them from the database, so a
+# missing hash never turns into partial counts. ``_seq`` orders deltas against
+# the snapshot a stream starts from. A delta arriving while the hash is missing
+# bumps the session's generation instead; a seed is only written if the
+# generation is still the one read before its aggregate query, so a delta
+# committed while the aggregate ran is never lost and never counted twice.
+APPLY_DELTA = """
+if redis.call('exists', KEYS[1]) == 0 then
+    redis.call('incr', KEYS[3])
+    redis.call('expire', KEYS[3], ARGV[2])
+    return 0
+end
+local seq = redis.call('hincrby', KEYS[1], '_seq', 1)
+local delta = cjson.decode(ARGV[1])
+for status, n in pairs(delta) do redis.call('hincrby', KEYS[1], status, n) end
+redis.call('expire', KEYS[1], ARGV[2])
+redis.call('publish', KEYS[2], cjson.encode({seq = seq, delta = delta}))
+return seq
+"""
+
+READ_GENERATION = """
+local generation = redis.call('incrby', KEYS[1], 0)
+redis.call('expire', KEYS[1], ARGV[1])
+return generation
+"""
+
+SEED_COUNTS = """
+if redis.call('exists', KEYS[1]) == 0 then
+    if redis.call('get', KEYS[2]) ~= ARGV[2] then return false end
+    redis.call('hset', KEYS[1], '_seq', 0, unpack(ARGV, 3))
+    redis.call('expire', KEYS[1], ARGV[1])
+end
+return redis.call('hgetall', KEYS[1])
+"""
+
+
+def counts_key(attendance_session_id):
+    return f"realtime:attendance:{attendance_session_id}:counts"
+
+
+def generation_key(attendance_session_id):
+    return f"realtime:attendance:{attendance_session_id}:generation"
+
+
+def session_channel(attendance_session_id):
+    return f"realtime:attendance:{attendance_session_id}"
+
+
+def apply_delta(attendance_session_id, delta):
+    get_redis().eval(APPLY_DELTA, 3, counts_key(attendance_session_id), session_channel(attendance_session_id),
+                     generation_key(attendance_session_id), json.dumps(delta), COUNTS_TTL)
+
+
+def record_change(attendance_session_id, old_status, new_status):
+    """Queue a counter update for one AttendanceRecord write, applied after commit"""
+    if old_status == new_status:
+        return
+    delta = {}
+    if old_status:
+        delta[old_status] = -1
+    if new_status:
+        delta[new_status] = 1
+    transaction.on_commit(lambda: apply_delta(attendance_session_id, delta))
+
+
+async def load_counts(redis, attendance_session_id):
+    """Current counts for a session, seeding Redis from one aggregate query if needed.
+
+    While writes keep beating the seed, it is retried up to SEED_ATTEMPTS times;
+    after that the last aggregate is returned unseeded, with ``_seq`` None since
+    no delta is published against it.
+    """
+    key = counts_key(attendance_session_id)
+    counts = await redis.hgetall(key)
+    if counts:
+        return {field.decode(): int(value) for field, value in counts.items()}
+    for _ in range(SEED_ATTEMPTS):
+        generation = await redis.eval(READ_GENERATION, 1, generation_key(attendance_session_id), COUNTS_TTL)
+        from_db = dict.fromkeys(STATUSES, 0)
+        rows = (AttendanceRecord.objects.filter(attendance_session_id=attendance_session_id)
+                .values_list('status').annotate(n=Count('id')).order_by())
+        async for status, n in rows:
+            from_db[status] = n
+        fields = [item for pair in from_db.items() for item in pair]
+        # None when a delta was missed while counting; the next aggregate includes it
+        flat = await redis.eval(SEED_COUNTS, 2, key, generation_key(attendance_session_id), COUNTS_TTL, generation,
+                                *fields)
+        if flat:
+            return {field.decode(): int(value) for field, value in zip(flat[::2], flat[1::2])}
+    return {'_seq': None, **from_db}
+
+
+class StreamSubscriber:
+    """Hub member that queues messages for one SSE stream"""
+
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=1000)
+
+    def deliver(self, text):
+        if not self.queue.full():
+            self.queue.put_nowait(text)
+
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def attendance_stream(attendance_session_id, max_seconds, keepalive_seconds=15):
+    """Server-sent events: one ``snapshot`` of the counts, then a ``delta`` per change.
+
+    The stream ends after ``max_seconds``; EventSource clients reconnect and get
+    a fresh snapshot, which also bounds streams whose client went away silently.
+    An unseeded snapshot (see load_counts) has no deltas to follow, so the
+    stream ends right after it and the client retries.
+    """
+    subscriber = StreamSubscriber()
+    channel = session_channel(attendance_session_id)
+    await hub.join(channel, subscriber)
+    try:
+        async with get_async_redis() as redis:
+            counts = await load_counts(redis, attendance_session_id)
+        seq = counts.pop('_seq')
+        yield "retry: 2000\n\n"
+        yield sse('snapshot', {'attendance_session_id': attendance_session_id, 'seq': seq, 'counts': counts})
+        if seq is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_seconds
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                text = await asyncio.wait_for(subscriber.queue.get(), timeout=min(keepalive_seconds, remaining))
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            message = json.loads(text)
+            if message['seq'] <= seq:
+                continue
+            yield f"event: delta\ndata: {text}\n\n"
+    finally:
+        await hub.leave(channel, subscriber)
@@ -0,0 +1,68 @@
+import json
+from urllib.parse import parse_qs
+
+from .auth import user_for_token, can_follow_offering
+from .events import user_channel, offering_channel
+from .hub import hub, Connection
+
+
+async def authenticate(scope):
+    """Return the user for the JWT access token passed as ``?token=``, or None"""
+    token = parse_qs(scope.get('query_string', b'').decode()).get('token', [None])[0]
+    return await user_for_token(token)
+
+
+async def websocket_application(scope, receive, send):
+    """WebSocket endpoint pushing grade and attendance events.
+
+    Every connection follows its own user channel. Faculty can additionally send
+    ``{"action": "subscribe", "course_offering": <id>}`` to follow an offering they teach.
+    """
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+    user = await authenticate(scope)
+    if user is None:
+        await send({'type': 'websocket.close', 'code': 4401})
+        return
+    await send({'type': 'websocket.accept'})
+
+    connection = Connection(send)
+    channels = {user_channel(user.pk)}
+    await hub.join(user_channel(user.pk), connection)
+    try:
+        while True:
+            message = await receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+            if message['type'] == 'websocket.receive':
+                reply = await handle_command(user, message.get('text') or '', connection, channels)
+                connection.deliver(json.dumps(reply))
+    finally:
+        for channel in channels:
+            await hub.leave(channel, connection)
+        connection.close()
+
+
+async def handle_command(user, text, connection, channels):
+    try:
+        command = json.loads(text)
+        action = command['action']
+        course_offering_id = int(command['course_offering'])
+    except (ValueError, KeyError, TypeError):
+        return {'event': 'error', 'detail': 'Expected {"action": ..., "course_offering": <id>}'}
+
+    channel = offering_channel(course_offering_id)
+    if action == 'subscribe':
+        if not await can_follow_offering(user, course_offering_id):
+            return {'event': 'error', 'detail': 'Not allowed to follow this course offering'}
+        if channel not in channels:
+            channels.add(channel)
+            await hub.join(channel, connection)
+        return {'event': 'subscribed', 'channel': channel}
+    if action == 'unsubscribe':
+        if channel in channels:
+            channels.discard(channel)
+            await hub.leave(channel, connection)
+        return {'event': 'unsubscribed', 'channel': channel}
+    return {'event': 'error', 'detail': f'Unknown action: {action}'}
@@ -0,0 +1,30 @@
+import json
+import logging
+
+import redis
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+def user_channel(user_id):
+    return f"realtime:user:{user_id}"
+
+
+def offering_channel(course_offering_id):
+    return f"realtime:offering:{course_offering_id}"
+
+
+def publish(channel, event, data):
+    """Publish an event to WebSocket subscribers once the current transaction commits"""
+    payload = json.dumps({'channel': channel, 'event': event, 'data': data}, cls=DjangoJSONEncoder)
+
+    def _send():
+        try:
+            get_redis().publish(channel, payload)
+        except redis.RedisError:
+            logger.warning("Could not publish %s to %s", event, channel, exc_info=True)
+
+    transaction.on_commit(_send)
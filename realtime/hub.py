@@ -0,0 +1,119 @@
+import asyncio
+import logging
+from collections import deque
+
+from core.redis_client import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+
+class Connection:
+    """Outgoing side of one WebSocket; buffers a bounded number of pending messages.
+
+    No task is kept alive while the connection is idle, so an idle socket costs
+    only this object and the server's own per-connection state.
+    """
+    max_pending = 100
+
+    def __init__(self, send):
+        self.send = send
+        self.pending = deque(maxlen=self.max_pending)
+        self.writer = None
+
+    def deliver(self, text):
+        self.pending.append(text)
+        if self.writer is None or self.writer.done():
+            self.writer = asyncio.ensure_future(self._drain())
+
+    async def _drain(self):
+        while self.pending:
+            try:
+                await self.send({'type': 'websocket.send', 'text': self.pending.popleft()})
+            except Exception:
+                self.pending.clear()
+                return
+
+    def close(self):
+        self.pending.clear()
+        if self.writer is not None:
+            self.writer.cancel()
+
+
+class Hub:
+    """Per-process fan-out: one Redis pub/sub connection shared by every local WebSocket.
+
+    A Redis channel is subscribed while at least one local connection listens to it.
+    """
+
+    def __init__(self):
+        self.groups = {}
+        self.redis = None
+        self.pubsub = None
+        self.reader = None
+        self.lock = asyncio.Lock()
+
+    async def _ensure_started(self):
+        if self.pubsub is None:
+            self.redis = get_async_redis()
+            self.pubsub = self.redis.pubsub()
+        if self.reader is None or self.reader.done():
+            self.reader = asyncio.ensure_future(self._read())
+
+    async def join(self, channel, connection):
+        members = self.groups.get(channel)
+        if members:
+            members.add(connection)
+            return
+        # PubSub is not safe for concurrent (un)subscribes, e.g. it may open
+        # several connections on first use, so serialise them.
+        async with self.lock:
+            await self._ensure_started()
+            members = self.groups.setdefault(channel, set())
+            members.add(connection)
+            if len(members) == 1:
+                await self.pubsub.subscribe(channel)
+
+    async def leave(self, channel, connection):
+        members = self.groups.get(channel)
+        if not members:
+            return
+        members.discard(connection)
+        if members:
+            return
+        async with self.lock:
+            if not self.groups.get(channel):
+                self.groups.pop(channel, None)
+                await self.pubsub.unsubscribe(channel)
+
+    async def close(self):
+        """Stop reading and drop the Redis connection, e.g. before the event loop shuts down"""
+        pubsub, redis, reader = self.pubsub, self.redis, self.reader
+        self.__init__()
+        if reader is not None:
+            reader.cancel()
+            await asyncio.wait([reader], timeout=2)
+        if pubsub is not None:
+            await pubsub.close()
+            await redis.close()
+
+    async def _read(self):
+        pubsub = self.pubsub
+        while pubsub is self.pubsub:
+            if not pubsub.subscribed:
+                await asyncio.sleep(0.5)
+                continue
+            try:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except Exception:
+                logger.warning("Realtime hub lost its Redis connection, retrying", exc_info=True)
+                await asyncio.sleep(1)
+                continue
+            if message is None or message['type'] != 'message':
+                continue
+            channel = message['channel'].decode()
+            text = message['data'].decode()
+            for connection in tuple(self.groups.get(channel, ())):
+                connection.deliver(text)
+
+
+hub = Hub()
@@ -0,0 +1,74 @@
+import asyncio
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import User
+from core.redis_client import get_async_redis
+from realtime.consumers import websocket_application
+from realtime.events import user_channel
+from realtime.hub import hub
+
+
+class Command(BaseCommand):
+    help = 'Hold many idle WebSocket connections in-process against Redis and report memory per connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=10000)
+        parser.add_argument('--hold', type=int, default=30, help='Seconds to hold the idle connections')
+
+    def handle(self, *args, **options):
+        users = list(User.objects.filter(is_active=True).order_by('id')[:options['connections']])
+        if not users:
+            self.stderr.write(self.style.ERROR('No active users; seed some data first'))
+            return
+        tokens = [str(AccessToken.for_user(user)) for user in users]
+        asyncio.run(self.run(tokens, users, options['connections'], options['hold']))
+
+    async def run(self, tokens, users, count, hold):
+        received = [0]
+        inboxes = []
+
+        async def send(message):
+            if message['type'] == 'websocket.send':
+                received[0] += 1
+
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        tasks = []
+        for i in range(count):
+            inbox = asyncio.Queue()
+            inbox.put_nowait({'type': 'websocket.connect'})
+            scope = {'type': 'websocket', 'path': '/ws/',
+                     'query_string': f'token={tokens[i % len(tokens)]}'.encode()}
+            tasks.append(asyncio.ensure_future(websocket_application(scope, inbox.get, send)))
+            inboxes.append(inbox)
+            if i % 500 == 499:
+                await asyncio.sleep(0)
+        await asyncio.sleep(1)
+        connected = time.perf_counter() - started
+        after_connect = tracemalloc.get_traced_memory()[0]
+        self.stdout.write(f'{count} connections in {connected:.1f}s, '
+                          f'{(after_connect - baseline) / count:.0f} bytes/connection')
+
+        for second in range(hold):
+            await asyncio.sleep(1)
+            if second % 5 == 4:
+                current = tracemalloc.get_traced_memory()[0]
+                self.stdout.write(f'  t+{second + 1}s: {(current - baseline) / 1024 / 1024:.1f} MiB traced')
+
+        redis = get_async_redis()
+        for user in users:
+            await redis.publish(user_channel(user.pk), '{"event": "loadtest"}')
+        await asyncio.sleep(2)
+        self.stdout.write(f'{received[0]} pushes delivered to {count} connections')
+
+        for inbox in inboxes:
+            inbox.put_nowait({'type': 'websocket.disconnect'})
+        await asyncio.gather(*tasks)
+        tracemalloc.stop()
+        await hub.close()
+        self.stdout.write(self.style.SUCCESS('Done'))
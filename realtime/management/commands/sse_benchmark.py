@@ -0,0 +1,63 @@
+import asyncio
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from realtime.attendance import attendance_stream, apply_delta
+from realtime.hub import hub
+
+
+class Command(BaseCommand):
+    help = 'Measure live attendance SSE fan-out: streams held and delta events delivered per second in one worker'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--streams', type=int, default=1000)
+        parser.add_argument('--events', type=int, default=200, help='Attendance changes to publish')
+        parser.add_argument('--session', type=int, default=0, help='AttendanceSession id to stream (any id works)')
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run(options['session'], options['streams'], options['events']))
+
+    async def run(self, session_id, stream_count, event_count):
+        delivered = [0]
+        ready = asyncio.Event()
+        started = [0]
+
+        async def consume():
+            async for chunk in attendance_stream(session_id, max_seconds=3600):
+                if chunk.startswith('event: snapshot'):
+                    started[0] += 1
+                    if started[0] == stream_count:
+                        ready.set()
+                elif chunk.startswith('event: delta'):
+                    delivered[0] += 1
+                    if delivered[0] == stream_count * event_count:
+                        return
+
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        opened = time.perf_counter()
+        consumers = [asyncio.ensure_future(consume()) for _ in range(stream_count)]
+        await ready.wait()
+        memory = tracemalloc.get_traced_memory()[0] - baseline
+        self.stdout.write(f'{stream_count} streams open in {time.perf_counter() - opened:.2f}s, '
+                          f'{memory / stream_count:.0f} bytes/stream')
+
+        def produce():
+            for i in range(event_count):
+                apply_delta(session_id, {'present': 1, 'absent': -1} if i % 2 else {'present': -1, 'absent': 1})
+
+        sent = time.perf_counter()
+        await asyncio.to_thread(produce)
+        try:
+            await asyncio.wait_for(asyncio.gather(*consumers), timeout=120)
+        except asyncio.TimeoutError:
+            for consumer in consumers:
+                consumer.cancel()
+        elapsed = time.perf_counter() - sent
+        tracemalloc.stop()
+        await hub.close()
+        self.stdout.write(self.style.SUCCESS(
+            f'{delivered[0]} delta events delivered in {elapsed:.2f}s '
+            f'({delivered[0] / elapsed:.0f} events/sec, {event_count / elapsed:.0f} changes/sec)'))
@@ -0,0 +1,65 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from courses.models import AssignmentSubmission, AttendanceRecord
+from .attendance import record_change
+from .events import publish, user_channel, offering_channel
+
+
+@receiver(pre_save, sender=AssignmentSubmission)
+def remember_grade(sender, instance, **kwargs):
+    instance._previous_grade = (
+        AssignmentSubmission.objects.filter(pk=instance.pk).values_list('status', 'marks_obtained').first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=AssignmentSubmission)
+def push_grade(sender, instance, **kwargs):
+    if instance.status != 'graded':
+        return
+    if getattr(instance, '_previous_grade', None) == (instance.status, instance.marks_obtained):
+        return
+    data = {
+        'submission_id': instance.pk,
+        'assignment_id': instance.assignment_id,
+        'student_id': instance.student_id,
+        'marks_obtained': instance.marks_obtained,
+        'graded_date': instance.graded_date,
+    }
+    offering_id, student_user_id = AssignmentSubmission.objects.filter(pk=instance.pk).values_list(
+        'assignment__course_offering_id', 'student__user_id').get()
+    publish(user_channel(student_user_id), 'submission.graded', data)
+    publish(offering_channel(offering_id), 'submission.graded', data)
+
+
+@receiver(pre_save, sender=AttendanceRecord)
+def remember_attendance_status(sender, instance, **kwargs):
+    instance._previous_status = (
+        AttendanceRecord.objects.filter(pk=instance.pk, session_date=instance.session_date)
+        .values_list('status', flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_delete, sender=AttendanceRecord)
+def count_removed_attendance(sender, instance, **kwargs):
+    record_change(instance.attendance_session_id, instance.status, None)
+
+
+@receiver(post_save, sender=AttendanceRecord)
+def push_attendance(sender, instance, created, **kwargs):
+    record_change(instance.attendance_session_id, getattr(instance, '_previous_status', None), instance.status)
+    offering_id, student_user_id = AttendanceRecord.objects.filter(
+        pk=instance.pk, session_date=instance.session_date).values_list(
+        'attendance_session__course_offering_id', 'student__user_id').get()
+    data = {
+        'record_id': instance.pk,
+        'attendance_session_id': instance.attendance_session_id,
+        'session_date': instance.session_date,
+        'student_id': instance.student_id,
+        'status': instance.status,
+        'created': created,
+    }
+    publish(user_channel(student_user_id), 'attendance.recorded', data)
+    publish(offering_channel(offering_id), 'attendance.recorded', data)
@@ -0,0 +1,113 @@
+from datetime import date, time
+from unittest import skipIf
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from courses.models import AttendanceRecord, AttendanceSession
+from courses.tests import build_offering
+from .attendance import SEED_ATTEMPTS, SEED_COUNTS, counts_key, load_counts
+
+try:
+    import fakeredis
+    import fakeredis.aioredis
+except ImportError:
+    fakeredis = None
+
+
+@skipIf(fakeredis is None, 'fakeredis is not installed')
+class AttendanceCountsTests(TestCase):
+    """Live counts are seeded from the database once and then follow every committed change"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.offering, cls.teacher, cls.students = build_offering('RT', students=3)
+        cls.session = AttendanceSession.objects.create(course_offering=cls.offering, session_date=date(2026, 8, 3),
+                                                       session_time=time(9), topic_covered='Stacks')
+
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+        self.redis = fakeredis.FakeRedis(server=self.server)
+        for module in ('realtime.attendance', 'realtime.events'):
+            patcher = patch(f'{module}.get_redis', return_value=self.redis)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def mark(self, student, status):
+        with self.captureOnCommitCallbacks(execute=True):
+            return AttendanceRecord.objects.create(attendance_session=self.session, student=student.student_profile,
+                                                   status=status)
+
+    def counts(self, before_seed=None):
+        async def load():
+            redis = fakeredis.aioredis.FakeRedis(server=self.server)
+            if before_seed:
+                run_script = redis.eval
+
+                async def seed_after_hook(script, *args):
+                    if script == SEED_COUNTS:
+                        await sync_to_async(before_seed)()
+                    return await run_script(script, *args)
+                redis.eval = seed_after_hook
+            return await load_counts(redis, self.session.pk)
+        return async_to_sync(load)()
+
+    def test_seed_then_deltas(self):
+        record = self.mark(self.students[0], 'present')
+        self.assertFalse(self.redis.exists(counts_key(self.session.pk)))
+        self.assertEqual(self.counts(), {'_seq': 0, 'present': 1, 'absent': 0, 'late': 0, 'excused': 0})
+
+        self.mark(self.students[1], 'absent')
+        with self.captureOnCommitCallbacks(execute=True):
+            record.status = 'late'
+            record.save()
+        self.assertEqual(self.counts(), {'_seq': 2, 'present': 0, 'absent': 1, 'late': 1, 'excused': 0})
+
+    def test_change_committed_while_seeding_is_kept(self):
+        self.mark(self.students[0], 'present')
+
+        def commit_once():
+            # Committed after the aggregate query ran but before its result was stored
+            if not AttendanceRecord.objects.filter(status='late').exists():
+                self.mark(self.students[1], 'late')
+
+        counts = self.counts(before_seed=commit_once)
+        self.assertEqual((counts['present'], counts['late']), (1, 1))
+
+    def test_seeding_gives_up_under_constant_writes(self):
+        record = self.mark(self.students[0], 'present')
+        seeds = []
+
+        def commit_every_time():
+            seeds.append(record.status)
+            with self.captureOnCommitCallbacks(execute=True):
+                record.status = 'late' if record.status == 'present' else 'present'
+                record.save()
+
+        counts = self.counts(before_seed=commit_every_time)
+        self.assertEqual(len(seeds), SEED_ATTEMPTS)
+        # The aggregate of the last attempt, served without seeding Redis
+        self.assertEqual(counts, {'_seq': None, 'present': 0, 'absent': 0, 'late': 0, 'excused': 0, seeds[-1]: 1})
+        self.assertFalse(self.redis.exists(counts_key(self.session.pk)))
+        self.assertEqual(self.counts()['_seq'], 0)
+
+
+class AttendanceStreamAccessTests(TestCase):
+    """Only staff and the offering's faculty may follow its sessions live"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.offering, cls.teacher, (cls.student,) = build_offering('RA', students=1)
+        cls.session = AttendanceSession.objects.create(course_offering=cls.offering, session_date=date(2026, 8, 3),
+                                                       session_time=time(9), topic_covered='Queues')
+
+    def get(self, session_id, user=None):
+        token = {'token': str(AccessToken.for_user(user))} if user else {}
+        return self.client.get(f'/api/realtime/attendance-sessions/{session_id}/live/', token)
+
+    def test_access(self):
+        self.assertEqual(self.get(self.session.pk).status_code, 401)
+        self.assertEqual(self.get(self.session.pk, self.student).status_code, 403)
+        self.assertEqual(self.get(self.session.pk + 1000, self.teacher).status_code, 404)
@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('attendance-sessions/<int:session_id>/live/', views.attendance_session_live,
+         name='attendance_session_live'),
+]
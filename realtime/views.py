@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+
+from courses.models import AttendanceSession
+from .attendance import attendance_stream
+from .auth import user_for_token, can_follow_offering
+
+
+def _request_token(request):
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        return header[len('Bearer '):]
+    # EventSource cannot set headers, so browsers pass the access token in the query string
+    return request.GET.get('token')
+
+
+async def attendance_session_live(request, session_id):
+    """Live present/absent counts for an attendance session as server-sent events.
+
+    Needs the ASGI server; under WSGI Django would buffer the whole stream.
+    """
+    user = await user_for_token(_request_token(request))
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    offering_id = await AttendanceSession.objects.filter(pk=session_id).values_list(
+        'course_offering_id', flat=True).afirst()
+    if offering_id is None:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+    if not await can_follow_offering(user, offering_id):
+        return JsonResponse({'detail': 'You do not have permission to perform this action.'}, status=403)
+
+    response = StreamingHttpResponse(
+        attendance_stream(session_id, settings.SSE_MAX_STREAM_SECONDS),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
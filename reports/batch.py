@@ -0,0 +1,143 @@
+"""
+Batch rendering of an institute's report cards.
+
+Students are streamed from the database in chunks; while the process pool
+renders one chunk the next one is loaded. Every finished card is appended to
+``manifest.jsonl`` in the output directory, so an interrupted run resumes
+where it stopped, and the cards are finally bundled into one ZIP per branch.
+"""
+import json
+import os
+import time
+import zipfile
+from functools import partial
+from itertools import groupby, islice
+from multiprocessing import Pool
+
+from django.conf import settings
+from django.db import connections
+from django.utils.text import slugify
+
+from academics.models import StudentEnrollment
+from courses.transcripts import semester_results, transcript_semesters
+from .report_cards import render_report_card
+
+
+def output_directory(institute, term):
+    return os.path.join(settings.MEDIA_ROOT, 'report_cards', slugify(institute.code), slugify(term))
+
+
+def read_manifest(path):
+    """Return ``{student_id: entry}`` for every card recorded in the manifest, ignoring a torn last line"""
+    done = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                done[entry['student']] = entry
+    return done
+
+
+def truncate_torn_line(path):
+    """Drop a partially written last line left by a crash, so new entries start on a fresh line"""
+    if os.path.exists(path):
+        with open(path, 'rb+') as f:
+            data = f.read()
+            f.truncate(data.rfind(b'\n') + 1)
+
+
+def report_card_payloads(rows, institute, term):
+    """Picklable report card data for ``rows`` of (student, enrollment number, name, program, branch, code)"""
+    results = {student_id: list(group) for student_id, group in
+               groupby(semester_results([row[0] for row in rows]), key=lambda result: result.student_id)}
+    payloads = []
+    for student_id, enrollment_number, first_name, last_name, program, branch, branch_code in rows:
+        semesters = transcript_semesters(results.get(student_id, []))
+        payloads.append({
+            'student': student_id,
+            'enrollment_number': enrollment_number,
+            'name': f'{first_name} {last_name}'.strip(),
+            'institute': institute.name,
+            'term': term,
+            'program': program,
+            'branch': branch,
+            'branch_code': slugify(branch_code) or 'branch',
+            'semesters': semesters,
+            'credits_earned': sum(semester['credits_earned'] for semester in semesters),
+            'cgpa': semesters[-1]['cgpa'] if semesters else None,
+        })
+    return payloads
+
+
+def bundle_branches(output_dir, entries):
+    """Write one ZIP per branch holding its report cards; returns the ZIP paths"""
+    paths = []
+    for branch, group in groupby(sorted(entries, key=lambda entry: (entry['branch'], entry['file'])),
+                                 key=lambda entry: entry['branch']):
+        path = os.path.join(output_dir, f'{branch}.zip')
+        with zipfile.ZipFile(f'{path}.part', 'w', zipfile.ZIP_STORED) as bundle:
+            for entry in group:
+                bundle.write(os.path.join(output_dir, entry['file']), os.path.basename(entry['file']))
+        os.replace(f'{path}.part', path)
+        paths.append(path)
+    return paths
+
+
+def render_institute(institute, term, workers=None, chunk_size=500, bundle=True, progress=None):
+    """
+    Render report cards for every active student of ``institute``.
+
+    ``progress`` is called as ``progress(rendered, skipped, elapsed_seconds)``
+    after each chunk. Returns totals and the branch ZIP paths.
+    """
+    output_dir = output_directory(institute, term)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, 'manifest.jsonl')
+    done = read_manifest(manifest_path)
+    truncate_torn_line(manifest_path)
+    rows = (StudentEnrollment.objects.filter(program__institute=institute, is_active=True)
+            .order_by('branch__code', 'student__enrollment_number')
+            .values_list('student_id', 'student__enrollment_number', 'student__user__first_name',
+                         'student__user__last_name', 'program__name', 'branch__name', 'branch__code')
+            .iterator(chunk_size=chunk_size))
+
+    started = time.perf_counter()
+    stats = {'rendered': 0, 'skipped': 0, 'bytes': 0}
+    render = partial(render_report_card, output_dir=output_dir)
+
+    def drain(results, manifest):
+        for entry in results:
+            manifest.write(json.dumps(entry) + '\n')
+            done[entry['student']] = entry
+            stats['rendered'] += 1
+            stats['bytes'] += entry['bytes']
+        manifest.flush()
+        os.fsync(manifest.fileno())
+        if progress:
+            progress(stats['rendered'], stats['skipped'], time.perf_counter() - started)
+
+    # Forked workers must not share the parent's database sockets
+    connections.close_all()
+    with Pool(workers) as pool, open(manifest_path, 'a') as manifest:
+        in_flight = None
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            pending = [row for row in chunk if row[0] not in done or
+                       not os.path.exists(os.path.join(output_dir, done[row[0]]['file']))]
+            stats['skipped'] += len(chunk) - len(pending)
+            submitted = pool.imap_unordered(render, report_card_payloads(pending, institute, term), chunksize=8)
+            if in_flight is not None:
+                drain(in_flight, manifest)
+            in_flight = submitted
+        if in_flight is not None:
+            drain(in_flight, manifest)
+
+    stats['seconds'] = time.perf_counter() - started
+    stats['per_second'] = stats['rendered'] / stats['seconds'] if stats['seconds'] else 0
+    stats['zips'] = bundle_branches(output_dir, done.values()) if bundle else []
+    return stats
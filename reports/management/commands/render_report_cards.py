@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Institute
+from reports.batch import render_institute
+
+
+class Command(BaseCommand):
+    help = "Render report card PDFs for every active student of an institute, resuming an interrupted run"
+
+    def add_arguments(self, parser):
+        parser.add_argument('institute_id', type=int)
+        parser.add_argument('--term', required=True, help='Term label, e.g. "2026 Odd"; reruns with the same label resume')
+        parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--no-zip', action='store_true', help='Skip the per-branch ZIP bundles')
+
+    def handle(self, *args, **options):
+        institute = Institute.objects.filter(pk=options['institute_id']).first()
+        if institute is None:
+            raise CommandError('Institute not found')
+
+        def progress(rendered, skipped, elapsed):
+            rate = rendered / elapsed if elapsed else 0
+            self.stdout.write(f'{rendered} rendered, {skipped} already done, {rate:.1f} cards/s')
+
+        stats = render_institute(institute, options['term'], options['workers'], options['chunk_size'],
+                                 bundle=not options['no_zip'], progress=progress)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {stats['rendered']} report cards ({stats['skipped']} resumed) in {stats['seconds']:.1f}s, "
+            f"{stats['per_second']:.1f} cards/s, {stats['bytes'] / 1e6:.1f} MB"))
+        for path in stats['zips']:
+            self.stdout.write(path)
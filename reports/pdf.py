@@ -0,0 +1,78 @@
+"""
+Minimal pure-Python PDF writer for text-and-rule documents.
+
+Supports A4 pages with the standard Helvetica fonts (so nothing is
+embedded), text, horizontal/vertical rules and Flate-compressed content
+streams. Output is deterministic: the same content always produces the same
+bytes, which keeps content hashes stable across re-renders.
+"""
+import zlib
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+FONTS = {'regular': 'Helvetica', 'bold': 'Helvetica-Bold'}
+
+# Average glyph widths (per 1000 units) are close enough for right-aligning numbers
+_AVERAGE_WIDTH = {'regular': 520, 'bold': 560}
+
+
+def _escape(text):
+    text = str(text).encode('latin-1', 'replace').decode('latin-1')
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def text_width(text, size, font='regular'):
+    return len(str(text)) * size * _AVERAGE_WIDTH[font] / 1000
+
+
+class PdfDocument:
+    """Accumulates pages of drawing operators and serializes them as a PDF file"""
+
+    def __init__(self, title=''):
+        self.title = title
+        self.pages = []
+        self.ops = None
+
+    def add_page(self):
+        self.ops = []
+        self.pages.append(self.ops)
+
+    def text(self, x, y, text, size=10, font='regular'):
+        """Draw ``text`` with its baseline at (x, y), measured from the top-left corner"""
+        key = 'F2' if font == 'bold' else 'F1'
+        self.ops.append(f'BT /{key} {size} Tf {x:.2f} {PAGE_HEIGHT - y:.2f} Td ({_escape(text)}) Tj ET')
+
+    def text_right(self, x, y, text, size=10, font='regular'):
+        self.text(x - text_width(text, size, font), y, text, size, font)
+
+    def line(self, x1, y1, x2, y2, width=0.5):
+        self.ops.append(f'{width} w {x1:.2f} {PAGE_HEIGHT - y1:.2f} m {x2:.2f} {PAGE_HEIGHT - y2:.2f} l S')
+
+    def render(self):
+        objects = [
+            b'<< /Type /Catalog /Pages 2 0 R >>',
+            None,  # page tree, filled in once the page object numbers are known
+            f'<< /Type /Font /Subtype /Type1 /BaseFont /{FONTS["regular"]} /Encoding /WinAnsiEncoding >>'.encode(),
+            f'<< /Type /Font /Subtype /Type1 /BaseFont /{FONTS["bold"]} /Encoding /WinAnsiEncoding >>'.encode(),
+            f'<< /Title ({_escape(self.title)}) /Producer (EduNexus) >>'.encode('latin-1'),
+        ]
+        kids = []
+        for ops in self.pages:
+            stream = zlib.compress('\n'.join(ops).encode('latin-1'), 6)
+            objects.append(b'<< /Length %d /Filter /FlateDecode >>\nstream\n' % len(stream) + stream + b'\nendstream')
+            objects.append(
+                f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] '
+                f'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {len(objects)} 0 R >>'.encode())
+            kids.append(f'{len(objects)} 0 R')
+        objects[1] = f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {len(kids)} >>'.encode()
+
+        out = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(len(out))
+            out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+        xref = len(out)
+        out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+        out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+        out += b'trailer\n<< /Size %d /Root 1 0 R /Info 5 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+        return bytes(out)
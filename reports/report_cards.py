@@ -0,0 +1,78 @@
+"""
+Report card rendering, run inside pool worker processes.
+
+Workers receive plain dictionaries and never touch the database; each one
+lays out a PDF, writes it atomically under a content-hash name and returns
+the manifest entry for it.
+"""
+import hashlib
+import os
+
+from .pdf import PdfDocument
+
+LEFT, RIGHT, TOP, BOTTOM = 50, 545, 60, 790
+# Right edges of the right-aligned columns
+NUMERIC_COLUMNS = ((430, 'Credits'), (485, 'Grade'), (RIGHT, 'Points'))
+
+
+def layout(card):
+    """Lay out one report card; ``card`` is the payload built by ``reports.batch.report_card_payloads``"""
+    doc = PdfDocument(title=f"Report card - {card['name']} ({card['enrollment_number']})")
+    doc.add_page()
+    doc.text(LEFT, TOP, card['institute'], size=16, font='bold')
+    doc.text(LEFT, TOP + 20, f"Report card - {card['term']}", size=12)
+    doc.line(LEFT, TOP + 30, RIGHT, TOP + 30, width=1)
+    y = TOP + 50
+    for label, value in (('Name', card['name']), ('Enrollment number', card['enrollment_number']),
+                         ('Program', card['program']), ('Branch', card['branch'])):
+        doc.text(LEFT, y, label, font='bold')
+        doc.text(LEFT + 120, y, value)
+        y += 15
+
+    for semester in card['semesters']:
+        if y + 60 + 14 * len(semester['courses']) > BOTTOM:
+            doc.add_page()
+            y = TOP
+        y += 20
+        doc.text(LEFT, y, f"{semester['name']} - {semester['academic_year']}", size=11, font='bold')
+        y += 16
+        doc.text(LEFT, y, 'Code', size=9, font='bold')
+        doc.text(LEFT + 70, y, 'Course', size=9, font='bold')
+        for x, heading in NUMERIC_COLUMNS:
+            doc.text_right(x, y, heading, size=9, font='bold')
+        doc.line(LEFT, y + 4, RIGHT, y + 4)
+        for course in semester['courses']:
+            y += 14
+            points = '' if course['grade_point'] is None else course['grade_point']
+            doc.text(LEFT, y, course['code'], size=9)
+            doc.text(LEFT + 70, y, course['name'][:55], size=9)
+            for (x, _), value in zip(NUMERIC_COLUMNS, (course['credits'], course['grade'], points)):
+                doc.text_right(x, y, value, size=9)
+        y += 18
+        doc.text(LEFT, y, f"Credits earned {semester['credits_earned']} of {semester['credits_attempted']}", size=9)
+        doc.text_right(RIGHT, y, f"SGPA {semester['sgpa'] or '-'}    CGPA {semester['cgpa'] or '-'}",
+                       size=9, font='bold')
+
+    if y + 40 > BOTTOM:
+        doc.add_page()
+        y = TOP
+    doc.line(LEFT, y + 15, RIGHT, y + 15, width=1)
+    doc.text(LEFT, y + 32, f"Total credits earned: {card['credits_earned']}", font='bold')
+    doc.text_right(RIGHT, y + 32, f"CGPA: {card['cgpa'] or '-'}", size=12, font='bold')
+    return doc.render()
+
+
+def render_report_card(card, output_dir):
+    """Render and store one report card; returns its manifest entry"""
+    data = layout(card)
+    digest = hashlib.sha256(data).hexdigest()
+    relative = os.path.join(card['branch_code'], f"{card['enrollment_number']}-{digest[:16]}.pdf")
+    path = os.path.join(output_dir, relative)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial = f'{path}.{os.getpid()}.part'
+        with open(partial, 'wb') as f:
+            f.write(data)
+        os.replace(partial, path)
+    return {'student': card['student'], 'branch': card['branch_code'], 'file': relative,
+            'sha256': digest, 'bytes': len(data)}
@@ -0,0 +1,82 @@
+import json
+import os
+import tempfile
+import zipfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+
+from courses.tests import build_offering
+from .batch import bundle_branches, read_manifest, report_card_payloads, truncate_torn_line
+from .report_cards import render_report_card
+
+CARD = {
+    'student': 7, 'enrollment_number': 'EN0007', 'name': 'Asha Rao', 'institute': 'Institute', 'term': '2026 Odd',
+    'program': 'B.Tech', 'branch': 'Computer Science', 'branch_code': 'cs',
+    'semesters': [{
+        'name': 'Semester 1', 'academic_year': 'First Year', 'credits_earned': 4, 'credits_attempted': 4,
+        'sgpa': '9.00', 'cgpa': '9.00',
+        'courses': [{'code': 'CS101', 'name': 'Data Structures', 'credits': 4, 'grade': 'A+', 'grade_point': 9}],
+    }],
+    'credits_earned': 4, 'cgpa': '9.00',
+}
+
+
+class ReportCardFileTests(SimpleTestCase):
+    """Cards are stored under content-hash names and recorded in a manifest that survives a crash"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_render_is_deterministic_and_content_addressed(self):
+        entry = render_report_card(CARD, self.directory)
+        self.assertEqual(render_report_card(CARD, self.directory), entry)
+        self.assertTrue(entry['file'].startswith('cs/EN0007-'))
+        with open(os.path.join(self.directory, entry['file']), 'rb') as f:
+            data = f.read()
+        self.assertTrue(data.startswith(b'%PDF-1.4'))
+        self.assertEqual(len(data), entry['bytes'])
+        changed = render_report_card({**CARD, 'cgpa': '8.50'}, self.directory)
+        self.assertNotEqual(changed['file'], entry['file'])
+
+    def test_manifest_ignores_a_torn_last_line(self):
+        path = os.path.join(self.directory, 'manifest.jsonl')
+        with open(path, 'w') as f:
+            f.write(json.dumps({'student': 1, 'file': 'a.pdf'}) + '\n' + '{"student": 2, "fi')
+        self.assertEqual(list(read_manifest(path)), [1])
+        truncate_torn_line(path)
+        with open(path) as f:
+            self.assertEqual(f.read(), json.dumps({'student': 1, 'file': 'a.pdf'}) + '\n')
+        self.assertEqual(read_manifest(os.path.join(self.directory, 'missing.jsonl')), {})
+
+    def test_one_zip_per_branch(self):
+        entries = [render_report_card({**CARD, 'student': i, 'enrollment_number': f'EN{i}', 'branch_code': code},
+                                      self.directory)
+                   for i, code in enumerate(('cs', 'cs', 'ee'))]
+        paths = bundle_branches(self.directory, entries)
+        self.assertEqual([os.path.basename(path) for path in paths], ['cs.zip', 'ee.zip'])
+        with zipfile.ZipFile(paths[0]) as bundle:
+            self.assertEqual(len(bundle.namelist()), 2)
+
+
+class ReportCardCommandTests(TestCase):
+    """Card payloads come from the database; the command checks its institute first"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.offering, _, (cls.student,) = build_offering('RC', students=1)
+
+    def test_payload_of_a_student_without_results(self):
+        profile = self.student.student_profile
+        institute = self.offering.subject.branch.program.institute
+        (card,) = report_card_payloads([(profile.pk, profile.enrollment_number, 'Asha', '', 'B.Tech', 'CS', 'CS RC')],
+                                       institute, '2026 Odd')
+        self.assertEqual((card['name'], card['branch_code'], card['semesters'], card['cgpa']),
+                         ('Asha', 'cs-rc', [], None))
+
+    def test_unknown_institute(self):
+        with self.assertRaisesMessage(CommandError, 'Institute not found'):
+            call_command('render_report_cards', 999999, term='2026 Odd', stdout=StringIO())
@@ -0,0 +1,198 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from core.models import UserRole
+
+# One index per institute per process. Signals keep the local index current for
+# writes made in this process; indexes older than AUTOCOMPLETE_MAX_AGE are
+# rebuilt so other workers' writes show up too, once per institute in the
+# background (``_refreshing``) while lookups keep using the old one. Users
+# refreshed while an index is being rebuilt are collected in its ``_pending``
+# set and re-read into it before it replaces the old one.
+_indexes = {}
+_pending = {}
+_refreshing = set()
+_lock = threading.RLock()
+
+ROW_FIELDS = ('user_id', 'user__first_name', 'user__last_name', 'user__email',
+              'user__student_profile__enrollment_number', 'user__faculty_profile__employee_id')
+
+
+def _entry(first_name, last_name, email, enrollment_number, employee_id):
+    """(label, email, kind, tokens) for one user; tokens are the lowercased strings searched by prefix"""
+    number = enrollment_number or employee_id or ''
+    kind = 'student' if enrollment_number else 'faculty' if employee_id else 'user'
+    label = f"{first_name} {last_name}".strip()
+    if number:
+        label = f"{label} ({number})"
+    tokens = tuple({token.lower() for token in (first_name, last_name, email, number) if token})
+    return label, email, kind, tokens
+
+
+class PrefixIndex:
+    """Sorted token array searched with bisect; ``ids[i]`` is the user owning ``keys[i]``"""
+
+    def __init__(self, rows=()):
+        self.entries = {}
+        pairs = []
+        for user_id, *fields in rows:
+            if user_id in self.entries:
+                continue
+            entry = _entry(*fields)
+            self.entries[user_id] = entry
+            pairs.extend((token, user_id) for token in entry[3])
+        pairs.sort()
+        self.keys = [token for token, _ in pairs]
+        self.ids = array('q', (user_id for _, user_id in pairs))
+        self.built_at = time.monotonic()
+
+    def add(self, user_id, fields):
+        self.remove(user_id)
+        entry = _entry(*fields)
+        self.entries[user_id] = entry
+        for token in entry[3]:
+            position = bisect_left(self.keys, token)
+            self.keys.insert(position, token)
+            self.ids.insert(position, user_id)
+
+    def remove(self, user_id):
+        entry = self.entries.pop(user_id, None)
+        if entry is None:
+            return
+        for token in entry[3]:
+            position = bisect_left(self.keys, token)
+            while self.ids[position] != user_id:
+                position += 1
+            del self.keys[position]
+            del self.ids[position]
+
+    def search(self, text, limit=10, kind=None):
+        words = text.lower().split()
+        if not words:
+            return []
+        first, rest = words[0], words[1:]
+        results, seen = [], set()
+        position = bisect_left(self.keys, first)
+        while position < len(self.keys) and self.keys[position].startswith(first) and len(results) < limit:
+            user_id = self.ids[position]
+            position += 1
+            if user_id in seen:
+                continue
+            seen.add(user_id)
+            label, email, entry_kind, tokens = self.entries[user_id]
+            if kind and entry_kind != kind:
+                continue
+            if all(any(token.startswith(word) for token in tokens) for word in rest):
+                results.append({'id': user_id, 'label': label, 'email': email, 'kind': entry_kind})
+        return results
+
+
+def _rows(institute_id, user_ids=None):
+    queryset = UserRole.objects.filter(institute_id=institute_id, is_active=True, user__is_active=True)
+    if user_ids is not None:
+        queryset = queryset.filter(user_id__in=user_ids)
+    return queryset.values_list(*ROW_FIELDS).iterator(chunk_size=5000)
+
+
+def _current(institute_id, user_ids):
+    return {row[0]: row[1:] for row in _rows(institute_id, user_ids)}
+
+
+def _apply(index, user_ids, current):
+    for user_id in user_ids:
+        if user_id in current:
+            index.add(user_id, current[user_id])
+        else:
+            index.remove(user_id)
+
+
+def get_index(institute_id):
+    """The institute's index, built on first use; a stale one is served while it is rebuilt in the background"""
+    index = _indexes.get(institute_id)
+    if index is None:
+        return _rebuild(institute_id)
+    if time.monotonic() - index.built_at > settings.AUTOCOMPLETE_MAX_AGE:
+        with _lock:
+            start = institute_id not in _refreshing
+            _refreshing.add(institute_id)
+        if start:
+            rebuild_executor().submit(_rebuild_in_background, institute_id)
+    return index
+
+
+@lru_cache(maxsize=None)
+def rebuild_executor():
+    """Background pool replacing stale indexes, one institute at a time"""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix='autocomplete')
+
+
+def _rebuild_in_background(institute_id):
+    close_old_connections()
+    try:
+        _rebuild(institute_id)
+    finally:
+        close_old_connections()
+        with _lock:
+            _refreshing.discard(institute_id)
+
+
+def _rebuild(institute_id):
+    # Build outside the lock so lookups and refreshes are not blocked
+    pending = set()
+    with _lock:
+        _pending.setdefault(institute_id, []).append(pending)
+    try:
+        fresh = PrefixIndex(_rows(institute_id))
+        while True:
+            with _lock:
+                if not pending:
+                    _indexes[institute_id] = fresh
+                    return fresh
+                user_ids = list(pending)
+                pending.clear()
+            _apply(fresh, user_ids, _current(institute_id, user_ids))
+    finally:
+        with _lock:
+            builds = _pending[institute_id]
+            builds.remove(pending)
+            if not builds:
+                del _pending[institute_id]
+
+
+def lookup(institute_id, text, limit=10, kind=None):
+    index = get_index(institute_id)
+    with _lock:
+        return index.search(text, limit, kind)
+
+
+def refresh_users(user_ids):
+    """Re-read the given users into every index loaded or being built in this process"""
+    with _lock:
+        for builds in _pending.values():
+            for pending in builds:
+                pending.update(user_ids)
+        institute_ids = list(_indexes)
+    # Queries run outside the lock; an index swapped in meanwhile has read these users itself
+    updates = [(institute_id, _current(institute_id, user_ids)) for institute_id in institute_ids]
+    with _lock:
+        for institute_id, current in updates:
+            _apply(_indexes[institute_id], user_ids, current)
+
+
+def preload():
+    """Build the index of every institute, e.g. when a worker starts"""
+    for institute_id in UserRole.objects.values_list('institute_id', flat=True).distinct():
+        get_index(institute_id)
+
+
+def preload_in_background():
+    """Called by the WSGI/ASGI entry points when AUTOCOMPLETE_PRELOAD is on"""
+    if settings.AUTOCOMPLETE_PRELOAD:
+        threading.Thread(target=preload, name='autocomplete-preload', daemon=True).start()
@@ -0,0 +1,52 @@
+import random
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from search.autocomplete import PrefixIndex
+from search.management.commands.search_benchmark import FIRST_NAMES, LAST_NAMES
+
+
+class Command(BaseCommand):
+    help = 'Measure autocomplete index memory and lookup latency on synthetic users'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument('--lookups', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        count = options['users']
+        rows = [
+            (i, rng.choice(FIRST_NAMES), f'{rng.choice(LAST_NAMES)}{i % 997}', f'user{i}@example.edu',
+             f'EN{i:08d}' if i % 20 else '', '' if i % 20 else f'EMP{i:06d}')
+            for i in range(count)
+        ]
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        index = PrefixIndex(rows)
+        built = time.perf_counter() - started
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del rows
+        self.stdout.write(f'{count} users indexed in {built:.2f}s, {memory / 1024 / 1024:.1f} MiB '
+                          f'({memory / 1024 / 1024 * 100000 / count:.1f} MiB per 100k users)')
+
+        queries = [rng.choice(FIRST_NAMES + LAST_NAMES)[:rng.randint(1, 4)].lower() for _ in range(options['lookups'])]
+        queries += [f'en{rng.randrange(count):08d}'[:rng.randint(3, 10)] for _ in range(options['lookups'] // 4)]
+        latencies = []
+        for text in queries:
+            started = time.perf_counter()
+            index.search(text, 10)
+            latencies.append(time.perf_counter() - started)
+        latencies.sort()
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(queries)} lookups: p50 {latencies[len(latencies) // 2] * 1e6:.0f} us, '
+            f'p99 {latencies[int(len(latencies) * 0.99) - 1] * 1e6:.0f} us'))
+
+        started = time.perf_counter()
+        for i in range(1000):
+            index.add(count + i, ('New', f'Person{i}', f'new{i}@example.edu', f'EN9{i:07d}', ''))
+        self.stdout.write(f'1000 incremental inserts: {(time.perf_counter() - started) * 1000:.0f} ms')
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+
+from search.vectors import SEARCH_VECTORS, update_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Fill the stored search vectors of users, subjects and assignments in primary key batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--all', action='store_true', help='Recompute every row, not only missing vectors')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for model in SEARCH_VECTORS:
+            queryset = model.objects.all()
+            if not options['all']:
+                queryset = queryset.filter(search_vector__isnull=True)
+            bounds = queryset.aggregate(low=Min('pk'), high=Max('pk'))
+            if bounds['low'] is None:
+                self.stdout.write(f'{model._meta.verbose_name_plural}: nothing to do')
+                continue
+            updated = 0
+            for start in range(bounds['low'], bounds['high'] + 1, batch_size):
+                updated += update_search_vectors(model, queryset.filter(pk__gte=start, pk__lt=start + batch_size))
+            self.stdout.write(self.style.SUCCESS(f'{model._meta.verbose_name_plural}: {updated} updated'))
@@ -0,0 +1,56 @@
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from core.models import User
+from search.queries import search_users, search_subjects, search_assignments
+
+FIRST_NAMES = ['Aarav', 'Ada', 'Alan', 'Amara', 'Chen', 'Diego', 'Fatima', 'Grace', 'Hiro', 'Ines',
+               'Ivan', 'Kofi', 'Leila', 'Maya', 'Noor', 'Omar', 'Priya', 'Ravi', 'Sofia', 'Zane']
+LAST_NAMES = ['Ahmed', 'Brown', 'Chowdhury', 'Garcia', 'Hopper', 'Ivanova', 'Kim', 'Lovelace', 'Mensah',
+              'Nakamura', 'Okafor', 'Patel', 'Rossi', 'Silva', 'Singh', 'Turing', 'Wang', 'Yilmaz']
+
+
+class Command(BaseCommand):
+    help = 'Measure /api/search/ query latency, optionally seeding synthetic users first'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed-users', type=int, default=0, help='Insert this many synthetic users first')
+        parser.add_argument('--queries', type=int, default=200)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        if options['seed_users']:
+            self.seed(options['seed_users'], rng)
+            call_command('backfill_search_vectors', batch_size=20000, stdout=self.stdout)
+
+        self.stdout.write(f'{User.objects.count()} users')
+        prefixes = [rng.choice(FIRST_NAMES)[:rng.randint(2, 5)] + (' ' + rng.choice(LAST_NAMES)[:3] if i % 3 == 0 else '')
+                    for i in range(options['queries'])]
+        for label, search in (('users', search_users), ('subjects', search_subjects),
+                              ('assignments', search_assignments)):
+            latencies = []
+            for text in prefixes:
+                started = time.perf_counter()
+                search(text, None, 10)
+                latencies.append(time.perf_counter() - started)
+            latencies.sort()
+            self.stdout.write(f'{label}: p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, '
+                              f'p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms')
+
+    def seed(self, count, rng):
+        password = make_password(None)
+        start = User.objects.count()
+        batch = []
+        for i in range(start, start + count):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            batch.append(User(username=f'bench{i}', email=f'bench{i}@example.com', password=password,
+                              first_name=first, last_name=f'{last}{i % 997}'))
+            if len(batch) == 10000:
+                User.objects.bulk_create(batch)
+                batch = []
+        User.objects.bulk_create(batch)
+        self.stdout.write(f'Seeded {count} users')
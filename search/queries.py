@@ -0,0 +1,72 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Exists, F, OuterRef, Q
+
+from academics.models import Subject
+from core.models import User, UserRole, Student
+from courses.models import Assignment
+from .vectors import CONFIG
+
+
+def prefix_query(text):
+    """tsquery matching every word of ``text`` as a prefix, e.g. 'ada lov' -> 'ada:* & lov:*'"""
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        return None
+    return SearchQuery(' & '.join(f"{term}:*" for term in terms), search_type='raw', config=CONFIG)
+
+
+def allowed_institutes(user):
+    """Institutes the user may search in; None means all (staff)"""
+    if user.is_staff:
+        return None
+    return set(UserRole.objects.filter(user=user, is_active=True).values_list('institute_id', flat=True))
+
+
+def search_users(text, institute_ids, limit):
+    query = prefix_query(text)
+    enrollment_matches = Student.objects.filter(
+        Q(enrollment_number__startswith=text) | Q(enrollment_number__startswith=text.upper())
+    ).values('user_id')
+    match = Q(pk__in=enrollment_matches) | Q(first_name__trigram_similar=text) | Q(last_name__trigram_similar=text)
+    if query is not None:
+        match |= Q(search_vector=query)
+    queryset = User.objects.filter(match, is_active=True)
+    if institute_ids is not None:
+        queryset = queryset.filter(Exists(
+            UserRole.objects.filter(user=OuterRef('pk'), institute_id__in=institute_ids, is_active=True)
+        ))
+    if query is not None:
+        queryset = queryset.annotate(rank=SearchRank(F('search_vector'), query)).order_by('-rank', 'id')
+    return list(queryset.values(
+        'id', 'first_name', 'last_name', 'email', enrollment_number=F('student_profile__enrollment_number')
+    )[:limit])
+
+
+def search_subjects(text, institute_ids, limit):
+    query = prefix_query(text)
+    match = Q(name__trigram_similar=text)
+    if query is not None:
+        match |= Q(search_vector=query)
+    queryset = Subject.objects.filter(match, is_active=True)
+    if institute_ids is not None:
+        queryset = queryset.filter(branch__program__institute_id__in=institute_ids)
+    if query is not None:
+        queryset = queryset.annotate(rank=SearchRank(F('search_vector'), query)).order_by('-rank', 'id')
+    return list(queryset.values('id', 'code', 'name', 'branch_id', 'semester_id')[:limit])
+
+
+def search_assignments(text, institute_ids, limit, published_only=True):
+    query = prefix_query(text)
+    match = Q(title__trigram_similar=text)
+    if query is not None:
+        match |= Q(search_vector=query)
+    queryset = Assignment.objects.filter(match)
+    if published_only:
+        queryset = queryset.filter(is_published=True)
+    if institute_ids is not None:
+        queryset = queryset.filter(course_offering__subject__branch__program__institute_id__in=institute_ids)
+    if query is not None:
+        queryset = queryset.annotate(rank=SearchRank(F('search_vector'), query)).order_by('-rank', 'id')
+    return list(queryset.values('id', 'title', 'due_date', 'course_offering_id')[:limit])
@@ -0,0 +1,39 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.models import User, UserRole, Student, Faculty
+from .autocomplete import refresh_users
+from .vectors import SEARCH_VECTORS, update_search_vectors
+
+AUTOCOMPLETE_USER_FIELDS = {'first_name', 'last_name', 'email', 'is_active'}
+
+
+def refresh_search_vector(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not SEARCH_VECTORS[sender]['fields'] & set(update_fields):
+        return
+    update_search_vectors(sender, sender.objects.filter(pk=instance.pk))
+
+
+for model in SEARCH_VECTORS:
+    receiver(post_save, sender=model, dispatch_uid=f'search_vector_{model._meta.label_lower}')(refresh_search_vector)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def refresh_autocomplete_user(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not AUTOCOMPLETE_USER_FIELDS & set(update_fields):
+        return
+    transaction.on_commit(lambda: refresh_users([instance.pk]))
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(post_save, sender=Faculty)
+@receiver(post_delete, sender=Faculty)
+def refresh_autocomplete_member(sender, instance, **kwargs):
+    transaction.on_commit(lambda: refresh_users([instance.user_id]))
@@ -0,0 +1,131 @@
+from unittest.mock import Mock, patch
+
+from django.conf import settings
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from academics.models import Subject
+from core.models import Role, User, UserRole
+from courses.tests import build_offering
+from . import autocomplete
+
+
+class AutocompleteTests(TestCase):
+    """Type-ahead over the in-process prefix index, kept current by refreshes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        offering, cls.teacher, cls.students = build_offering('AC', students=2)
+        cls.institute = offering.subject.branch.program.institute
+        role = Role.objects.create(name='student')
+        for user, first_name in zip(cls.students, ('Meera', 'Mehul')):
+            User.objects.filter(pk=user.pk).update(first_name=first_name, last_name='Shah')
+            UserRole.objects.create(user=user, role=role, institute=cls.institute)
+        UserRole.objects.create(user=cls.teacher, role=role, institute=cls.institute)
+
+    def setUp(self):
+        indexes = patch.dict(autocomplete._indexes, clear=True)
+        indexes.start()
+        self.addCleanup(indexes.stop)
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def get(self, **params):
+        return self.client.get('/api/search/autocomplete/', {'institute': self.institute.pk, **params})
+
+    def names(self, text):
+        return [row['label'] for row in autocomplete.lookup(self.institute.pk, text)]
+
+    def test_prefix_lookup(self):
+        response = self.get(q='me sh')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['label'] for row in response.data], ['Meera Shah (AC0000)', 'Mehul Shah (AC0001)'])
+        self.assertEqual([row['kind'] for row in response.data], ['student', 'student'])
+        self.assertEqual(len(self.get(q='me', limit=1).data), 1)
+
+    def test_refresh_updates_a_loaded_index(self):
+        self.names('me')
+        User.objects.filter(pk=self.students[0].pk).update(first_name='Nisha')
+        autocomplete.refresh_users([self.students[0].pk])
+        self.assertEqual(self.names('me'), ['Mehul Shah (AC0001)'])
+        self.assertEqual(self.names('ni'), ['Nisha Shah (AC0000)'])
+
+    def test_refresh_during_a_rebuild_is_kept(self):
+        build = autocomplete.PrefixIndex
+
+        def build_then_rename(rows):
+            index = build(rows)
+            # Committed after the rebuild read its rows but before it was swapped in
+            User.objects.filter(pk=self.students[0].pk).update(first_name='Nisha')
+            autocomplete.refresh_users([self.students[0].pk])
+            return index
+
+        with patch.object(autocomplete, 'PrefixIndex', build_then_rename):
+            autocomplete.get_index(self.institute.pk)
+        self.assertEqual(self.names('ni'), ['Nisha Shah (AC0000)'])
+        self.assertEqual(self.names('meera'), [])
+        self.assertEqual(autocomplete._pending, {})
+
+    def test_stale_index_is_served_and_rebuilt_once(self):
+        jobs = []
+        executor = Mock(submit=lambda job, *args: jobs.append((job, args)))
+        self.names('me')
+        autocomplete._indexes[self.institute.pk].built_at -= settings.AUTOCOMPLETE_MAX_AGE + 1
+        User.objects.filter(pk=self.students[0].pk).update(first_name='Nisha')
+        with patch.object(autocomplete, 'rebuild_executor', return_value=executor):
+            self.assertEqual(self.names('me'), ['Meera Shah (AC0000)', 'Mehul Shah (AC0001)'])
+            self.assertEqual(self.names('me'), ['Meera Shah (AC0000)', 'Mehul Shah (AC0001)'])
+        self.assertEqual(len(jobs), 1)
+
+        (job, args), = jobs
+        with patch.object(autocomplete, 'close_old_connections'):
+            job(*args)
+        self.assertEqual(self.names('me'), ['Mehul Shah (AC0001)'])
+        self.assertEqual(autocomplete._refreshing, set())
+
+    def test_validation(self):
+        self.assertEqual(self.get(q='').status_code, 400)
+        self.assertEqual(self.client.get('/api/search/autocomplete/', {'q': 'me'}).status_code, 400)
+        self.assertEqual(self.get(q='me', limit='x').status_code, 400)
+        _, outsider, _ = build_offering('AD', students=0)
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.get(q='me').status_code, 403)
+
+
+class SearchTests(TestCase):
+    """Full-text search within the caller's institutes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        offering, cls.teacher, _ = build_offering('SR', students=0)
+        subject = offering.subject
+        for i, name in enumerate(('Algebra I', 'Algebra II', 'Algorithms')):
+            Subject.objects.create(branch=subject.branch, semester=subject.semester, code=f'MA{i}', name=name,
+                                   credits=3)
+        UserRole.objects.create(user=cls.teacher, role=Role.objects.create(name='faculty'),
+                                institute=offering.subject.branch.program.institute)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def get(self, **params):
+        return self.client.get('/api/search/', {'types': 'subjects', **params})
+
+    def test_prefix_search(self):
+        response = self.get(q='alg')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(row['name'] for row in response.data['subjects']),
+                         ['Algebra I', 'Algebra II', 'Algorithms'])
+        self.assertEqual([row['name'] for row in self.get(q='algo').data['subjects']], ['Algorithms'])
+
+    def test_limit_is_clamped(self):
+        for limit, expected in (('-5', 1), ('0', 1), ('2', 2), ('500', 3)):
+            response = self.get(q='alg', limit=limit)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data['subjects']), expected)
+
+    def test_validation(self):
+        self.assertEqual(self.get(q='a').status_code, 400)
+        self.assertEqual(self.get(q='alg', limit='x').status_code, 400)
+        self.assertEqual(self.get(q='alg', institute='999999').status_code, 403)
@@ -0,0 +1,33 @@
+from django.contrib.postgres.search import SearchVector
+
+from academics.models import Subject
+from core.models import User
+from courses.models import Assignment
+
+# The 'simple' configuration keeps names, codes and emails unstemmed so that
+# prefix queries typed into a search box match them directly.
+CONFIG = 'simple'
+
+SEARCH_VECTORS = {
+    User: {
+        'fields': {'first_name', 'last_name', 'email', 'username'},
+        'vector': lambda: (SearchVector('first_name', 'last_name', weight='A', config=CONFIG)
+                           + SearchVector('email', 'username', weight='B', config=CONFIG)),
+    },
+    Subject: {
+        'fields': {'name', 'code', 'description'},
+        'vector': lambda: (SearchVector('name', 'code', weight='A', config=CONFIG)
+                           + SearchVector('description', weight='C', config=CONFIG)),
+    },
+    Assignment: {
+        'fields': {'title', 'description'},
+        'vector': lambda: (SearchVector('title', weight='A', config=CONFIG)
+                           + SearchVector('description', weight='C', config=CONFIG)),
+    },
+}
+
+
+def update_search_vectors(model, queryset=None):
+    """Recompute the stored vectors of ``queryset`` (default: all rows) in one UPDATE"""
+    queryset = model.objects.all() if queryset is None else queryset
+    return queryset.update(search_vector=SEARCH_VECTORS[model]['vector']())
@@ -0,0 +1,57 @@
+from rest_framework import status, permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from .autocomplete import lookup
+from .queries import allowed_institutes, search_users, search_subjects, search_assignments
+
+SEARCH_TYPES = ('users', 'subjects', 'assignments')
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def search(request):
+    """Search users, subjects and assignments within the caller's institutes"""
+    text = request.query_params.get('q', '').strip()
+    if len(text) < 2:
+        return Response({'error': 'Query must be at least 2 characters'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = max(min(int(request.query_params.get('limit', 10)), 50), 1)
+    except ValueError:
+        return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+    types = [t for t in request.query_params.get('types', ','.join(SEARCH_TYPES)).split(',') if t in SEARCH_TYPES]
+
+    institute_ids = allowed_institutes(request.user)
+    institute = request.query_params.get('institute')
+    if institute:
+        if not institute.isdigit() or (institute_ids is not None and int(institute) not in institute_ids):
+            return Response({'error': 'Not a member of this institute'}, status=status.HTTP_403_FORBIDDEN)
+        institute_ids = {int(institute)}
+
+    results = {}
+    if 'users' in types:
+        results['users'] = search_users(text, institute_ids, limit)
+    if 'subjects' in types:
+        results['subjects'] = search_subjects(text, institute_ids, limit)
+    if 'assignments' in types:
+        results['assignments'] = search_assignments(text, institute_ids, limit,
+                                                    published_only=not request.user.is_staff)
+    return Response(results)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def autocomplete(request):
+    """Type-ahead suggestions of users in one institute, e.g. for picking faculty in admin forms"""
+    text = request.query_params.get('q', '').strip()
+    institute = request.query_params.get('institute', '')
+    if not text or not institute.isdigit():
+        return Response({'error': 'q and institute are required'}, status=status.HTTP_400_BAD_REQUEST)
+    institute_ids = allowed_institutes(request.user)
+    if institute_ids is not None and int(institute) not in institute_ids:
+        return Response({'error': 'Not a member of this institute'}, status=status.HTTP_403_FORBIDDEN)
+    kind = request.query_params.get('kind') or None
+    try:
+        limit = max(min(int(request.query_params.get('limit', 10)), 50), 1)
+    except ValueError:
+        return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(lookup(int(institute), text, limit, kind))
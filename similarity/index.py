@@ -0,0 +1,147 @@
+"""
+Per-assignment MinHash index of submissions.
+
+Every submission's text, plus the text extracted from its uploaded file, is
+signed in the background after a submit (``signals``) or in bulk (``rescan_similarity``) and its band
+keys are stored as ``LSHBucket`` rows. Candidate pairs of an assignment come
+from one self-join on ``(assignment, band, key)``; only those pairs are scored
+by comparing signatures, never all n² pairs.
+"""
+import logging
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, connection, transaction
+
+from courses.models import AssignmentSubmission
+from .minhash import band_keys, similarity, text_signature, unpack
+from .models import LSHBucket, SubmissionSignature
+
+logger = logging.getLogger(__name__)
+
+TEXT_EXTENSIONS = {
+    '.txt', '.md', '.rst', '.tex', '.csv', '.html', '.htm', '.xml', '.json',
+    '.py', '.java', '.c', '.h', '.cpp', '.hpp', '.cs', '.js', '.ts', '.go', '.rb', '.php', '.sql', '.m', '.r',
+}
+MAX_TEXT_BYTES = 5 * 1024 * 1024
+WORDPROCESSINGML = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def extract_text(name):
+    """Text of an uploaded file (plain-text formats and .docx); '' for other formats or unreadable files"""
+    extension = os.path.splitext(name)[1].lower()
+    try:
+        if extension == '.docx':
+            with default_storage.open(name, 'rb') as f, zipfile.ZipFile(f) as document:
+                if document.getinfo('word/document.xml').file_size > MAX_TEXT_BYTES * 4:
+                    return ''
+                root = ElementTree.fromstring(document.read('word/document.xml'))
+            return '\n'.join(''.join(run.text or '' for run in paragraph.iter(f'{WORDPROCESSINGML}t'))
+                             for paragraph in root.iter(f'{WORDPROCESSINGML}p'))
+        if extension in TEXT_EXTENSIONS:
+            with default_storage.open(name, 'rb') as f:
+                return f.read(MAX_TEXT_BYTES).decode('utf-8', 'replace')
+    except (OSError, KeyError, zipfile.BadZipFile, ElementTree.ParseError) as e:
+        logger.warning('Cannot extract text from %s: %s', name, e)
+    return ''
+
+
+def submission_signature(task):
+    """Pool worker: ``(submission, assignment, text, file name)`` -> ``(submission, assignment, signature, shingles)``"""
+    submission_id, assignment_id, text, file_name = task
+    if file_name:
+        text = f'{text}\n{extract_text(file_name)}'
+    return (submission_id, assignment_id, *text_signature(text))
+
+
+def store_signatures(results):
+    """Replace the signatures and buckets of the submissions in ``submission_signature`` results"""
+    signed = [result for result in results if result[2] is not None]
+    with transaction.atomic():
+        LSHBucket.objects.filter(submission_id__in=[result[0] for result in results]).delete()
+        SubmissionSignature.objects.filter(
+            submission_id__in=[result[0] for result in results if result[2] is None]).delete()
+        SubmissionSignature.objects.bulk_create([
+            SubmissionSignature(submission_id=submission_id, assignment_id=assignment_id, signature=packed,
+                                shingle_count=count)
+            for submission_id, assignment_id, packed, count in signed
+        ], update_conflicts=True, unique_fields=['submission'],
+            update_fields=['assignment', 'signature', 'shingle_count', 'updated_at'])
+        rows = [(assignment_id, submission_id, band, key) for submission_id, assignment_id, packed, _ in signed
+                for band, key in enumerate(band_keys(packed))]
+        if rows:
+            # Inserted from arrays: model instances for 32 rows per submission dominate a rescan otherwise
+            with connection.cursor() as cursor:
+                cursor.execute('''
+                    INSERT INTO similarity_lshbucket (assignment_id, submission_id, band, key)
+                    SELECT * FROM unnest(%s::bigint[], %s::bigint[], %s::smallint[], %s::bigint[])
+                ''', [list(column) for column in zip(*rows)])
+
+
+def index_submission(submission_id):
+    """Sign one submission as it is now; runs on ``signing_executor``"""
+    close_old_connections()
+    try:
+        task = AssignmentSubmission.objects.filter(pk=submission_id).values_list(
+            'pk', 'assignment_id', 'submission_text', 'submission_file').first()
+        if task is not None:
+            store_signatures([submission_signature(task)])
+    finally:
+        close_old_connections()
+
+
+@lru_cache(maxsize=None)
+def signing_executor():
+    """Shared background pool signing submissions after they are saved"""
+    return ThreadPoolExecutor(max_workers=settings.SIMILARITY_WORKERS, thread_name_prefix='similarity')
+
+
+def candidate_pairs(assignment_id, threshold, max_bucket=None):
+    """
+    Pairs of an assignment's submissions with estimated similarity >= ``threshold``, most similar first.
+
+    Returns ``(pairs, candidates, skipped)``: ``[(a, b, similarity)]``, the number
+    of candidate pairs scored and the number of buckets skipped for holding more
+    than ``max_bucket`` submissions.
+    """
+    max_bucket = max_bucket or settings.SIMILARITY_MAX_BUCKET
+    with connection.cursor() as cursor:
+        cursor.execute('''
+            WITH buckets AS (
+                SELECT band, key, submission_id, count(*) OVER (PARTITION BY band, key) AS size
+                FROM similarity_lshbucket
+                WHERE assignment_id = %s
+            )
+            SELECT DISTINCT a.submission_id, b.submission_id
+            FROM buckets a
+            JOIN buckets b ON b.band = a.band AND b.key = a.key AND b.submission_id > a.submission_id
+            WHERE a.size <= %s
+        ''', [assignment_id, max_bucket])
+        candidates = cursor.fetchall()
+        cursor.execute('''
+            SELECT count(*) FROM (
+                SELECT 1 FROM similarity_lshbucket WHERE assignment_id = %s GROUP BY band, key HAVING count(*) > %s
+            ) oversized
+        ''', [assignment_id, max_bucket])
+        skipped = cursor.fetchone()[0]
+
+    signatures = {
+        submission_id: unpack(packed) for submission_id, packed in SubmissionSignature.objects.filter(
+            submission_id__in={submission_id for pair in candidates for submission_id in pair}
+        ).values_list('submission_id', 'signature')
+    }
+    pairs = []
+    for first, second in candidates:
+        if first not in signatures or second not in signatures:
+            # Re-signed or deleted since the buckets were read
+            continue
+        score = similarity(signatures[first], signatures[second])
+        if score >= threshold:
+            pairs.append((first, second, score))
+    pairs.sort(key=lambda pair: (-pair[2], pair[0], pair[1]))
+    return pairs, len(candidates), skipped
@@ -0,0 +1,47 @@
+import time
+from multiprocessing import Pool
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from courses.models import AssignmentSubmission
+from similarity.index import store_signatures, submission_signature
+
+
+class Command(BaseCommand):
+    help = 'Recompute the MinHash signatures and LSH buckets of assignment submissions in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('assignment_ids', nargs='*', type=int, help='Limit to these assignments (default: all)')
+        parser.add_argument('--missing', action='store_true', help='Only submissions without a signature')
+        parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        submissions = AssignmentSubmission.objects.order_by('pk')
+        if options['assignment_ids']:
+            submissions = submissions.filter(assignment_id__in=options['assignment_ids'])
+        if options['missing']:
+            submissions = submissions.filter(similarity_signature__isnull=True)
+
+        started = time.perf_counter()
+        done = empty = last = 0
+        # Forked workers must not share the parent's database sockets
+        connections.close_all()
+        with Pool(options['workers']) as pool:
+            while True:
+                tasks = list(submissions.filter(pk__gt=last).values_list(
+                    'pk', 'assignment_id', 'submission_text', 'submission_file')[:options['chunk_size']])
+                if not tasks:
+                    break
+                last = tasks[-1][0]
+                results = list(pool.imap_unordered(submission_signature, tasks, chunksize=16))
+                store_signatures(results)
+                done += len(results)
+                empty += sum(result[2] is None for result in results)
+                self.stdout.write(f'  {done} done, {done / (time.perf_counter() - started):.1f} submissions/s')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Signed {done - empty} submissions in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.1f}/s), '
+            f'{empty} without text'))
@@ -0,0 +1,153 @@
+import random
+import time
+from datetime import date, timedelta
+from itertools import islice
+from multiprocessing import Pool
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from academics.models import AcademicYear, Branch, Program, Semester, Subject
+from core.models import Faculty, Institute, Student, User
+from courses.models import Assignment, AssignmentSubmission, CourseOffering
+from similarity.index import candidate_pairs, store_signatures, submission_signature
+from similarity.minhash import shingles, similarity, unpack
+
+
+class Rollback(Exception):
+    pass
+
+
+def jaccard(first, second):
+    return len(first & second) / len(first | second)
+
+
+class Command(BaseCommand):
+    help = 'Sign synthetic submissions of one assignment, find near-duplicates by LSH and compare with all pairs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--submissions', type=int, default=5000)
+        parser.add_argument('--words', type=int, default=400, help='Words per submission')
+        parser.add_argument('--copies', type=float, default=0.05, help='Share of submissions edited from another')
+        parser.add_argument('--threshold', type=float, default=0.5)
+        parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+        parser.add_argument('--sample', type=int, default=20000, help='Pairs compared to extrapolate all pairs')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                assignment, copies = self.seed(options['submissions'], options['words'], options['copies'])
+                self.run(assignment, copies, options)
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Synthetic data rolled back')
+
+    def seed(self, count, words, copy_share):
+        today = date.today()
+        institute = Institute.objects.create(name='Similarity Benchmark', subdomain='similarity-benchmark',
+                                             code='SIMBENCH', address='-', phone='0', email='bench@example.com',
+                                             established_date=date(2000, 1, 1))
+        program = Program.objects.create(institute=institute, name='Benchmark Program', code='BENCH', duration_years=4)
+        branch = Branch.objects.create(program=program, name='Benchmark Branch', code='BENCH')
+        year = AcademicYear.objects.create(program=program, year_number=1, name='Year 1')
+        semester = Semester.objects.create(academic_year=year, semester_number=1, name='Semester 1',
+                                           start_date=today, end_date=today, is_current=True)
+        password = make_password(None)
+        faculty = Faculty.objects.create(
+            user=User.objects.create(username='similarity-bench-faculty', password=password),
+            employee_id='SIMBENCH', department='-', designation='-', joining_date=today)
+        subject = Subject.objects.create(branch=branch, semester=semester, code='SIMBENCH', name='Benchmark',
+                                         credits=3)
+        offering = CourseOffering.objects.create(subject=subject, semester=semester, faculty=faculty)
+        assignment = Assignment.objects.create(course_offering=offering, title='Essay', description='-',
+                                               due_date=timezone.now() + timedelta(days=7), max_marks=10)
+
+        users = User.objects.bulk_create([
+            User(username=f'similarity{i}', email=f'similarity{i}@example.com', password=password)
+            for i in range(count)
+        ])
+        students = Student.objects.bulk_create([
+            Student(user=user, enrollment_number=f'SB{i:08d}', admission_date=today) for i, user in enumerate(users)
+        ])
+
+        rng = random.Random(7)
+        vocabulary = [''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(2, 9))) for _ in range(20000)]
+        weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+        texts, copies = [], {}
+        for i in range(count):
+            if texts and rng.random() < copy_share:
+                source = rng.randrange(len(texts))
+                edit = rng.uniform(0.01, 0.15)
+                text = [word if rng.random() > edit else rng.choice(vocabulary) for word in texts[source]]
+                copies[i] = source
+            else:
+                text = rng.choices(vocabulary, weights, k=words)
+            texts.append(text)
+        submissions = AssignmentSubmission.objects.bulk_create([
+            AssignmentSubmission(assignment=assignment, student=student, submission_text=' '.join(text))
+            for student, text in zip(students, texts)
+        ], batch_size=2000)
+        return assignment, {(submissions[source].pk, submissions[i].pk) for i, source in copies.items()}
+
+    def run(self, assignment, copies, options):
+        tasks = list(AssignmentSubmission.objects.filter(assignment=assignment).order_by('pk').values_list(
+            'pk', 'assignment_id', 'submission_text', 'submission_file'))
+        texts = {task[0]: task[2] for task in tasks}
+        count = len(tasks)
+        self.stdout.write(f'{count} submissions, {len(copies)} edited copies')
+
+        started = time.perf_counter()
+        for task in tasks[:200]:
+            submission_signature(task)
+        serial = (time.perf_counter() - started) / min(count, 200)
+        # Workers never touch the database; the parent's connection keeps the transaction that is rolled back
+        started = time.perf_counter()
+        with Pool(options['workers']) as pool:
+            results = list(pool.imap_unordered(submission_signature, tasks, chunksize=16))
+        signing = time.perf_counter() - started
+        self.stdout.write(f'Signing: {serial * 1000:.2f} ms per submission serially, '
+                          f'{count / signing:.0f}/s with the pool ({signing:.2f}s)')
+
+        started = time.perf_counter()
+        store_signatures(results)
+        self.stdout.write(f'Storing signatures and buckets: {time.perf_counter() - started:.2f}s')
+
+        started = time.perf_counter()
+        pairs, candidates, skipped = candidate_pairs(assignment.pk, options['threshold'])
+        lsh = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'LSH: {candidates} candidate pairs, {len(pairs)} above {options["threshold"]} in {lsh * 1000:.0f} ms '
+            f'({skipped} oversized buckets skipped)'))
+
+        total = count * (count - 1) // 2
+        rng = random.Random(11)
+        ids = list(texts)
+        sample = [tuple(rng.sample(ids, 2)) for _ in range(min(options['sample'], total))]
+        signatures = {submission_id: unpack(packed) for submission_id, _, packed, _ in results if packed}
+        started = time.perf_counter()
+        for first, second in sample:
+            similarity(signatures[first], signatures[second])
+        per_signature_pair = (time.perf_counter() - started) / len(sample)
+        sets = {}
+
+        def exact(pair):
+            for submission_id in pair:
+                if submission_id not in sets:
+                    sets[submission_id] = shingles(texts[submission_id])
+            return jaccard(sets[pair[0]], sets[pair[1]])
+
+        started = time.perf_counter()
+        for pair in islice(sample, 2000):
+            exact(pair)
+        per_exact_pair = (time.perf_counter() - started) / min(len(sample), 2000)
+        self.stdout.write(f'All {total} pairs: ~{per_signature_pair * total:.1f}s comparing signatures, '
+                          f'~{per_exact_pair * total:.0f}s with exact Jaccard (extrapolated)')
+
+        expected = {pair for pair in copies if exact(pair) >= options['threshold']}
+        found = {(first, second) for first, second, _ in pairs}
+        false_positives = sum(exact(pair) < options['threshold'] for pair in found)
+        recall = len(expected & found) / len(expected) if expected else 1
+        self.stdout.write(f'Recall of copies above the threshold: {recall:.3f} ({len(expected)} pairs); '
+                          f'{false_positives} of {len(found)} reported pairs below it by exact Jaccard')
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('courses', '0007_semesterresult'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionSignature',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('signature', models.BinaryField(help_text='128 little-endian uint32 minimums, see similarity.minhash')),
+                ('shingle_count', models.PositiveIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarity_signatures', to='courses.assignment')),
+                ('submission', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='similarity_signature', to='courses.assignmentsubmission')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('key', models.BigIntegerField()),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='courses.assignment')),
+                ('submission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='courses.assignmentsubmission')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['assignment', 'band', 'key'], name='similarity__assignm_7544fd_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='lshbucket',
+            constraint=models.UniqueConstraint(fields=('submission', 'band'), name='similarity_one_bucket_per_band'),
+        ),
+    ]
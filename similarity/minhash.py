@@ -0,0 +1,77 @@
+"""
+MinHash signatures and LSH band keys for near-duplicate text.
+
+A text is reduced to the set of its word 5-grams (lowercased, split on anything
+that is not a letter or digit). Every shingle's 512-byte SHAKE-128 digest is
+read as ``NUM_HASHES`` independent 32-bit hashes, and the signature keeps the
+smallest value of each over all shingles: two signatures agree at a position
+with probability equal to the Jaccard similarity of the two shingle sets.
+Hashing and taking the minima run in C, so there is no per-hash Python loop,
+and shingles are folded in chunks so memory does not grow with the text.
+
+The signature is cut into ``BANDS`` bands of ``ROWS`` values and every band is
+hashed to a 64-bit key. Texts sharing a key in any band are candidate pairs:
+a pair with similarity ``s`` shares at least one band with probability
+``1 - (1 - s ** ROWS) ** BANDS``, about 0.87 at s = 0.5 and 0.9998 at s = 0.7,
+while finding them only touches texts that landed in the same buckets.
+Changing these constants invalidates stored signatures (run
+``rescan_similarity``).
+"""
+import hashlib
+import operator
+import re
+import struct
+from itertools import islice
+
+SHINGLE_WORDS = 5
+NUM_HASHES = 128
+BANDS = 32
+ROWS = NUM_HASHES // BANDS
+SIGNATURE_FORMAT = struct.Struct(f'<{NUM_HASHES}I')
+BAND_BYTES = ROWS * 4
+CHUNK_SHINGLES = 1024
+
+WORD = re.compile(r'\w+')
+
+
+def shingles(text):
+    """Encoded word 5-grams of ``text``; a shorter text is one shingle"""
+    words = WORD.findall(text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return {' '.join(words).encode()} if words else set()
+    return {' '.join(words[i:i + SHINGLE_WORDS]).encode() for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def signature(shingle_set):
+    """Packed MinHash signature of a non-empty set of shingles"""
+    minima = None
+    shingle_iter = iter(shingle_set)
+    # Minima are folded chunk by chunk so memory stays at CHUNK_SHINGLES hash tuples whatever the text length
+    while chunk := list(islice(shingle_iter, CHUNK_SHINGLES)):
+        chunk_minima = map(min, zip(*[
+            SIGNATURE_FORMAT.unpack(hashlib.shake_128(shingle).digest(SIGNATURE_FORMAT.size)) for shingle in chunk]))
+        minima = list(chunk_minima if minima is None else map(min, minima, chunk_minima))
+    return SIGNATURE_FORMAT.pack(*minima)
+
+
+def band_keys(packed):
+    """Signed 64-bit key of every band of a packed signature, in band order"""
+    return [int.from_bytes(hashlib.blake2b(packed[offset:offset + BAND_BYTES], digest_size=8).digest(),
+                           'big', signed=True)
+            for offset in range(0, len(packed), BAND_BYTES)]
+
+
+def unpack(packed):
+    return SIGNATURE_FORMAT.unpack(packed)
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of the texts behind two unpacked signatures"""
+    return sum(map(operator.eq, first, second)) / NUM_HASHES
+
+
+def text_signature(text):
+    """``(packed signature, shingle count)`` of ``text``, or ``(None, 0)`` when it has no words"""
+    shingle_set = shingles(text)
+    return (signature(shingle_set), len(shingle_set)) if shingle_set else (None, 0)
+
@@ -0,0 +1,29 @@
+from django.db import models
+from courses.models import Assignment, AssignmentSubmission
+
+
+class SubmissionSignature(models.Model):
+    """MinHash signature of a submission's text and the text extracted from its uploaded file"""
+    submission = models.OneToOneField(AssignmentSubmission, on_delete=models.CASCADE, related_name='similarity_signature')
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='similarity_signatures')
+    signature = models.BinaryField(help_text="128 little-endian uint32 minimums, see similarity.minhash")
+    shingle_count = models.PositiveIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Signature of submission {self.submission_id}"
+
+
+class LSHBucket(models.Model):
+    """One hashed band of a submission's signature; submissions of an assignment sharing a bucket are candidates"""
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='lsh_buckets')
+    submission = models.ForeignKey(AssignmentSubmission, on_delete=models.CASCADE, related_name='lsh_buckets')
+    band = models.PositiveSmallIntegerField()
+    key = models.BigIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=['assignment', 'band', 'key'])]
+        constraints = [models.UniqueConstraint(fields=['submission', 'band'], name='similarity_one_bucket_per_band')]
+
+    def __str__(self):
+        return f"Band {self.band} of submission {self.submission_id}"
@@ -0,0 +1,25 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
+
+from courses.models import AssignmentSubmission
+from .index import index_submission, signing_executor
+
+
+def submission_content(text, file_name):
+    return text, file_name or ''
+
+
+@receiver(pre_save, sender=AssignmentSubmission)
+def remember_submission_content(sender, instance, **kwargs):
+    previous = AssignmentSubmission.objects.filter(pk=instance.pk).values_list(
+        'submission_text', 'submission_file').first() if instance.pk else None
+    instance._previous_content = submission_content(*previous) if previous else None
+
+
+@receiver(post_save, sender=AssignmentSubmission)
+def sign_submission(sender, instance, created, **kwargs):
+    content = submission_content(instance.submission_text, instance.submission_file.name)
+    if created or getattr(instance, '_previous_content', None) != content:
+        pk = instance.pk
+        transaction.on_commit(lambda: signing_executor().submit(index_submission, pk))
@@ -0,0 +1,70 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from courses.models import Assignment, AssignmentSubmission
+from courses.tests import build_offering
+from .index import candidate_pairs, store_signatures, submission_signature
+from .models import SubmissionSignature
+
+ESSAY = ('A binary heap is a complete binary tree stored in an array where every parent is no larger than its '
+         'children, so the minimum sits at the root and insertion and removal take logarithmic time. ')
+
+
+class SimilarPairsTests(TestCase):
+    """Near-duplicate submissions of an assignment are found through their LSH buckets"""
+
+    @classmethod
+    def setUpTestData(cls):
+        offering, cls.teacher, cls.students = build_offering('SM', students=3)
+        cls.assignment = Assignment.objects.create(course_offering=offering, title='Heaps', description='Text',
+                                                   due_date=timezone.now() + timedelta(days=7), max_marks=10)
+        texts = [ESSAY * 3, ESSAY * 3 + 'Copied with one extra sentence at the end.',
+                 'Tries store strings by their prefixes so that lookups cost time proportional to the key length. ' * 3]
+        cls.submissions = [
+            AssignmentSubmission.objects.create(assignment=cls.assignment, student=user.student_profile,
+                                                submission_text=text)
+            for user, text in zip(cls.students, texts)
+        ]
+        # Signed here rather than on the background pool
+        store_signatures([submission_signature((submission.pk, cls.assignment.pk, submission.submission_text, ''))
+                          for submission in cls.submissions])
+
+    def get(self, user, **params):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(f'/api/similarity/assignments/{self.assignment.pk}/pairs/', params)
+
+    def test_near_duplicates_are_paired(self):
+        pairs, candidates, skipped = candidate_pairs(self.assignment.pk, 0.5)
+        self.assertEqual([pair[:2] for pair in pairs], [(self.submissions[0].pk, self.submissions[1].pk)])
+        self.assertGreater(pairs[0][2], 0.8)
+        self.assertEqual(skipped, 0)
+
+        response = self.get(self.teacher)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['indexed_submissions'], 3)
+        self.assertEqual([row['submission_id'] for row in response.data['pairs'][0]['submissions']],
+                         [self.submissions[0].pk, self.submissions[1].pk])
+
+    def test_pairs_losing_a_signature_or_submission_are_skipped(self):
+        # A re-sign between reading the buckets and the signatures
+        SubmissionSignature.objects.filter(submission=self.submissions[1]).delete()
+        self.assertEqual(candidate_pairs(self.assignment.pk, 0.5)[0], [])
+
+        scored = [(self.submissions[0].pk, self.submissions[1].pk, 0.9)]
+        self.submissions[1].delete()
+        with patch('similarity.views.candidate_pairs', return_value=(scored, 1, 0)):
+            response = self.get(self.teacher)
+        self.assertEqual((response.status_code, response.data['pairs']), (200, []))
+
+    def test_access_and_validation(self):
+        self.assertEqual(self.get(self.students[0]).status_code, 403)
+        self.assertEqual(self.get(self.teacher, threshold='2').status_code, 400)
+        self.assertEqual(self.get(self.teacher, threshold='x').status_code, 400)
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+        self.assertEqual(client.get('/api/similarity/assignments/999999/pairs/').status_code, 404)
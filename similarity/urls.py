@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('assignments/<int:assignment_id>/pairs/', views.assignment_pairs, name='assignment-similar-pairs'),
+]
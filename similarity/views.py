@@ -0,0 +1,53 @@
+from django.conf import settings
+from rest_framework import status, permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from courses.models import Assignment, AssignmentSubmission
+from .index import candidate_pairs
+from .models import SubmissionSignature
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def assignment_pairs(request, assignment_id):
+    """Pairs of near-duplicate submissions of an assignment with their estimated Jaccard similarity"""
+    assignments = Assignment.objects.filter(pk=assignment_id)
+    if not assignments.exists():
+        return Response({'error': 'Assignment not found'}, status=status.HTTP_404_NOT_FOUND)
+    if not request.user.is_staff and not assignments.filter(course_offering__faculty__user=request.user).exists():
+        return Response({'error': 'Only the offering faculty can compare its submissions'},
+                        status=status.HTTP_403_FORBIDDEN)
+    try:
+        threshold = float(request.query_params.get('threshold', settings.SIMILARITY_THRESHOLD))
+    except ValueError:
+        return Response({'error': 'threshold must be a number between 0 and 1'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 0 < threshold <= 1:
+        return Response({'error': 'threshold must be a number between 0 and 1'}, status=status.HTTP_400_BAD_REQUEST)
+
+    pairs, candidates, skipped = candidate_pairs(assignment_id, threshold)
+    students = {
+        row['pk']: {
+            'submission_id': row['pk'],
+            'student_id': row['student_id'],
+            'enrollment_number': row['student__enrollment_number'],
+            'name': f"{row['student__user__first_name']} {row['student__user__last_name']}".strip(),
+        }
+        for row in AssignmentSubmission.objects.filter(
+            pk__in={submission_id for pair in pairs for submission_id in pair[:2]}
+        ).values('pk', 'student_id', 'student__enrollment_number', 'student__user__first_name',
+                 'student__user__last_name')
+    }
+    return Response({
+        'assignment': assignment_id,
+        'threshold': threshold,
+        'indexed_submissions': SubmissionSignature.objects.filter(assignment_id=assignment_id).count(),
+        'candidate_pairs': candidates,
+        'skipped_buckets': skipped,
+        'pairs': [
+            {'similarity': round(score, 3), 'submissions': [students[first], students[second]]}
+            for first, second, score in pairs
+            # Submissions deleted since they were scored are left out
+            if first in students and second in students
+        ],
+    })
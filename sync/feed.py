@@ -0,0 +1,182 @@
+"""
+Incremental change feed for offline clients.
+
+A client keeps an opaque cursor holding, per feed, the ``(updated_at, id)`` of
+the last row it received and, for deletions, the ``(deleted_at, id)`` of the
+last tombstone. Each call returns the rows after those positions in that order,
+at most ``limit`` per feed, read through ``(scope, updated_at, id)`` indexes.
+
+Rows are only served once they are ``SYNC_LAG_SECONDS`` old: ``updated_at`` is
+stamped before the transaction commits, so a newer position must not be handed
+out while an older row may still become visible. Students see their own
+enrollments and submissions and the offerings they are enrolled in; faculty see
+their offerings and everything in them. When that set of offerings changes the
+cursor is restarted for the feeds scoped by it, since rows of a newly joined
+offering can be older than the cursor. A deleted enrollment (or offering) takes
+the rows scoped by it out of the client's view; clients drop them with it.
+"""
+import hashlib
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Faculty, Student
+from courses.models import Assignment, AssignmentSubmission, CourseOffering, Enrollment
+from .models import Tombstone
+
+CURSOR_SALT = 'sync.cursor'
+
+# feed -> (model, fields, student scope, faculty scope); a scope is the person's own id or the offering ids
+FEEDS = {
+    'offerings': (CourseOffering, (
+        'id', 'subject_id', 'subject__code', 'subject__name', 'semester_id', 'faculty_id', 'section', 'room_number',
+        'schedule', 'is_active', 'updated_at',
+    ), 'pk', 'faculty_id'),
+    'assignments': (Assignment, (
+        'id', 'course_offering_id', 'title', 'description', 'due_date', 'max_marks', 'assignment_type',
+        'is_published', 'allow_late_submission', 'late_penalty_per_day', 'updated_at',
+    ), 'course_offering_id', 'course_offering_id'),
+    'enrollments': (Enrollment, (
+        'id', 'student_id', 'course_offering_id', 'enrolled_date', 'status', 'final_grade', 'final_marks',
+        'updated_at',
+    ), 'student_id', 'course_offering_id'),
+    'submissions': (AssignmentSubmission, (
+        'id', 'assignment_id', 'student_id', 'submitted_date', 'is_late', 'marks_obtained', 'feedback',
+        'graded_date', 'status', 'updated_at',
+    ), 'student_id', 'assignment__course_offering_id'),
+}
+ENTITIES = {model: name for name, (model, *_) in FEEDS.items()}
+# Rows students must not see; a change that hides one reaches them as a deletion
+HIDDEN_FROM_STUDENTS = {'assignments': lambda row: not row['is_published']}
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class ExpiredCursor(Exception):
+    pass
+
+
+class Scope:
+    """Who the feed is for: a student or faculty member and the offerings their rows hang off"""
+
+    def __init__(self, student_id=None, faculty_id=None):
+        self.student_id, self.faculty_id = student_id, faculty_id
+        if student_id is not None:
+            offerings = Enrollment.objects.filter(student_id=student_id).values_list('course_offering_id', flat=True)
+        else:
+            offerings = CourseOffering.objects.filter(faculty_id=faculty_id).values_list('pk', flat=True)
+        self.offering_ids = sorted(offerings)
+        self.digest = hashlib.blake2b(repr(self.offering_ids).encode(), digest_size=8).hexdigest()
+
+    @classmethod
+    def for_user(cls, user):
+        """Scope of ``user``, or None for users who are neither students nor faculty"""
+        student_id = Student.objects.filter(user=user).values_list('pk', flat=True).first()
+        if student_id is not None:
+            return cls(student_id=student_id)
+        faculty_id = Faculty.objects.filter(user=user).values_list('pk', flat=True).first()
+        return cls(faculty_id=faculty_id) if faculty_id is not None else None
+
+    def lookup(self, name):
+        return FEEDS[name][2 if self.student_id is not None else 3]
+
+    def by_offering(self, name):
+        return self.lookup(name) not in ('student_id', 'faculty_id')
+
+    def filter(self, name):
+        lookup = self.lookup(name)
+        if lookup == 'student_id':
+            return Q(student_id=self.student_id)
+        if lookup == 'faculty_id':
+            return Q(faculty_id=self.faculty_id)
+        return Q(**{f'{lookup}__in': self.offering_ids})
+
+    def tombstones(self):
+        if self.student_id is not None:
+            # Other students' rows in the same offering are none of the client's business
+            return Q(student_id=self.student_id) | Q(course_offering_id__in=self.offering_ids, student_id__isnull=True)
+        return Q(faculty_id=self.faculty_id) | Q(course_offering_id__in=self.offering_ids)
+
+
+def encode_cursor(positions, tombstones, digest):
+    return signing.dumps({
+        'p': {name: [moment.isoformat(), pk] for name, (moment, pk) in positions.items()},
+        't': [tombstones[0].isoformat(), tombstones[1]],
+        's': digest,
+    }, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(cursor):
+    """``(positions, tombstone position, scope digest)`` of a cursor; raises InvalidCursor"""
+    try:
+        data = signing.loads(cursor, salt=CURSOR_SALT)
+        positions = {name: (datetime.fromisoformat(moment), pk) for name, (moment, pk) in data['p'].items()}
+        tombstones = (datetime.fromisoformat(data['t'][0]), data['t'][1])
+        return positions, tombstones, data['s']
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise InvalidCursor
+
+
+def after(field, position):
+    """Rows strictly after ``(moment, id)`` in ``(field, id)`` order; the ``>=`` keeps the index range bounded"""
+    if position is None:
+        return Q()
+    moment, pk = position
+    return Q(**{f'{field}__gte': moment}) & (Q(**{f'{field}__gt': moment}) | Q(id__gt=pk))
+
+
+def changes(scope, cursor=None, limit=None):
+    """
+    The next batch of the feed after ``cursor`` (None for a first sync).
+
+    Returns ``{'cursor', 'has_more', 'changes': {feed: rows}, 'deleted': {feed: ids}}``.
+    A first sync starts from the beginning of every feed but skips earlier
+    tombstones, which concern rows the client never had.
+    """
+    limit = min(limit or settings.SYNC_BATCH_SIZE, settings.SYNC_MAX_BATCH_SIZE)
+    horizon = timezone.now() - timedelta(seconds=settings.SYNC_LAG_SECONDS)
+    if cursor is None:
+        positions, tombstone_position, digest = {}, (horizon, 0), scope.digest
+    else:
+        positions, tombstone_position, digest = decode_cursor(cursor)
+        if tombstone_position[0] < timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS):
+            raise ExpiredCursor
+    if digest != scope.digest:
+        positions = {name: position for name, position in positions.items() if not scope.by_offering(name)}
+
+    result = {'changes': {}, 'deleted': {name: [] for name in FEEDS}}
+    has_more = False
+    for name, (model, fields, *_) in FEEDS.items():
+        rows = list(model.objects.filter(scope.filter(name), after('updated_at', positions.get(name)),
+                                         updated_at__lt=horizon)
+                    .order_by('updated_at', 'id').values(*fields)[:limit])
+        if len(rows) == limit:
+            has_more = True
+            positions[name] = (rows[-1]['updated_at'], rows[-1]['id'])
+        else:
+            positions[name] = (horizon, 0)
+        hidden = HIDDEN_FROM_STUDENTS.get(name) if scope.student_id is not None else None
+        if hidden is not None:
+            result['deleted'][name].extend(row['id'] for row in rows if hidden(row))
+            rows = [row for row in rows if not hidden(row)]
+        result['changes'][name] = rows
+
+    tombstones = list(Tombstone.objects.filter(scope.tombstones(), after('deleted_at', tombstone_position),
+                                               deleted_at__lt=horizon)
+                      .order_by('deleted_at', 'id').values_list('deleted_at', 'id', 'entity', 'object_id')[:limit])
+    for _, _, entity, object_id in tombstones:
+        result['deleted'][entity].append(object_id)
+    if len(tombstones) == limit:
+        has_more = True
+        tombstone_position = tombstones[-1][:2]
+    else:
+        tombstone_position = (horizon, 0)
+
+    result['cursor'] = encode_cursor(positions, tombstone_position, scope.digest)
+    result['has_more'] = has_more
+    return result
@@ -0,0 +1,124 @@
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from academics.models import AcademicYear, Branch, Program, Semester, Subject
+from core.models import Faculty, Institute, Student, User
+from courses.models import Assignment, AssignmentSubmission, CourseOffering, Enrollment
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Bytes and latency of a full sync versus incremental /api/sync/ calls after a few changes (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=300)
+        parser.add_argument('--offerings', type=int, default=8)
+        parser.add_argument('--assignments', type=int, default=12, help='Per offering')
+        parser.add_argument('--limit', type=int, default=200)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic(), override_settings(SYNC_LAG_SECONDS=0):
+                student, faculty = self.seed(options['students'], options['offerings'], options['assignments'])
+                for label, user in (('student', student.user), ('faculty', faculty.user)):
+                    self.run(label, user, options['limit'])
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Synthetic data rolled back')
+
+    def seed(self, students, offerings, assignments):
+        today = date.today()
+        institute = Institute.objects.create(name='Sync Benchmark', subdomain='sync-benchmark', code='SYNCBENCH',
+                                             address='-', phone='0', email='bench@example.com',
+                                             established_date=date(2000, 1, 1))
+        program = Program.objects.create(institute=institute, name='Benchmark Program', code='BENCH', duration_years=4)
+        branch = Branch.objects.create(program=program, name='Benchmark Branch', code='BENCH')
+        year = AcademicYear.objects.create(program=program, year_number=1, name='Year 1')
+        semester = Semester.objects.create(academic_year=year, semester_number=1, name='Semester 1',
+                                           start_date=today, end_date=today, is_current=True)
+        password = make_password(None)
+        faculty = Faculty.objects.create(
+            user=User.objects.create(username='sync-bench-faculty', email='sync-bench@example.com', password=password),
+            employee_id='SYNCBENCH', department='-', designation='-', joining_date=today)
+        course_offerings = []
+        for number in range(offerings):
+            subject = Subject.objects.create(branch=branch, semester=semester, code=f'SYNC{number}',
+                                             name=f'Benchmark {number}', credits=3)
+            course_offerings.append(CourseOffering.objects.create(subject=subject, semester=semester, faculty=faculty,
+                                                                  schedule={'mon': '09:00', 'wed': '09:00'}))
+        created = Assignment.objects.bulk_create([
+            Assignment(course_offering=offering, title=f'Assignment {number}', description='Read the chapter. ' * 20,
+                       due_date=timezone.now() + timedelta(days=number), max_marks=10, is_published=number % 4 != 3)
+            for offering in course_offerings for number in range(assignments)
+        ])
+        users = User.objects.bulk_create([
+            User(username=f'sync{i}', email=f'sync{i}@example.com', password=password) for i in range(students)
+        ])
+        people = Student.objects.bulk_create([
+            Student(user=user, enrollment_number=f'SY{i:08d}', admission_date=today) for i, user in enumerate(users)
+        ])
+        Enrollment.objects.bulk_create([
+            Enrollment(student=student, course_offering=offering) for student in people for offering in course_offerings
+        ])
+        AssignmentSubmission.objects.bulk_create([
+            AssignmentSubmission(assignment=assignment, student=student, submission_text='-', marks_obtained=7,
+                                 feedback='Good work', status='graded', graded_date=timezone.now())
+            for student in people for assignment in created if assignment.is_published
+        ], batch_size=5000)
+        return people[0], faculty
+
+    def sync(self, client, cursor=None, limit=None):
+        """Follow has_more to the end; returns (cursor, bytes, calls, rows, seconds, queries per call)"""
+        size = calls = rows = queries = 0
+        started = time.perf_counter()
+        while True:
+            params = {'limit': limit} if limit else {}
+            if cursor:
+                params['cursor'] = cursor
+            with CaptureQueriesContext(connection) as captured:
+                response = client.get('/api/sync/', params, HTTP_ACCEPT='application/json')
+            queries += len(captured.captured_queries)
+            data = response.json()
+            size, calls = size + len(response.content), calls + 1
+            rows += sum(map(len, data['changes'].values())) + sum(map(len, data['deleted'].values()))
+            cursor = data['cursor']
+            if not data['has_more']:
+                return cursor, size, calls, rows, time.perf_counter() - started, queries / calls
+
+    def report(self, label, result):
+        _, size, calls, rows, elapsed, queries = result
+        self.stdout.write(f'  {label:30} {size / 1024:9.1f} KB  {calls:3} calls  {rows:6} rows  '
+                          f'{elapsed * 1000:8.1f} ms  {queries:.0f} queries/call')
+
+    def run(self, label, user, limit):
+        client = APIClient()
+        client.force_authenticate(user)
+        self.stdout.write(label)
+        full = self.sync(client, limit=limit)
+        self.report('full sync', full)
+        cursor = full[0]
+        self.report('nothing changed', self.sync(client, cursor, limit))
+
+        offering_ids = CourseOffering.objects.filter(faculty__user=user).values_list('pk', flat=True) or \
+            Enrollment.objects.filter(student__user=user).values_list('course_offering_id', flat=True)
+        submissions = AssignmentSubmission.objects.filter(assignment__course_offering_id__in=offering_ids)
+        if hasattr(user, 'student_profile'):
+            submissions = submissions.filter(student__user=user)
+        for submission in submissions.order_by('pk')[:3]:
+            submission.marks_obtained = 9
+            submission.save()
+        assignment = Assignment.objects.filter(course_offering_id__in=offering_ids, is_published=False).first()
+        assignment.is_published = True
+        assignment.save()
+        submissions.order_by('-pk').first().delete()
+        self.report('3 grades, 1 publish, 1 delete', self.sync(client, cursor, limit))
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(help_text="Feed the row belonged to, e.g. 'assignments'", max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('course_offering_id', models.BigIntegerField(null=True)),
+                ('student_id', models.BigIntegerField(null=True)),
+                ('faculty_id', models.BigIntegerField(null=True)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student_id', 'deleted_at', 'id'], name='sync_tombst_student_c7fe33_idx'), models.Index(fields=['faculty_id', 'deleted_at', 'id'], name='sync_tombst_faculty_cd5e22_idx'), models.Index(fields=['course_offering_id', 'deleted_at', 'id'], name='sync_tombst_course__4bc381_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import models
+
+
+class Tombstone(models.Model):
+    """A deleted row of a synced table, kept so offline clients can drop their copy"""
+    entity = models.CharField(max_length=20, help_text="Feed the row belonged to, e.g. 'assignments'")
+    object_id = models.BigIntegerField()
+    # Plain ids rather than foreign keys: tombstones outlive the rows they scope to
+    course_offering_id = models.BigIntegerField(null=True)
+    student_id = models.BigIntegerField(null=True)
+    faculty_id = models.BigIntegerField(null=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student_id', 'deleted_at', 'id']),
+            models.Index(fields=['faculty_id', 'deleted_at', 'id']),
+            models.Index(fields=['course_offering_id', 'deleted_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f"Deleted {self.entity} {self.object_id}"
@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete
+
+from courses.models import Assignment, AssignmentSubmission, CourseOffering, Enrollment
+from .feed import ENTITIES
+from .models import Tombstone
+
+
+def tombstone_scope(instance):
+    """The ids a tombstone is found by: the offering, plus the student or faculty member owning the row"""
+    if isinstance(instance, CourseOffering):
+        return {'course_offering_id': instance.pk, 'faculty_id': instance.faculty_id}
+    if isinstance(instance, AssignmentSubmission):
+        offering_id = Assignment.objects.filter(pk=instance.assignment_id).values_list(
+            'course_offering_id', flat=True).first()
+        return {'course_offering_id': offering_id, 'student_id': instance.student_id}
+    return {'course_offering_id': instance.course_offering_id, 'student_id': getattr(instance, 'student_id', None)}
+
+
+def record_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(entity=ENTITIES[sender], object_id=instance.pk, **tombstone_scope(instance))
+
+
+for model in (CourseOffering, Assignment, Enrollment, AssignmentSubmission):
+    post_delete.connect(record_tombstone, sender=model, dispatch_uid=f'sync_tombstone_{model._meta.label_lower}')
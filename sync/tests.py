@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from courses.models import Assignment
+from courses.tests import build_offering
+
+
+@override_settings(SYNC_LAG_SECONDS=0, SYNC_BATCH_SIZE=2)
+class ChangeFeedTests(TestCase):
+    """A cursor resumes exactly where the last batch ended and carries deletions"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.offering, cls.teacher, (cls.student,) = build_offering('SY', students=1)
+        cls.assignments = [
+            Assignment.objects.create(course_offering=cls.offering, title=f'Assignment {i}', description='Text',
+                                      due_date=timezone.now() + timedelta(days=7), max_marks=10, is_published=i != 2)
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def sync(self, cursor=None, **params):
+        response = self.client.get('/api/sync/', {**params, **({'cursor': cursor} if cursor else {})})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def drain(self, cursor=None):
+        seen, deleted = [], []
+        while True:
+            data = self.sync(cursor)
+            seen += [row['id'] for row in data['changes']['assignments']]
+            deleted += data['deleted']['assignments']
+            cursor = data['cursor']
+            if not data['has_more']:
+                return seen, deleted, cursor
+
+    def test_first_sync_pages_through_everything_once(self):
+        seen, deleted, _ = self.drain()
+        published = [a.pk for a in self.assignments if a.is_published]
+        self.assertEqual(sorted(seen), published)
+        # The unpublished assignment reaches students as a deletion
+        self.assertEqual(deleted, [self.assignments[2].pk])
+
+    def test_changes_and_deletions_after_the_cursor(self):
+        _, _, cursor = self.drain()
+        Assignment.objects.filter(pk=self.assignments[0].pk).update(title='Renamed', updated_at=timezone.now())
+        removed = self.assignments[1].pk
+        Assignment.objects.filter(pk=removed).delete()
+        seen, deleted, _ = self.drain(cursor)
+        self.assertEqual(seen, [self.assignments[0].pk])
+        self.assertEqual(deleted, [removed])
+
+    def test_validation(self):
+        for limit in ('-5', '0', 'x'):
+            self.assertEqual(self.client.get('/api/sync/', {'limit': limit}).status_code, 400)
+        self.assertEqual(self.client.get('/api/sync/', {'cursor': 'forged'}).status_code, 400)
+        self.assertEqual(len(self.sync(limit=1)['changes']['assignments']), 1)
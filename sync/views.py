@@ -0,0 +1,28 @@
+from rest_framework import status, permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .feed import ExpiredCursor, InvalidCursor, Scope, changes
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def change_feed(request):
+    """Offerings, assignments, enrollments and submissions created, updated or deleted since ?cursor="""
+    scope = Scope.for_user(request.user)
+    if scope is None:
+        return Response({'error': 'Only students and faculty have a change feed'}, status=status.HTTP_403_FORBIDDEN)
+    limit = request.query_params.get('limit')
+    try:
+        limit = int(limit) if limit else None
+    except ValueError:
+        return Response({'error': 'limit must be a positive number'}, status=status.HTTP_400_BAD_REQUEST)
+    if limit is not None and limit < 1:
+        return Response({'error': 'limit must be a positive number'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        return Response(changes(scope, request.query_params.get('cursor') or None, limit))
+    except InvalidCursor:
+        return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+    except ExpiredCursor:
+        return Response({'error': 'Cursor expired; discard local data and sync without a cursor'},
+                        status=status.HTTP_410_GONE)